@@ -0,0 +1,191 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Times the per frame throughput of the API 1.0, API 2.0 and C++ plugins.
+
+Every build gets the same scene, constraints following keyed targets going
+around circles, and the scene is played through with every constrained
+translate read each frame. The positions of each build are checked against
+the first one. The builds use the same node ids so only one is loaded at a
+time.
+
+Run it with mayapy to time the real plugins, the C++ one is only timed when
+the path to the compiled plugin is given. With any other Python the stand-in
+package in benchmarks/fakeMaya is used and only the Python builds are timed,
+the stand-in adds the same overhead to both so only compare them to each other.
+
+    mayapy benchmarks/apiBenchmark.py --nodes 1 100 --frames 200 --cpp build/sePushPullConstraint.so
+'''
+
+from __future__ import print_function
+
+import argparse
+import math
+import os
+import sys
+import time
+
+benchmarkDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarkDir))
+
+try:
+    import maya.standalone
+    inMaya = True
+except ImportError:
+    sys.path.insert(0, os.path.join(benchmarkDir, 'fakeMaya'))
+    inMaya = False
+
+timer = getattr(time, 'perf_counter', time.time)
+
+# the Python builds by the plugin file they are loaded from
+PYTHON_BUILDS = (('api1', 'sePushPullConstraint.py'), ('api2', 'sePushPullConstraint2.py'))
+
+def loadBuild(path):
+    '''Loads the plugin and returns what unloadBuild needs to take it out again'''
+    if inMaya:
+        import maya.cmds as cmds
+        cmds.loadPlugin(path, quiet=True)
+        return os.path.splitext(os.path.basename(path))[0]
+
+    # the stand-in has no plugin loading, the module registers itself instead
+    import maya.OpenMaya as OpenMaya
+    moduleName = os.path.splitext(os.path.basename(path))[0]
+    module = __import__(moduleName)
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        module.initializePlugin(OpenMaya.MObject())
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return module
+
+def unloadBuild(loaded):
+    '''Clears the scene and unloads the plugin'''
+    newScene()
+    if inMaya:
+        import maya.cmds as cmds
+        cmds.unloadPlugin(loaded, force=True)
+    else:
+        import maya.OpenMaya as OpenMaya
+        loaded.uninitializePlugin(OpenMaya.MObject())
+
+def newScene():
+    if inMaya:
+        import maya.cmds as cmds
+        cmds.file(new=True, force=True)
+    else:
+        import maya.OpenMaya as OpenMaya
+        OpenMaya.newScene()
+
+def buildScene(numNodes, numFrames, radius=5.0):
+    '''Creates the constraints with targets keyed on a circle, returns the
+    constrained transform names'''
+    import maya.cmds as cmds
+    newScene()
+
+    constrainedNames = []
+    for i in range(numNodes):
+        target = cmds.createNode('transform', name='target%d' % i)
+        constrained = cmds.createNode('transform', name='constrained%d' % i)
+        cmds.setAttr(constrained + '.translate', radius + 2.0, 0.0, 0.0)
+
+        for frame in range(numFrames):
+            angle = i * 0.01 + frame * 0.1
+            cmds.setKeyframe(target, attribute='translateX', time=frame, value=radius * math.cos(angle))
+            cmds.setKeyframe(target, attribute='translateZ', time=frame, value=radius * math.sin(angle))
+
+        # only the flags the C++ command has too
+        cmds.currentTime(0)
+        cmds.sePushPullConstraint(target, constrained, distance=2.0, startFrame=1.0)
+        constrainedNames.append(constrained)
+    return constrainedNames
+
+def playScene(constrainedNames, numFrames):
+    '''Reads every constrained translate on every frame, returns the time taken
+    and the positions on the last frame'''
+    import maya.cmds as cmds
+    cmds.currentTime(0)
+
+    start = timer()
+    for frame in range(numFrames):
+        cmds.currentTime(frame)
+        positions = [cmds.getAttr(name + '.translate')[0] for name in constrainedNames]
+    seconds = timer() - start
+    return seconds, positions
+
+def benchmarkBuild(path, nodeCounts, numFrames):
+    '''Times the build at every node count'''
+    loaded = loadBuild(path)
+    results = []
+    try:
+        for numNodes in nodeCounts:
+            constrainedNames = buildScene(numNodes, numFrames)
+            seconds, positions = playScene(constrainedNames, numFrames)
+            results.append({'nodes': numNodes,
+                            'seconds': seconds,
+                            'framesPerSecond': numFrames / seconds,
+                            'computesPerSecond': numFrames * numNodes / seconds,
+                            'positions': positions})
+    finally:
+        unloadBuild(loaded)
+    return results
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--nodes', type=int, nargs='+', default=[1, 10, 100], help='constraint counts to time')
+    parser.add_argument('--frames', type=int, default=100, help='frames to play through')
+    parser.add_argument('--cpp', help='path to the compiled plugin, only used with mayapy')
+    options = parser.parse_args(args)
+
+    if inMaya:
+        maya.standalone.initialize(name='python')
+    else:
+        import maya.cmds as cmds
+        import maya.OpenMayaMPx as OpenMayaMPx
+
+        # the stand-in commands are not in maya.cmds, run them like MEL would
+        def sePushPullConstraint(*objects, **flags):
+            args = []
+            for name, value in flags.items():
+                args.extend(['-' + name, value])
+            return OpenMayaMPx.runCommand('sePushPullConstraint', *(args + list(objects))).currentResult()
+        cmds.sePushPullConstraint = sePushPullConstraint
+
+    builds = [(name, os.path.join(os.path.dirname(benchmarkDir), fileName)) for name, fileName in PYTHON_BUILDS]
+    if options.cpp:
+        if inMaya:
+            builds.append(('cpp', os.path.abspath(options.cpp)))
+        else:
+            print('The C++ plugin can only be timed with mayapy, skipping it.')
+
+    print('%-6s %8s %12s %14s %10s' % ('build', 'nodes', 'frames/sec', 'computes/sec', 'match'))
+    expected = None
+    for name, path in builds:
+        results = benchmarkBuild(path, options.nodes, options.frames)
+        if expected is None:
+            expected = results
+
+        for result, reference in zip(results, expected):
+            # the builds invert the parent matrix differently so allow for rounding
+            match = all(abs(a - b) < 1e-9 for p, q in zip(result['positions'], reference['positions'])
+                        for a, b in zip(p, q))
+            print('%-6s %8d %12.1f %14.1f %10s' % (name, result['nodes'], result['framesPerSecond'],
+                                                   result['computesPerSecond'], match))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1709 @@
+'''Stand-in for the parts of maya.OpenMaya used by the plugin.
+
+The scene is a list of nodes, transforms can have a parent set with
+cmds.parent. A transform only has a translate and a rotate Y which make its
+local matrix, there are no pivots, scale or instances.
+'''
+
+import array
+import math
+import uuid
+
+## SCENE
+
+class _Scene(object):
+    '''Holds every node, connection and the current time'''
+
+    def __init__(self):
+        self.nodes = []
+        self.connections = {}
+        self.selection = []
+        self.currentTime = 1.0
+        self.minTime = 1.0
+        self.maxTime = 120.0
+        self.nodeTypes = {}
+
+    def findNode(self, name):
+        for node in self.nodes:
+            if node.name == name:
+                return node
+        return None
+
+    def uniqueName(self, name):
+        '''Adds a number to the name if it is already used, like Maya does'''
+        if not name.endswith('#') and self.findNode(name) is None:
+            return name
+
+        base = name.rstrip('#').rstrip('0123456789')
+        names = set(node.name for node in self.nodes)
+        index = 1
+        while '%s%d' % (base, index) in names:
+            index += 1
+        return '%s%d' % (base, index)
+
+_scene = _Scene()
+
+def newScene():
+    '''Removes everything from the scene, the registered node types are kept'''
+    nodeTypes = _scene.nodeTypes
+    _scene.__init__()
+    _scene.nodeTypes = nodeTypes
+
+    # every scene has a time node
+    createNode('time', 'time1')
+
+## BASICS
+
+class MStatus(object):
+    kSuccess = 'kSuccess'
+    kFailure = 'kFailure'
+    kUnknownParameter = 'kUnknownParameter'
+
+class MTypeId(object):
+    def __init__(self, typeId=0):
+        self._id = typeId
+
+    def id(self):
+        return self._id
+
+    def __eq__(self, other):
+        return isinstance(other, MTypeId) and other._id == self._id
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._id)
+
+class MObject(object):
+    '''Handle to a node, an attribute or a data object'''
+
+    def __init__(self, other=None):
+        self._node = other._node if isinstance(other, MObject) else None
+
+    def isNull(self):
+        return self._node is None
+
+    def hasFn(self, fnType):
+        nodeType = getattr(self._node, 'fnType', None)
+        if fnType == MFn.kDagNode:
+            # transforms are the only DAG nodes
+            return nodeType == MFn.kTransform
+        return self._node is not None and nodeType == fnType
+
+    def __eq__(self, other):
+        return isinstance(other, MObject) and self._node is other._node
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return id(self._node)
+
+class MUuid(object):
+    def __init__(self, value=''):
+        self._value = value
+
+    def asString(self):
+        return self._value
+
+class MObjectHandle(object):
+    def __init__(self, obj=None):
+        self._node = obj._node if obj is not None else None
+
+    def object(self):
+        obj = MObject()
+        obj._node = self._node
+        return obj
+
+    def isValid(self):
+        return self._node is not None and self._node in _scene.nodes
+
+    def isAlive(self):
+        return self._node is not None
+
+    def hashCode(self):
+        return id(self._node)
+
+class MFn(object):
+    kInvalid = 0
+    kTime = 1
+    kTransform = 2
+    kPluginDependNode = 3
+    kAnimCurve = 4
+    kDagNode = 5
+
+class MSpace(object):
+    kInvalid = 0
+    kTransform = 1
+    kPreTransform = 2
+    kPostTransform = 3
+    kWorld = 4
+    kObject = kPreTransform
+
+class MGlobal(object):
+    messages = []
+
+    @staticmethod
+    def displayInfo(message):
+        MGlobal.messages.append(('info', message))
+
+    @staticmethod
+    def displayWarning(message):
+        MGlobal.messages.append(('warning', message))
+
+    @staticmethod
+    def displayError(message):
+        MGlobal.messages.append(('error', message))
+
+    @staticmethod
+    def getActiveSelectionList(selectionList):
+        selectionList.clear()
+        for name in _scene.selection:
+            selectionList.add(name)
+
+class _Array(list):
+    '''Base of the M*Array classes'''
+
+    def length(self):
+        return len(self)
+
+    def clear(self):
+        del self[:]
+
+    def setLength(self, length):
+        del self[length:]
+
+class MIntArray(_Array):
+    pass
+
+class MDoubleArray(_Array):
+    pass
+
+class MStringArray(_Array):
+    pass
+
+class MPlugArray(_Array):
+    pass
+
+class MObjectArray(_Array):
+    pass
+
+class MPointArray(_Array):
+    pass
+
+class MTimeArray(_Array):
+    pass
+
+## MATH
+
+class MVector(object):
+    def __init__(self, *args):
+        if not args:
+            self.x = self.y = self.z = 0.0
+        elif len(args) == 1:
+            self.x, self.y, self.z = args[0].x, args[0].y, args[0].z
+        else:
+            self.x, self.y, self.z = float(args[0]), float(args[1]), float(args[2])
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normalize(self):
+        length = self.length()
+        if length > 0.0:
+            self.x /= length
+            self.y /= length
+            self.z /= length
+        return self
+
+    def normal(self):
+        return MVector(self).normalize()
+
+    def __mul__(self, other):
+        if isinstance(other, MMatrix):
+            m = other._m
+            return MVector(self.x * m[0][0] + self.y * m[1][0] + self.z * m[2][0],
+                           self.x * m[0][1] + self.y * m[1][1] + self.z * m[2][1],
+                           self.x * m[0][2] + self.y * m[1][2] + self.z * m[2][2])
+        if isinstance(other, MVector):
+            return self.x * other.x + self.y * other.y + self.z * other.z
+        return MVector(self.x * other, self.y * other, self.z * other)
+
+    def __imul__(self, scale):
+        self.x *= scale
+        self.y *= scale
+        self.z *= scale
+        return self
+
+    def __add__(self, other):
+        return MVector(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return MVector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __neg__(self):
+        return MVector(-self.x, -self.y, -self.z)
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __repr__(self):
+        return 'MVector(%g, %g, %g)' % (self.x, self.y, self.z)
+
+class MPoint(object):
+    def __init__(self, *args):
+        self.w = 1.0
+        if not args:
+            self.x = self.y = self.z = 0.0
+        elif len(args) == 1:
+            self.x, self.y, self.z = args[0].x, args[0].y, args[0].z
+        else:
+            self.x, self.y, self.z = float(args[0]), float(args[1]), float(args[2])
+            if len(args) > 3:
+                self.w = float(args[3])
+
+    def __mul__(self, matrix):
+        m = matrix._m
+        return MPoint(self.x * m[0][0] + self.y * m[1][0] + self.z * m[2][0] + m[3][0],
+                      self.x * m[0][1] + self.y * m[1][1] + self.z * m[2][1] + m[3][1],
+                      self.x * m[0][2] + self.y * m[1][2] + self.z * m[2][2] + m[3][2])
+
+    def __add__(self, vector):
+        return MPoint(self.x + vector.x, self.y + vector.y, self.z + vector.z)
+
+    def __sub__(self, other):
+        if isinstance(other, MPoint):
+            return MVector(self.x - other.x, self.y - other.y, self.z - other.z)
+        return MPoint(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def distanceTo(self, other):
+        return (self - other).length()
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z, self.w)[index]
+
+    def __len__(self):
+        return 4
+
+    def __repr__(self):
+        return 'MPoint(%g, %g, %g)' % (self.x, self.y, self.z)
+
+class MMatrix(object):
+    def __init__(self, rows=None):
+        if rows is None:
+            self._m = [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0], [0.0, 0.0, 0.0, 1.0]]
+        elif isinstance(rows, MMatrix):
+            self._m = [list(row) for row in rows._m]
+        else:
+            self._m = [[float(v) for v in row] for row in rows]
+
+    def __call__(self, row, column):
+        return self._m[row][column]
+
+    def __getitem__(self, row):
+        return self._m[row]
+
+    def __mul__(self, other):
+        a = self._m
+        b = other._m
+        return MMatrix([[sum(a[r][k] * b[k][c] for k in range(4)) for c in range(4)] for r in range(4)])
+
+    def __eq__(self, other):
+        return isinstance(other, MMatrix) and self._m == other._m
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def inverse(self):
+        '''Gauss-Jordan inverse with partial pivoting'''
+        m = [list(row) + [1.0 if r == c else 0.0 for c in range(4)] for r, row in enumerate(self._m)]
+        for column in range(4):
+            pivot = max(range(column, 4), key=lambda r: abs(m[r][column]))
+            if m[pivot][column] == 0.0:
+                raise RuntimeError('(kFailure): Matrix is singular')
+            m[column], m[pivot] = m[pivot], m[column]
+
+            scale = 1.0 / m[column][column]
+            m[column] = [v * scale for v in m[column]]
+            for r in range(4):
+                if r != column and m[r][column] != 0.0:
+                    factor = m[r][column]
+                    m[r] = [a - factor * b for a, b in zip(m[r], m[column])]
+
+        return MMatrix([row[4:] for row in m])
+
+    def isEquivalent(self, other, tolerance=1e-10):
+        return all(abs(a - b) <= tolerance for ra, rb in zip(self._m, other._m) for a, b in zip(ra, rb))
+
+def _translationMatrix(x, y, z):
+    matrix = MMatrix()
+    matrix._m[3][0:3] = [float(x), float(y), float(z)]
+    return matrix
+
+class MTime(object):
+    kInvalid = 0
+    kHours = 1
+    kMinutes = 2
+    kSeconds = 3
+    kMilliseconds = 4
+    kGames = 5
+    kFilm = 6
+    kPALFrame = 7
+    kNTSCFrame = 8
+
+    def __init__(self, value=0.0, unit=kFilm):
+        if isinstance(value, MTime):
+            self._value, self._unit = value._value, value._unit
+        else:
+            self._value, self._unit = float(value), unit
+
+    def value(self):
+        return self._value
+
+    def unit(self):
+        return self._unit
+
+    def setValue(self, value):
+        self._value = float(value)
+
+    def asUnits(self, unit):
+        return self._value
+
+    @staticmethod
+    def uiUnit():
+        return MTime.kFilm
+
+    def __eq__(self, other):
+        return isinstance(other, MTime) and other._value == self._value
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return 'MTime(%g)' % self._value
+
+class MDGContext(object):
+    fsNormal = None
+
+    def __init__(self, time=None):
+        self._time = time
+
+    def isNormal(self):
+        return self._time is None
+
+    def getTime(self):
+        return MTime(self._time)
+
+MDGContext.fsNormal = MDGContext()
+
+## ATTRIBUTES
+
+class _Attribute(MObject):
+    '''An attribute definition, the MObject returned by the attribute function sets'''
+
+    def __init__(self, name, shortName, kind, default=None):
+        MObject.__init__(self)
+        self._node = self
+        self.name = name
+        self.shortName = shortName
+        self.kind = kind
+        self.default = default
+        self.children = []
+        self.parent = None
+        self.array = False
+        self.flags = {'readable': True, 'writable': True, 'storable': True, 'keyable': False, 'hidden': False}
+
+    def defaultValue(self):
+        if isinstance(self.default, MMatrix):
+            return MMatrix(self.default)
+        if isinstance(self.default, MTime):
+            return MTime(self.default)
+        return self.default
+
+    def __repr__(self):
+        return '<attribute %s>' % self.name
+
+class MFnAttribute(object):
+    def __init__(self, attribute=None):
+        self._attr = attribute
+
+    def object(self):
+        return self._attr
+
+    def name(self):
+        return self._attr.name
+
+    def _set(self, flag, value):
+        self._attr.flags[flag] = value
+
+    def setReadable(self, value):
+        self._set('readable', value)
+
+    def setWritable(self, value):
+        self._set('writable', value)
+
+    def setStorable(self, value):
+        self._set('storable', value)
+
+    def setKeyable(self, value):
+        self._set('keyable', value)
+
+    def setHidden(self, value):
+        self._set('hidden', value)
+
+    def setCached(self, value):
+        self._set('cached', value)
+
+    def setConnectable(self, value):
+        self._set('connectable', value)
+
+    def setUsedAsFilename(self, value):
+        self._set('usedAsFilename', value)
+
+    def setArray(self, value):
+        self._attr.array = value
+
+    def setUsesArrayDataBuilder(self, value):
+        self._set('usesArrayDataBuilder', value)
+
+    def setIndexMatters(self, value):
+        self._set('indexMatters', value)
+
+    def setDisconnectBehavior(self, value):
+        self._set('disconnectBehavior', value)
+
+    def setAffectsAppearance(self, value):
+        self._set('affectsAppearance', value)
+
+class MFnNumericData(object):
+    kInvalid = 0
+    kBoolean = 1
+    kByte = 2
+    kChar = 3
+    kShort = 4
+    kInt = 7
+    kLong = kInt
+    kFloat = 11
+    kDouble = 14
+    k3Double = 17
+
+    def __init__(self, obj=None):
+        self._obj = obj
+
+class MFnData(object):
+    kInvalid = 0
+    kNumeric = 1
+    kString = 4
+    kMatrix = 5
+    kMesh = 12
+
+class MFnNumericAttribute(MFnAttribute):
+    def create(self, name, shortName, typeOrChild, default=0.0, *children):
+        if isinstance(typeOrChild, _Attribute):
+            # a compound of the three numeric children
+            children = (typeOrChild, default) + children
+            self._attr = _Attribute(name, shortName, MFnNumericData.k3Double, tuple(c.default for c in children))
+            for child in children:
+                child.parent = self._attr
+                self._attr.children.append(child)
+            return self._attr
+
+        if typeOrChild == MFnNumericData.kBoolean:
+            default = bool(default)
+        elif typeOrChild == MFnNumericData.kInt:
+            default = int(default)
+        else:
+            default = float(default)
+        self._attr = _Attribute(name, shortName, typeOrChild, default)
+        return self._attr
+
+    def setMin(self, *value):
+        self._set('min', value)
+
+    def setMax(self, *value):
+        self._set('max', value)
+
+    def setSoftMin(self, *value):
+        self._set('softMin', value)
+
+    def setSoftMax(self, *value):
+        self._set('softMax', value)
+
+    def setDefault(self, *value):
+        self._attr.default = value[0] if len(value) == 1 else tuple(value)
+
+class MFnUnitAttribute(MFnAttribute):
+    kInvalid = 0
+    kAngle = 1
+    kDistance = 2
+    kTime = 3
+
+    def create(self, name, shortName, unitType, default=0.0):
+        value = MTime(default) if unitType == MFnUnitAttribute.kTime else float(default)
+        self._attr = _Attribute(name, shortName, ('unit', unitType), value)
+        return self._attr
+
+class MFnMatrixAttribute(MFnAttribute):
+    kFloat = 0
+    kDouble = 1
+
+    def create(self, name, shortName, matrixType=kDouble):
+        self._attr = _Attribute(name, shortName, 'matrix', MMatrix())
+        return self._attr
+
+class MFnTypedAttribute(MFnAttribute):
+    def create(self, name, shortName, dataType, default=None):
+        self._attr = _Attribute(name, shortName, ('typed', dataType), '' if dataType == MFnData.kString else None)
+        return self._attr
+
+class MFnEnumAttribute(MFnAttribute):
+    def create(self, name, shortName, default=0):
+        self._attr = _Attribute(name, shortName, MFnNumericData.kShort, int(default))
+        self._attr.fields = []
+        return self._attr
+
+    def addField(self, fieldName, value):
+        self._attr.fields.append((fieldName, value))
+
+class MFnCompoundAttribute(MFnAttribute):
+    def create(self, name, shortName):
+        self._attr = _Attribute(name, shortName, 'compound')
+        return self._attr
+
+    def addChild(self, child):
+        child.parent = self._attr
+        self._attr.children.append(child)
+
+class _MatrixData(MObject):
+    def __init__(self, matrix):
+        MObject.__init__(self)
+        self._node = self
+        self.matrix = matrix
+
+class MFnMatrixData(object):
+    def __init__(self, obj=None):
+        self._obj = obj
+
+    def create(self, matrix=None):
+        self._obj = _MatrixData(MMatrix(matrix))
+        return self._obj
+
+    def matrix(self):
+        return MMatrix(self._obj.matrix)
+
+    def set(self, matrix):
+        self._obj.matrix = MMatrix(matrix)
+
+class _MeshData(MObject):
+    def __init__(self):
+        MObject.__init__(self)
+        self._node = self
+        self.points = []
+        self.counts = []
+        self.connects = []
+
+class _Pointer(object):
+    '''A pointer returned by the API, int gives its address'''
+
+    def __init__(self, address):
+        self.address = address
+
+    def __int__(self):
+        return self.address
+
+    __long__ = __int__
+
+class MFnMeshData(object):
+    def create(self):
+        return _MeshData()
+
+class MFnMesh(object):
+    '''Polygons of a mesh data object, the points have no world space of their own'''
+
+    def __init__(self, obj=None):
+        self._obj = obj
+
+    def create(self, numVertices, numPolygons, vertexArray, polygonCounts, polygonConnects, parent):
+        parent.points = [MPoint(p) for p in vertexArray]
+        parent.counts = list(polygonCounts)
+        parent.connects = list(polygonConnects)
+        self._obj = parent
+        return parent
+
+    def numVertices(self):
+        return len(self._obj.points)
+
+    def numPolygons(self):
+        return len(self._obj.counts)
+
+    def numFaceVertices(self):
+        return len(self._obj.connects)
+
+    def getPoints(self, pointArray, space=MSpace.kObject):
+        pointArray[:] = [MPoint(p) for p in self._obj.points]
+
+    def setPoints(self, pointArray, space=MSpace.kObject):
+        self._obj.points = [MPoint(p) for p in pointArray]
+
+    def getRawPoints(self):
+        '''The points as x, y, z floats, returned as the address of the first
+        one like the float pointer Maya returns. The floats are kept on the data.'''
+        self._obj.rawPoints = array.array('f', [v for p in self._obj.points for v in (p.x, p.y, p.z)])
+        return _Pointer(self._obj.rawPoints.buffer_info()[0])
+
+    def getTriangles(self, triangleCounts, triangleVertices):
+        '''Fans every polygon out from its first point'''
+        triangleCounts[:] = [count - 2 for count in self._obj.counts]
+        del triangleVertices[:]
+        start = 0
+        for count in self._obj.counts:
+            face = self._obj.connects[start:start + count]
+            for i in range(1, count - 1):
+                triangleVertices.extend((face[0], face[i], face[i + 1]))
+            start += count
+
+## NODES
+
+class _Node(object):
+    '''A node in the scene, the values of every leaf plug are kept in a dict by plug path'''
+
+    def __init__(self, typeName, name, attributes, typeId=None, mpx=None, fnType=MFn.kPluginDependNode):
+        self.typeName = typeName
+        self.name = name
+        self.attributes = attributes
+        self.typeId = typeId
+        self.mpx = mpx
+        self.fnType = fnType
+        self.values = {}
+        self.getters = {}
+        self.uuid = str(uuid.uuid4()).upper()
+
+        self.attributesByName = {}
+        def addNames(attrs):
+            for attr in attrs:
+                self.attributesByName[attr.name] = attr
+                self.attributesByName[attr.shortName] = attr
+                addNames(attr.children)
+        addNames(attributes)
+
+    def attributePath(self, attr):
+        '''Returns the path from the root to the attribute, not in an array element'''
+        path = []
+        while attr is not None:
+            path.insert(0, (attr, None))
+            attr = attr.parent
+        return tuple(path)
+
+class _NodeType(object):
+    def __init__(self, name, typeId, creator, initializer, fnType=MFn.kPluginDependNode):
+        self.name = name
+        self.typeId = typeId
+        self.creator = creator
+        self.initializer = initializer
+        self.fnType = fnType
+        self.attributes = []
+
+def _builtinAttributes(typeName):
+    '''Attributes of the few built in node types'''
+    numericFn = MFnNumericAttribute()
+    matrixFn = MFnMatrixAttribute()
+    unitFn = MFnUnitAttribute()
+
+    if typeName == 'transform':
+        x = numericFn.create('translateX', 'tx', MFnNumericData.kDouble, 0.0)
+        y = numericFn.create('translateY', 'ty', MFnNumericData.kDouble, 0.0)
+        z = numericFn.create('translateZ', 'tz', MFnNumericData.kDouble, 0.0)
+        translate = numericFn.create('translate', 't', x, y, z)
+        rotateY = numericFn.create('rotateY', 'ry', MFnNumericData.kDouble, 0.0)
+        matrix = matrixFn.create('matrix', 'm')
+        worldMatrix = matrixFn.create('worldMatrix', 'wm')
+        worldMatrix.array = True
+        parentMatrix = matrixFn.create('parentMatrix', 'pm')
+        parentMatrix.array = True
+        return [translate, rotateY, matrix, worldMatrix, parentMatrix], MFn.kTransform
+
+    if typeName == 'time':
+        return [unitFn.create('outTime', 'o', MFnUnitAttribute.kTime, 1.0)], MFn.kTime
+
+    if typeName.startswith('animCurve'):
+        inputTime = unitFn.create('input', 'i', MFnUnitAttribute.kTime, 0.0)
+        output = numericFn.create('output', 'o', MFnNumericData.kDouble, 0.0)
+        return [inputTime, output], MFn.kAnimCurve
+
+    raise RuntimeError('Unknown node type: %s' % typeName)
+
+def createNode(typeName, name=None):
+    '''Creates a node in the scene and returns it'''
+    nodeType = _scene.nodeTypes.get(typeName)
+    if nodeType is not None:
+        mpx = nodeType.creator()
+        node = _Node(typeName, _scene.uniqueName(name or typeName + '#'), nodeType.attributes,
+                     nodeType.typeId, mpx, nodeType.fnType)
+        mpx._fakeNode = node
+    else:
+        attributes, fnType = _builtinAttributes(typeName)
+        node = _Node(typeName, _scene.uniqueName(name or typeName + '#'), attributes, fnType=fnType)
+
+    if typeName == 'transform':
+        node.parent = None
+        node.getters['matrix'] = lambda plug: _transformMatrix(node)
+        node.getters['worldMatrix'] = lambda plug: _transformWorldMatrix(node)
+        node.getters['parentMatrix'] = lambda plug: _transformParentMatrix(node)
+    elif typeName == 'time':
+        node.getters['outTime'] = lambda plug: MTime(_scene.currentTime)
+    elif typeName.startswith('animCurve'):
+        node.keys = {}
+        node.getters['output'] = lambda plug: _evaluateCurve(node, _scene.currentTime)
+
+    _scene.nodes.append(node)
+    return node
+
+def _registerNodeType(name, typeId, creator, initializer):
+    '''Adds a plugin node type and runs its initializer like MFnPlugin.registerNode'''
+    if name in _scene.nodeTypes:
+        raise RuntimeError('(kFailure): Node type %s is already registered' % name)
+
+    nodeType = _NodeType(name, typeId, creator, initializer)
+    _initializingTypes.append(nodeType)
+    try:
+        initializer()
+    finally:
+        _initializingTypes.pop()
+    _scene.nodeTypes[name] = nodeType
+
+# the node types currently running their initializer, MPxNode.addAttribute adds to the last one
+_initializingTypes = []
+
+def _transformMatrix(node):
+    '''The local matrix is the rotate Y then the translate, there are no pivots'''
+    translate = MPlug(node, node.attributePath(node.attributesByName['translate']))
+    matrix = _translationMatrix(*[translate.child(i).asDouble() for i in range(3)])
+    angle = math.radians(MPlug(node, node.attributePath(node.attributesByName['rotateY'])).asDouble())
+    c, s = math.cos(angle), math.sin(angle)
+    matrix._m[0][0], matrix._m[0][2], matrix._m[2][0], matrix._m[2][2] = c, -s, s, c
+    return matrix
+
+def _transformParentMatrix(node):
+    if node.parent is None:
+        return MMatrix()
+    return _transformWorldMatrix(node.parent)
+
+def _transformWorldMatrix(node):
+    return _transformMatrix(node) * _transformParentMatrix(node)
+
+def _evaluateCurve(node, time):
+    '''Linear interpolation of the curve keys'''
+    if not node.keys:
+        return 0.0
+    times = sorted(node.keys)
+    if time <= times[0]:
+        return node.keys[times[0]]
+    if time >= times[-1]:
+        return node.keys[times[-1]]
+    for low, high in zip(times, times[1:]):
+        if low <= time <= high:
+            weight = (time - low) / (high - low)
+            return node.keys[low] + (node.keys[high] - node.keys[low]) * weight
+
+def _nodeObject(node):
+    obj = MObject()
+    obj._node = node
+    return obj
+
+## PLUGS
+
+class MPlug(object):
+    '''A plug is a node and a path of (attribute, element index) steps from the root attribute'''
+
+    def __init__(self, node=None, attribute=None):
+        if isinstance(node, MObject):
+            node = node._node
+        self._node = node
+
+        if isinstance(attribute, tuple):
+            self._path = attribute
+        elif attribute is not None:
+            self._path = node.attributePath(attribute)
+        else:
+            self._path = ()
+
+    def __eq__(self, other):
+        if isinstance(other, MPlug):
+            return self._node is other._node and self._path == other._path
+        if isinstance(other, MObject):
+            return self.attribute() is other
+        return False
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((id(self._node), self._path))
+
+    def isNull(self):
+        return not self._path
+
+    def attribute(self):
+        return self._path[-1][0]
+
+    def node(self):
+        return _nodeObject(self._node)
+
+    def name(self):
+        return '%s.%s' % (self._node.name, self.partialName())
+
+    def partialName(self, *args):
+        return '.'.join(attr.name + ('[%d]' % index if index is not None else '') for attr, index in self._path)
+
+    def isChild(self):
+        return len(self._path) > 1
+
+    def isCompound(self):
+        return bool(self.attribute().children)
+
+    def isArray(self):
+        return self.attribute().array and self._path[-1][1] is None
+
+    def isElement(self):
+        return self._path[-1][1] is not None
+
+    def parent(self):
+        return MPlug(self._node, self._path[:-1])
+
+    def array(self):
+        return MPlug(self._node, self._path[:-1] + ((self.attribute(), None),))
+
+    def numChildren(self):
+        return len(self.attribute().children)
+
+    def child(self, child):
+        if not isinstance(child, _Attribute):
+            child = self.attribute().children[child]
+        return MPlug(self._node, self._path + ((child, None),))
+
+    def elementByLogicalIndex(self, index):
+        return MPlug(self._node, self._path[:-1] + ((self.attribute(), index),))
+
+    def logicalIndex(self):
+        return self._path[-1][1]
+
+    def getExistingArrayAttributeIndices(self, indices):
+        '''Fills the array with the logical indices that have a value or connection'''
+        del indices[:]
+        found = set()
+        depth = len(self._path) - 1
+        keys = list(self._node.values) + [key[1] for key in _scene.connections if key[0] is self._node]
+        keys += [source._path for dest, source in _scene.connections.items() if source._node is self._node]
+        for path in keys:
+            if len(path) > depth and path[:depth] == self._path[:depth] and path[depth][0] is self.attribute():
+                if path[depth][1] is not None:
+                    found.add(path[depth][1])
+        indices.extend(sorted(found))
+        return len(indices)
+
+    def numElements(self):
+        return self.getExistingArrayAttributeIndices(MIntArray())
+
+    ## values
+
+    def _source(self):
+        '''Returns the plug and the child path driving this plug or None'''
+        connections = _scene.connections
+        for depth in range(len(self._path), 0, -1):
+            source = connections.get((self._node, self._path[:depth]))
+            if source is not None:
+                return source, self._path[depth:]
+        return None
+
+    def _leafPlugs(self):
+        attr = self.attribute()
+        if attr.children:
+            return [self.child(i) for i in range(len(attr.children))]
+        return None
+
+    def _value(self):
+        '''Returns the value of the plug, following connections and running compute'''
+        driven = self._source()
+        if driven is not None:
+            # the children of the source and destination match by position
+            plug, childPath = driven
+            parentAttr = self._path[len(self._path) - len(childPath) - 1][0]
+            for attr, index in childPath:
+                plug = plug.child(parentAttr.children.index(attr))
+                parentAttr = attr
+            return plug._value()
+
+        children = self._leafPlugs()
+        if children is not None:
+            return tuple(child._value() for child in children)
+
+        attr = self.attribute()
+        getter = self._node.getters.get(attr.name)
+        if getter is not None:
+            return getter(self)
+
+        if self._isComputed():
+            _computePlug(self)
+
+        return self._node.values.get(self._path, attr.defaultValue())
+
+    def _isComputed(self):
+        '''Returns True if the plug is an output of a plugin node'''
+        if self._node.mpx is None:
+            return False
+        root = self._path[0][0]
+        return root in getattr(type(self._node.mpx), '_affected', ())
+
+    def _setValue(self, value):
+        children = self._leafPlugs()
+        if children is not None:
+            for child, childValue in zip(children, value):
+                child._setValue(childValue)
+            return
+        self._node.values[self._path] = value
+        _setDirty(self)
+
+    def asDouble(self, context=None):
+        return float(self._valueAt(context))
+
+    def asFloat(self, context=None):
+        return float(self._valueAt(context))
+
+    def asInt(self, context=None):
+        return int(self._valueAt(context))
+
+    def asShort(self, context=None):
+        return int(self._valueAt(context))
+
+    def asBool(self, context=None):
+        return bool(self._valueAt(context))
+
+    def asString(self, context=None):
+        return self._valueAt(context)
+
+    def asMTime(self, context=None):
+        return MTime(self._valueAt(context))
+
+    def asMObject(self, context=None):
+        value = self._valueAt(context)
+        if value is None:
+            return MObject()
+        if isinstance(value, MObject):
+            return value
+        return _MatrixData(value)
+
+    def _valueAt(self, context):
+        if context is None or context.isNormal():
+            return self._value()
+
+        # evaluate at another time by moving the scene time while reading
+        currentTime = _scene.currentTime
+        _scene.currentTime = context.getTime().value()
+        try:
+            return self._value()
+        finally:
+            _scene.currentTime = currentTime
+
+    def setDouble(self, value):
+        self._setValue(float(value))
+
+    def setFloat(self, value):
+        self._setValue(float(value))
+
+    def setInt(self, value):
+        self._setValue(int(value))
+
+    def setShort(self, value):
+        self._setValue(int(value))
+
+    def setBool(self, value):
+        self._setValue(bool(value))
+
+    def setString(self, value):
+        self._setValue(value)
+
+    def setMTime(self, value):
+        self._setValue(MTime(value))
+
+    def setMObject(self, value):
+        if isinstance(value, _MatrixData):
+            self._setValue(MMatrix(value.matrix))
+        else:
+            self._setValue(value)
+
+    def connectedTo(self, plugs, asDestination, asSource):
+        '''Fills the array with the plugs connected to this one'''
+        del plugs[:]
+        if asDestination:
+            source = _scene.connections.get((self._node, self._path))
+            if source is not None:
+                plugs.append(source)
+        if asSource:
+            for (node, path), source in _scene.connections.items():
+                if source == self:
+                    plugs.append(MPlug(node, path))
+        return bool(plugs)
+
+    def isConnected(self):
+        return self.connectedTo(MPlugArray(), True, True)
+
+def _disconnect(key):
+    '''Removes the connection to the (node, path) destination and tells the
+    plugin nodes at both ends, returns the source plug or None'''
+    source = _scene.connections.pop(key, None)
+    if source is not None:
+        destination = MPlug(*key)
+        if destination._node.mpx is not None:
+            destination._node.mpx._connectionBroken(destination, source, False)
+        if source._node.mpx is not None:
+            source._node.mpx._connectionBroken(source, destination, True)
+        _setDirty(destination)
+    return source
+
+def _setDirty(plug):
+    '''Tells a plugin node its plug changed'''
+    if plug._node.mpx is not None:
+        plug._node.mpx._setDirty(plug)
+
+def _computePlug(plug):
+    '''Runs compute on the plugin node for the plug'''
+    plug._node.mpx._compute(plug)
+
+## DATA BLOCK
+
+class MDataHandle(object):
+    def __init__(self, node, path, output=False):
+        self._plug = MPlug(node, path)
+        self._output = output
+
+    def _value(self):
+        if self._output:
+            return self._plug._node.values.get(self._plug._path, self._plug.attribute().defaultValue())
+        return self._plug._value()
+
+    def asDouble(self):
+        return float(self._value())
+
+    def asFloat(self):
+        return float(self._value())
+
+    def asInt(self):
+        return int(self._value())
+
+    def asShort(self):
+        return int(self._value())
+
+    def asBool(self):
+        return bool(self._value())
+
+    def asString(self):
+        return self._value()
+
+    def asTime(self):
+        return MTime(self._value())
+
+    def asMatrix(self):
+        return MMatrix(self._value())
+
+    def asMesh(self):
+        value = self._value()
+        return value if isinstance(value, _MeshData) else MObject()
+
+    def asVector(self):
+        return MVector(*self._value())
+
+    def asDouble3(self):
+        return tuple(self._value())
+
+    def child(self, attr):
+        return MDataHandle(self._plug._node, self._plug._path + ((attr, None),), self._output)
+
+    def setDouble(self, value):
+        self._plug._setValue(float(value))
+
+    def setInt(self, value):
+        self._plug._setValue(int(value))
+
+    def setBool(self, value):
+        self._plug._setValue(bool(value))
+
+    def setString(self, value):
+        self._plug._setValue(value)
+
+    def setMVector(self, vector):
+        self._plug._setValue((vector.x, vector.y, vector.z))
+
+    def set3Double(self, x, y, z):
+        self._plug._setValue((float(x), float(y), float(z)))
+
+    def setMMatrix(self, matrix):
+        self._plug._setValue(MMatrix(matrix))
+
+    def setMTime(self, time):
+        self._plug._setValue(MTime(time))
+
+    def setClean(self):
+        pass
+
+class MArrayDataHandle(object):
+    def __init__(self, node, path, output=False):
+        self._node = node
+        self._path = path
+        self._output = output
+        indices = MIntArray()
+        MPlug(node, path).getExistingArrayAttributeIndices(indices)
+        self._indices = list(indices)
+        self._current = 0
+
+    def elementCount(self):
+        return len(self._indices)
+
+    def jumpToArrayElement(self, position):
+        self._current = position
+
+    def jumpToElement(self, index):
+        self._current = self._indices.index(index)
+
+    def elementIndex(self):
+        return self._indices[self._current]
+
+    def next(self):
+        self._current += 1
+
+    def _elementPath(self):
+        return self._path[:-1] + ((self._path[-1][0], self.elementIndex()),)
+
+    def inputValue(self):
+        return MDataHandle(self._node, self._elementPath())
+
+    def outputValue(self):
+        return MDataHandle(self._node, self._elementPath(), True)
+
+    def set(self, builder):
+        pass
+
+    def setAllClean(self):
+        pass
+
+class MArrayDataBuilder(object):
+    def __init__(self, data, attr, size=0):
+        self._node = data._node
+        self._path = self._node.attributePath(attr)
+
+    def addElement(self, index):
+        return MDataHandle(self._node, self._path[:-1] + ((self._path[-1][0], index),), True)
+
+class MDataBlock(object):
+    '''Maya makes these for compute, the stand-in also takes the node MObject'''
+
+    def __init__(self, node):
+        self._node = node._node if isinstance(node, MObject) else node
+        self.cleaned = set()
+
+    def inputValue(self, attr):
+        return MDataHandle(self._node, self._node.attributePath(attr))
+
+    def outputValue(self, attr):
+        return MDataHandle(self._node, self._node.attributePath(attr), True)
+
+    def inputArrayValue(self, attr):
+        return MArrayDataHandle(self._node, self._node.attributePath(attr))
+
+    def outputArrayValue(self, attr):
+        return MArrayDataHandle(self._node, self._node.attributePath(attr), True)
+
+    def setClean(self, attr):
+        self.cleaned.add(attr)
+
+## FUNCTION SETS
+
+class MFnDependencyNode(object):
+    def __init__(self, obj=None):
+        self._node = None
+        if obj is not None:
+            self.setObject(obj)
+
+    def setObject(self, obj):
+        if obj._node is None:
+            raise RuntimeError('(kInvalidParameter): Object is incompatible with this method')
+        self._node = obj._node
+
+    def object(self):
+        return _nodeObject(self._node)
+
+    def create(self, typeName, name=None):
+        self._node = createNode(typeName, name)
+        return _nodeObject(self._node)
+
+    def name(self):
+        return self._node.name
+
+    def setName(self, name):
+        self._node.name = _scene.uniqueName(name)
+        return self._node.name
+
+    def uuid(self):
+        return MUuid(self._node.uuid)
+
+    def typeName(self):
+        return self._node.typeName
+
+    def typeId(self):
+        return self._node.typeId or MTypeId(0)
+
+    def userNode(self):
+        return self._node.mpx
+
+    def attribute(self, name):
+        return self._node.attributesByName[name]
+
+    def hasAttribute(self, name):
+        return name in self._node.attributesByName
+
+    def getConnections(self, plugs):
+        '''Fills the array with the plugs of the node that are connected'''
+        del plugs[:]
+        for (node, path), source in _scene.connections.items():
+            if node is self._node:
+                plugs.append(MPlug(node, path))
+            if source._node is self._node and source not in plugs:
+                plugs.append(source)
+
+    def findPlug(self, attr, wantNetworkedPlug=True):
+        if not isinstance(attr, _Attribute):
+            try:
+                attr = self._node.attributesByName[attr]
+            except KeyError:
+                raise RuntimeError('(kInvalidParameter): Cannot find plug %s' % attr)
+        return MPlug(self._node, attr)
+
+class MDagPath(object):
+    def __init__(self, other=None):
+        self._node = other._node if other is not None else None
+
+    @staticmethod
+    def getAPathTo(obj, dagPath):
+        if obj._node is None or obj._node.fnType != MFn.kTransform:
+            raise RuntimeError('(kInvalidParameter): Object is not a DAG node')
+        dagPath._node = obj._node
+
+    def node(self):
+        return _nodeObject(self._node)
+
+    def transform(self):
+        return _nodeObject(self._node)
+
+    def length(self):
+        length = 0
+        node = self._node
+        while node is not None:
+            length += 1
+            node = node.parent
+        return length
+
+    def pop(self):
+        self._node = self._node.parent
+
+    def fullPathName(self):
+        names = []
+        node = self._node
+        while node is not None:
+            names.insert(0, node.name)
+            node = node.parent
+        return '|' + '|'.join(names)
+
+    def partialPathName(self):
+        return self._node.name
+
+    def isValid(self):
+        return self._node is not None and self._node in _scene.nodes
+
+class MFnDagNode(MFnDependencyNode):
+    def setObject(self, obj):
+        if obj._node is None or obj._node.fnType != MFn.kTransform:
+            raise RuntimeError('(kInvalidParameter): Object is incompatible with this method')
+        self._node = obj._node
+
+    def dagPath(self):
+        return MDagPath(self)
+
+    def parentCount(self):
+        '''The world is not a node here, so nodes under it have no parent'''
+        return 0 if self._node.parent is None else 1
+
+    def parent(self, index):
+        return _nodeObject(self._node.parent)
+
+class MFnTransform(MFnDagNode):
+    def getTranslation(self, space):
+        if space == MSpace.kWorld:
+            matrix = _transformWorldMatrix(self._node)
+            return MVector(matrix(3, 0), matrix(3, 1), matrix(3, 2))
+        translate = self.findPlug('translate')
+        return MVector(*[translate.child(i).asDouble() for i in range(3)])
+
+    def setTranslation(self, vector, space):
+        translate = self.findPlug('translate')
+        for i, value in enumerate((vector.x, vector.y, vector.z)):
+            translate.child(i).setDouble(value)
+
+class MDGModifier(object):
+    '''Queues operations until doIt, undoIt reverts everything done so far and
+    calling doIt again after that redoes it all'''
+
+    def __init__(self):
+        self._operations = []
+        self._next = 0
+        self._done = []
+
+    def connect(self, source, destination):
+        self._operations.append(('connect', source, destination))
+
+    def disconnect(self, source, destination):
+        self._operations.append(('disconnect', source, destination))
+
+    def deleteNode(self, node):
+        self._operations.append(('delete', node._node, None))
+
+    def newPlugValueString(self, plug, value):
+        self._operations.append(('value', plug, value))
+
+    def newPlugValueInt(self, plug, value):
+        self._operations.append(('value', plug, int(value)))
+
+    def newPlugValueDouble(self, plug, value):
+        self._operations.append(('value', plug, float(value)))
+
+    def newPlugValueBool(self, plug, value):
+        self._operations.append(('value', plug, bool(value)))
+
+    def removeMultiInstance(self, plug, breakConnections):
+        self._operations.append(('removeMulti', plug, breakConnections))
+
+    def createNode(self, typeName):
+        # the node is left in the scene so the names stay unique, undoIt takes it out
+        node = createNode(typeName)
+        self._created(node)
+        return _nodeObject(node)
+
+    def _created(self, node):
+        self._operations.append(('create', node, None))
+
+    def renameNode(self, node, name):
+        self._operations.append(('rename', node._node, name))
+
+    def doIt(self):
+        connections = _scene.connections
+        for operation, a, b in self._operations[self._next:]:
+            if operation == 'connect':
+                key = (b._node, b._path)
+                self._done.append((operation, key, _disconnect(key)))
+                connections[key] = a
+                _setDirty(b)
+            elif operation == 'disconnect':
+                key = (b._node, b._path)
+                self._done.append((operation, key, _disconnect(key)))
+            elif operation == 'create':
+                if a not in _scene.nodes:
+                    _scene.nodes.append(a)
+                self._done.append((operation, a, None))
+            elif operation == 'delete':
+                removed = dict((k, v) for k, v in connections.items() if k[0] is a or v._node is a)
+                for key in removed:
+                    _disconnect(key)
+                _scene.nodes.remove(a)
+                _nodeRemoved(a)
+                self._done.append((operation, a, removed))
+            elif operation == 'value':
+                self._done.append((operation, a, a._node.values.get(a._path)))
+                a._setValue(b)
+            elif operation == 'rename':
+                self._done.append((operation, a, a.name))
+                a.name = _scene.uniqueName(b)
+            elif operation == 'removeMulti':
+                # everything under the element, the connections only if asked to
+                node = a._node
+                depth = len(a._path)
+                values = dict((p, v) for p, v in node.values.items() if p[:depth] == a._path)
+                for path in values:
+                    del node.values[path]
+                removed = {}
+                if b:
+                    removed = dict((k, v) for k, v in connections.items()
+                                   if (k[0] is node and k[1][:depth] == a._path) or
+                                   (v._node is node and v._path[:depth] == a._path))
+                    for key in removed:
+                        _disconnect(key)
+                self._done.append((operation, a, (values, removed)))
+        self._next = len(self._operations)
+
+    def undoIt(self):
+        connections = _scene.connections
+        for operation, a, b in reversed(self._done):
+            if operation in ('connect', 'disconnect'):
+                _disconnect(a)
+                if b is not None:
+                    connections[a] = b
+                _setDirty(MPlug(*a))
+            elif operation == 'create':
+                if a in _scene.nodes:
+                    _scene.nodes.remove(a)
+            elif operation == 'delete':
+                _scene.nodes.append(a)
+                connections.update(b)
+            elif operation == 'value':
+                if b is None:
+                    a._node.values.pop(a._path, None)
+                else:
+                    a._node.values[a._path] = b
+            elif operation == 'rename':
+                a.name = b
+            elif operation == 'removeMulti':
+                a._node.values.update(b[0])
+                connections.update(b[1])
+        self._done = []
+        self._next = 0
+
+class MItDependencyNodes(object):
+    def __init__(self, filterType=MFn.kInvalid):
+        self._nodes = [n for n in _scene.nodes if filterType == MFn.kInvalid or n.fnType == filterType]
+        self._index = 0
+
+    def isDone(self):
+        return self._index >= len(self._nodes)
+
+    def next(self):
+        self._index += 1
+
+    def thisNode(self):
+        return _nodeObject(self._nodes[self._index])
+
+class MSelectionList(object):
+    def __init__(self):
+        self._nodes = []
+
+    def add(self, name):
+        if isinstance(name, MObject):
+            self._nodes.append(name._node)
+            return
+        node = _scene.findNode(name.split('.')[0].lstrip('|'))
+        if node is None:
+            raise RuntimeError('(kInvalidParameter): Object does not exist')
+        self._nodes.append(node)
+
+    def length(self):
+        return len(self._nodes)
+
+    def clear(self):
+        self._nodes = []
+
+    def getDagPath(self, index, dagPath):
+        node = self._nodes[index]
+        if node.fnType != MFn.kTransform:
+            raise RuntimeError('(kInvalidParameter): Object is not a DAG node')
+        dagPath._node = node
+
+    def getDependNode(self, index, obj):
+        obj._node = self._nodes[index]
+
+    def getSelectionStrings(self, strings):
+        strings.extend(node.name for node in self._nodes)
+
+## MESSAGES
+
+# callback id -> (event name, function, client data), kept over new scenes like in Maya
+_eventCallbacks = {}
+
+class MEventMessage(object):
+    _nextId = 0
+
+    @staticmethod
+    def addEventCallback(event, function, clientData=None):
+        return _addCallback(event, function, clientData)
+
+class MMessage(object):
+    @staticmethod
+    def removeCallback(callbackId):
+        if callbackId not in _eventCallbacks:
+            raise RuntimeError('Unknown callback id: %s' % callbackId)
+        del _eventCallbacks[callbackId]
+
+class MDGMessage(object):
+    @staticmethod
+    def addNodeRemovedCallback(function, nodeType='dependNode', clientData=None):
+        return _addCallback('nodeRemoved:' + nodeType, function, clientData)
+
+def _nodeRemoved(node):
+    '''Calls the node removed callbacks of every node and of its type'''
+    _notify('nodeRemoved:' + node.typeName, _nodeObject(node))
+    _notify('nodeRemoved:dependNode', _nodeObject(node))
+
+def _addCallback(event, function, clientData):
+    MEventMessage._nextId += 1
+    _eventCallbacks[MEventMessage._nextId] = (event, function, clientData)
+    return MEventMessage._nextId
+
+def _notify(event, *args):
+    '''Calls the callbacks of the event with the arguments and their client
+    data. Returns False if there are none registered.'''
+    callbacks = [c for c in _eventCallbacks.values() if c[0] == event]
+    for event, function, clientData in callbacks:
+        function(*(args + (clientData,)))
+    return bool(callbacks)
+
+def idle():
+    '''Calls the idle event callbacks once, like Maya does while it waits for
+    input. Returns False if there are none registered.'''
+    return _notify('idle')
+
+## COMMAND ARGUMENTS
+
+class MSyntax(object):
+    kNoArg = 0
+    kBoolean = 1
+    kLong = 2
+    kUnsigned = kLong
+    kDouble = 3
+    kString = 4
+    kUnsigned64 = 5
+    kDistance = 6
+    kAngle = 7
+    kTime = 8
+    kSelectionItem = 9
+
+    kNone = 1
+    kStringObjects = 2
+    kSelectionList = 3
+
+    def __init__(self):
+        self.flags = {}
+        self.objectType = MSyntax.kNone
+        self.minObjects = 0
+        self.maxObjects = None
+        self.editEnabled = False
+        self.queryEnabled = False
+
+    def setObjectType(self, objectType, minObjects=0, maxObjects=None):
+        self.objectType = objectType
+
+    def setMinObjects(self, count):
+        self.minObjects = count
+
+    def setMaxObjects(self, count):
+        self.maxObjects = count
+
+    def enableEdit(self, value=True):
+        self.editEnabled = value
+
+    def enableQuery(self, value=True):
+        self.queryEnabled = value
+
+    def addFlag(self, shortName, longName, *argTypes):
+        flag = {'short': shortName, 'long': longName, 'types': argTypes, 'multiUse': False}
+        self.flags[shortName] = flag
+        self.flags[longName] = flag
+
+    def makeFlagMultiUse(self, name):
+        self.flags[name]['multiUse'] = True
+
+    def makeFlagQueryWithFullArgs(self, name, optional):
+        self.flags[name]['queryWithFullArgs'] = True
+
+class MArgList(_Array):
+    def addArg(self, value):
+        self.append(value)
+
+    def asString(self, index):
+        return str(self[index])
+
+    def asDouble(self, index):
+        return float(self[index])
+
+    def asInt(self, index):
+        return int(self[index])
+
+    def asBool(self, index):
+        return self[index] not in (False, 0, 'false', 'off', '0')
+
+class MArgParser(object):
+    '''Parses the argument list by the syntax the same way Maya does for simple flags'''
+
+    def __init__(self, syntax, args):
+        self._uses = {}
+        self._objects = []
+        self.query = False
+        self.edit = False
+
+        args = list(args)
+        i = 0
+        while i < len(args):
+            arg = args[i]
+            i += 1
+            if isinstance(arg, str) and arg.startswith('-') and not _isNumber(arg):
+                if arg in ('-q', '-query') and syntax.queryEnabled:
+                    self.query = True
+                    continue
+                if arg in ('-e', '-edit') and syntax.editEnabled:
+                    self.edit = True
+                    continue
+
+                flag = syntax.flags.get(arg)
+                if flag is None:
+                    raise RuntimeError('Invalid flag: %s' % arg)
+
+                # query flags do not take their arguments unless asked to
+                types = flag['types'] if not self.query or flag.get('queryWithFullArgs') else ()
+                values = MArgList(args[i:i + len(types)])
+                i += len(types)
+
+                uses = self._uses.setdefault(flag['short'], [])
+                if uses and not flag['multiUse']:
+                    raise RuntimeError('Flag %s can only be used once' % arg)
+                uses.append(values)
+            else:
+                self._objects.append(arg)
+
+        if syntax.maxObjects is not None and len(self._objects) > syntax.maxObjects:
+            raise RuntimeError('Too many objects or values.')
+
+    def _lookup(self, name):
+        return self._uses.get(name, [])
+
+    def isFlagSet(self, name):
+        return bool(self._lookup(name))
+
+    def numberOfFlagUses(self, name):
+        return len(self._lookup(name))
+
+    def flagArgumentString(self, name, index):
+        return str(self._lookup(name)[0][index])
+
+    def flagArgumentDouble(self, name, index):
+        return float(self._lookup(name)[0][index])
+
+    def flagArgumentInt(self, name, index):
+        return int(self._lookup(name)[0][index])
+
+    def flagArgumentBool(self, name, index):
+        return self._lookup(name)[0].asBool(index)
+
+    def getFlagArgumentList(self, name, use, argList):
+        del argList[:]
+        argList.extend(self._lookup(name)[use])
+
+    def getObjects(self, objects):
+        objects.extend(self._objects)
+
+    def isQuery(self):
+        return self.query
+
+    def isEdit(self):
+        return self.edit
+
+def _isNumber(value):
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
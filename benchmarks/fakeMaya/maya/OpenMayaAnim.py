@@ -0,0 +1,78 @@
+'''Stand-in for the parts of maya.OpenMayaAnim used by the plugin.'''
+
+from maya import OpenMaya
+
+class MFnAnimCurve(object):
+    kAnimCurveTA = 0
+    kAnimCurveTL = 1
+    kAnimCurveTT = 2
+    kAnimCurveTU = 3
+
+    kTangentGlobal = 0
+    kTangentLinear = 2
+
+    def __init__(self, obj=None):
+        self._node = obj._node if obj is not None else None
+
+    def create(self, plug, curveType=kAnimCurveTL, modifier=None):
+        self._node = OpenMaya.createNode('animCurveTL', plug._node.name + '_' + plug.attribute().name)
+        output = OpenMaya.MPlug(self._node, self._node.attributesByName['output'])
+        if modifier is not None:
+            modifier._created(self._node)
+            modifier.connect(output, plug)
+        else:
+            OpenMaya._scene.connections[(plug._node, plug._path)] = output
+        return OpenMaya._nodeObject(self._node)
+
+    def addKey(self, time, value, *args):
+        self._node.keys[time.value()] = float(value)
+
+    def addKeys(self, times, values, *args):
+        for time, value in zip(times, values):
+            self._node.keys[time.value()] = float(value)
+
+    def numKeys(self):
+        return len(self._node.keys)
+
+    def time(self, index):
+        return OpenMaya.MTime(sorted(self._node.keys)[index])
+
+    def value(self, index):
+        return self._node.keys[sorted(self._node.keys)[index]]
+
+    def inTangentType(self, index):
+        return self.kTangentLinear
+
+    def outTangentType(self, index):
+        return self.kTangentLinear
+
+    def evaluate(self, time):
+        return OpenMaya._evaluateCurve(self._node, time.value())
+
+class MAnimMessage(object):
+    @staticmethod
+    def addAnimCurveEditedCallback(function, clientData=None):
+        '''Called with the edited curves after a command edits their keys'''
+        return OpenMaya._addCallback('animCurveEdited', function, clientData)
+
+class MAnimControl(object):
+    @staticmethod
+    def currentTime():
+        return OpenMaya.MTime(OpenMaya._scene.currentTime)
+
+    @staticmethod
+    def setCurrentTime(time):
+        OpenMaya._scene.currentTime = time.value()
+
+    @staticmethod
+    def minTime():
+        return OpenMaya.MTime(OpenMaya._scene.minTime)
+
+    @staticmethod
+    def maxTime():
+        return OpenMaya.MTime(OpenMaya._scene.maxTime)
+
+    @staticmethod
+    def setMinMaxTime(minTime, maxTime):
+        OpenMaya._scene.minTime = minTime.value()
+        OpenMaya._scene.maxTime = maxTime.value()
@@ -0,0 +1,117 @@
+'''Stand-in for the parts of maya.OpenMayaMPx used by the plugin.'''
+
+from maya import OpenMaya
+
+def asMPxPtr(obj):
+    return obj
+
+class MPxNode(object):
+    # the scheduling types of the evaluation manager
+    kParallel = 0
+    kSerial = 1
+    kGloballySerial = 2
+    kUntrusted = 3
+
+    def __init__(self):
+        self._fakeNode = None
+
+    def thisMObject(self):
+        return OpenMaya._nodeObject(self._fakeNode)
+
+    def name(self):
+        return self._fakeNode.name
+
+    def compute(self, plug, data):
+        return OpenMaya.MStatus.kUnknownParameter
+
+    def _compute(self, plug):
+        '''Runs compute for the plug, the API 2.0 stand-in wraps the plug and data first'''
+        return self.compute(plug, OpenMaya.MDataBlock(self._fakeNode))
+
+    def setDependentsDirty(self, plug, plugArray):
+        return OpenMaya.MStatus.kSuccess
+
+    def connectionBroken(self, plug, otherPlug, asSrc):
+        return OpenMaya.MStatus.kUnknownParameter
+
+    def _connectionBroken(self, plug, otherPlug, asSrc):
+        return self.connectionBroken(plug, otherPlug, asSrc)
+
+    def _setDirty(self, plug):
+        '''Tells the node the plug was set or connected, there is no dirty
+        propagation so only the plugs of the node itself are passed'''
+        return self.setDependentsDirty(plug, OpenMaya.MPlugArray())
+
+    @classmethod
+    def addAttribute(cls, attr):
+        OpenMaya._initializingTypes[-1].attributes.append(attr)
+
+    @classmethod
+    def attributeAffects(cls, whenChanges, isAffected):
+        # only the affected outputs matter here, they are the plugs that run compute
+        if '_affected' not in cls.__dict__:
+            cls._affected = set()
+        while isAffected.parent is not None:
+            isAffected = isAffected.parent
+        cls._affected.add(isAffected)
+
+class MPxCommand(object):
+    _syntaxCreators = {}
+
+    def __init__(self):
+        self._result = None
+
+    def syntax(self):
+        return MPxCommand._syntaxCreators[type(self)]()
+
+    def isUndoable(self):
+        return False
+
+    def setResult(self, value):
+        self._result = value
+
+    def clearResult(self):
+        self._result = None
+
+    def appendToResult(self, value):
+        if not isinstance(self._result, list):
+            self._result = []
+        self._result.append(value)
+
+    def currentResult(self):
+        return self._result
+
+class MFnPlugin(object):
+    def __init__(self, obj=None, vendor='', version='', requiredApiVersion='Any'):
+        self.commands = {}
+
+    def registerNode(self, name, typeId, creator, initializer, nodeType=None, classification=None):
+        OpenMaya._registerNodeType(name, typeId, creator, initializer)
+
+    def deregisterNode(self, typeId):
+        for name, nodeType in list(OpenMaya._scene.nodeTypes.items()):
+            if nodeType.typeId == typeId:
+                del OpenMaya._scene.nodeTypes[name]
+                return
+        raise RuntimeError('(kFailure): Node type is not registered')
+
+    def registerCommand(self, name, creator, syntaxCreator=None):
+        command = creator()
+        if syntaxCreator is not None:
+            MPxCommand._syntaxCreators[type(command)] = syntaxCreator
+        _commands[name] = (creator, syntaxCreator)
+
+    def deregisterCommand(self, name):
+        if _commands.pop(name, None) is None:
+            raise RuntimeError('(kFailure): Command is not registered')
+
+# registered commands by name, run them with runCommand
+_commands = {}
+
+def runCommand(name, *args):
+    '''Runs a registered command with the arguments like MEL would and returns
+    the command instance so it can be undone and redone'''
+    creator, syntaxCreator = _commands[name]
+    command = creator()
+    command.doIt(OpenMaya.MArgList([str(arg) for arg in args]))
+    return command
@@ -0,0 +1,8 @@
+'''Minimal stand-in for the maya package so the plugin can be timed without Maya.
+
+Only the parts of maya.OpenMaya, maya.OpenMayaAnim, maya.OpenMayaMPx,
+maya.api.OpenMaya, maya.api.OpenMayaAnim and maya.cmds used by the API 1.0
+and 2.0 plugins are here. Both APIs work on the same scene. There is no dirty
+propagation, reading a plug that is driven by a plugin node always runs its
+compute.
+'''
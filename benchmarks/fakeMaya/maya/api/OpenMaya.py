@@ -0,0 +1,411 @@
+'''Stand-in for the parts of maya.api.OpenMaya used by the plugin.
+
+The classes wrap the maya.OpenMaya stand-in so the API 1.0 and 2.0 plugins
+work on the same scene. Like Maya, values are returned instead of filled into
+arguments, flags are properties and a matrix indexes as its 16 values.
+'''
+
+from maya import OpenMaya as _api1
+from maya import OpenMayaMPx as _mpx
+
+# the classes that work the same in both
+MObject = _api1.MObject
+MObjectHandle = _api1.MObjectHandle
+MUuid = _api1.MUuid
+MTypeId = _api1.MTypeId
+MFn = _api1.MFn
+MSpace = _api1.MSpace
+MSyntax = _api1.MSyntax
+MVector = _api1.MVector
+MFnNumericData = _api1.MFnNumericData
+MFnData = _api1.MFnData
+MArgList = _api1.MArgList
+MIntArray = _api1.MIntArray
+MDoubleArray = _api1.MDoubleArray
+MPlugArray = _api1.MPlugArray
+MObjectArray = _api1.MObjectArray
+MTimeArray = _api1.MTimeArray
+MPoint = _api1.MPoint
+MPointArray = _api1.MPointArray
+MFnMeshData = _api1.MFnMeshData
+MItDependencyNodes = _api1.MItDependencyNodes
+MDGModifier = _api1.MDGModifier
+MEventMessage = _api1.MEventMessage
+MMessage = _api1.MMessage
+MDGMessage = _api1.MDGMessage
+
+MObject.kNullObj = MObject()
+
+## MATH
+
+class MMatrix(_api1.MMatrix):
+    '''Indexes as the 16 values in row order'''
+
+    def __init__(self, values=None):
+        if values is not None and not isinstance(values, _api1.MMatrix):
+            values = list(values)
+            if len(values) == 16:
+                values = [values[r * 4:r * 4 + 4] for r in range(4)]
+        _api1.MMatrix.__init__(self, values)
+
+    def __getitem__(self, index):
+        if index < 0 or index > 15:
+            raise IndexError('index out of range')
+        return self._m[index // 4][index % 4]
+
+    def __len__(self):
+        return 16
+
+    def getElement(self, row, column):
+        return self._m[row][column]
+
+    def __mul__(self, other):
+        return MMatrix(_api1.MMatrix.__mul__(self, other))
+
+    def inverse(self):
+        return MMatrix(_api1.MMatrix.inverse(self))
+
+class MTime(object):
+    '''The value and unit are properties'''
+
+    kFilm = _api1.MTime.kFilm
+
+    def __init__(self, value=0.0, unit=kFilm):
+        if isinstance(value, MTime):
+            value, unit = value.value, value.unit
+        elif isinstance(value, _api1.MTime):
+            value, unit = value.value(), value.unit()
+        self.value = float(value)
+        self.unit = unit
+
+    @staticmethod
+    def uiUnit():
+        return MTime.kFilm
+
+    def _api1(self):
+        return _api1.MTime(self.value, self.unit)
+
+    def asUnits(self, unit):
+        return self.value
+
+    def __eq__(self, other):
+        return isinstance(other, MTime) and other.value == self.value
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return 'MTime(%g)' % self.value
+
+class MDGContext(_api1.MDGContext):
+    def __init__(self, time=None):
+        _api1.MDGContext.__init__(self, None if time is None else time.value)
+
+MDGContext.kNormal = MDGContext()
+
+## ATTRIBUTES
+
+def _flag(name):
+    '''Returns a property for an attribute flag'''
+    def getter(self):
+        return self._attr.flags.get(name, False)
+    def setter(self, value):
+        self._attr.flags[name] = value
+    return property(getter, setter)
+
+class MFnAttribute(_api1.MFnAttribute):
+    '''The attribute flags are properties'''
+
+    readable = _flag('readable')
+    writable = _flag('writable')
+    storable = _flag('storable')
+    keyable = _flag('keyable')
+    hidden = _flag('hidden')
+    cached = _flag('cached')
+    connectable = _flag('connectable')
+    usedAsFilename = _flag('usedAsFilename')
+    usesArrayDataBuilder = _flag('usesArrayDataBuilder')
+    indexMatters = _flag('indexMatters')
+    affectsAppearance = _flag('affectsAppearance')
+
+    @property
+    def array(self):
+        return self._attr.array
+
+    @array.setter
+    def array(self, value):
+        self._attr.array = value
+
+class MFnNumericAttribute(MFnAttribute, _api1.MFnNumericAttribute):
+    pass
+
+class MFnUnitAttribute(MFnAttribute, _api1.MFnUnitAttribute):
+    pass
+
+class MFnMatrixAttribute(MFnAttribute, _api1.MFnMatrixAttribute):
+    pass
+
+class MFnTypedAttribute(MFnAttribute, _api1.MFnTypedAttribute):
+    pass
+
+class MFnEnumAttribute(MFnAttribute, _api1.MFnEnumAttribute):
+    pass
+
+class MFnCompoundAttribute(MFnAttribute, _api1.MFnCompoundAttribute):
+    pass
+
+class MFnMatrixData(_api1.MFnMatrixData):
+    def matrix(self):
+        return MMatrix(self._obj.matrix)
+
+class MFnMesh(_api1.MFnMesh):
+    '''The counts are properties and the arrays are returned'''
+
+    numVertices = property(_api1.MFnMesh.numVertices)
+    numPolygons = property(_api1.MFnMesh.numPolygons)
+    numFaceVertices = property(_api1.MFnMesh.numFaceVertices)
+
+    def create(self, vertices, polygonCounts, polygonConnects, uValues=None, vValues=None, parent=None):
+        return _api1.MFnMesh.create(self, len(vertices), len(polygonCounts), vertices,
+                                    polygonCounts, polygonConnects, parent)
+
+    def getPoints(self, space=MSpace.kObject):
+        points = MPointArray()
+        _api1.MFnMesh.getPoints(self, points, space)
+        return points
+
+    def setPoints(self, points, space=MSpace.kObject):
+        _api1.MFnMesh.setPoints(self, points, space)
+
+    def getTriangles(self):
+        counts = MIntArray()
+        vertices = MIntArray()
+        _api1.MFnMesh.getTriangles(self, counts, vertices)
+        return counts, vertices
+
+## PLUGS
+
+class MPlug(_api1.MPlug):
+    '''The is* queries are properties and the arrays are returned'''
+
+    isChild = property(_api1.MPlug.isChild)
+    isCompound = property(_api1.MPlug.isCompound)
+    isArray = property(_api1.MPlug.isArray)
+    isElement = property(_api1.MPlug.isElement)
+
+    def parent(self):
+        return MPlug(self._node, self._path[:-1])
+
+    def array(self):
+        return MPlug(self._node, self._path[:-1] + ((self.attribute(), None),))
+
+    def child(self, child):
+        plug = _api1.MPlug.child(self, child)
+        return MPlug(plug._node, plug._path)
+
+    def elementByLogicalIndex(self, index):
+        return MPlug(self._node, self._path[:-1] + ((self.attribute(), index),))
+
+    def getExistingArrayAttributeIndices(self):
+        indices = MIntArray()
+        _api1.MPlug.getExistingArrayAttributeIndices(self, indices)
+        return indices
+
+    def connectedTo(self, asDestination, asSource):
+        plugs = MPlugArray()
+        _api1.MPlug.connectedTo(self, plugs, asDestination, asSource)
+        return MPlugArray(MPlug(plug._node, plug._path) for plug in plugs)
+
+    def asMTime(self, context=None):
+        return MTime(self._valueAt(context))
+
+## DATA BLOCK
+
+class MDataHandle(_api1.MDataHandle):
+    def asTime(self):
+        return MTime(self._value())
+
+    def asMatrix(self):
+        return MMatrix(self._value())
+
+    def child(self, attr):
+        return MDataHandle(self._plug._node, self._plug._path + ((attr, None),), self._output)
+
+    def setMTime(self, time):
+        self._plug._setValue(time._api1())
+
+class MArrayDataHandle(_api1.MArrayDataHandle):
+    '''The elements are jumped to by their physical or logical index'''
+
+    def __len__(self):
+        return len(self._indices)
+
+    def jumpToPhysicalElement(self, position):
+        self._current = position
+
+    def jumpToLogicalElement(self, index):
+        self._current = self._indices.index(index)
+
+    def elementLogicalIndex(self):
+        return self._indices[self._current]
+
+    def inputValue(self):
+        return MDataHandle(self._node, self._elementPath())
+
+    def outputValue(self):
+        return MDataHandle(self._node, self._elementPath(), True)
+
+class MArrayDataBuilder(_api1.MArrayDataBuilder):
+    def addElement(self, index):
+        return MDataHandle(self._node, self._path[:-1] + ((self._path[-1][0], index),), True)
+
+class MDataBlock(_api1.MDataBlock):
+    def inputValue(self, attr):
+        return MDataHandle(self._node, self._node.attributePath(attr))
+
+    def outputValue(self, attr):
+        return MDataHandle(self._node, self._node.attributePath(attr), True)
+
+    def inputArrayValue(self, attr):
+        return MArrayDataHandle(self._node, self._node.attributePath(attr))
+
+    def outputArrayValue(self, attr):
+        return MArrayDataHandle(self._node, self._node.attributePath(attr), True)
+
+## FUNCTION SETS
+
+class MFnDependencyNode(_api1.MFnDependencyNode):
+    '''The type is a property and findPlug always needs wantNetworkedPlug'''
+
+    typeId = property(_api1.MFnDependencyNode.typeId)
+    typeName = property(_api1.MFnDependencyNode.typeName)
+
+    def findPlug(self, attr, wantNetworkedPlug):
+        plug = _api1.MFnDependencyNode.findPlug(self, attr)
+        return MPlug(plug._node, plug._path)
+
+    def getConnections(self):
+        plugs = MPlugArray()
+        _api1.MFnDependencyNode.getConnections(self, plugs)
+        return MPlugArray([MPlug(plug._node, plug._path) for plug in plugs])
+
+class MDagPath(_api1.MDagPath):
+    @staticmethod
+    def getAPathTo(obj):
+        dagPath = MDagPath()
+        _api1.MDagPath.getAPathTo(obj, dagPath)
+        return dagPath
+
+    def pop(self, num=1):
+        for i in range(num):
+            _api1.MDagPath.pop(self)
+        return self
+
+class MFnDagNode(MFnDependencyNode):
+    def setObject(self, obj):
+        if obj._node is None or obj._node.fnType != MFn.kTransform:
+            raise RuntimeError('(kInvalidParameter): Object is incompatible with this method')
+        self._node = obj._node
+        return self
+
+    def getPath(self):
+        return MDagPath(self)
+
+    def parentCount(self):
+        return 0 if self._node.parent is None else 1
+
+    def parent(self, index):
+        return _api1._nodeObject(self._node.parent)
+
+class MFnTransform(MFnDagNode):
+    def translation(self, space):
+        if space == MSpace.kWorld:
+            matrix = _api1._transformWorldMatrix(self._node)
+            return MVector(matrix(3, 0), matrix(3, 1), matrix(3, 2))
+        translate = self.findPlug('translate', False)
+        return MVector(*[translate.child(i).asDouble() for i in range(3)])
+
+class MSelectionList(_api1.MSelectionList):
+    def add(self, name):
+        _api1.MSelectionList.add(self, name)
+        return self
+
+    def getDependNode(self, index):
+        obj = MObject()
+        _api1.MSelectionList.getDependNode(self, index, obj)
+        return obj
+
+    def getDagPath(self, index):
+        dagPath = MDagPath()
+        _api1.MSelectionList.getDagPath(self, index, dagPath)
+        return dagPath
+
+    def getSelectionStrings(self):
+        strings = []
+        _api1.MSelectionList.getSelectionStrings(self, strings)
+        return strings
+
+class MGlobal(_api1.MGlobal):
+    @staticmethod
+    def getActiveSelectionList():
+        selectionList = MSelectionList()
+        for name in _api1._scene.selection:
+            selectionList.add(name)
+        return selectionList
+
+## COMMAND ARGUMENTS
+
+class MArgParser(_api1.MArgParser):
+    '''The query and edit checks are properties'''
+
+    isQuery = property(lambda self: self.query)
+    isEdit = property(lambda self: self.edit)
+
+    def getObjectStrings(self):
+        return list(self._objects)
+
+    def getFlagArgumentList(self, name, use):
+        return MArgList(self._lookup(name)[use])
+
+## PLUGIN CLASSES
+
+class MPxNode(_mpx.MPxNode):
+    def _compute(self, plug):
+        return self.compute(MPlug(plug._node, plug._path), MDataBlock(self._fakeNode))
+
+    def setDependentsDirty(self, plug, plugArray):
+        return None
+
+    def connectionBroken(self, plug, otherPlug, asSrc):
+        return None
+
+    def _connectionBroken(self, plug, otherPlug, asSrc):
+        return self.connectionBroken(MPlug(plug._node, plug._path), MPlug(otherPlug._node, otherPlug._path), asSrc)
+
+    def _setDirty(self, plug):
+        return self.setDependentsDirty(MPlug(plug._node, plug._path), MPlugArray())
+
+class MPxCommand(_mpx.MPxCommand):
+    '''The result is set with static methods like in Maya'''
+
+    _commandResult = None
+
+    @staticmethod
+    def setResult(value):
+        MPxCommand._commandResult = value
+
+    @staticmethod
+    def clearResult():
+        MPxCommand._commandResult = None
+
+    @staticmethod
+    def appendToResult(value):
+        if not isinstance(MPxCommand._commandResult, list):
+            MPxCommand._commandResult = []
+        MPxCommand._commandResult.append(value)
+
+    @staticmethod
+    def currentResult():
+        return MPxCommand._commandResult
+
+MFnPlugin = _mpx.MFnPlugin
@@ -0,0 +1,44 @@
+'''Stand-in for the parts of maya.api.OpenMayaAnim used by the plugin.'''
+
+from maya import OpenMayaAnim as _anim1
+from maya.api import OpenMaya
+
+class MFnAnimCurve(_anim1.MFnAnimCurve):
+    '''Takes the API 2.0 times, the key count is a property'''
+
+    numKeys = property(_anim1.MFnAnimCurve.numKeys)
+
+    def input(self, index):
+        return OpenMaya.MTime(_anim1.MFnAnimCurve.time(self, index))
+
+    def addKey(self, time, value, *args):
+        _anim1.MFnAnimCurve.addKey(self, time._api1(), value)
+
+    def addKeys(self, times, values, *args):
+        _anim1.MFnAnimCurve.addKeys(self, [time._api1() for time in times], values)
+
+    def evaluate(self, time):
+        return _anim1.MFnAnimCurve.evaluate(self, time._api1())
+
+MAnimMessage = _anim1.MAnimMessage
+
+class MAnimControl(object):
+    @staticmethod
+    def currentTime():
+        return OpenMaya.MTime(_anim1.MAnimControl.currentTime())
+
+    @staticmethod
+    def setCurrentTime(time):
+        _anim1.MAnimControl.setCurrentTime(time._api1())
+
+    @staticmethod
+    def minTime():
+        return OpenMaya.MTime(_anim1.MAnimControl.minTime())
+
+    @staticmethod
+    def maxTime():
+        return OpenMaya.MTime(_anim1.MAnimControl.maxTime())
+
+    @staticmethod
+    def setMinMaxTime(minTime, maxTime):
+        _anim1.MAnimControl.setMinMaxTime(minTime._api1(), maxTime._api1())
@@ -0,0 +1 @@
+'''Stand-in for the maya.api package, see maya/__init__.py.'''
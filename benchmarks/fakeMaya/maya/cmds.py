@@ -0,0 +1,149 @@
+'''Stand-in for the parts of maya.cmds used by the plugin and the benchmarks.'''
+
+import re
+
+from maya import OpenMaya
+
+def _plug(name):
+    '''Returns the MPlug for "node.attr[index].child" style names'''
+    nodeName, attrPath = name.split('.', 1)
+    node = OpenMaya._scene.findNode(nodeName)
+    if node is None:
+        raise RuntimeError('No object matches name: %s' % name)
+
+    plug = None
+    for part in attrPath.split('.'):
+        match = re.match(r'(\w+)(?:\[(\d+)\])?$', part)
+        attr = node.attributesByName[match.group(1)]
+        plug = OpenMaya.MPlug(node, attr) if plug is None else plug.child(attr)
+        if match.group(2) is not None:
+            plug = plug.elementByLogicalIndex(int(match.group(2)))
+    return plug
+
+def ls(*names, **kwargs):
+    selection = kwargs.get('sl', kwargs.get('selection', False))
+    nodeType = kwargs.get('type')
+    nodes = OpenMaya._scene.selection if selection else [n.name for n in OpenMaya._scene.nodes]
+    if names:
+        nodes = [n for n in nodes if n in names]
+    if nodeType is not None:
+        nodes = [n for n in nodes if OpenMaya._scene.findNode(n).typeName == nodeType]
+    return list(nodes)
+
+def select(*names, **kwargs):
+    if kwargs.get('clear', kwargs.get('cl', False)):
+        OpenMaya._scene.selection = []
+        return
+    OpenMaya._scene.selection = list(names)
+
+def currentTime(time=None, **kwargs):
+    if kwargs.get('q', kwargs.get('query', False)):
+        return OpenMaya._scene.currentTime
+    OpenMaya._scene.currentTime = float(time)
+    OpenMaya._notify('timeChanged')
+    return OpenMaya._scene.currentTime
+
+def createNode(typeName, name=None, n=None, parent=None, p=None):
+    node = OpenMaya.createNode(typeName, name or n)
+    if parent or p:
+        node.parent = OpenMaya._scene.findNode(parent or p)
+    return node.name
+
+def parent(child, parentName):
+    OpenMaya._scene.findNode(child).parent = OpenMaya._scene.findNode(parentName)
+
+def delete(*names):
+    for name in names:
+        node = OpenMaya._scene.findNode(name)
+        if node is None:
+            raise RuntimeError('No object matches name: %s' % name)
+        connections = OpenMaya._scene.connections
+        for key in [k for k, v in connections.items() if k[0] is node or v._node is node]:
+            OpenMaya._disconnect(key)
+        OpenMaya._scene.nodes.remove(node)
+        OpenMaya._nodeRemoved(node)
+
+def objExists(name):
+    return OpenMaya._scene.findNode(name.split('.')[0]) is not None
+
+def setAttr(name, *values, **kwargs):
+    plug = _plug(name)
+    if kwargs.get('type') == 'string':
+        plug.setString(values[0])
+    elif len(values) == 1:
+        plug._setValue(values[0])
+    else:
+        plug._setValue(tuple(float(v) for v in values))
+
+def getAttr(name):
+    value = _plug(name)._value()
+    if isinstance(value, OpenMaya.MTime):
+        return value.value()
+    if isinstance(value, OpenMaya.MMatrix):
+        return [value(r, c) for r in range(4) for c in range(4)]
+    if isinstance(value, tuple):
+        return [value]
+    return value
+
+def connectAttr(source, destination, force=False, f=False):
+    destinationPlug = _plug(destination)
+    key = (destinationPlug._node, destinationPlug._path)
+    OpenMaya._disconnect(key)
+    OpenMaya._scene.connections[key] = _plug(source)
+    OpenMaya._setDirty(destinationPlug)
+
+def disconnectAttr(source, destination):
+    destinationPlug = _plug(destination)
+    OpenMaya._disconnect((destinationPlug._node, destinationPlug._path))
+
+def listConnections(name, source=True, destination=True, plugs=False, connections=False, c=False):
+    '''Lists what a plug or every plug of a node is connected to, with
+    connections on the plug of the node comes before each one'''
+    found = []
+    if '.' in name:
+        plug = _plug(name)
+        others = OpenMaya.MPlugArray()
+        plug.connectedTo(others, source, destination)
+        found = [(plug, other) for other in others]
+    else:
+        node = OpenMaya._scene.findNode(name)
+        if node is None:
+            raise RuntimeError('No object matches name: %s' % name)
+        for key, sourcePlug in OpenMaya._scene.connections.items():
+            if source and key[0] is node:
+                found.append((OpenMaya.MPlug(*key), sourcePlug))
+            if destination and sourcePlug._node is node:
+                found.append((sourcePlug, OpenMaya.MPlug(*key)))
+
+    result = []
+    for own, other in found:
+        if connections or c:
+            result.append(own.name())
+        result.append(other.name() if plugs else other._node.name)
+    return result
+
+def removeMultiInstance(name, b=False, breakConnections=False):
+    plug = _plug(name)
+    node = plug._node
+    depth = len(plug._path)
+    for path in [p for p in node.values if p[:depth] == plug._path]:
+        del node.values[path]
+    connections = OpenMaya._scene.connections
+    for key in [k for k, v in connections.items()
+                if (k[0] is node and k[1][:depth] == plug._path) or (v._node is node and v._path[:depth] == plug._path)]:
+        OpenMaya._disconnect(key)
+
+def setKeyframe(name, attribute=None, at=None, time=None, t=None, value=None, v=None):
+    '''Keys a single attribute, the curve is made and connected the first time'''
+    plug = _plug('%s.%s' % (name, attribute or at))
+    source = plug._source()
+    if source is None:
+        curve = OpenMaya.createNode('animCurveTL', '%s_%s' % (name, plug.attribute().name))
+        output = OpenMaya.MPlug(curve, curve.attributesByName['output'])
+        OpenMaya._scene.connections[(plug._node, plug._path)] = output
+    else:
+        curve = source[0]._node
+    keyTime = time if time is not None else t if t is not None else OpenMaya._scene.currentTime
+    keyValue = value if value is not None else v if v is not None else plug._value()
+    curve.keys[float(keyTime)] = float(keyValue)
+    OpenMaya._notify('animCurveEdited', OpenMaya.MObjectArray([OpenMaya._nodeObject(curve)]))
@@ -0,0 +1,200 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Times the level of detail of the plugin node on a large layout of nodes.
+
+The nodes are laid out on a square grid, each one following a target
+transform going around a circle at its grid point, connected to the node so
+like in a scene a node that does not read its target does not evaluate it.
+A camera pans slowly across the front of the grid looking into it. Maya
+evaluates the camera once a frame for every node, the stand-in does not keep
+values so its matrix is set on each node instead. Every frame compute is
+called on every node with the level of detail off, holding and at a reduced
+rate, and the time per frame is compared with it off. The lod column is how
+many of the evaluations the level of detail left out of the full solve.
+
+The level of detail cone is the view angle plus a margin so nodes switch
+before they are on screen. The step columns are the largest distance any
+node on screen moved between two frames, with the level of detail and with
+it off. A pop when coming back to the full solve would show as the whole
+distance the node was behind in one frame, with the blend it is caught up
+over lodRate frames. Nodes coming closer than lodDistance are still on
+screen, at the reduced rate they catch up by how far they trailed so their
+step can be up to about twice as large.
+
+Each mode is run --repeat times and the fastest run is kept, the times of
+single runs vary a lot on a busy machine. The maya package in
+benchmarks/fakeMaya stands in for OpenMaya, so the numbers include some
+overhead from it and are only useful compared against other runs of this
+script.
+
+    python benchmarks/lodBenchmark.py --nodes 10000 --frames 24
+'''
+
+from __future__ import print_function
+
+import argparse
+import math
+import os
+import sys
+import time
+
+benchmarkDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(benchmarkDir, 'fakeMaya'))
+sys.path.insert(0, os.path.dirname(benchmarkDir))
+
+import maya.OpenMaya as OpenMaya
+import maya.cmds as cmds
+
+import sePushPullConstraint
+import sePushPullMath
+
+timer = getattr(time, 'perf_counter', time.time)
+
+MODES = (('off', sePushPullConstraint.LOD_OFF),
+         ('hold', sePushPullConstraint.LOD_HOLD),
+         ('reducedRate', sePushPullConstraint.LOD_REDUCED))
+
+def loadPlugin():
+    '''Registers the plugin with the stand-in, keeping its banner out of the output'''
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        sePushPullConstraint.initializePlugin(OpenMaya.MObject())
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+def gridPoints(numNodes, spacing):
+    '''Returns the (x, 0, z) points of a square grid centered on the origin'''
+    side = int(math.ceil(math.sqrt(numNodes)))
+    offset = (side - 1) * spacing * 0.5
+    return [((i % side) * spacing - offset, 0.0, (i // side) * spacing - offset) for i in range(numNodes)]
+
+def matrixData(x, y, z):
+    '''Returns a matrix data object of a translation'''
+    matrix = OpenMaya.MMatrix([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [x, y, z, 1]])
+    return OpenMaya.MFnMatrixData().create(matrix)
+
+def targetPosition(point, index, frame, radius=3.0):
+    angle = index * 0.7 + frame * 0.15
+    return (point[0] + radius * math.cos(angle), 0.0, point[2] + radius * math.sin(angle))
+
+def cameraPosition(frame, numFrames, width):
+    '''The camera pans an eighth of the way across the front of the grid'''
+    return (width * 0.125 * (float(frame) / max(numFrames - 1, 1) - 0.5), 10.0, width * 0.75)
+
+def benchmark(numNodes, numFrames, mode, viewAngle, margin, lodDistance, rate, spacing=4.0):
+    '''Calls compute on every node for every frame with the level of detail
+    mode, returns the seconds taken, how many evaluations the level of detail
+    took and the positions of every node at every frame'''
+    OpenMaya.newScene()
+    points = gridPoints(numNodes, spacing)
+    width = math.sqrt(numNodes) * spacing
+
+    nodes = []
+    for point in points:
+        target = cmds.createNode('transform', name='target#')
+        nodeFn = OpenMaya.MFnDependencyNode()
+        nodeFn.create('sePushPullConstraint')
+        nodeFn.findPlug('distance').setDouble(2.0)
+        nodeFn.findPlug('startFrame').setDouble(1.0)
+        nodeFn.findPlug('startPosition').child(0).setDouble(point[0])
+        nodeFn.findPlug('startPosition').child(2).setDouble(point[2])
+        nodeFn.findPlug('lodMode').setShort(mode)
+        nodeFn.findPlug('lodDistance').setDouble(lodDistance)
+        nodeFn.findPlug('lodAngle').setDouble(math.radians(viewAngle + margin))
+        nodeFn.findPlug('lodRate').setInt(rate)
+        cmds.connectAttr(target + '.worldMatrix[0]', nodeFn.name() + '.targetWorldMatrix')
+        nodes.append((nodeFn, nodeFn.userNode(), target))
+
+    nodeClass = sePushPullConstraint.sePushPullConstraintNode
+    outputAttr = nodeClass.constTransAttr
+    childAttrs = (nodeClass.ctAttrX, nodeClass.ctAttrY, nodeClass.ctAttrZ)
+    seconds = 0.0
+    lodCalls = 0
+    positions = []
+
+    # frame 0 is before the start frame and sets every node to its start position
+    for frame in range(numFrames + 1):
+        cameraData = matrixData(*cameraPosition(frame, numFrames + 1, width))
+        framePositions = []
+        for index, (nodeFn, node, target) in enumerate(nodes):
+            nodeFn.findPlug('inTime').setMTime(OpenMaya.MTime(frame))
+            nodeFn.findPlug('cameraMatrix').setMObject(cameraData)
+            cmds.setAttr(target + '.translate', *targetPosition(points[index], index, frame))
+
+            plug = nodeFn.findPlug(outputAttr)
+            data = OpenMaya.MDataBlock(nodeFn.object())
+
+            start = timer()
+            node.compute(plug, data)
+            if frame:
+                seconds += timer() - start
+                lodCalls += node.lodShown is not None
+
+            outputHandle = data.outputValue(outputAttr)
+            framePositions.append(tuple(outputHandle.child(attr).asDouble() for attr in childAttrs))
+        positions.append(framePositions)
+
+    return seconds, lodCalls, positions
+
+def maxOnScreenStep(positions, numFrames, viewAngle, width):
+    '''Returns the largest distance a node inside the view cone moved between two frames'''
+    minCosine = math.cos(math.radians(viewAngle))
+    largest = 0.0
+    for frame in range(2, numFrames + 1):
+        cameraPos = cameraPosition(frame, numFrames + 1, width)
+        for position, previous in zip(positions[frame], positions[frame - 1]):
+            if sePushPullMath.isOutsideView(position, cameraPos, (0.0, 0.0, -1.0), 0.0, minCosine):
+                continue
+            largest = max(largest, math.sqrt(sum((a - b) ** 2 for a, b in zip(position, previous))))
+    return largest
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--nodes', type=int, default=10000, help='nodes in the layout')
+    parser.add_argument('--frames', type=int, default=24, help='frames to evaluate')
+    parser.add_argument('--view-angle', type=float, default=20.0, help='half the camera view angle in degrees')
+    parser.add_argument('--margin', type=float, default=10.0, help='degrees added to the view angle for lodAngle')
+    parser.add_argument('--lod-distance', type=float, default=250.0, help='lodDistance of every node')
+    parser.add_argument('--rate', type=int, default=4, help='lodRate of every node')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of each mode, the fastest is kept')
+    options = parser.parse_args(args)
+
+    loadPlugin()
+    width = math.sqrt(options.nodes) * 4.0
+    fullSeconds = None
+    fullStep = None
+    print('%8s %8s %12s %12s %8s %8s %16s %16s' % ('nodes', 'frames', 'mode', 'ms/frame', 'speedup', 'lod %',
+                                                   'on screen step', 'full step'))
+    for name, mode in MODES:
+        runs = [benchmark(options.nodes, options.frames, mode, options.view_angle, options.margin,
+                          options.lod_distance, options.rate) for _ in range(max(options.repeat, 1))]
+        seconds, lodCalls, positions = min(runs, key=lambda run: run[0])
+        step = maxOnScreenStep(positions, options.frames, options.view_angle, width)
+        if fullSeconds is None:
+            fullSeconds = seconds
+            fullStep = step
+        print('%8d %8d %12s %12.2f %8.2f %8.1f %16.3f %16.3f' % (options.nodes, options.frames, name,
+                                                                1e3 * seconds / options.frames, fullSeconds / seconds,
+                                                                100.0 * lodCalls / (options.nodes * options.frames),
+                                                                step, fullStep))
+    sePushPullConstraint.uninitializePlugin(OpenMaya.MObject())
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Times the closest point lookups of the mesh target mode.
+
+Spheres of about the given triangle counts are built, then wobbled so the
+hierarchy is refit, and random points near their surface are looked up. The
+lookups are checked against a brute force search over every triangle, which is
+timed too. The push and pull solve is checked to end up the distance in front
+of the surface. Needs NumPy, but not Maya.
+
+A lookup tests every triangle closer to the point than its closest point on
+the surface could be, so it costs more the further the point is from the mesh
+compared to the size of the triangles.
+
+    python benchmarks/meshBenchmark.py --triangles 1000 10000 100000 1000000
+'''
+
+from __future__ import print_function
+
+import argparse
+import math
+import os
+import sys
+import time
+
+benchmarkDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarkDir))
+
+import numpy
+
+import sePushPullMath
+import sePushPullMesh
+
+timer = getattr(time, 'perf_counter', time.time)
+
+def sphereMesh(numTriangles, radius=5.0):
+    '''Returns the triangles and points of a sphere with about the number of
+    triangles, wound so the normals face out'''
+    segments = max(int(math.sqrt(numTriangles)), 3)
+    rings = max(numTriangles // (2 * segments), 2)
+
+    theta = numpy.linspace(0.0, math.pi, rings + 1)[1:-1]
+    phi = numpy.linspace(0.0, 2.0 * math.pi, segments, endpoint=False)
+    t, p = numpy.meshgrid(theta, phi, indexing='ij')
+    points = numpy.empty((len(theta) * segments + 2, 3))
+    points[:-2, 0] = (numpy.sin(t) * numpy.cos(p)).ravel()
+    points[:-2, 1] = numpy.cos(t).ravel()
+    points[:-2, 2] = (-numpy.sin(t) * numpy.sin(p)).ravel()
+    points[-2] = (0.0, 1.0, 0.0)
+    points[-1] = (0.0, -1.0, 0.0)
+    points *= radius
+
+    ring = numpy.arange(len(theta))[:, None] * segments
+    column = numpy.arange(segments)[None, :]
+    a = (ring + column).ravel()
+    b = (ring + (column + 1) % segments).ravel()
+    quads = a[:-segments], b[:-segments], a[:-segments] + segments, b[:-segments] + segments
+    triangles = [numpy.stack([quads[0], quads[2], quads[1]], 1),
+                 numpy.stack([quads[1], quads[2], quads[3]], 1),
+                 numpy.stack([numpy.full(segments, len(points) - 2), a[:segments], b[:segments]], 1),
+                 numpy.stack([numpy.full(segments, len(points) - 1), b[-segments:], a[-segments:]], 1)]
+    return numpy.concatenate(triangles), points
+
+def wobble(points, amount):
+    '''Returns the points moved in and out along their direction'''
+    return points * (1.0 + amount * numpy.sin(points[:, :1] * 3.0) * numpy.cos(points[:, 1:2] * 2.0))
+
+def bruteClosestPoint(point, corners):
+    '''Returns the squared distance and closest point over every triangle,
+    from the plane when the projection lands inside and the edges otherwise'''
+    a, b, c = corners[:, 0], corners[:, 1], corners[:, 2]
+    normal = numpy.cross(b - a, c - a)
+    area = numpy.einsum('ij,ij->i', normal, normal)
+    safeArea = numpy.where(area > 0.0, area, 1.0)
+    projected = point - normal * (numpy.einsum('ij,ij->i', point - a, normal) / safeArea)[:, None]
+    inside = area > 0.0
+    for u, v in ((a, b), (b, c), (c, a)):
+        inside &= numpy.einsum('ij,ij->i', numpy.cross(v - u, projected - u), normal) >= 0.0
+
+    candidates = [numpy.where(inside[:, None], projected, numpy.inf)]
+    for u, v in ((a, b), (b, c), (c, a)):
+        edge = v - u
+        length = numpy.einsum('ij,ij->i', edge, edge)
+        s = numpy.clip(numpy.einsum('ij,ij->i', point - u, edge) / numpy.where(length > 0.0, length, 1.0), 0.0, 1.0)
+        candidates.append(u + edge * s[:, None])
+
+    candidates = numpy.stack(candidates)
+    distances = numpy.sum((candidates - point) ** 2, axis=2)
+    distances[numpy.isnan(distances)] = numpy.inf
+    best = numpy.unravel_index(numpy.argmin(distances), distances.shape)
+    return distances[best], candidates[best]
+
+def benchmarkMesh(numTriangles, numQueries, numChecks, seed):
+    triangles, points = sphereMesh(numTriangles)
+    random = numpy.random.RandomState(seed)
+
+    start = timer()
+    target = sePushPullMesh.sePushPullMeshTarget()
+    bvh = target.update(len(triangles), lambda: triangles, points)
+    buildSeconds = timer() - start
+
+    moved = wobble(points, 0.1)
+    start = timer()
+    bvh = target.update(len(triangles), lambda: triangles, moved)
+    refitSeconds = timer() - start
+
+    # points near the surface, inside and out
+    directions = random.normal(size=(numQueries, 3))
+    directions /= numpy.linalg.norm(directions, axis=1)[:, None]
+    queries = directions * random.uniform(4.5, 5.5, size=(numQueries, 1))
+
+    start = timer()
+    results = [bvh.closestPoint(*query) for query in queries.tolist()]
+    querySeconds = (timer() - start) / numQueries
+
+    corners = moved[triangles]
+    match = True
+    start = timer()
+    for query, result in zip(queries[:numChecks], results):
+        distance, closest = bruteClosestPoint(query, corners)
+        match = match and abs(distance - result[0]) < 1e-9 and numpy.allclose(closest, result[1], atol=1e-6)
+    bruteSeconds = (timer() - start) / max(min(numChecks, numQueries), 1)
+
+    # every solved position ends up the distance in front of the surface
+    parentSpace = sePushPullMath.sePushPullParentSpace()
+    parentSpace.update([1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0])
+    for query in queries[:numChecks].tolist():
+        position = sePushPullMesh.solveMeshPosition(query, bvh, parentSpace, 1.0, True, True)
+        if position is not None:
+            distance, closest, triangle, feature = bvh.closestPoint(*position)
+            nx, ny, nz = bvh.pseudonormal(triangle, feature)
+            front = (position[0] - closest[0]) * nx + (position[1] - closest[1]) * ny + (position[2] - closest[2]) * nz
+            # a point pushed near a crease can end up closer to another triangle
+            match = match and front >= 0.0 and math.sqrt(distance) <= 1.0 + 1e-9
+
+    return {'triangles': len(triangles),
+            'build': buildSeconds,
+            'refit': refitSeconds,
+            'query': querySeconds,
+            'brute': bruteSeconds,
+            'match': match}
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--triangles', type=int, nargs='+', default=[1000, 10000, 100000, 1000000],
+                        help='about how many triangles the spheres have')
+    parser.add_argument('--queries', type=int, default=1000, help='lookups timed on each sphere')
+    parser.add_argument('--checks', type=int, default=20, help='lookups checked against the brute force search')
+    parser.add_argument('--seed', type=int, default=1, help='seed of the random lookups')
+    options = parser.parse_args(args)
+
+    print('%10s %10s %10s %12s %12s %8s' % ('triangles', 'build ms', 'refit ms', 'query us', 'brute us', 'match'))
+    for numTriangles in options.triangles:
+        result = benchmarkMesh(numTriangles, options.queries, options.checks, options.seed)
+        print('%10d %10.1f %10.1f %12.1f %12.1f %8s' % (result['triangles'], result['build'] * 1e3,
+                                                      result['refit'] * 1e3, result['query'] * 1e6,
+                                                      result['brute'] * 1e6, result['match']))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
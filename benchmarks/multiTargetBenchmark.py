@@ -0,0 +1,79 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Compares the grid and the all pairs multi target solve, and the default
+that picks between them by the number of pairs.
+
+The points and targets are scattered in a box that grows with the count so
+the number of targets near each point stays about the same, like a crowd
+spreading out over a bigger set. Run with:
+
+    python benchmarks/multiTargetBenchmark.py
+'''
+
+from __future__ import print_function
+
+import os
+import sys
+import timeit
+
+import numpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sePushPullSolver
+
+def makeScene(numPoints, numTargets, density=0.05, seed=0):
+    '''Returns random points, target matrices and radii for the counts'''
+    random = numpy.random.RandomState(seed)
+    size = ((numPoints + numTargets) / density) ** (1.0 / 3.0)
+
+    points = random.uniform(0.0, size, (numPoints, 3))
+    targetMatrices = numpy.tile(numpy.identity(4), (numTargets, 1, 1))
+    targetMatrices[:, 3, :3] = random.uniform(0.0, size, (numTargets, 3))
+    radius = random.uniform(0.5, 2.0, numTargets)
+
+    return points, targetMatrices, radius
+
+def timeSolve(points, targetMatrices, radius, bruteForce, repeat=3):
+    '''Returns the best time of a single frame solve'''
+    timer = lambda: sePushPullSolver.solveMultiTargetFrame(points, targetMatrices, radius, bruteForce=bruteForce)
+    return min(timeit.repeat(timer, number=1, repeat=repeat))
+
+def main():
+    print('%10s %10s %12s %12s %8s %12s' % ('points', 'targets', 'all pairs', 'grid', 'speedup', 'default'))
+
+    crossover = None
+    for count in (10, 30, 100, 300, 1000, 3000, 10000, 30000):
+        points, targetMatrices, radius = makeScene(count, count // 2)
+
+        bruteTime = timeSolve(points, targetMatrices, radius, True)
+        gridTime = timeSolve(points, targetMatrices, radius, False)
+        defaultTime = timeSolve(points, targetMatrices, radius, None)
+
+        if crossover is None and gridTime < bruteTime:
+            crossover = count
+
+        print('%10d %10d %11.3fms %11.3fms %7.1fx %11.3fms' % (count, count // 2, bruteTime * 1000.0,
+                                                               gridTime * 1000.0, bruteTime / gridTime,
+                                                               defaultTime * 1000.0))
+
+    if crossover is None:
+        print('The grid was never faster than all pairs.')
+    else:
+        print('The grid is faster from %d points.' % crossover)
+
+if __name__ == '__main__':
+    main()
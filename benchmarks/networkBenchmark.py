@@ -0,0 +1,99 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Times the chained constraint solve with one process and with a pool.
+
+Builds chains of constraints like the links of a tail, where the first link
+follows an animated target and every other link targets the transform the one
+before it drives. Every chain is solved with one process and then with each
+of the process counts given, the results have to match exactly.
+
+    python benchmarks/networkBenchmark.py --chains 64 --links 16 --frames 200 --processes 1 2 4
+'''
+
+from __future__ import print_function
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy
+
+import sePushPullNetwork
+
+timer = getattr(time, 'perf_counter', time.time)
+
+def buildNetwork(numChains, numLinks, numFrames, seed=0):
+    '''Returns a network of chains that do not depend on each other'''
+    random = numpy.random.RandomState(seed)
+    numConstraints = numChains * numLinks
+    frames = numpy.arange(numFrames, dtype=numpy.float64)
+
+    links = numpy.tile(numpy.arange(numLinks), numChains)
+    firstLinks = links == 0
+    targetDrivers = numpy.where(firstLinks, -1, numpy.arange(numConstraints) - 1)
+    parentDrivers = numpy.full(numConstraints, -1)
+
+    # the first links follow a target going around a circle, the others target the link before
+    phases = random.uniform(0.0, 2.0 * numpy.pi, numChains)
+    angles = 0.1 * frames[:, None] + phases[None, :]
+    targetMatrices = numpy.broadcast_to(numpy.identity(4), (numFrames, numConstraints, 4, 4)).copy()
+    targetMatrices[:, firstLinks, 3, 0] = 10.0 * numpy.cos(angles)
+    targetMatrices[:, firstLinks, 3, 2] = 10.0 * numpy.sin(angles)
+
+    identities = numpy.broadcast_to(numpy.identity(4), (numFrames, numConstraints, 4, 4))
+    startPositions = numpy.column_stack([links + 1.0, numpy.zeros(numConstraints), numpy.zeros(numConstraints)])
+
+    return sePushPullNetwork.sePushPullNetwork(frames, targetDrivers, targetMatrices, parentDrivers, identities,
+                                               identities, numpy.ones((numConstraints, 3), dtype=bool),
+                                               numpy.zeros((numFrames, numConstraints, 3)),
+                                               numpy.full((numFrames, numConstraints), 1.0),
+                                               numpy.ones((numFrames, numConstraints), dtype=bool),
+                                               numpy.ones((numFrames, numConstraints), dtype=bool),
+                                               numpy.zeros(numConstraints), startPositions)
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--chains', type=int, default=64, help='chains that do not depend on each other')
+    parser.add_argument('--links', type=int, default=16, help='constraints in each chain')
+    parser.add_argument('--frames', type=int, default=200, help='frames to solve')
+    parser.add_argument('--processes', type=int, nargs='+', default=[2, 4], help='pool sizes to time')
+    options = parser.parse_args(args)
+
+    network = buildNetwork(options.chains, options.links, options.frames)
+    print('%d chains of %d links over %d frames, %d cpus' % (options.chains, options.links, options.frames,
+                                                             multiprocessing.cpu_count()))
+
+    start = timer()
+    expected = network.solve(1)
+    serialTime = timer() - start
+    print('%-10s %10s %8s %8s' % ('processes', 'seconds', 'speedup', 'match'))
+    print('%-10d %10.3f %7.1fx %8s' % (1, serialTime, 1.0, True))
+
+    for processes in options.processes:
+        start = timer()
+        positions = network.solve(processes)
+        seconds = timer() - start
+        print('%-10d %10.3f %7.1fx %8s' % (processes, seconds, serialTime / seconds,
+                                           numpy.array_equal(positions, expected)))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,216 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Times the Python plugin node and command without Maya.
+
+The maya package in benchmarks/fakeMaya stands in for OpenMaya, OpenMayaMPx
+and cmds, so the numbers include some overhead from the stand-in and are only
+useful compared against other runs of this script. Each node follows a target
+moving on a circle. The frames before the start frame, the frames with push
+and pull turned off and the solved frames are timed separately.
+
+    python benchmarks/pluginBenchmark.py --nodes 1 10 100 --frames 200 --output results.json
+'''
+
+from __future__ import print_function
+
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+benchmarkDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(benchmarkDir, 'fakeMaya'))
+sys.path.insert(0, os.path.dirname(benchmarkDir))
+
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaMPx as OpenMayaMPx
+import maya.cmds as cmds
+
+import sePushPullConstraint
+
+timer = getattr(time, 'perf_counter', time.time)
+
+BRANCHES = ('beforeStartFrame', 'pushPullOff', 'solve')
+
+def loadPlugin():
+    '''Registers the plugin with the stand-in, keeping its banner out of the output'''
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        sePushPullConstraint.initializePlugin(OpenMaya.MObject())
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+def targetMatrices(numFrames, radius=5.0, phase=0.0):
+    '''Returns matrix data objects of a target going around a circle, one per frame'''
+    matrices = []
+    for frame in range(numFrames):
+        angle = phase + frame * 0.1
+        matrix = OpenMaya.MMatrix([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0],
+                                   [radius * math.cos(angle), 0.0, radius * math.sin(angle), 1]])
+        matrices.append(OpenMaya.MFnMatrixData().create(matrix))
+    return matrices
+
+def benchmarkCompute(numNodes, numFrames, startFrame=10.0, offFraction=0.2):
+    '''Calls compute on every node for every frame and returns the timings'''
+    OpenMaya.newScene()
+
+    nodes = []
+    for i in range(numNodes):
+        nodeFn = OpenMaya.MFnDependencyNode()
+        nodeFn.create('sePushPullConstraint')
+        nodeFn.findPlug('distance').setDouble(2.0)
+        nodeFn.findPlug('startFrame').setDouble(startFrame)
+        nodes.append((nodeFn, nodeFn.userNode(), targetMatrices(numFrames, phase=i * 0.01)))
+
+    outputAttr = sePushPullConstraint.sePushPullConstraintNode.constTransAttr
+    branchTimes = dict((branch, 0.0) for branch in BRANCHES)
+    branchCalls = dict((branch, 0) for branch in BRANCHES)
+
+    # push and pull are turned off for the last frames
+    offFrame = int(numFrames * (1.0 - offFraction))
+
+    for frame in range(numFrames):
+        if frame < startFrame:
+            branch = 'beforeStartFrame'
+        elif frame >= offFrame:
+            branch = 'pushPullOff'
+        else:
+            branch = 'solve'
+
+        for nodeFn, node, matrices in nodes:
+            nodeFn.findPlug('inTime').setMTime(OpenMaya.MTime(frame))
+            nodeFn.findPlug('targetWorldMatrix').setMObject(matrices[frame])
+            if frame == offFrame:
+                nodeFn.findPlug('push').setBool(False)
+                nodeFn.findPlug('pull').setBool(False)
+
+            plug = nodeFn.findPlug(outputAttr)
+            data = OpenMaya.MDataBlock(nodeFn.object())
+
+            start = timer()
+            node.compute(plug, data)
+            branchTimes[branch] += timer() - start
+
+        branchCalls[branch] += numNodes
+
+    totalTime = sum(branchTimes.values())
+    return {'nodes': numNodes,
+            'frames': numFrames,
+            'seconds': totalTime,
+            'framesPerSecond': numFrames / totalTime,
+            'computesPerSecond': numFrames * numNodes / totalTime,
+            'branches': dict((branch, {'calls': branchCalls[branch],
+                                       'seconds': branchTimes[branch],
+                                       'microsecondsPerCall': 1e6 * branchTimes[branch] / max(branchCalls[branch], 1)})
+                             for branch in BRANCHES)}
+
+def benchmarkCommand(numConstraints):
+    '''Creates constraints with the command then undoes and redoes them, first
+    one call per constraint and then all of them in one call'''
+    OpenMaya.newScene()
+
+    pairs = []
+    for i in range(numConstraints):
+        target = cmds.createNode('transform', name='target%d' % i)
+        constrained = cmds.createNode('transform', name='constrained%d' % i)
+        cmds.setAttr(constrained + '.translate', float(i), 0.0, 3.0)
+        pairs.append((target, constrained))
+
+    commands = []
+    start = timer()
+    for target, constrained in pairs:
+        commands.append(OpenMayaMPx.runCommand('sePushPullConstraint', '-d', 2.0, '-sf', 1, target, constrained))
+    doItTime = timer() - start
+
+    start = timer()
+    for command in reversed(commands):
+        command.undoIt()
+    undoItTime = timer() - start
+
+    start = timer()
+    for command in commands:
+        command.redoIt()
+    redoItTime = timer() - start
+
+    # the same constraints again from a single call with the pairs flag
+    for command in reversed(commands):
+        command.undoIt()
+
+    pairArgs = [name for pair in pairs for name in pair]
+    start = timer()
+    command = OpenMayaMPx.runCommand('sePushPullConstraint', '-d', 2.0, '-sf', 1, '-pairs', *pairArgs)
+    bulkDoItTime = timer() - start
+
+    start = timer()
+    command.undoIt()
+    bulkUndoItTime = timer() - start
+
+    start = timer()
+    command.redoIt()
+    bulkRedoItTime = timer() - start
+
+    return {'constraints': numConstraints,
+            'doItSeconds': doItTime,
+            'undoItSeconds': undoItTime,
+            'redoItSeconds': redoItTime,
+            'doItMillisecondsPerCall': 1e3 * doItTime / numConstraints,
+            'redoItMillisecondsPerCall': 1e3 * redoItTime / numConstraints,
+            'bulk': {'doItSeconds': bulkDoItTime,
+                     'undoItSeconds': bulkUndoItTime,
+                     'redoItSeconds': bulkRedoItTime}}
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--nodes', type=int, nargs='+', default=[1, 10, 100, 1000],
+                        help='node counts to time compute with')
+    parser.add_argument('--frames', type=int, default=100, help='frames to evaluate per node count')
+    parser.add_argument('--commands', type=int, default=200, help='constraints to create with the command')
+    parser.add_argument('--output', help='write the results to this JSON file instead of stdout')
+    options = parser.parse_args(args)
+
+    loadPlugin()
+
+    results = {'python': platform.python_version(),
+               'platform': platform.platform(),
+               'plugin': os.path.abspath(sePushPullConstraint.__file__),
+               'compute': [],
+               'command': benchmarkCommand(options.commands)}
+
+    for numNodes in options.nodes:
+        results['compute'].append(benchmarkCompute(numNodes, options.frames))
+
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+        for compute in results['compute']:
+            print('%6d nodes %10.1f frames/sec %12.1f computes/sec' % (compute['nodes'], compute['framesPerSecond'],
+                                                                     compute['computesPerSecond']))
+        print('Wrote %s' % options.output)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
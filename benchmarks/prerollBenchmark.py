@@ -0,0 +1,181 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Times jumping to the end of a shot with and without the pre-roll.
+
+Each constraint follows a keyed target with a rotating parent. Without the
+pre-roll, jumping from the first frame to the last one with the state cache
+on solves on from the first frame, the frames in between are replayed once
+their inputs are sampled while Maya is idle. With it the idle time spent sampling the
+inputs and waiting for the worker thread is timed, then the same jump only
+looks the position up. A key is then moved half way through the shot, the
+time jumps straight to the last frame and the idle time to solve the frames
+after the key again is timed. The match column
+compares every frame with playing the shot through without the pre-roll.
+
+The idle events are sent by the stand-in maya package in benchmarks/fakeMaya,
+so the numbers include some overhead from it and are only useful compared
+against other runs of this script.
+
+    python benchmarks/prerollBenchmark.py --nodes 1 10 50 --frames 200
+'''
+
+from __future__ import print_function
+
+import argparse
+import os
+import sys
+import time
+
+benchmarkDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(benchmarkDir, 'fakeMaya'))
+sys.path.insert(0, os.path.dirname(benchmarkDir))
+
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaAnim as OpenMayaAnim
+import maya.OpenMayaMPx as OpenMayaMPx
+import maya.cmds as cmds
+
+import sePushPullConstraint
+import sePushPullPreroll
+
+timer = getattr(time, 'perf_counter', time.time)
+
+def loadPlugin():
+    '''Registers the plugin with the stand-in, keeping its banner out of the output'''
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        sePushPullConstraint.initializePlugin(OpenMaya.MObject())
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+def buildScene(numNodes, numFrames, attribute=None):
+    '''Makes the constraints with a key every 10 frames on each target and
+    parent, the attribute is turned on for every node'''
+    OpenMaya.newScene()
+    OpenMayaAnim.MAnimControl.setMinMaxTime(OpenMaya.MTime(0.0), OpenMaya.MTime(float(numFrames)))
+
+    constrained = []
+    for i in range(numNodes):
+        target = cmds.createNode('transform', name='target%d' % i)
+        parent = cmds.createNode('transform', name='parent%d' % i)
+        child = cmds.createNode('transform', name='constrained%d' % i, parent=parent)
+        cmds.setAttr(child + '.translate', 4.0 + i % 3, 0.0, 0.0)
+        for frame in range(0, numFrames + 10, 10):
+            cmds.setKeyframe(target, attribute='translateX', time=frame, value=((frame * 7 + i) % 11) - 5.0)
+            cmds.setKeyframe(target, attribute='translateZ', time=frame, value=((frame * 3 + i) % 7) - 3.0)
+            cmds.setKeyframe(parent, attribute='rotateY', time=frame, value=0.05 * frame)
+
+        command = OpenMayaMPx.runCommand('sePushPullConstraint', '-d', 2.0, '-sf', 1, target, child)
+        if attribute is not None:
+            cmds.setAttr(command.currentResult() + '.' + attribute, True)
+        constrained.append(child)
+
+    # the frame before the start frame sets every node to its start position
+    read(constrained, 0)
+    return constrained
+
+def read(constrained, frame):
+    '''Returns the positions of every constrained at the frame'''
+    cmds.currentTime(frame)
+    return [cmds.getAttr(child + '.translate')[0] for child in constrained]
+
+def play(constrained, numFrames):
+    '''Returns the positions at every frame from the first one'''
+    return [read(constrained, frame) for frame in range(numFrames + 1)]
+
+def jump(constrained, frame):
+    '''Returns the positions at the frame and the seconds taken to get them'''
+    start = timer()
+    positions = read(constrained, frame)
+    return positions, timer() - start
+
+def settle():
+    '''Sends idle events until every pre-roll is sampled and waits for the
+    worker, returns the seconds taken'''
+    start = timer()
+    while OpenMaya.idle():
+        pass
+    sePushPullPreroll.worker.wait()
+    return timer() - start
+
+def maxDifference(positions, otherPositions):
+    return max(abs(a - b) for frame, otherFrame in zip(positions, otherPositions)
+               for position, otherPosition in zip(frame, otherFrame)
+               for a, b in zip(position, otherPosition))
+
+def editKey(frame):
+    cmds.setKeyframe('target0', attribute='translateX', time=frame, value=9.0)
+
+def benchmark(numNodes, numFrames):
+    '''Returns the timings of the jump with the state cache and with the pre-roll'''
+    editFrame = numFrames // 2 + 5
+
+    constrained = buildScene(numNodes, numFrames)
+    serialPositions = play(constrained, numFrames)
+    editKey(editFrame)
+    read(constrained, 0)
+    editedPositions = play(constrained, numFrames)
+
+    # the jump solves on from the last position until the frames in between
+    # are sampled while Maya is idle, then they are replayed from the cache
+    constrained = buildScene(numNodes, numFrames, 'useCache')
+    cachePositions, cacheTime = jump(constrained, numFrames)
+    settle()
+    cachePositions = read(constrained, numFrames)
+
+    constrained = buildScene(numNodes, numFrames, 'preroll')
+    idleTime = settle()
+    prerollPositions, prerollTime = jump(constrained, numFrames)
+    difference = max(maxDifference([cachePositions, prerollPositions], serialPositions[-1:] * 2),
+                     maxDifference(play(constrained, numFrames), serialPositions))
+
+    # the edit is found without evaluating its frame, only the frames after it are solved again
+    editKey(editFrame)
+    read(constrained, numFrames)
+    editIdleTime = settle()
+    difference = max(difference, maxDifference(play(constrained, numFrames), editedPositions))
+
+    return {'nodes': numNodes,
+            'frames': numFrames,
+            'cacheJumpMilliseconds': 1e3 * cacheTime,
+            'idleSeconds': idleTime,
+            'prerollJumpMilliseconds': 1e3 * prerollTime,
+            'editIdleSeconds': editIdleTime,
+            'match': difference < 1e-9}
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--nodes', type=int, nargs='+', default=[1, 10, 50], help='constraints in each scene')
+    parser.add_argument('--frames', type=int, default=200, help='frames in the shot')
+    options = parser.parse_args(args)
+
+    loadPlugin()
+    print('%8s %8s %16s %10s %16s %10s %6s' % ('nodes', 'frames', 'cache jump ms', 'idle s', 'preroll jump ms',
+                                               'edit s', 'match'))
+    for numNodes in options.nodes:
+        result = benchmark(numNodes, options.frames)
+        print('%8d %8d %16.2f %10.3f %16.2f %10.3f %6s' % (result['nodes'], result['frames'],
+                                                          result['cacheJumpMilliseconds'], result['idleSeconds'],
+                                                          result['prerollJumpMilliseconds'], result['editIdleSeconds'],
+                                                          result['match']))
+    sePushPullConstraint.uninitializePlugin(OpenMaya.MObject())
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Times the per call cost of the sePushPullConstraint node solve.
+
+The solve the node used before the parent matrix inverse was kept is timed
+against the current one, with a static parent, a parent that only moves and a
+parent that rotates every call. The constrained is placed so every call needs
+a correction, which is when the old solve inverted the parent matrix.
+
+Run it with mayapy to time the real OpenMaya classes, with any other Python
+the stand-in package in benchmarks/fakeMaya is used. The stand-in matrix
+inverse is pure Python so the old solve looks slower there than in Maya.
+
+    python benchmarks/solveBenchmark.py --calls 20000
+'''
+
+from __future__ import print_function
+
+import argparse
+import math
+import os
+import sys
+import time
+
+benchmarkDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarkDir))
+
+try:
+    import maya.OpenMaya as OpenMaya
+except ImportError:
+    sys.path.insert(0, os.path.join(benchmarkDir, 'fakeMaya'))
+    import maya.OpenMaya as OpenMaya
+
+import sePushPullConstraint
+
+timer = getattr(time, 'perf_counter', time.time)
+
+CASES = ('static', 'translating', 'rotating')
+
+def allocatingSolve(lastPosition, targetMat, constraintParentMat, dist, isPushActive, isPullActive):
+    '''The solve as the node did it before, building new points and vectors
+    and inverting the parent matrix on every correction'''
+    lastPosition = OpenMaya.MPoint(lastPosition[0], lastPosition[1], lastPosition[2])
+    targetPos = OpenMaya.MPoint(targetMat(3,0), targetMat(3,1), targetMat(3,2))
+    relativePos = OpenMaya.MVector((lastPosition * constraintParentMat) - targetPos)
+    currentDistance = relativePos.length()
+    if (isPullActive and (currentDistance > dist)) or (isPushActive and (currentDistance < dist)):
+        relativePos.normalize()
+        relativePos *= dist
+        newPosition = targetPos + relativePos
+        return OpenMaya.MVector(newPosition * constraintParentMat.inverse())
+    return None
+
+def parentMatrices(case, numMatrices):
+    '''Returns the parent matrices for the case, one per call'''
+    matrices = []
+    for i in range(numMatrices):
+        angle = i * 0.01 if case == 'rotating' else 0.3
+        offset = i * 0.01 if case != 'static' else 0.0
+        c, s = math.cos(angle), math.sin(angle)
+        matrices.append(OpenMaya.MMatrix([[c, 0, -s, 0], [0, 1, 0, 0], [s, 0, c, 0], [offset, 1.0, 2.0, 1]]))
+    if case == 'static':
+        # a static parent reads the same matrix every time
+        matrices = [matrices[0]] * numMatrices
+    return matrices
+
+def targetMatrices(numMatrices):
+    '''Returns target matrices going around a circle, one per call'''
+    return [OpenMaya.MMatrix([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0],
+                              [5.0 * math.cos(i * 0.1), 0.0, 5.0 * math.sin(i * 0.1), 1]])
+            for i in range(numMatrices)]
+
+def benchmarkCase(case, numCalls):
+    '''Returns the microseconds per call of the old and the current solve'''
+    parents = parentMatrices(case, numCalls)
+    targets = targetMatrices(numCalls)
+
+    # far from every target so each call is pulled in
+    lastPosition = (100.0, 0.0, 0.0)
+
+    start = timer()
+    for parent, target in zip(parents, targets):
+        allocatingSolve(lastPosition, target, parent, 2.0, True, True)
+    beforeTime = timer() - start
+
+    parentSpace = sePushPullConstraint.sePushPullParentSpace()
+    start = timer()
+    for parent, target in zip(parents, targets):
+        parentSpace.update(parent)
+        sePushPullConstraint.solvePosition(lastPosition, (target(3,0), target(3,1), target(3,2)), parentSpace,
+                                           2.0, True, True)
+    afterTime = timer() - start
+
+    return {'case': case,
+            'calls': numCalls,
+            'beforeMicroseconds': 1e6 * beforeTime / numCalls,
+            'afterMicroseconds': 1e6 * afterTime / numCalls,
+            'inversions': parentSpace.inversions}
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--calls', type=int, default=20000, help='solves to time per case')
+    options = parser.parse_args(args)
+
+    print('OpenMaya from %s' % os.path.dirname(OpenMaya.__file__))
+    print('%-12s %12s %12s %8s %12s' % ('parent', 'before us', 'after us', 'speedup', 'inversions'))
+    for case in CASES:
+        result = benchmarkCase(case, options.calls)
+        print('%-12s %12.2f %12.2f %7.1fx %12d' % (case, result['beforeMicroseconds'], result['afterMicroseconds'],
+                                                 result['beforeMicroseconds'] / result['afterMicroseconds'],
+                                                 result['inversions']))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Times simulating a crowd of constraints in a sePushPullStateStore.
+
+Each agent follows its own target going around a circle. The store is solved
+frame by frame, saved half way through, loaded back and solved to the end.
+The result is checked against sePushPullSolver.solve on the first agents,
+which solves every frame in one call without a store. Needs NumPy, but not
+Maya.
+
+    python benchmarks/stateStoreBenchmark.py --agents 1000 10000 100000 --frames 50
+'''
+
+from __future__ import print_function
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+benchmarkDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarkDir))
+
+import numpy
+
+import sePushPullSolver
+import sePushPullState
+
+timer = getattr(time, 'perf_counter', time.time)
+
+def targetMatrices(numAgents, frame, radius=5.0):
+    '''Returns the (agents, 4, 4) target matrices going around their circles'''
+    angles = numpy.arange(numAgents) * 0.01 + frame * 0.1
+    matrices = numpy.broadcast_to(numpy.identity(4), (numAgents, 4, 4)).copy()
+    matrices[:, 3, 0] = radius * numpy.cos(angles)
+    matrices[:, 3, 2] = radius * numpy.sin(angles)
+    return matrices
+
+def buildStore(numAgents, seed):
+    '''Returns a store with random distances and start positions'''
+    random = numpy.random.RandomState(seed)
+    store = sePushPullState.sePushPullStateStore(numAgents)
+    store.startPosition[:] = random.uniform(-8.0, 8.0, size=(numAgents, 3))
+    store.lastPosition[:] = store.startPosition
+    store.distance[:] = random.uniform(1.0, 3.0, size=numAgents)
+    store.push[:] = random.uniform(size=numAgents) < 0.9
+    return store
+
+def benchmarkStore(numAgents, numFrames, numChecked, seed, tempDir):
+    parentMatrix = numpy.broadcast_to(numpy.identity(4), (numAgents, 4, 4))
+    store = buildStore(numAgents, seed)
+    original = buildStore(numAgents, seed)
+
+    solveSeconds = 0.0
+    path = os.path.join(tempDir, 'crowd%d.spps' % numAgents)
+    for frame in range(1, numFrames + 1):
+        if frame == numFrames // 2:
+            start = timer()
+            store.save(path)
+            saveSeconds = timer() - start
+
+            start = timer()
+            store = sePushPullState.sePushPullStateStore.load(path)
+            loadSeconds = timer() - start
+
+        targets = targetMatrices(numAgents, frame)
+        start = timer()
+        store.solveFrame(targets, parentMatrix, float(frame))
+        solveSeconds += timer() - start
+
+    # the same agents solved without a store
+    numChecked = min(numChecked, numAgents)
+    frames = numpy.arange(1, numFrames + 1, dtype=numpy.float64)
+    allTargets = numpy.stack([targetMatrices(numAgents, frame)[:numChecked] for frame in frames])
+    expected = sePushPullSolver.solve(allTargets, numpy.broadcast_to(numpy.identity(4), allTargets.shape), frames,
+                                      original.distance[:numChecked], original.startFrame[:numChecked],
+                                      original.startPosition[:numChecked], original.push[:numChecked],
+                                      original.pull[:numChecked])
+    match = numpy.array_equal(expected[-1], store.lastPosition[:numChecked])
+
+    return {'agents': numAgents,
+            'bytes': store.nbytes,
+            'fileBytes': os.path.getsize(path),
+            'frame': solveSeconds / numFrames,
+            'save': saveSeconds,
+            'load': loadSeconds,
+            'match': match}
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--agents', type=int, nargs='+', default=[1000, 10000, 100000], help='crowd sizes to time')
+    parser.add_argument('--frames', type=int, default=50, help='frames to simulate')
+    parser.add_argument('--checked', type=int, default=1000, help='agents checked against the solver')
+    parser.add_argument('--seed', type=int, default=1, help='seed of the random agents')
+    options = parser.parse_args(args)
+
+    tempDir = tempfile.mkdtemp()
+    try:
+        print('%8s %12s %12s %10s %9s %9s %8s' % ('agents', 'memory KB', 'file KB', 'frame ms', 'save ms',
+                                                  'load ms', 'match'))
+        for numAgents in options.agents:
+            result = benchmarkStore(numAgents, options.frames, options.checked, options.seed, tempDir)
+            print('%8d %12.1f %12.1f %10.2f %9.2f %9.2f %8s' % (result['agents'], result['bytes'] / 1024.0,
+                                                              result['fileBytes'] / 1024.0, result['frame'] * 1e3,
+                                                              result['save'] * 1e3, result['load'] * 1e3,
+                                                              result['match']))
+    finally:
+        shutil.rmtree(tempDir)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
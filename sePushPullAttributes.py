@@ -0,0 +1,319 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Adds the attributes of the sePushPullConstraint and
+sePushPullMultiConstraint nodes for both builds of the plugin. The API 1.0
+sets the attribute flags with methods and the API 2.0 with properties, the
+setFlags call of the plugin api does either.'''
+
+import math
+
+from sePushPullNode import LOD_OFF, LOD_HOLD, LOD_REDUCED
+
+def initializeNode(nodeClass, api):
+    '''Handles adding the attributes to the node'''
+    OpenMaya = api.OpenMaya
+    setFlags = api.setFlags
+    numericAttr = OpenMaya.MFnNumericAttribute()
+    unitAttr = OpenMaya.MFnUnitAttribute()
+    matrixAttr = OpenMaya.MFnMatrixAttribute()
+
+    # create the output translation attribute
+    nodeClass.ctAttrX = numericAttr.create("constraintTranslateX", "ctx", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.ctAttrY = numericAttr.create("constraintTranslateY", "cty", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.ctAttrZ = numericAttr.create("constraintTranslateZ", "ctz", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.constTransAttr = numericAttr.create("constraintTranslate", "ct",
+                                                  nodeClass.ctAttrX, nodeClass.ctAttrY, nodeClass.ctAttrZ)
+    setFlags(numericAttr, writable=False)
+    nodeClass.addAttribute(nodeClass.constTransAttr)
+
+    # create the in time attribute
+    nodeClass.inTimeAttr = unitAttr.create("inTime", "it",  OpenMaya.MFnUnitAttribute.kTime, 1.0)
+    setFlags(unitAttr, storable=False, keyable=False, hidden=True)
+    nodeClass.addAttribute(nodeClass.inTimeAttr)
+    nodeClass.attributeAffects(nodeClass.inTimeAttr, nodeClass.constTransAttr)
+
+    # create the start frame attribute
+    nodeClass.startFrameAttr = numericAttr.create("startFrame", "stf", OpenMaya.MFnNumericData.kDouble, 1.0)
+    setFlags(numericAttr, keyable=True)
+    nodeClass.addAttribute(nodeClass.startFrameAttr)
+    nodeClass.attributeAffects(nodeClass.startFrameAttr, nodeClass.constTransAttr)
+
+    # create the distance attribute
+    nodeClass.distanceAttr = numericAttr.create("distance", "dist", OpenMaya.MFnNumericData.kDouble)
+    setFlags(numericAttr, keyable=True)
+    numericAttr.setMin(0.0)
+    nodeClass.addAttribute(nodeClass.distanceAttr)
+    nodeClass.attributeAffects(nodeClass.distanceAttr, nodeClass.constTransAttr)
+
+    # create the target world matrix attribute
+    nodeClass.targetAttr = matrixAttr.create("targetWorldMatrix", "twm", OpenMaya.MFnMatrixAttribute.kDouble)
+    setFlags(matrixAttr, storable=False)
+    nodeClass.addAttribute(nodeClass.targetAttr)
+    nodeClass.attributeAffects(nodeClass.targetAttr, nodeClass.constTransAttr)
+
+    # create the constraint parent matrix attribute
+    nodeClass.constraintParentAttr = matrixAttr.create("constraintParentMatrix", "cpm", OpenMaya.MFnMatrixAttribute.kDouble)
+    setFlags(matrixAttr, storable=False)
+    nodeClass.addAttribute(nodeClass.constraintParentAttr)
+    nodeClass.attributeAffects(nodeClass.constraintParentAttr, nodeClass.constTransAttr)
+
+    # create the start position attribute
+    nodeClass.spAttrX = numericAttr.create("startPositionX", "spx", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.spAttrY = numericAttr.create("startPositionY", "spy", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.spAttrZ = numericAttr.create("startPositionZ", "spz", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.startPositionAttr = numericAttr.create("startPosition", "sp",
+                                                     nodeClass.spAttrX, nodeClass.spAttrY, nodeClass.spAttrZ)
+    setFlags(numericAttr, keyable=True)
+    nodeClass.addAttribute(nodeClass.startPositionAttr)
+    nodeClass.attributeAffects(nodeClass.startPositionAttr, nodeClass.constTransAttr)
+
+    # create the push bool attribute
+    nodeClass.pushAttr = numericAttr.create("push", "psh", OpenMaya.MFnNumericData.kBoolean, 1.0)
+    setFlags(numericAttr, keyable=True)
+    nodeClass.addAttribute(nodeClass.pushAttr)
+    nodeClass.attributeAffects(nodeClass.pushAttr, nodeClass.constTransAttr)
+
+    # create the pull bool attribute
+    nodeClass.pullAttr = numericAttr.create("pull", "pll", OpenMaya.MFnNumericData.kBoolean, 1.0)
+    setFlags(numericAttr, keyable=True)
+    nodeClass.addAttribute(nodeClass.pullAttr)
+    nodeClass.attributeAffects(nodeClass.pullAttr, nodeClass.constTransAttr)
+
+    # create the last position attribute for internal uses
+    nodeClass.lpAttrX = numericAttr.create("lastPositionX", "lpx", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.lpAttrY = numericAttr.create("lastPositionY", "lpy", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.lpAttrZ = numericAttr.create("lastPositionZ", "lpz", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.lastPositionAttr = numericAttr.create("lastPosition", "lp",
+                                                    nodeClass.lpAttrX, nodeClass.lpAttrY, nodeClass.lpAttrZ)
+    setFlags(numericAttr, hidden=True)
+    nodeClass.addAttribute(nodeClass.lastPositionAttr)
+
+    # create the state cache attributes
+    nodeClass.useCacheAttr = numericAttr.create("useCache", "uc", OpenMaya.MFnNumericData.kBoolean, 0.0)
+    setFlags(numericAttr, keyable=False)
+    nodeClass.addAttribute(nodeClass.useCacheAttr)
+    nodeClass.attributeAffects(nodeClass.useCacheAttr, nodeClass.constTransAttr)
+
+    nodeClass.checkpointIntervalAttr = numericAttr.create("checkpointInterval", "cpi", OpenMaya.MFnNumericData.kInt, 10)
+    setFlags(numericAttr, keyable=False)
+    numericAttr.setMin(1)
+    nodeClass.addAttribute(nodeClass.checkpointIntervalAttr)
+    nodeClass.attributeAffects(nodeClass.checkpointIntervalAttr, nodeClass.constTransAttr)
+
+    nodeClass.cacheSizeAttr = numericAttr.create("cacheSize", "csz", OpenMaya.MFnNumericData.kInt, 1000)
+    setFlags(numericAttr, keyable=False)
+    numericAttr.setMin(0)
+    nodeClass.addAttribute(nodeClass.cacheSizeAttr)
+    nodeClass.attributeAffects(nodeClass.cacheSizeAttr, nodeClass.constTransAttr)
+
+    # create the trajectory cache file attributes
+    typedAttr = OpenMaya.MFnTypedAttribute()
+    nodeClass.cacheFileAttr = typedAttr.create("cacheFile", "cf", OpenMaya.MFnData.kString)
+    setFlags(typedAttr, usedAsFilename=True)
+    nodeClass.addAttribute(nodeClass.cacheFileAttr)
+    nodeClass.attributeAffects(nodeClass.cacheFileAttr, nodeClass.constTransAttr)
+
+    nodeClass.cacheIndexAttr = numericAttr.create("cacheIndex", "cix", OpenMaya.MFnNumericData.kInt, 0)
+    setFlags(numericAttr, keyable=False)
+    numericAttr.setMin(0)
+    nodeClass.addAttribute(nodeClass.cacheIndexAttr)
+    nodeClass.attributeAffects(nodeClass.cacheIndexAttr, nodeClass.constTransAttr)
+
+    # create the adaptive sub step attributes
+    nodeClass.adaptiveSubstepsAttr = numericAttr.create("adaptiveSubsteps", "asb", OpenMaya.MFnNumericData.kBoolean, 0.0)
+    setFlags(numericAttr, keyable=False)
+    nodeClass.addAttribute(nodeClass.adaptiveSubstepsAttr)
+    nodeClass.attributeAffects(nodeClass.adaptiveSubstepsAttr, nodeClass.constTransAttr)
+
+    nodeClass.maxSubstepsAttr = numericAttr.create("maxSubsteps", "msb", OpenMaya.MFnNumericData.kInt, 8)
+    setFlags(numericAttr, keyable=False)
+    numericAttr.setMin(1)
+    nodeClass.addAttribute(nodeClass.maxSubstepsAttr)
+    nodeClass.attributeAffects(nodeClass.maxSubstepsAttr, nodeClass.constTransAttr)
+
+    nodeClass.substepFractionAttr = numericAttr.create("substepFraction", "sbf", OpenMaya.MFnNumericData.kDouble, 0.5)
+    setFlags(numericAttr, keyable=False)
+    numericAttr.setMin(0.01)
+    nodeClass.addAttribute(nodeClass.substepFractionAttr)
+    nodeClass.attributeAffects(nodeClass.substepFractionAttr, nodeClass.constTransAttr)
+
+    # how many sub steps the last evaluation took, worked out with the output position
+    nodeClass.substepsTakenAttr = numericAttr.create("substepsTaken", "sbt", OpenMaya.MFnNumericData.kInt, 0)
+    setFlags(numericAttr, writable=False, storable=False)
+    nodeClass.addAttribute(nodeClass.substepsTakenAttr)
+
+    # create the target mesh attribute, pushes and pulls from the mesh surface when connected
+    nodeClass.targetMeshAttr = typedAttr.create("targetMesh", "tms", OpenMaya.MFnData.kMesh)
+    setFlags(typedAttr, storable=False)
+    nodeClass.addAttribute(nodeClass.targetMeshAttr)
+    nodeClass.attributeAffects(nodeClass.targetMeshAttr, nodeClass.constTransAttr)
+
+    # create the stateless attribute, solves from the inputs alone when on
+    nodeClass.statelessAttr = numericAttr.create("stateless", "stl", OpenMaya.MFnNumericData.kBoolean, 0.0)
+    setFlags(numericAttr, keyable=False)
+    nodeClass.addAttribute(nodeClass.statelessAttr)
+    nodeClass.attributeAffects(nodeClass.statelessAttr, nodeClass.constTransAttr)
+
+    # create the pre-roll attribute, solves ahead of the playhead in the background when on
+    nodeClass.prerollAttr = numericAttr.create("preroll", "prr", OpenMaya.MFnNumericData.kBoolean, 0.0)
+    setFlags(numericAttr, keyable=False)
+    nodeClass.addAttribute(nodeClass.prerollAttr)
+    nodeClass.attributeAffects(nodeClass.prerollAttr, nodeClass.constTransAttr)
+
+    # create the level of detail attributes, the camera world matrix is connected to the camera matrix
+    nodeClass.cameraMatrixAttr = matrixAttr.create("cameraMatrix", "cam", OpenMaya.MFnMatrixAttribute.kDouble)
+    setFlags(matrixAttr, storable=False)
+    nodeClass.addAttribute(nodeClass.cameraMatrixAttr)
+
+    enumAttr = OpenMaya.MFnEnumAttribute()
+    nodeClass.lodModeAttr = enumAttr.create("lodMode", "lodm", LOD_OFF)
+    enumAttr.addField("off", LOD_OFF)
+    enumAttr.addField("hold", LOD_HOLD)
+    enumAttr.addField("reducedRate", LOD_REDUCED)
+    setFlags(enumAttr, keyable=False)
+    nodeClass.addAttribute(nodeClass.lodModeAttr)
+
+    nodeClass.lodDistanceAttr = numericAttr.create("lodDistance", "lodd", OpenMaya.MFnNumericData.kDouble, 0.0)
+    setFlags(numericAttr, keyable=False)
+    numericAttr.setMin(0.0)
+    nodeClass.addAttribute(nodeClass.lodDistanceAttr)
+
+    # half the angle of the view cone, everything is in view at 180 degrees
+    nodeClass.lodAngleAttr = unitAttr.create("lodAngle", "loda", OpenMaya.MFnUnitAttribute.kAngle, math.pi)
+    setFlags(unitAttr, keyable=False)
+    nodeClass.addAttribute(nodeClass.lodAngleAttr)
+
+    nodeClass.lodRateAttr = numericAttr.create("lodRate", "lodr", OpenMaya.MFnNumericData.kInt, 4)
+    setFlags(numericAttr, keyable=False)
+    numericAttr.setMin(1)
+    nodeClass.addAttribute(nodeClass.lodRateAttr)
+
+    for attr in (nodeClass.cameraMatrixAttr, nodeClass.lodModeAttr, nodeClass.lodDistanceAttr,
+                 nodeClass.lodAngleAttr, nodeClass.lodRateAttr):
+        nodeClass.attributeAffects(attr, nodeClass.constTransAttr)
+
+    # everything that affects the position affects the sub steps taken
+    for attr in (nodeClass.inTimeAttr, nodeClass.startFrameAttr, nodeClass.distanceAttr, nodeClass.targetAttr,
+                 nodeClass.constraintParentAttr, nodeClass.startPositionAttr, nodeClass.pushAttr,
+                 nodeClass.pullAttr, nodeClass.useCacheAttr, nodeClass.cacheFileAttr, nodeClass.cacheIndexAttr,
+                 nodeClass.adaptiveSubstepsAttr, nodeClass.maxSubstepsAttr, nodeClass.substepFractionAttr,
+                 nodeClass.targetMeshAttr, nodeClass.statelessAttr, nodeClass.prerollAttr,
+                 nodeClass.cameraMatrixAttr, nodeClass.lodModeAttr, nodeClass.lodDistanceAttr,
+                 nodeClass.lodAngleAttr, nodeClass.lodRateAttr):
+        nodeClass.attributeAffects(attr, nodeClass.substepsTakenAttr)
+
+def initializeMultiNode(nodeClass, api):
+    '''Handles adding the attributes to the multi node'''
+    OpenMaya = api.OpenMaya
+    setFlags = api.setFlags
+    numericAttr = OpenMaya.MFnNumericAttribute()
+    unitAttr = OpenMaya.MFnUnitAttribute()
+    matrixAttr = OpenMaya.MFnMatrixAttribute()
+    compoundAttr = OpenMaya.MFnCompoundAttribute()
+
+    # create the output translation array attribute
+    nodeClass.ctAttrX = numericAttr.create("constraintTranslateX", "ctx", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.ctAttrY = numericAttr.create("constraintTranslateY", "cty", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.ctAttrZ = numericAttr.create("constraintTranslateZ", "ctz", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.constTransAttr = numericAttr.create("constraintTranslate", "ct",
+                                                  nodeClass.ctAttrX, nodeClass.ctAttrY, nodeClass.ctAttrZ)
+    setFlags(numericAttr, writable=False, array=True, usesArrayDataBuilder=True)
+    nodeClass.addAttribute(nodeClass.constTransAttr)
+
+    # create the in time attribute
+    nodeClass.inTimeAttr = unitAttr.create("inTime", "it",  OpenMaya.MFnUnitAttribute.kTime, 1.0)
+    setFlags(unitAttr, storable=False, keyable=False, hidden=True)
+    nodeClass.addAttribute(nodeClass.inTimeAttr)
+    nodeClass.attributeAffects(nodeClass.inTimeAttr, nodeClass.constTransAttr)
+
+    # create the start frame attribute
+    nodeClass.startFrameAttr = numericAttr.create("startFrame", "stf", OpenMaya.MFnNumericData.kDouble, 1.0)
+    setFlags(numericAttr, keyable=True)
+    nodeClass.addAttribute(nodeClass.startFrameAttr)
+    nodeClass.attributeAffects(nodeClass.startFrameAttr, nodeClass.constTransAttr)
+
+    # create the target world matrix attribute
+    nodeClass.targetAttr = matrixAttr.create("targetWorldMatrix", "twm", OpenMaya.MFnMatrixAttribute.kDouble)
+    setFlags(matrixAttr, storable=False)
+    nodeClass.addAttribute(nodeClass.targetAttr)
+    nodeClass.attributeAffects(nodeClass.targetAttr, nodeClass.constTransAttr)
+
+    # create the push bool attribute
+    nodeClass.pushAttr = numericAttr.create("push", "psh", OpenMaya.MFnNumericData.kBoolean, 1.0)
+    setFlags(numericAttr, keyable=True)
+    nodeClass.addAttribute(nodeClass.pushAttr)
+    nodeClass.attributeAffects(nodeClass.pushAttr, nodeClass.constTransAttr)
+
+    # create the pull bool attribute
+    nodeClass.pullAttr = numericAttr.create("pull", "pll", OpenMaya.MFnNumericData.kBoolean, 1.0)
+    setFlags(numericAttr, keyable=True)
+    nodeClass.addAttribute(nodeClass.pullAttr)
+    nodeClass.attributeAffects(nodeClass.pullAttr, nodeClass.constTransAttr)
+
+    # create the per constrained compound array attribute
+    nodeClass.constraintParentAttr = matrixAttr.create("constraintParentMatrix", "cpm", OpenMaya.MFnMatrixAttribute.kDouble)
+    setFlags(matrixAttr, storable=False)
+
+    nodeClass.distanceAttr = numericAttr.create("distance", "dist", OpenMaya.MFnNumericData.kDouble)
+    setFlags(numericAttr, keyable=True)
+    numericAttr.setMin(0.0)
+
+    nodeClass.spAttrX = numericAttr.create("startPositionX", "spx", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.spAttrY = numericAttr.create("startPositionY", "spy", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.spAttrZ = numericAttr.create("startPositionZ", "spz", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.startPositionAttr = numericAttr.create("startPosition", "sp",
+                                                     nodeClass.spAttrX, nodeClass.spAttrY, nodeClass.spAttrZ)
+    setFlags(numericAttr, keyable=True)
+
+    nodeClass.constraintAttr = compoundAttr.create("constraint", "cst")
+    compoundAttr.addChild(nodeClass.constraintParentAttr)
+    compoundAttr.addChild(nodeClass.distanceAttr)
+    compoundAttr.addChild(nodeClass.startPositionAttr)
+    setFlags(compoundAttr, array=True)
+    nodeClass.addAttribute(nodeClass.constraintAttr)
+    nodeClass.attributeAffects(nodeClass.constraintAttr, nodeClass.constTransAttr)
+
+    # create the pusher compound array attribute
+    nodeClass.pusherMatrixAttr = matrixAttr.create("pusherWorldMatrix", "pwm", OpenMaya.MFnMatrixAttribute.kDouble)
+    setFlags(matrixAttr, storable=False)
+
+    nodeClass.pusherRadiusAttr = numericAttr.create("pusherRadius", "prd", OpenMaya.MFnNumericData.kDouble, 1.0)
+    setFlags(numericAttr, keyable=True)
+    numericAttr.setMin(0.0)
+
+    nodeClass.pusherAttr = compoundAttr.create("pusher", "psr")
+    compoundAttr.addChild(nodeClass.pusherMatrixAttr)
+    compoundAttr.addChild(nodeClass.pusherRadiusAttr)
+    setFlags(compoundAttr, array=True)
+    nodeClass.addAttribute(nodeClass.pusherAttr)
+    nodeClass.attributeAffects(nodeClass.pusherAttr, nodeClass.constTransAttr)
+
+    # create the last position array attribute for internal uses
+    nodeClass.lpAttrX = numericAttr.create("lastPositionX", "lpx", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.lpAttrY = numericAttr.create("lastPositionY", "lpy", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.lpAttrZ = numericAttr.create("lastPositionZ", "lpz", OpenMaya.MFnNumericData.kDouble, 0.0)
+    nodeClass.lastPositionAttr = numericAttr.create("lastPosition", "lp",
+                                                    nodeClass.lpAttrX, nodeClass.lpAttrY, nodeClass.lpAttrZ)
+    setFlags(numericAttr, array=True, usesArrayDataBuilder=True, hidden=True)
+    nodeClass.addAttribute(nodeClass.lastPositionAttr)
+
+    # create the trajectory cache file attribute
+    typedAttr = OpenMaya.MFnTypedAttribute()
+    nodeClass.cacheFileAttr = typedAttr.create("cacheFile", "cf", OpenMaya.MFnData.kString)
+    setFlags(typedAttr, usedAsFilename=True)
+    nodeClass.addAttribute(nodeClass.cacheFileAttr)
+    nodeClass.attributeAffects(nodeClass.cacheFileAttr, nodeClass.constTransAttr)
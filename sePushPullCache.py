@@ -0,0 +1,196 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Per frame state cache for the sePushPullConstraint node.
+
+Every solved frame is stored along with the inputs it was solved with. Frames
+that land on a checkpoint (every checkpointInterval frames from the start
+frame) are kept until they are invalidated or there are more than
+maxCheckpoints of them, all other frames are kept in a least recently used
+list capped at maxFrames entries. A jump to an uncached frame only has to
+replay from the nearest cached frame before it.
+
+The input history keeps the inputs of the frames the cache replays, so they
+do not have to be read from the graph at other times inside compute.
+'''
+
+import collections
+
+class sePushPullStateCache(object):
+    '''Time indexed cache of solved positions for one constraint'''
+
+    def __init__(self, checkpointInterval=10, maxFrames=1000, maxCheckpoints=10000):
+        self.checkpointInterval = checkpointInterval
+        self.maxFrames = maxFrames
+        # the checkpoints are least recently used too, so a very long shot can not grow the cache forever
+        self.maxCheckpoints = maxCheckpoints
+
+        self.startFrame = None
+        self.parameters = None
+
+        # frame -> (inputs, position)
+        self.checkpoints = collections.OrderedDict()
+        self.frames = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.checkpoints) + len(self.frames)
+
+    def clear(self):
+        '''Removes every cached frame'''
+        self.checkpoints.clear()
+        self.frames.clear()
+
+    def setParameters(self, startFrame, parameters):
+        '''Sets the non animated inputs, clearing the cache if they changed.
+
+        Returns True if the cache was cleared.
+        '''
+        if startFrame == self.startFrame and parameters == self.parameters:
+            return False
+
+        self.startFrame = startFrame
+        self.parameters = parameters
+        self.clear()
+        return True
+
+    def isCheckpoint(self, frame):
+        '''Returns True if the frame is one that is kept as a checkpoint'''
+        if self.startFrame is None or self.checkpointInterval < 1:
+            return False
+
+        offset = frame - self.startFrame
+        return offset == int(offset) and int(offset) % self.checkpointInterval == 0
+
+    def lookup(self, frame, inputs):
+        '''Returns the cached position for the frame or None.
+
+        If the frame was solved with different inputs then it and every
+        frame after it are invalidated.
+        '''
+        entries = self.checkpoints
+        entry = entries.get(frame)
+        if entry is None:
+            entries = self.frames
+            entry = entries.get(frame)
+            if entry is None:
+                return None
+        # mark it as recently used
+        del entries[frame]
+        entries[frame] = entry
+
+        if entry[0] != inputs:
+            self.invalidate(frame)
+            return None
+
+        return entry[1]
+
+    def store(self, frame, inputs, position):
+        '''Stores the solved position for the frame'''
+        if self.isCheckpoint(frame):
+            entries = self.checkpoints
+            maxEntries = self.maxCheckpoints
+        else:
+            entries = self.frames
+            maxEntries = self.maxFrames
+        entries.pop(frame, None)
+        entries[frame] = (inputs, position)
+
+        # evict the least recently used frames past the cap
+        while len(entries) > max(maxEntries, 0):
+            entries.popitem(last=False)
+
+    def nearest(self, frame):
+        '''Returns (frame, inputs, position) of the latest cached frame before
+        the given frame or None if there is nothing to start from.
+        '''
+        nearestFrame = None
+        for cachedFrame in self.checkpoints:
+            if cachedFrame < frame and (nearestFrame is None or cachedFrame > nearestFrame):
+                nearestFrame = cachedFrame
+
+        for cachedFrame in self.frames:
+            if cachedFrame < frame and (nearestFrame is None or cachedFrame > nearestFrame):
+                nearestFrame = cachedFrame
+
+        if nearestFrame is None:
+            return None
+
+        entry = self.checkpoints.get(nearestFrame)
+        if entry is None:
+            entry = self.frames[nearestFrame]
+
+        return nearestFrame, entry[0], entry[1]
+
+    def invalidate(self, fromFrame):
+        '''Removes the given frame and every frame after it'''
+        for cachedFrame in [f for f in self.checkpoints if f >= fromFrame]:
+            del self.checkpoints[cachedFrame]
+
+        for cachedFrame in [f for f in self.frames if f >= fromFrame]:
+            del self.frames[cachedFrame]
+
+class sePushPullInputHistory(object):
+    '''The inputs of one constraint at the frames it was evaluated at or sampled
+    at while Maya was idle. Frames are replayed from these instead of reading
+    the graph at other times inside compute.'''
+
+    def __init__(self):
+        # frame -> inputs
+        self.inputs = {}
+
+        # the frames to sample the next times Maya is idle
+        self.requested = set()
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def get(self, frame):
+        '''Returns the inputs at the frame or None if they are not known'''
+        return self.inputs.get(frame)
+
+    def record(self, frame, inputs):
+        '''Keeps the inputs at the frame.
+
+        Returns False if different inputs were kept for the frame before.
+        '''
+        self.requested.discard(frame)
+        previous = self.inputs.get(frame)
+        self.inputs[frame] = inputs
+        return previous is None or previous == inputs
+
+    def missing(self, frames):
+        '''Returns the frames without inputs, they are requested to be sampled'''
+        missing = [frame for frame in frames if frame not in self.inputs]
+        self.requested.update(missing)
+        return missing
+
+    def resample(self, fromFrame=None):
+        '''Samples the known frames from the given frame on again, every one
+        when it is None, for a change to the inputs of frames that are not
+        being evaluated'''
+        frames = [frame for frame in self.inputs if fromFrame is None or frame >= fromFrame]
+        self.requested.update(frames)
+        for frame in frames:
+            del self.inputs[frame]
+
+    def framesToSample(self, count):
+        '''Returns up to count of the requested frames in order'''
+        return sorted(self.requested)[:count]
+
+    def clear(self):
+        '''Forgets every frame and request'''
+        self.inputs.clear()
+        self.requested.clear()
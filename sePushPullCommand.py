@@ -0,0 +1,862 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''The sePushPullConstraint command, the bake and the state store, shared by
+the API 1.0 and 2.0 builds of the plugin.
+
+The command class of each build derives from the class here and from the
+MPxCommand of its API. The functions take the api class of the plugin as
+their first argument, it makes the calls that are written differently in
+the two APIs.
+'''
+
+import math
+
+import sePushPullNode
+import sePushPullStats
+
+# the bake and the state store need NumPy
+try:
+    import numpy
+    import sePushPullTrajectory
+    import sePushPullNetwork
+    import sePushPullState
+except ImportError:
+    numpy = None
+
+def sampleBakeInputs(api, nodeFn, frames, unit):
+    '''Evaluates the animated inputs of a constraint node at every frame.
+
+    Returns the (frames, 4, 4) target and parent matrices and the (frames,)
+    distance, push and pull values.
+    '''
+    OpenMaya = api.OpenMaya
+    targetPlug = nodeFn.findPlug('targetWorldMatrix', False)
+    parentPlug = nodeFn.findPlug('constraintParentMatrix', False)
+    distancePlug = nodeFn.findPlug('distance', False)
+    pushPlug = nodeFn.findPlug('push', False)
+    pullPlug = nodeFn.findPlug('pull', False)
+
+    targetMatrices = numpy.empty((len(frames), 4, 4))
+    parentMatrices = numpy.empty((len(frames), 4, 4))
+    distances = numpy.empty(len(frames))
+    pushes = numpy.empty(len(frames), dtype=bool)
+    pulls = numpy.empty(len(frames), dtype=bool)
+
+    for i, frame in enumerate(frames):
+        context = OpenMaya.MDGContext(OpenMaya.MTime(frame, unit))
+        targetMatrices[i] = api.matrixToList(OpenMaya.MFnMatrixData(targetPlug.asMObject(context)).matrix())
+        parentMatrices[i] = api.matrixToList(OpenMaya.MFnMatrixData(parentPlug.asMObject(context)).matrix())
+        distances[i] = distancePlug.asDouble(context)
+        pushes[i] = pushPlug.asBool(context)
+        pulls[i] = pullPlug.asBool(context)
+
+    return targetMatrices, parentMatrices, distances, pushes, pulls
+
+def sampleMatrices(api, plug, frames, unit):
+    '''Returns the (frames, 4, 4) values of the matrix plug at every frame'''
+    OpenMaya = api.OpenMaya
+    matrices = numpy.empty((len(frames), 4, 4))
+    for i, frame in enumerate(frames):
+        context = OpenMaya.MDGContext(OpenMaya.MTime(frame, unit))
+        matrices[i] = api.matrixToList(OpenMaya.MFnMatrixData(plug.asMObject(context)).matrix())
+    return matrices
+
+def sourceNode(api, plug):
+    '''Returns the node connected into the plug or None'''
+    plugs = api.connectedPlugs(plug, True, False)
+    if not plugs:
+        return None
+    return plugs[0].node()
+
+def nearestDriven(api, nodeObject, drivenPaths, includeSelf):
+    '''Returns the index of the constraint driving the transform or its nearest
+    parent that is driven, and the path to that transform. Returns -1 and None
+    if none of them are driven.'''
+    if nodeObject is None or not nodeObject.hasFn(api.OpenMaya.MFn.kTransform):
+        return -1, None
+
+    dagPath = api.dagPathTo(nodeObject)
+    if not includeSelf:
+        dagPath.pop()
+
+    while dagPath.length() > 0:
+        index = drivenPaths.get(dagPath.fullPathName())
+        if index is not None:
+            return index, api.OpenMaya.MDagPath(dagPath)
+        dagPath.pop()
+    return -1, None
+
+def relativeMatrices(api, matrices, dagPath, frames, unit):
+    '''Returns the world matrices relative to the world matrix of the transform'''
+    worldPlug = api.OpenMaya.MFnDependencyNode(dagPath.node()).findPlug('worldMatrix', False).elementByLogicalIndex(0)
+    return numpy.matmul(matrices, numpy.linalg.inv(sampleMatrices(api, worldPlug, frames, unit)))
+
+def sampleNetwork(api, nodeFns, frames, unit):
+    '''Evaluates the inputs of the constraint nodes at every frame and finds the
+    nodes that drive the target or the parent of another one.
+
+    Returns a sePushPullNetwork that solves the nodes in the same order as the DG.
+    '''
+    OpenMaya = api.OpenMaya
+    numFrames = len(frames)
+    numNodes = len(nodeFns)
+
+    # the transforms driven by the nodes keyed by their full path, a transform
+    # can only be followed if the node also gets its parent matrix
+    drivenPaths = {}
+    drivenAxes = numpy.zeros((numNodes, 3), dtype=bool)
+    localMatrices = numpy.broadcast_to(numpy.identity(4), (numFrames, numNodes, 4, 4)).copy()
+    localTranslates = numpy.zeros((numFrames, numNodes, 3))
+
+    for index, nodeFn in enumerate(nodeFns):
+        connections, destinations = constraintDestinations(api, nodeFn)
+        if not destinations:
+            continue
+
+        transformObject = destinations[0][0].node()
+        for plug, axis in destinations:
+            if plug.node() == transformObject:
+                drivenAxes[index, axis] = True
+
+        if sourceNode(api, nodeFn.findPlug('constraintParentMatrix', False)) != transformObject:
+            continue
+
+        dagPath = api.dagPathTo(transformObject)
+        drivenPaths[dagPath.fullPathName()] = index
+
+        # the local matrix without the translate leaves the pivot offset
+        transformFn = OpenMaya.MFnDependencyNode(transformObject)
+        localMatrices[:, index] = sampleMatrices(api, transformFn.findPlug('matrix', False), frames, unit)
+        translatePlug = transformFn.findPlug('translate', False)
+        for i, frame in enumerate(frames):
+            context = OpenMaya.MDGContext(OpenMaya.MTime(frame, unit))
+            localTranslates[i, index] = [translatePlug.child(axis).asDouble(context) for axis in range(3)]
+        localMatrices[:, index, 3, :3] -= localTranslates[:, index]
+
+    targetDrivers = numpy.full(numNodes, -1, dtype=numpy.intp)
+    parentDrivers = numpy.full(numNodes, -1, dtype=numpy.intp)
+    inputs = []
+
+    for index, nodeFn in enumerate(nodeFns):
+        targetMatrices, parentMatrices, distances, pushes, pulls = sampleBakeInputs(api, nodeFn, frames, unit)
+
+        # a driven target or parent is given relative to the transform the other node drives
+        targetSource = sourceNode(api, nodeFn.findPlug('targetWorldMatrix', False))
+        targetDrivers[index], dagPath = nearestDriven(api, targetSource, drivenPaths, True)
+        if dagPath is not None:
+            if dagPath.node() == targetSource:
+                targetMatrices[:] = numpy.identity(4)
+            else:
+                targetMatrices = relativeMatrices(api, targetMatrices, dagPath, frames, unit)
+
+        parentSource = sourceNode(api, nodeFn.findPlug('constraintParentMatrix', False))
+        parentDrivers[index], dagPath = nearestDriven(api, parentSource, drivenPaths, False)
+        if dagPath is not None:
+            parentMatrices = relativeMatrices(api, parentMatrices, dagPath, frames, unit)
+
+        inputs.append((targetMatrices, parentMatrices, distances, pushes, pulls))
+
+    startFrames = [nodeFn.findPlug('startFrame', False).asDouble() for nodeFn in nodeFns]
+    startPositions = [[nodeFn.findPlug(name, False).asDouble() for name in ('startPositionX', 'startPositionY', 'startPositionZ')]
+                      for nodeFn in nodeFns]
+
+    # the nodes taking adaptive sub steps are solved in sub steps like when playing every frame
+    maxSubsteps = [nodeFn.findPlug('maxSubsteps', False).asInt() if nodeFn.findPlug('adaptiveSubsteps', False).asBool() else 0
+                   for nodeFn in nodeFns]
+    substepFractions = [nodeFn.findPlug('substepFraction', False).asDouble() for nodeFn in nodeFns]
+
+    return sePushPullNetwork.sePushPullNetwork(frames, targetDrivers, numpy.stack([i[0] for i in inputs], axis=1),
+                                               parentDrivers, numpy.stack([i[1] for i in inputs], axis=1),
+                                               localMatrices, drivenAxes, localTranslates,
+                                               numpy.stack([i[2] for i in inputs], axis=1),
+                                               numpy.stack([i[3] for i in inputs], axis=1),
+                                               numpy.stack([i[4] for i in inputs], axis=1),
+                                               startFrames, startPositions, maxSubsteps, substepFractions)
+
+def readStateStore(nodeFns):
+    '''Returns a sePushPullStateStore holding the parameters and last position
+    of the sePushPullConstraint nodes, in the same order'''
+    store = sePushPullState.sePushPullStateStore(len(nodeFns))
+    for index, nodeFn in enumerate(nodeFns):
+        for name, fileType, width, default in sePushPullState.FIELDS:
+            plug = nodeFn.findPlug(name, False)
+            if width > 1:
+                value = [plug.child(axis).asDouble() for axis in range(width)]
+            elif fileType == '|b1':
+                value = plug.asBool()
+            else:
+                value = plug.asDouble()
+            getattr(store, name)[index] = value
+    return store
+
+def writeStateStore(api, store, nodeFns, indices=None, modifier=None):
+    '''Sets the attributes of the sePushPullConstraint nodes from the store,
+    each node gets the state at the same position in indices, or at its own
+    position when there are no indices. Only the nodes given are changed so a
+    few can be picked out of a large store.
+
+    The changes are added to the modifier for the caller to do. Without one
+    they are done at once with a new modifier, which is returned, but they are
+    not on the undo queue of Maya. The loadState flag of the command sets the
+    nodes from a state file so it can be undone.
+    '''
+    if indices is None:
+        indices = range(len(nodeFns))
+
+    doIt = modifier is None
+    if doIt:
+        modifier = api.OpenMaya.MDGModifier()
+
+    for nodeFn, index in zip(nodeFns, indices):
+        for name, fileType, width, default in sePushPullState.FIELDS:
+            plug = nodeFn.findPlug(name, False)
+            value = getattr(store, name)[index]
+            if width > 1:
+                for axis in range(width):
+                    modifier.newPlugValueDouble(plug.child(axis), float(value[axis]))
+            elif fileType == '|b1':
+                modifier.newPlugValueBool(plug, bool(value))
+            else:
+                modifier.newPlugValueDouble(plug, float(value))
+
+    if doIt:
+        modifier.doIt()
+    return modifier
+
+def constraintDestinations(api, nodeFn):
+    '''Returns the (source, destination) connections from the constraint output and
+    the (plug, axis) of every translate channel they drive'''
+    connections = []
+    destinations = []
+    outputPlug = nodeFn.findPlug('constraintTranslate', False)
+
+    # the whole translate connected at once, each axis gets keyed on its own
+    for plug in api.connectedPlugs(outputPlug, False, True):
+        connections.append((outputPlug, plug))
+        for axis in range(3):
+            destinations.append((plug.child(axis), axis))
+
+    # single axes connected when some were skipped
+    for axis in range(3):
+        for plug in api.connectedPlugs(outputPlug.child(axis), False, True):
+            connections.append((outputPlug.child(axis), plug))
+            destinations.append((plug, axis))
+
+    return connections, destinations
+
+def transformFn(api, sList, index, label):
+    '''Returns the transform function set for the object in the selection list,
+    the label names the object in the errors'''
+    try:
+        dagPath = api.dagPath(sList, index)
+    except RuntimeError:
+        raise RuntimeError('%s object must be a DAG object type. Unable to get path to object.' % label)
+
+    transFn = api.OpenMaya.MFnTransform()
+    try:
+        transFn.setObject(dagPath)
+    except RuntimeError:
+        raise RuntimeError('%s object type invalid. You must choose a transform.' % label)
+    return transFn
+
+def findAppendNode(api, name):
+    '''Returns the multi constraint node with the name to append to'''
+    appendList = api.OpenMaya.MSelectionList()
+    try:
+        appendList.add(name)
+    except RuntimeError:
+        raise RuntimeError('Unable to find the node to append to: %s' % name)
+
+    appendObject = api.dependNode(appendList, 0)
+    if api.typeId(api.OpenMaya.MFnDependencyNode(appendObject)) != api.multiNodeClass.kPluginNodeId:
+        raise RuntimeError('Can only append to a sePushPullMultiConstraint node.')
+    return appendObject
+
+def nextArrayIndex(api, arrayPlug):
+    '''Returns the index after the highest existing element of the array plug'''
+    existingIndices = api.existingIndices(arrayPlug)
+    if not existingIndices:
+        return 0
+    # the indices are sorted so the last is the highest
+    return existingIndices[-1] + 1
+
+def findTimeNode(api):
+    '''Returns the time node, there should be a better way but I'm not sure how'''
+    dgTimeNodes = api.OpenMaya.MItDependencyNodes(api.OpenMaya.MFn.kTime)
+    if dgTimeNodes.isDone():
+        raise RuntimeError('Unable to find the time node.')
+    # gives us time MObject
+    return dgTimeNodes.thisNode()
+
+def findConstraintNode(api, name, message):
+    '''Returns the sePushPullConstraint node with the name, raising the message
+    if it is a different type of node'''
+    nodeList = api.OpenMaya.MSelectionList()
+    try:
+        nodeList.add(name)
+    except RuntimeError:
+        raise RuntimeError('Unable to find the node: %s' % name)
+
+    nodeObject = api.dependNode(nodeList, 0)
+    if api.typeId(api.OpenMaya.MFnDependencyNode(nodeObject)) != api.nodeClass.kPluginNodeId:
+        raise RuntimeError(message)
+    return nodeObject
+
+def cmdSyntax(api):
+    '''Creates the syntax for the command'''
+    MSyntax = api.OpenMaya.MSyntax
+    syntax = MSyntax()
+
+    # any number of objects, the command checks them itself
+    syntax.setObjectType(MSyntax.kStringObjects)
+
+    syntax.enableEdit(False)
+    syntax.enableQuery(True)
+
+    syntax.addFlag("-n", "-name", MSyntax.kString)
+    syntax.addFlag("-d", "-distance", MSyntax.kDouble)
+    syntax.addFlag("-sf", "-startFrame", MSyntax.kDouble)
+    syntax.addFlag("-sp", "-startPosition", MSyntax.kDouble, MSyntax.kDouble, MSyntax.kDouble)
+    syntax.addFlag("-sk", "-skip", MSyntax.kString)
+    syntax.makeFlagMultiUse("-sk")
+    syntax.addFlag("-m", "-multi")
+    syntax.addFlag("-a", "-append", MSyntax.kString)
+    syntax.addFlag("-p", "-pairs")
+    syntax.addFlag("-b", "-bake", MSyntax.kDouble, MSyntax.kDouble)
+    syntax.addFlag("-dc", "-deleteConstraint")
+    syntax.addFlag("-cf", "-cacheFile", MSyntax.kString)
+    syntax.addFlag("-pr", "-processes", MSyntax.kLong)
+    syntax.addFlag("-pf", "-profile", MSyntax.kBoolean)
+    syntax.addFlag("-st", "-stats")
+    syntax.addFlag("-rst", "-resetStats")
+    syntax.addFlag("-prr", "-preroll")
+    syntax.addFlag("-ls", "-loadState", MSyntax.kString)
+    syntax.addFlag("-si", "-stateIndex", MSyntax.kLong)
+    syntax.makeFlagMultiUse("-si")
+
+    return syntax
+
+class sePushPullConstraintCmdBase(object):
+    '''The sePushPullConstraint command without the MPxCommand of either API.
+    The plugin class sets api.'''
+
+    # the calls that differ between the two APIs
+    api = None
+
+    def __init__(self):
+        OpenMaya = self.api.OpenMaya
+        self.api.MPxCommand.__init__(self)
+        self.dgMod = OpenMaya.MDGModifier()
+
+        self.nodeName = ''
+        self.skipX = False
+        self.skipY = False
+        self.skipZ = False
+        self.startFrame = 0.0
+        self.sList = OpenMaya.MSelectionList()
+
+        # multi constraint node options
+        self.multi = False
+        self.appendNode = ''
+
+        # (target index, constrained index, distance, start position) of each
+        # constraint, the target index is None when appending
+        self.constraints = []
+
+        # the nodes and appended elements made by the modifier
+        self.nodes = []
+        self.elementIndices = []
+
+        # bake options
+        self.bakeRange = None
+        self.deleteConstraint = False
+        self.cacheFile = ''
+        self.processes = 1
+
+        # profiling and stats do not change the scene so there is nothing to undo
+        self.undoable = True
+
+    def doIt(self, args):
+        '''Creates the node and connects everything based on the parameters given'''
+        api = self.api
+        OpenMaya = api.OpenMaya
+
+        # get the arguments passed in
+        argData = OpenMaya.MArgParser(self.syntax(), args)
+
+        # get objects to use in the constraint and make sure there is only two
+        objects = api.objectStrings(argData)
+
+        if api.isQuery(argData) or argData.isFlagSet('-pf') or argData.isFlagSet('-rst') or argData.isFlagSet('-prr'):
+            self.undoable = False
+            self.doStats(argData, objects)
+            return
+
+        if objects:
+            for obj in objects:
+                self.sList.add(obj)
+        else:
+            # use the selection
+            self.sList = api.activeSelection()
+
+        # bake the given constraint nodes instead of creating one
+        if argData.isFlagSet('-b'):
+            if numpy is None:
+                raise RuntimeError('NumPy is required to bake the constraints.')
+
+            self.bakeRange = (argData.flagArgumentDouble('-b', 0), argData.flagArgumentDouble('-b', 1))
+            if self.bakeRange[1] < self.bakeRange[0]:
+                raise RuntimeError('The bake end frame must not be before the start frame.')
+
+            # the solve steps a whole frame at a time, so a frame in between is never keyed
+            if any(frame != math.floor(frame) for frame in self.bakeRange):
+                raise RuntimeError('The bake start and end frames must be whole frames.')
+
+            self.deleteConstraint = argData.isFlagSet('-dc')
+            if argData.isFlagSet('-pr'):
+                self.processes = argData.flagArgumentInt('-pr', 0)
+                if self.processes < 1:
+                    raise RuntimeError('At least one process is needed to bake.')
+            if argData.isFlagSet('-cf'):
+                self.cacheFile = argData.flagArgumentString('-cf', 0)
+                if self.deleteConstraint:
+                    raise RuntimeError('The constraint nodes are needed to read the cache file, they can not be deleted.')
+
+            if self.sList.length() < 1:
+                raise RuntimeError('At least one sePushPullConstraint node is required to bake.')
+
+            for i in range(self.sList.length()):
+                nodeObject = api.dependNode(self.sList, i)
+                nodeFn = OpenMaya.MFnDependencyNode(nodeObject)
+                if api.typeId(nodeFn) != api.nodeClass.kPluginNodeId:
+                    raise RuntimeError('Only sePushPullConstraint nodes can be baked.')
+
+                # the bake solves from the target matrix, the same as the pre-roll
+                meshPlug = nodeFn.findPlug('targetMesh', False)
+                if api.connectedPlugs(meshPlug, True, False) or not meshPlug.asMObject().isNull():
+                    raise RuntimeError('%s follows a target mesh and can not be baked.' % nodeFn.name())
+
+            self.redoIt()
+            return
+
+        # set the given constraint nodes from a state file instead of creating one
+        if argData.isFlagSet('-ls'):
+            if numpy is None:
+                raise RuntimeError('NumPy is required to load a state file.')
+
+            if self.sList.length() < 1:
+                raise RuntimeError('At least one sePushPullConstraint node is required to load a state file.')
+
+            nodeFns = []
+            for i in range(self.sList.length()):
+                nodeFn = OpenMaya.MFnDependencyNode(api.dependNode(self.sList, i))
+                if api.typeId(nodeFn) != api.nodeClass.kPluginNodeId:
+                    raise RuntimeError('Only sePushPullConstraint nodes can be loaded from a state file.')
+                nodeFns.append(nodeFn)
+                self.nodes.append(nodeFn.object())
+
+            store = sePushPullState.sePushPullStateStore.load(argData.flagArgumentString('-ls', 0))
+
+            # each node gets the state at its own position without state indices
+            indices = [api.flagArgumentList(argData, '-si', i).asInt(0) for i in range(argData.numberOfFlagUses('-si'))]
+            if not indices:
+                indices = list(range(len(nodeFns)))
+            elif len(indices) != len(nodeFns):
+                raise RuntimeError('There must be one state index for each node.')
+            if any(index < 0 or index >= len(store) for index in indices):
+                raise RuntimeError('The state file only has %d constraints.' % len(store))
+
+            writeStateStore(api, store, nodeFns, indices, self.dgMod)
+            self.redoIt()
+            return
+
+        # multi node flags
+        self.multi = argData.isFlagSet('-m')
+        if argData.isFlagSet('-a'):
+            self.appendNode = argData.flagArgumentString('-a', 0)
+
+        if (self.multi or self.appendNode) and sePushPullNode.numpy is None:
+            raise RuntimeError('NumPy is required to use the sePushPullMultiConstraint node.')
+
+        pairs = argData.isFlagSet('-p')
+        if pairs and (self.multi or self.appendNode):
+            raise RuntimeError('The pairs flag can not be used with the multi or append flags.')
+
+        numObjects = self.sList.length()
+        targetPositions = {}
+
+        if self.appendNode:
+            # the target comes from the existing node, every object given is constrained
+            if numObjects < 1:
+                raise RuntimeError('A transform is required to append to the constraint.')
+
+            appendObject = findAppendNode(api, self.appendNode)
+            targetPlug = OpenMaya.MFnDependencyNode(appendObject).findPlug('targetWorldMatrix', False)
+            targetMat = OpenMaya.MFnMatrixData(targetPlug.asMObject()).matrix()
+            targetPositions[None] = OpenMaya.MVector(*api.translation(targetMat))
+
+            objectPairs = [(None, i) for i in range(numObjects)]
+        elif pairs:
+            # target, constrained, target, constrained...
+            if numObjects < 2 or numObjects % 2:
+                raise RuntimeError('The pairs flag needs a target and a constrained transform for each constraint.')
+
+            objectPairs = [(i, i + 1) for i in range(0, numObjects, 2)]
+        else:
+            # the first object is the target of all the others
+            if numObjects < 2:
+                raise RuntimeError('Two transforms are required to create constraint.')
+
+            objectPairs = [(0, i) for i in range(1, numObjects)]
+
+        # make sure everything is a transform before changing anything
+        for targetIndex, constrainedIndex in objectPairs:
+            if targetIndex not in targetPositions:
+                targetTransFn = transformFn(api, self.sList, targetIndex, 'Target')
+                targetPositions[targetIndex] = api.transformTranslation(targetTransFn, OpenMaya.MSpace.kWorld)
+            transformFn(api, self.sList, constrainedIndex, 'Constraint')
+
+        numSkips = argData.numberOfFlagUses('-sk')
+        if numSkips > 3:
+            raise RuntimeError('You can not have more than 3 skip flags.')
+
+        if argData.isFlagSet('-n'):
+            self.nodeName = argData.flagArgumentString('-n', 0)
+
+        for i in range(numSkips):
+            argList = api.flagArgumentList(argData, '-sk', i)
+
+            axis = argList.asString(0)
+
+            if axis == 'x':
+                self.skipX = True
+            elif axis == 'y':
+                self.skipY = True
+            elif axis == 'z':
+                self.skipZ = True
+
+        # start frame flag
+        if argData.isFlagSet('-sf'):
+            self.startFrame = argData.flagArgumentDouble('-sf', 0)
+        else:
+            self.startFrame = api.currentTime()
+
+        # the distance and start position flags are used for every constraint
+        for targetIndex, constrainedIndex in objectPairs:
+            constrainedTransFn = transformFn(api, self.sList, constrainedIndex, 'Constraint')
+
+            # distance flag
+            if argData.isFlagSet('-d'):
+                distanceValue = argData.flagArgumentDouble('-d', 0)
+            else:
+                # calculate the distance
+                constrainedPos = api.transformTranslation(constrainedTransFn, OpenMaya.MSpace.kWorld)
+                localPos = targetPositions[targetIndex] - constrainedPos
+                distanceValue = localPos.length()
+
+            # start position
+            if argData.isFlagSet('-sp'):
+                spX = argData.flagArgumentDouble('-sp', 0)
+                spY = argData.flagArgumentDouble('-sp', 1)
+                spZ = argData.flagArgumentDouble('-sp', 2)
+
+                startVector = OpenMaya.MVector(spX, spY, spZ)
+            else:
+                startVector = api.transformTranslation(constrainedTransFn, OpenMaya.MSpace.kTransform)
+
+            self.constraints.append((targetIndex, constrainedIndex, distanceValue, startVector))
+
+        self.createConstraints()
+        self.redoIt()
+
+    def createConstraints(self):
+        '''Adds creating and connecting every constraint to the modifier'''
+        api = self.api
+        OpenMaya = api.OpenMaya
+        self.dgMod = OpenMaya.MDGModifier()
+        self.nodes = []
+        self.elementIndices = []
+
+        depNodeFn = OpenMaya.MFnDependencyNode()
+        nextElementIndex = 0
+
+        if self.appendNode:
+            # add to the existing multi node, the target and time are already connected
+            appendObject = findAppendNode(api, self.appendNode)
+            depNodeFn.setObject(appendObject)
+            self.nodes.append(appendObject)
+            nextElementIndex = nextArrayIndex(api, depNodeFn.findPlug('constraint', False))
+        else:
+            # every node is connected to the same time node
+            timePlug = OpenMaya.MFnDependencyNode(findTimeNode(api)).findPlug('outTime', False)
+            nodeType = 'sePushPullMultiConstraint' if self.multi else 'sePushPullConstraint'
+
+        for targetIndex, constrainedIndex, distanceValue, startVector in self.constraints:
+            constrainedTransFn = transformFn(api, self.sList, constrainedIndex, 'Constraint')
+
+            # a node for each constraint, the multi node only needs one
+            if not self.appendNode and not (self.multi and self.nodes):
+                nodeObject = self.dgMod.createNode(nodeType)
+                depNodeFn.setObject(nodeObject)
+                self.nodes.append(nodeObject)
+
+                # when there is a node for each constraint the name is numbered
+                if self.nodeName and len(self.constraints) > 1 and not self.multi:
+                    self.dgMod.renameNode(nodeObject, '%s%d' % (self.nodeName, len(self.nodes)))
+                elif self.nodeName:
+                    self.dgMod.renameNode(nodeObject, self.nodeName)
+
+                targetTransFn = transformFn(api, self.sList, targetIndex, 'Target')
+                targetWorldMatPlug = targetTransFn.findPlug('worldMatrix', False)
+                self.dgMod.connect(targetWorldMatPlug.elementByLogicalIndex(0), depNodeFn.findPlug('targetWorldMatrix', False))
+                self.dgMod.connect(timePlug, depNodeFn.findPlug('inTime', False))
+
+                # start frame
+                self.dgMod.newPlugValueDouble(depNodeFn.findPlug('startFrame', False), self.startFrame)
+
+            # get the plugs for the constrained, the multi node uses the next free element
+            if self.multi or self.appendNode:
+                elementIndex = nextElementIndex
+                nextElementIndex += 1
+                self.elementIndices.append(elementIndex)
+
+                elementPlug = depNodeFn.findPlug('constraint', False).elementByLogicalIndex(elementIndex)
+                parentPlug = elementPlug.child(api.multiNodeClass.constraintParentAttr)
+                distancePlug = elementPlug.child(api.multiNodeClass.distanceAttr)
+                startPositionPlug = elementPlug.child(api.multiNodeClass.startPositionAttr)
+                lastPositionPlug = depNodeFn.findPlug('lastPosition', False).elementByLogicalIndex(elementIndex)
+                constTransPlug = depNodeFn.findPlug('constraintTranslate', False).elementByLogicalIndex(elementIndex)
+            else:
+                parentPlug = depNodeFn.findPlug('constraintParentMatrix', False)
+                distancePlug = depNodeFn.findPlug('distance', False)
+                startPositionPlug = depNodeFn.findPlug('startPosition', False)
+                lastPositionPlug = depNodeFn.findPlug('lastPosition', False)
+                constTransPlug = depNodeFn.findPlug('constraintTranslate', False)
+
+            # get the plugs to make the connections
+            constrainedParWorldMatPlug = constrainedTransFn.findPlug('parentMatrix', False)
+            self.dgMod.connect(constrainedParWorldMatPlug.elementByLogicalIndex(0), parentPlug)
+
+            # connecting the translation of constrained transform
+            if not self.skipX and not self.skipY and not self.skipZ:
+                self.dgMod.connect(constTransPlug, constrainedTransFn.findPlug('translate', False))
+            else:
+                if not self.skipX:
+                    self.dgMod.connect(constTransPlug.child(0), constrainedTransFn.findPlug('translateX', False))
+
+                if not self.skipY:
+                    self.dgMod.connect(constTransPlug.child(1), constrainedTransFn.findPlug('translateY', False))
+
+                if not self.skipZ:
+                    self.dgMod.connect(constTransPlug.child(2), constrainedTransFn.findPlug('translateZ', False))
+
+            # distance
+            self.dgMod.newPlugValueDouble(distancePlug, distanceValue)
+
+            # the start position, last position and the output so it starts at the right place
+            for plug in (startPositionPlug, lastPositionPlug, constTransPlug):
+                self.dgMod.newPlugValueDouble(plug.child(0), startVector.x)
+                self.dgMod.newPlugValueDouble(plug.child(1), startVector.y)
+                self.dgMod.newPlugValueDouble(plug.child(2), startVector.z)
+
+    def redoIt(self):
+
+        if self.bakeRange is not None:
+            self.bake()
+            return
+
+        self.dgMod.doIt()
+
+        # the names are only known once the modifier renamed the nodes
+        names = [self.api.OpenMaya.MFnDependencyNode(node).name() for node in self.nodes]
+        if len(names) == 1:
+            self.setResult(names[0])
+        else:
+            self.clearResult()
+            for name in names:
+                self.appendToResult(name)
+
+    def undoIt(self):
+        # the nodes, connections and values were all done through the modifier
+        self.dgMod.undoIt()
+
+        if self.appendNode and self.bakeRange is None:
+            # the modifier leaves the added elements behind
+            OpenMaya = self.api.OpenMaya
+            nodeFn = OpenMaya.MFnDependencyNode(self.nodes[0])
+            removeMod = OpenMaya.MDGModifier()
+            for elementIndex in self.elementIndices:
+                for name in ('constraint', 'lastPosition', 'constraintTranslate'):
+                    removeMod.removeMultiInstance(nodeFn.findPlug(name, False).elementByLogicalIndex(elementIndex), True)
+            removeMod.doIt()
+
+    def bake(self):
+        '''Solves the constraint nodes over the bake range and keys the constrained
+        translates or writes the positions to a trajectory cache file'''
+        api = self.api
+        OpenMaya = api.OpenMaya
+        OpenMayaAnim = api.OpenMayaAnim
+        self.dgMod = OpenMaya.MDGModifier()
+        self.clearResult()
+
+        bakeStart, bakeEnd = self.bakeRange
+        unit = OpenMaya.MTime.uiUnit()
+
+        nodes = [api.dependNode(self.sList, i) for i in range(self.sList.length())]
+        nodeFns = [OpenMaya.MFnDependencyNode(node) for node in nodes]
+        startFrames = numpy.array([nodeFn.findPlug('startFrame', False).asDouble() for nodeFn in nodeFns])
+
+        # solve from the frame before the earliest start frame so the history is right
+        firstFrame = min(bakeStart, numpy.floor(startFrames.min()) - 1.0)
+        numFrames = int(numpy.floor(bakeEnd - firstFrame)) + 1
+        frames = firstFrame + numpy.arange(numFrames)
+
+        # sample all the upstream inputs once, then solve a frame at a time with
+        # chained nodes after the nodes driving them
+        network = sampleNetwork(api, nodeFns, frames, unit)
+        try:
+            positions = network.solve(self.processes)
+        except ValueError as error:
+            raise RuntimeError(str(error))
+
+        bakeFrames = frames >= bakeStart
+
+        if self.cacheFile:
+            # write the positions to the cache file and have the nodes read it back
+            sePushPullTrajectory.write(self.cacheFile, frames[bakeFrames][0], positions[bakeFrames])
+            for nodeIndex, nodeFn in enumerate(nodeFns):
+                self.dgMod.newPlugValueString(nodeFn.findPlug('cacheFile', False), self.cacheFile)
+                self.dgMod.newPlugValueInt(nodeFn.findPlug('cacheIndex', False), nodeIndex)
+                self.appendToResult(nodeFn.name())
+            self.dgMod.doIt()
+            return
+
+        keyTimes = OpenMaya.MTimeArray()
+        for frame in frames[bakeFrames]:
+            keyTimes.append(OpenMaya.MTime(frame, unit))
+
+        # replace the constraint connections with animation curves
+        keyed = []
+        for nodeIndex, nodeFn in enumerate(nodeFns):
+            connections, destinations = constraintDestinations(api, nodeFn)
+            for source, destination in connections:
+                self.dgMod.disconnect(source, destination)
+            keyed.extend((nodeIndex, destination, axis) for destination, axis in destinations)
+        self.dgMod.doIt()
+
+        for nodeIndex, destination, axis in keyed:
+            curveFn = OpenMayaAnim.MFnAnimCurve()
+            curveFn.create(destination, OpenMayaAnim.MFnAnimCurve.kAnimCurveTL, self.dgMod)
+
+            values = OpenMaya.MDoubleArray()
+            for value in positions[bakeFrames, nodeIndex, axis]:
+                values.append(value)
+            curveFn.addKeys(keyTimes, values)
+
+        # return the baked nodes that are still around
+        if self.deleteConstraint:
+            for node in nodes:
+                self.dgMod.deleteNode(node)
+        else:
+            for nodeFn in nodeFns:
+                self.appendToResult(nodeFn.name())
+
+        self.dgMod.doIt()
+
+    def doStats(self, argData, objects):
+        '''Turns profiling on or off, resets or returns the evaluation counters
+        or returns how far the pre-rolls have solved'''
+        if self.api.isQuery(argData):
+            if argData.isFlagSet('-pf'):
+                self.setResult(sePushPullStats.enabled)
+                return
+
+            if argData.isFlagSet('-prr'):
+                self.setResult(self.prerollProgress(objects))
+                return
+
+            if not argData.isFlagSet('-st'):
+                raise RuntimeError('Only the profile, stats and preroll flags can be queried.')
+
+            # field=value strings, named node.field=value for the nodes asked for
+            self.clearResult()
+            for name, stats in zip(objects or [None], self.statsForObjects(objects)):
+                for label in sePushPullStats.labels(stats, name):
+                    self.appendToResult(label)
+            return
+
+        if argData.isFlagSet('-prr'):
+            raise RuntimeError('The preroll flag can only be queried.')
+
+        if argData.isFlagSet('-pf'):
+            sePushPullStats.enabled = argData.flagArgumentBool('-pf', 0)
+
+        if argData.isFlagSet('-rst'):
+            if objects:
+                for stats in self.statsForObjects(objects):
+                    stats.reset()
+            else:
+                sePushPullStats.resetAll()
+
+    def statsForObjects(self, objects):
+        '''Returns the counters of the named nodes or the aggregate if there are none'''
+        if not objects:
+            return [sePushPullStats.aggregate]
+
+        result = []
+        for obj in objects:
+            nodeObject = findConstraintNode(self.api, obj, 'Stats are only kept for sePushPullConstraint nodes.')
+
+            # nodes that have not been evaluated while profiling have nothing recorded yet
+            result.append(sePushPullStats.statsForNode(sePushPullNode.nodeUuid(self.api, nodeObject)))
+
+        return result
+
+    def prerollProgress(self, objects):
+        '''Returns the last frame solved and the end frame of the pre-roll of
+        each named node, or the earliest last frame of every pre-roll and the end
+        frame if there are no nodes. A node without a pre-roll has solved up to
+        the frame before its start frame.'''
+        OpenMaya = self.api.OpenMaya
+        prerollNodes = sePushPullNode.prerollNodes
+        result = OpenMaya.MDoubleArray()
+        endFrame = self.api.maxTime()
+
+        if not objects:
+            for node in list(prerollNodes.values()):
+                if not node.nodeHandle.isValid():
+                    sePushPullNode.stopPreroll(node)
+            frames = [node.preroll.progress()[0] for node in prerollNodes.values()]
+            frames = [frame for frame in frames if frame is not None]
+            if frames:
+                result.append(min(frames))
+                result.append(endFrame)
+            return result
+
+        for obj in objects:
+            nodeObject = findConstraintNode(self.api, obj, 'Only sePushPullConstraint nodes have a pre-roll.')
+            node = prerollNodes.get(OpenMaya.MObjectHandle(nodeObject).hashCode())
+            frame = None if node is None else node.preroll.progress()[0]
+            if frame is None:
+                frame = OpenMaya.MFnDependencyNode(nodeObject).findPlug('startFrame', False).asDouble() - 1.0
+            result.append(frame)
+            result.append(endFrame)
+
+        return result
+
+    def isUndoable(self):
+        return self.undoable
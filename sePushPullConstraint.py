@@ -14,217 +14,269 @@
 #    You should have received a copy of the GNU General Public License
 #    along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+'''The sePushPullConstraint plugin written with the Maya Python API 1.0.
+
+The nodes and the command are written once in sePushPullNode.py,
+sePushPullAttributes.py and sePushPullCommand.py. This file has the calls
+that are written differently in the API 1.0 and the classes Maya registers.
+'''
+
+import ctypes
+
 import maya.OpenMayaMPx as OpenMayaMPx
 import maya.OpenMaya as OpenMaya
-import maya.cmds as cmds
+import maya.OpenMayaAnim as OpenMayaAnim
+
+from sePushPullMath import solvePosition
+from sePushPullNode import LOD_OFF, LOD_HOLD, LOD_REDUCED
+from sePushPullCommand import readStateStore
+import sePushPullAttributes
+import sePushPullCommand
+import sePushPullMath
+import sePushPullNode
+
+# the multi constraint node solves with NumPy, it is only registered when NumPy is available
+numpy = sePushPullNode.numpy
+
+class sePushPullParentSpace(sePushPullMath.sePushPullParentSpace):
+    '''The parent space read from an API 1.0 MMatrix, the elements are read
+    straight from the matrix instead of going through all 16 values'''
+
+    def update(self, matrix):
+        '''Updates from the parent matrix, does nothing if it is the same as last time'''
+        if self.matrix is not None and self.matrix == matrix:
+            return
+        self.matrix = OpenMaya.MMatrix(matrix)
+
+        axes = (matrix(0,0), matrix(0,1), matrix(0,2),
+                matrix(1,0), matrix(1,1), matrix(1,2),
+                matrix(2,0), matrix(2,1), matrix(2,2))
+        if axes != self.axes:
+            self.setAxes(axes)
+
+        self.setTranslation(matrix(3,0), matrix(3,1), matrix(3,2))
+
+    def blend(self, axes, translation, matrix, weight):
+        '''Sets the parent space part way from the axes and translation to the matrix'''
+        self.matrix = None
+
+        blended = tuple(a + (matrix(r, c) - a) * weight for a, (r, c) in zip(axes, sePushPullMath._AXES_ELEMENTS))
+        if blended != self.axes:
+            self.setAxes(blended)
+
+        self.setTranslation(translation[0] + (matrix(3,0) - translation[0]) * weight,
+                            translation[1] + (matrix(3,1) - translation[1]) * weight,
+                            translation[2] + (matrix(3,2) - translation[2]) * weight)
+
+def meshTriangles(meshFn):
+    '''Returns the (n, 3) point indices of the mesh triangles'''
+    counts = OpenMaya.MIntArray()
+    vertices = OpenMaya.MIntArray()
+    meshFn.getTriangles(counts, vertices)
+    return numpy.array([vertices[i] for i in range(vertices.length())], dtype=int).reshape(-1, 3)
+
+def meshPoints(meshFn):
+    '''Returns the (n, 3) positions of the mesh points, copied in one go from
+    the floats the mesh keeps them in. The mesh data has no transform of its
+    own so these are the world positions.'''
+    count = meshFn.numVertices()
+    if not count:
+        return numpy.zeros((0, 3))
+    rawPoints = (ctypes.c_float * (count * 3)).from_address(int(meshFn.getRawPoints()))
+    return numpy.frombuffer(rawPoints, dtype=numpy.float32).astype(float).reshape(-1, 3)
+
+class sePushPullApi(object):
+    '''The API 1.0 calls the shared node and command code makes'''
+    OpenMaya = OpenMaya
+    OpenMayaAnim = OpenMayaAnim
+    MPxNode = OpenMayaMPx.MPxNode
+    MPxCommand = OpenMayaMPx.MPxCommand
+    parentSpace = sePushPullParentSpace
+
+    # returned by compute for a plug the node does not compute
+    unknownParameter = OpenMaya.MStatus.kUnknownParameter
+
+    # the node classes, set once they are defined below
+    nodeClass = None
+    multiNodeClass = None
+
+    @staticmethod
+    def meshTriangles(meshFn):
+        return meshTriangles(meshFn)
+
+    @staticmethod
+    def meshPoints(meshFn):
+        return meshPoints(meshFn)
+
+    @staticmethod
+    def frameValue(time):
+        return time.value()
+
+    @staticmethod
+    def timeUnit(time):
+        return time.unit()
+
+    @staticmethod
+    def currentTime():
+        return OpenMayaAnim.MAnimControl.currentTime().value()
+
+    @staticmethod
+    def maxTime():
+        return OpenMayaAnim.MAnimControl.maxTime().value()
+
+    @staticmethod
+    def row(matrix, r):
+        '''Returns the first three values of the matrix row'''
+        return (matrix(r,0), matrix(r,1), matrix(r,2))
+
+    @staticmethod
+    def translation(matrix):
+        return (matrix(3,0), matrix(3,1), matrix(3,2))
+
+    @staticmethod
+    def matrixValues(matrix):
+        '''Returns the 16 values of the matrix in row order'''
+        return tuple(matrix(r, c) for r in range(4) for c in range(4))
+
+    @staticmethod
+    def matrixToList(matrix):
+        '''Returns the MMatrix as nested lists'''
+        return [[matrix(r, c) for c in range(4)] for r in range(4)]
+
+    @staticmethod
+    def rootAttribute(plug):
+        '''Returns the attribute of the plug, or of its parent if it is a child plug'''
+        if plug.isChild():
+            plug = plug.parent()
+        return plug.attribute()
+
+    @staticmethod
+    def arrayElements(arrayHandle):
+        '''Yields the logical index and the input handle of every element'''
+        for i in range(arrayHandle.elementCount()):
+            arrayHandle.jumpToArrayElement(i)
+            yield arrayHandle.elementIndex(), arrayHandle.inputValue()
+
+    @staticmethod
+    def meshTopology(meshFn):
+        return (meshFn.numVertices(), meshFn.numPolygons(), meshFn.numFaceVertices())
+
+    @staticmethod
+    def setFlags(attrFn, **flags):
+        '''Sets the flags of the attribute, keyable=True calls setKeyable(True)'''
+        for name, value in flags.items():
+            getattr(attrFn, 'set' + name[0].upper() + name[1:])(value)
+
+    @staticmethod
+    def connectedPlugs(plug, asDestination, asSource):
+        plugs = OpenMaya.MPlugArray()
+        plug.connectedTo(plugs, asDestination, asSource)
+        return [plugs[i] for i in range(plugs.length())]
+
+    @staticmethod
+    def nodeConnections(nodeObject):
+        '''Returns the plugs of the node that are connected'''
+        plugs = OpenMaya.MPlugArray()
+        OpenMaya.MFnDependencyNode(nodeObject).getConnections(plugs)
+        return [plugs[i] for i in range(plugs.length())]
+
+    @staticmethod
+    def objects(objectArray):
+        return [objectArray[i] for i in range(objectArray.length())]
+
+    @staticmethod
+    def animCurveKeys(curve, unit):
+        '''Returns the time in the unit, the value and the tangent types of every key'''
+        curveFn = OpenMayaAnim.MFnAnimCurve(curve)
+        return [(curveFn.time(i).asUnits(unit), curveFn.value(i), curveFn.inTangentType(i), curveFn.outTangentType(i))
+                for i in range(curveFn.numKeys())]
+
+    @staticmethod
+    def existingIndices(arrayPlug):
+        indices = OpenMaya.MIntArray()
+        arrayPlug.getExistingArrayAttributeIndices(indices)
+        return [indices[i] for i in range(indices.length())]
 
-class sePushPullConstraintNode(OpenMayaMPx.MPxNode):
+    @staticmethod
+    def dagPathTo(nodeObject):
+        dagPath = OpenMaya.MDagPath()
+        OpenMaya.MDagPath.getAPathTo(nodeObject, dagPath)
+        return dagPath
+
+    @staticmethod
+    def dependNode(sList, index):
+        nodeObject = OpenMaya.MObject()
+        sList.getDependNode(index, nodeObject)
+        return nodeObject
+
+    @staticmethod
+    def dagPath(sList, index):
+        dagPath = OpenMaya.MDagPath()
+        sList.getDagPath(index, dagPath)
+        return dagPath
+
+    @staticmethod
+    def typeId(nodeFn):
+        return nodeFn.typeId()
+
+    @staticmethod
+    def transformTranslation(transFn, space):
+        return transFn.getTranslation(space)
+
+    @staticmethod
+    def objectStrings(argData):
+        objects = []
+        argData.getObjects(objects)
+        return objects
+
+    @staticmethod
+    def isQuery(argData):
+        return argData.isQuery()
+
+    @staticmethod
+    def flagArgumentList(argData, flag, index):
+        argList = OpenMaya.MArgList()
+        argData.getFlagArgumentList(flag, index, argList)
+        return argList
+
+    @staticmethod
+    def activeSelection():
+        sList = OpenMaya.MSelectionList()
+        OpenMaya.MGlobal.getActiveSelectionList(sList)
+        return sList
+
+class sePushPullConstraintNode(sePushPullNode.sePushPullConstraintBase, OpenMayaMPx.MPxNode):
     '''sePushPullConstraint node class'''
     kPluginNodeId = OpenMaya.MTypeId(0x0011A640)
+    api = sePushPullApi
+
+class sePushPullMultiConstraintNode(sePushPullNode.sePushPullMultiConstraintBase, OpenMayaMPx.MPxNode):
+    '''sePushPullMultiConstraint node class, one target pushing or pulling many constrained transforms'''
+    kPluginNodeId = OpenMaya.MTypeId(0x0011A641)
+    api = sePushPullApi
+
+sePushPullApi.nodeClass = sePushPullConstraintNode
+sePushPullApi.multiNodeClass = sePushPullMultiConstraintNode
+
+class sePushPullConstraintCmd(sePushPullCommand.sePushPullConstraintCmdBase, OpenMayaMPx.MPxCommand):
+    '''Class that contains all functions related to the sePushPullConstraint command'''
+    api = sePushPullApi
 
-    ## DEFINE THE ATTRIBUTES - PLACE HOLDERS
-    # constraint output attribute
-    constTransAttr = OpenMaya.MObject() 
-    ctAttrX = OpenMaya.MObject()
-    ctAttrY = OpenMaya.MObject()
-    ctAttrZ = OpenMaya.MObject()
-    
-    # last position attribute
-    lastPositionAttr = OpenMaya.MObject()
-    lpAttrX = OpenMaya.MObject()
-    lpAttrY = OpenMaya.MObject()
-    lpAttrZ = OpenMaya.MObject()
-    
-    # start position attribute
-    startPositionAttr = OpenMaya.MObject()
-    spAttrX = OpenMaya.MObject()
-    spAttrY = OpenMaya.MObject()
-    spAttrZ = OpenMaya.MObject()
-    
-    # target and constraint matrix attributes
-    targetAttr = OpenMaya.MObject()
-    constraintParentAttr = OpenMaya.MObject()
-    
-    # others
-    distanceAttr = OpenMaya.MObject()
-    inTimeAttr = OpenMaya.MObject()
-    startFrameAttr = OpenMaya.MObject()
-    pullAttr = OpenMaya.MObject()
-    pushAttr = OpenMaya.MObject()
-    
-    def __init__(self):
-        OpenMayaMPx.MPxNode.__init__(self)
-
-    def compute(self, plug, data):
-        '''Does all the computing when the node needs to evaluate'''
-        
-        # get the root plug if this is a child plug
-        if plug.isChild():
-            plugRoot = plug.parent()
-        else:
-            plugRoot = plug
-        
-        # check the plug is the output one we need to compute for
-        if plugRoot != sePushPullConstraintNode.constTransAttr:
-            return OpenMaya.MStatus.kUnknownParameter
-        
-        # get the current and start frame
-        currentFrame = data.inputValue(sePushPullConstraintNode.inTimeAttr).asTime()
-        startFrame = data.inputValue(sePushPullConstraintNode.startFrameAttr).asDouble()
-    
-        # get the output attributes
-        outputHandle = data.outputValue(sePushPullConstraintNode.constTransAttr)
-    
-        # if the current frame is before the start frame set the current position
-        # as the start position and return as completed
-        if currentFrame.value() < startFrame:
-            startPos = data.inputValue(sePushPullConstraintNode.startPositionAttr).asVector()
-            lastPosHandle = data.outputValue(sePushPullConstraintNode.lastPositionAttr)
-            
-            lastPosHandle.setMVector(startPos)
-            outputHandle.setMVector(startPos)
-            
-            data.setClean(sePushPullConstraintNode.constTransAttr)
-            data.setClean(sePushPullConstraintNode.lastPositionAttr)
-            
-            return
-        
-        # check if either the push or pull toggles are on to save a little time
-        isPullActive = data.inputValue(sePushPullConstraintNode.pullAttr).asBool()
-        isPushActive = data.inputValue(sePushPullConstraintNode.pushAttr).asBool()
-        
-        if not isPullActive and not isPushActive:
-            # no need to go any further since nothing will change
-            data.setClean(sePushPullConstraintNode.constTransAttr)
-            return
-        
-        # use the last position we stored on the previous calculation
-        lp = data.inputValue(sePushPullConstraintNode.lastPositionAttr).asVector()
-        lastPosition = OpenMaya.MPoint(lp)
-
-        # get the target world matrix and store the translation
-        targetMat = data.inputValue(sePushPullConstraintNode.targetAttr).asMatrix()
-        targetPos = OpenMaya.MPoint(targetMat(3,0), targetMat(3,1), targetMat(3,2))
-                
-        # get the distance
-        dist = data.inputValue(sePushPullConstraintNode.distanceAttr).asDouble()
-        
-        # get the constrained object parent matrix attribute
-        constraintParentMat = data.inputValue(sePushPullConstraintNode.constraintParentAttr).asMatrix()
-
-        # we get the relative vector from the target to the constrained
-        relativePos = OpenMaya.MVector((lastPosition * constraintParentMat) - targetPos)
-        
-        # get distance between these two objects
-        currentDistance = relativePos.length()
-
-        # if the pull is on and the current distance is greater than our set distance
-        if (isPullActive and (currentDistance > dist)) or (isPushActive and (currentDistance < dist)):
-            # normalize the local vector to unit length of 1
-            relativePos.normalize()
-            relativePos *= dist
-            # add the new local position to the target giving us were need to place the constraint object
-            newPosition = targetPos + relativePos
-            # get the inverse of the parent matrix 
-            localPos = OpenMaya.MVector(newPosition * constraintParentMat.inverse())
-            # set the value to the plugs
-            outputHandle.setMVector(localPos)
-            lastPosOutHandle = data.outputValue(sePushPullConstraintNode.lastPositionAttr)
-            lastPosOutHandle.setMVector(localPos)
-            
-            data.setClean(sePushPullConstraintNode.lastPositionAttr)
-
-        # set the plug to clean
-        data.setClean(sePushPullConstraintNode.constTransAttr)
-        
 def nodeCreator():
     '''Creates and returns a new instance of the node'''
     return OpenMayaMPx.asMPxPtr(sePushPullConstraintNode())
 
 def nodeInitialize():
     '''Handles adding the attributes to the node'''
-    numericAttr = OpenMaya.MFnNumericAttribute()
-    unitAttr = OpenMaya.MFnUnitAttribute()
-    matrixAttr = OpenMaya.MFnMatrixAttribute()
-
-    # create the output translation attribute
-    sePushPullConstraintNode.ctAttrX = numericAttr.create("constraintTranslateX", "ctx", OpenMaya.MFnNumericData.kDouble, 0.0)
-    sePushPullConstraintNode.ctAttrY = numericAttr.create("constraintTranslateY", "cty", OpenMaya.MFnNumericData.kDouble, 0.0)
-    sePushPullConstraintNode.ctAttrZ = numericAttr.create("constraintTranslateZ", "ctz", OpenMaya.MFnNumericData.kDouble, 0.0)
-    sePushPullConstraintNode.constTransAttr = numericAttr.create("constraintTranslate", "ct",
-                                                                 sePushPullConstraintNode.ctAttrX,
-                                                                 sePushPullConstraintNode.ctAttrY,
-                                                                 sePushPullConstraintNode.ctAttrZ)
-    numericAttr.setWritable(False)
-    sePushPullConstraintNode.addAttribute(sePushPullConstraintNode.constTransAttr)
-
-    # create the in time attribute
-    sePushPullConstraintNode.inTimeAttr = unitAttr.create("inTime", "it",  OpenMaya.MFnUnitAttribute.kTime, 1.0)
-    unitAttr.setStorable(False)
-    unitAttr.setKeyable(False)
-    unitAttr.setHidden(True)
-    sePushPullConstraintNode.addAttribute(sePushPullConstraintNode.inTimeAttr)
-    sePushPullConstraintNode.attributeAffects(sePushPullConstraintNode.inTimeAttr, sePushPullConstraintNode.constTransAttr)
-    
-    # create the start frame attribute
-    sePushPullConstraintNode.startFrameAttr = numericAttr.create("startFrame", "stf", OpenMaya.MFnNumericData.kDouble, 1.0)
-    numericAttr.setKeyable(True)
-    sePushPullConstraintNode.addAttribute(sePushPullConstraintNode.startFrameAttr)
-    sePushPullConstraintNode.attributeAffects(sePushPullConstraintNode.startFrameAttr, sePushPullConstraintNode.constTransAttr)
-    
-    # create the distance attribute
-    sePushPullConstraintNode.distanceAttr = numericAttr.create("distance", "dist", OpenMaya.MFnNumericData.kDouble)
-    numericAttr.setKeyable(True)
-    numericAttr.setMin(0.0)
-    sePushPullConstraintNode.addAttribute(sePushPullConstraintNode.distanceAttr)
-    sePushPullConstraintNode.attributeAffects(sePushPullConstraintNode.distanceAttr, sePushPullConstraintNode.constTransAttr)
-    
-    # create the target world matrix attribute
-    sePushPullConstraintNode.targetAttr = matrixAttr.create("targetWorldMatrix", "twm", OpenMaya.MFnMatrixAttribute.kDouble)
-    matrixAttr.setStorable(False)
-    sePushPullConstraintNode.addAttribute(sePushPullConstraintNode.targetAttr)
-    sePushPullConstraintNode.attributeAffects(sePushPullConstraintNode.targetAttr, sePushPullConstraintNode.constTransAttr)
-
-    # create the constraint parent matrix attribute    
-    sePushPullConstraintNode.constraintParentAttr = matrixAttr.create("constraintParentMatrix", "cpm", OpenMaya.MFnMatrixAttribute.kDouble)
-    matrixAttr.setStorable(False)
-    sePushPullConstraintNode.addAttribute(sePushPullConstraintNode.constraintParentAttr)
-    sePushPullConstraintNode.attributeAffects(sePushPullConstraintNode.constraintParentAttr, sePushPullConstraintNode.constTransAttr)
-    
-    # create the start position attribute
-    sePushPullConstraintNode.spAttrX = numericAttr.create("startPositionX", "spx", OpenMaya.MFnNumericData.kDouble, 0.0)
-    sePushPullConstraintNode.spAttrY = numericAttr.create("startPositionY", "spy", OpenMaya.MFnNumericData.kDouble, 0.0)
-    sePushPullConstraintNode.spAttrZ = numericAttr.create("startPositionZ", "spz", OpenMaya.MFnNumericData.kDouble, 0.0)
-    sePushPullConstraintNode.startPositionAttr = numericAttr.create("startPosition", "sp",
-                                                                    sePushPullConstraintNode.spAttrX,
-                                                                    sePushPullConstraintNode.spAttrY,
-                                                                    sePushPullConstraintNode.spAttrZ)
-    numericAttr.setKeyable(True)
-    sePushPullConstraintNode.addAttribute(sePushPullConstraintNode.startPositionAttr)
-    sePushPullConstraintNode.attributeAffects(sePushPullConstraintNode.startPositionAttr, sePushPullConstraintNode.constTransAttr)
-
-    # create the push bool attribute
-    sePushPullConstraintNode.pushAttr = numericAttr.create("push", "psh", OpenMaya.MFnNumericData.kBoolean, 1.0)
-    numericAttr.setKeyable(True)
-    sePushPullConstraintNode.addAttribute(sePushPullConstraintNode.pushAttr)
-    sePushPullConstraintNode.attributeAffects(sePushPullConstraintNode.pushAttr, sePushPullConstraintNode.constTransAttr)
-    
-    # create the push bool attribute
-    sePushPullConstraintNode.pullAttr = numericAttr.create("pull", "pll", OpenMaya.MFnNumericData.kBoolean, 1.0)
-    numericAttr.setKeyable(True)
-    sePushPullConstraintNode.addAttribute(sePushPullConstraintNode.pullAttr)
-    sePushPullConstraintNode.attributeAffects(sePushPullConstraintNode.pullAttr, sePushPullConstraintNode.constTransAttr)
-
-    # create the last position attribute for internal uses
-    sePushPullConstraintNode.lpAttrX = numericAttr.create("lastPositionX", "lpx", OpenMaya.MFnNumericData.kDouble, 0.0)
-    sePushPullConstraintNode.lpAttrY = numericAttr.create("lastPositionY", "lpy", OpenMaya.MFnNumericData.kDouble, 0.0)
-    sePushPullConstraintNode.lpAttrZ = numericAttr.create("lastPositionZ", "lpz", OpenMaya.MFnNumericData.kDouble, 0.0)
-    sePushPullConstraintNode.lastPositionAttr = numericAttr.create("lastPosition", "lp",
-                                                                   sePushPullConstraintNode.lpAttrX,
-                                                                   sePushPullConstraintNode.lpAttrY,
-                                                                   sePushPullConstraintNode.lpAttrZ)
-    numericAttr.setHidden(True);
-    sePushPullConstraintNode.addAttribute(sePushPullConstraintNode.lastPositionAttr);
+    sePushPullAttributes.initializeNode(sePushPullConstraintNode, sePushPullApi)
+
+def multiNodeCreator():
+    '''Creates and returns a new instance of the multi node'''
+    return OpenMayaMPx.asMPxPtr(sePushPullMultiConstraintNode())
+
+def multiNodeInitialize():
+    '''Handles adding the attributes to the multi node'''
+    sePushPullAttributes.initializeMultiNode(sePushPullMultiConstraintNode, sePushPullApi)
 
 def cmdCreator():
     '''Creates and returns and instance of the sePushPullConstraint command'''
@@ -232,253 +284,76 @@ def cmdCreator():
 
 def cmdSyntax():
     '''Creates the syntax for the command'''
-    syntax = OpenMaya.MSyntax()
-    
-    syntax.setObjectType(OpenMaya.MSyntax.kStringObjects)
-    syntax.setMaxObjects(2)
-    
-    syntax.enableEdit(False)
-    syntax.enableQuery(False)
-    
-    syntax.addFlag("-n", "-name", OpenMaya.MSyntax.kString)
-    syntax.addFlag("-d", "-distance", OpenMaya.MSyntax.kDouble)
-    syntax.addFlag("-sf", "-startFrame", OpenMaya.MSyntax.kDouble)
-    syntax.addFlag("-sp", "-startPosition", OpenMaya.MSyntax.kDouble, OpenMaya.MSyntax.kDouble, OpenMaya.MSyntax.kDouble)
-    syntax.addFlag("-sk", "-skip", OpenMaya.MSyntax.kString)
-    syntax.makeFlagMultiUse("-sk")
-    
-    return syntax
-
-class sePushPullConstraintCmd(OpenMayaMPx.MPxCommand):
-    '''Class that contains all functions related to the sePushPullConstraint command'''
-        
-    def __init__(self):
-        OpenMayaMPx.MPxCommand.__init__(self)
-        self.dgMod = OpenMaya.MDGModifier()
-        
-        self.nodeName = ''
-        self.skipX = False
-        self.skipY = False
-        self.skipZ = False
-        self.distanceValue = 0.0
-        self.startFrame = 0.0
-        self.startVector = OpenMaya.MVector()
-        self.sList = OpenMaya.MSelectionList()        
-                
-    def doIt(self, args):
-        '''Creates the node and connects everything based on the parameters given'''
-        # get the arguments passed in
-        argData = OpenMaya.MArgParser(self.syntax(), args)
-        
-        # get objects to use in the constraint and make sure there is only two
-        objects = []
-        argData.getObjects(objects)
-        if not objects:
-            # use the selection
-            objects = cmds.ls(sl=True)
-            
-        for obj in objects:
-            self.sList.add(obj)
-        
-        # if there is less than two objects given, return an error
-        if self.sList.length() < 2:
-            raise RuntimeError('Two transforms are required to create constraint.')
-        
-        # get the target object path and make sure it's a transform type
-        targetDAG = OpenMaya.MDagPath()
-        try:
-            self.sList.getDagPath(0, targetDAG)
-        except RuntimeError:
-            raise RuntimeError('Target object must be a DAG object type. Unable to get path to object.')
+    return sePushPullCommand.cmdSyntax(sePushPullApi)
 
-        targetTransFn = OpenMaya.MFnTransform()
-        try:
-            targetTransFn.setObject(targetDAG)
-        except RuntimeError:
-            raise RuntimeError('Target object type invalid. You must choose a transform.')
-        
-        # get the constraint object path and make sure it's a transform type
-        constraintDAG = OpenMaya.MDagPath()
-        try:
-            self.sList.getDagPath(1, constraintDAG)
-        except RuntimeError:
-            raise RuntimeError('Constraint object must be a DAG object type. Unable to get path to object.')
+def sampleNetwork(nodeFns, frames, unit):
+    '''Returns a sePushPullNetwork solving the constraint nodes, see sePushPullCommand.sampleNetwork'''
+    return sePushPullCommand.sampleNetwork(sePushPullApi, nodeFns, frames, unit)
+
+def writeStateStore(store, nodeFns, indices=None, modifier=None):
+    '''Sets the node attributes from the store, see sePushPullCommand.writeStateStore'''
+    return sePushPullCommand.writeStateStore(sePushPullApi, store, nodeFns, indices, modifier)
+
+# the callbacks made when the plugin is loaded
+animCurveCallback = None
+nodeRemovedCallback = None
+timeChangedCallback = None
 
-        constrainedTransFn = OpenMaya.MFnTransform()
-        try:
-            constrainedTransFn.setObject(constraintDAG)
-        except RuntimeError:
-            raise RuntimeError('Constraint object type invalid. You must choose a transform.')
-                
-        numSkips = argData.numberOfFlagUses('-sk')
-        if numSkips > 3:
-            raise RuntimeError('You can not have more than 3 skip flags.')
-        
-        if argData.isFlagSet('-n'):
-            self.nodeName = argData.flagArgumentString('-n', 0)
-        
-        for i in range(numSkips):
-            argList = OpenMaya.MArgList()
-            argData.getFlagArgumentList('-sk', i, argList)
-            
-            axis = argList.asString(0)
-
-            if axis == 'x':
-                self.skipX = True
-            elif axis == 'y':
-                self.skipY = True
-            elif axis == 'z':
-                self.skipZ = True
-        
-        # distance flag
-        if argData.isFlagSet('-d'):
-            self.distanceValue = argData.flagArgumentDouble('-d', 0)
-        else:
-            # calculate the distance
-            targetPos = targetTransFn.getTranslation(OpenMaya.MSpace.kWorld)
-            constrainedPos = constrainedTransFn.getTranslation(OpenMaya.MSpace.kWorld)
-            localPos = targetPos - constrainedPos
-            self.distanceValue = localPos.length()
-            
-        # start frame flag
-        if argData.isFlagSet('-sf'):
-            self.startFrame = argData.flagArgumentDouble('-sf', 0)
-        else:
-            self.startFrame = cmds.currentTime(q=True)
-        
-        # start position
-        if argData.isFlagSet('-sp'):
-            spX = argData.flagArgumentDouble('-sp', 0)
-            spY = argData.flagArgumentDouble('-sp', 1)
-            spZ = argData.flagArgumentDouble('-sp', 2)
-            
-            self.startVector = OpenMaya.MVector(spX, spY, spZ)
-        else:
-            self.startVector = constrainedTransFn.getTranslation(OpenMaya.MSpace.kTransform)
-            
-        self.redoIt()
-        
-    def redoIt(self):
-        
-        targetDAG = OpenMaya.MDagPath()
-        self.sList.getDagPath(0, targetDAG)
-        targetTransFn = OpenMaya.MFnTransform()
-        targetTransFn.setObject(targetDAG)
-        
-        constrainedDAG = OpenMaya.MDagPath()
-        self.sList.getDagPath(1, constrainedDAG)
-        constrainedTransFn = OpenMaya.MFnTransform()
-        constrainedTransFn.setObject(constrainedDAG)
-        
-         # get a time node, there should be a better way but I'm not sure how
-        dgTimeNodes = OpenMaya.MItDependencyNodes(OpenMaya.MFn.kTime)
-        while not dgTimeNodes.isDone():
-            # gives us time MObject
-            timeObject = dgTimeNodes.thisNode()
-            break
-        
-        timeNode = OpenMaya.MFnDependencyNode(timeObject)
-        
-        # create the node and rename it
-        depNodeFn = OpenMaya.MFnDependencyNode()
-        if self.nodeName:
-            depNodeFn.create('sePushPullConstraint', self.nodeName)
-        else:
-            depNodeFn.create('sePushPullConstraint')
-        
-        # just in case a number was added
-        self.nodeName = depNodeFn.name()
-            
-        # get the plugs to make the connections
-        targetWorldMatPlug = targetTransFn.findPlug('worldMatrix')
-        constrainedParWorldMatPlug = constrainedTransFn.findPlug('parentMatrix')
-        
-        dgMod = OpenMaya.MDGModifier()
-        
-        dgMod.connect(targetWorldMatPlug.elementByLogicalIndex(0), depNodeFn.findPlug('targetWorldMatrix'))
-        dgMod.connect(constrainedParWorldMatPlug.elementByLogicalIndex(0), depNodeFn.findPlug('constraintParentMatrix'))
-        dgMod.connect(timeNode.findPlug('outTime'), depNodeFn.findPlug('inTime'))
-        
-        # connecting the translation of constrained transform
-        if not self.skipX and not self.skipY and not self.skipZ:
-            dgMod.connect(depNodeFn.findPlug('constraintTranslate'), constrainedTransFn.findPlug('translate'))
-        else:
-            if not self.skipX:
-                dgMod.connect(depNodeFn.findPlug('constraintTranslateX'), constrainedTransFn.findPlug('translateX'))
-                
-            if not self.skipY:
-                dgMod.connect(depNodeFn.findPlug('constraintTranslateY'), constrainedTransFn.findPlug('translateY'))
-                
-            if not self.skipZ:
-                dgMod.connect(depNodeFn.findPlug('constraintTranslateZ'), constrainedTransFn.findPlug('translateZ'))
-    
-        # distance
-        distancePlug = depNodeFn.findPlug('distance')
-        distancePlug.setDouble(self.distanceValue)
-        
-        # start frame
-        startFramePlug = depNodeFn.findPlug('startFrame')
-        startFramePlug.setDouble(self.startFrame)
-                
-        # start position
-        startPositionXPlug = depNodeFn.findPlug('startPositionX')
-        startPositionYPlug = depNodeFn.findPlug('startPositionY')
-        startPositionZPlug = depNodeFn.findPlug('startPositionZ')
-        startPositionXPlug.setDouble(self.startVector.x)
-        startPositionYPlug.setDouble(self.startVector.y)
-        startPositionZPlug.setDouble(self.startVector.z)
-        
-        # set the last position
-        lastPositionXPlug = depNodeFn.findPlug('lastPositionX')
-        lastPositionYPlug = depNodeFn.findPlug('lastPositionY')
-        lastPositionZPlug = depNodeFn.findPlug('lastPositionZ')
-        lastPositionXPlug.setDouble(self.startVector.x)
-        lastPositionYPlug.setDouble(self.startVector.y)
-        lastPositionZPlug.setDouble(self.startVector.z)
-        
-        # set the constraint translate out put so it starts at the right place
-        constPositionXPlug = depNodeFn.findPlug('constraintTranslateX')
-        constPositionYPlug = depNodeFn.findPlug('constraintTranslateY')
-        constPositionZPlug = depNodeFn.findPlug('constraintTranslateZ')
-        constPositionXPlug.setDouble(self.startVector.x)
-        constPositionYPlug.setDouble(self.startVector.y)
-        constPositionZPlug.setDouble(self.startVector.z)
-
-        dgMod.doIt()
-        
-        self.setResult(self.nodeName)
-            
-    def undoIt(self):
-        cmds.delete(self.nodeName)
-    
-    def isUndoable(self):
-        return True
-    
 def initializePlugin(obj):
     '''Called when loading the plugin'''
+    global animCurveCallback, nodeRemovedCallback, timeChangedCallback
     plugin = OpenMayaMPx.MFnPlugin(obj, 'Scott Englert', '1.2', 'Any')
     try:
         plugin.registerNode('sePushPullConstraint', sePushPullConstraintNode.kPluginNodeId, nodeCreator, nodeInitialize)
-        print "sePushPullConstraint  Copyright (C) 2014  Scott Englert - scott@scottenglert.com"
-        print "This program comes with ABSOLUTELY NO WARRANTY; for details read the license file."
-        print "This is free software, and you are welcome to redistribute it under certain conditions; See license file for details."
+        print("sePushPullConstraint  Copyright (C) 2014  Scott Englert - scott@scottenglert.com")
+        print("This program comes with ABSOLUTELY NO WARRANTY; for details read the license file.")
+        print("This is free software, and you are welcome to redistribute it under certain conditions; See license file for details.")
     except:
         raise RuntimeError('Failed to register node')
-    
+
+    if numpy is not None:
+        try:
+            plugin.registerNode('sePushPullMultiConstraint', sePushPullMultiConstraintNode.kPluginNodeId, multiNodeCreator, multiNodeInitialize)
+        except:
+            raise RuntimeError('Failed to register multi node')
+
     try:
         plugin.registerCommand('sePushPullConstraint', cmdCreator, cmdSyntax)
     except:
         raise RuntimeError('Failed to register command')
 
+    animCurveCallback = OpenMayaAnim.MAnimMessage.addAnimCurveEditedCallback(sePushPullNode.animCurvesEdited, sePushPullApi)
+    nodeRemovedCallback = OpenMaya.MDGMessage.addNodeRemovedCallback(sePushPullNode.nodeRemoved, 'sePushPullConstraint',
+                                                                      sePushPullApi)
+    timeChangedCallback = OpenMaya.MEventMessage.addEventCallback('timeChanged', sePushPullNode.timeChanged, sePushPullApi)
+
 def uninitializePlugin(obj):
     '''Called by Maya to unload the plugin'''
+    global animCurveCallback, nodeRemovedCallback, timeChangedCallback
     plugin = OpenMayaMPx.MFnPlugin(obj)
+    sePushPullNode.stopAllPrerolls(sePushPullApi)
+    if animCurveCallback is not None:
+        OpenMaya.MMessage.removeCallback(animCurveCallback)
+        animCurveCallback = None
+    if nodeRemovedCallback is not None:
+        OpenMaya.MMessage.removeCallback(nodeRemovedCallback)
+        nodeRemovedCallback = None
+    if timeChangedCallback is not None:
+        OpenMaya.MMessage.removeCallback(timeChangedCallback)
+        timeChangedCallback = None
+
     try:
         plugin.deregisterNode(sePushPullConstraintNode.kPluginNodeId)
     except:
         raise RuntimeError('Failed to deregister node')
-    
+
+    if numpy is not None:
+        try:
+            plugin.deregisterNode(sePushPullMultiConstraintNode.kPluginNodeId)
+        except:
+            raise RuntimeError('Failed to deregister multi node')
+
     try:
         plugin.deregisterCommand('sePushPullConstraint')
     except:
-        raise RuntimeError('Failed to deregister command')
\ No newline at end of file
+        raise RuntimeError('Failed to deregister command')
@@ -0,0 +1,309 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''The sePushPullConstraint plugin written with the Maya Python API 2.0.
+
+This is the same node, multi node and command as sePushPullConstraint.py with
+the same attributes and node ids, only one of the two plugins can be loaded at
+a time. Both plugins share the code in sePushPullNode.py, sePushPullAttributes.py
+and sePushPullCommand.py, this file only has the calls written differently in
+the API 2.0. It returns values instead of filling in arguments and hands
+matrices over as 16 values, which saves a lot of the Python calls the API 1.0
+plugin makes every evaluation.
+'''
+
+import maya.api.OpenMaya as OpenMaya
+import maya.api.OpenMayaAnim as OpenMayaAnim
+
+from sePushPullMath import sePushPullParentSpace, solvePosition
+from sePushPullNode import LOD_OFF, LOD_HOLD, LOD_REDUCED
+from sePushPullCommand import readStateStore
+import sePushPullAttributes
+import sePushPullCommand
+import sePushPullNode
+
+# the multi constraint node solves with NumPy, it is only registered when NumPy is available
+numpy = sePushPullNode.numpy
+
+def maya_useNewAPI():
+    '''Tells Maya this plugin uses the Python API 2.0'''
+    pass
+
+def meshTriangles(meshFn):
+    '''Returns the (n, 3) point indices of the mesh triangles'''
+    counts, vertices = meshFn.getTriangles()
+    return numpy.array(list(vertices), dtype=int).reshape(-1, 3)
+
+def meshPoints(meshFn):
+    '''Returns the (n, 3) world positions of the mesh points'''
+    # the points are read as x, y, z, w sequences by NumPy rather than one by one in Python
+    points = meshFn.getPoints(OpenMaya.MSpace.kWorld)
+    return numpy.array(points, dtype=float).reshape(-1, 4)[:, :3]
+
+class sePushPullApi(object):
+    '''The API 2.0 calls the shared node and command code makes'''
+    OpenMaya = OpenMaya
+    OpenMayaAnim = OpenMayaAnim
+    MPxNode = OpenMaya.MPxNode
+    MPxCommand = OpenMaya.MPxCommand
+    parentSpace = sePushPullParentSpace
+
+    # returned by compute for a plug the node does not compute
+    unknownParameter = None
+
+    # the node classes, set once they are defined below
+    nodeClass = None
+    multiNodeClass = None
+
+    @staticmethod
+    def meshTriangles(meshFn):
+        return meshTriangles(meshFn)
+
+    @staticmethod
+    def meshPoints(meshFn):
+        return meshPoints(meshFn)
+
+    @staticmethod
+    def frameValue(time):
+        return time.value
+
+    @staticmethod
+    def timeUnit(time):
+        return time.unit
+
+    @staticmethod
+    def currentTime():
+        return OpenMayaAnim.MAnimControl.currentTime().value
+
+    @staticmethod
+    def maxTime():
+        return OpenMayaAnim.MAnimControl.maxTime().value
+
+    @staticmethod
+    def row(matrix, r):
+        '''Returns the first three values of the matrix row'''
+        return (matrix[r * 4], matrix[r * 4 + 1], matrix[r * 4 + 2])
+
+    @staticmethod
+    def translation(matrix):
+        return (matrix[12], matrix[13], matrix[14])
+
+    @staticmethod
+    def matrixValues(matrix):
+        '''Returns the 16 values of the matrix in row order'''
+        return tuple(matrix)
+
+    @staticmethod
+    def matrixToList(matrix):
+        '''Returns the MMatrix as nested lists'''
+        return [[matrix[r * 4 + c] for c in range(4)] for r in range(4)]
+
+    @staticmethod
+    def rootAttribute(plug):
+        '''Returns the attribute of the plug, or of its parent if it is a child plug'''
+        if plug.isChild:
+            plug = plug.parent()
+        return plug.attribute()
+
+    @staticmethod
+    def arrayElements(arrayHandle):
+        '''Yields the logical index and the input handle of every element'''
+        for i in range(len(arrayHandle)):
+            arrayHandle.jumpToPhysicalElement(i)
+            yield arrayHandle.elementLogicalIndex(), arrayHandle.inputValue()
+
+    @staticmethod
+    def meshTopology(meshFn):
+        return (meshFn.numVertices, meshFn.numPolygons, meshFn.numFaceVertices)
+
+    @staticmethod
+    def setFlags(attrFn, **flags):
+        '''Sets the flags of the attribute, keyable=True sets attrFn.keyable'''
+        for name, value in flags.items():
+            setattr(attrFn, name, value)
+
+    @staticmethod
+    def connectedPlugs(plug, asDestination, asSource):
+        return list(plug.connectedTo(asDestination, asSource))
+
+    @staticmethod
+    def nodeConnections(nodeObject):
+        '''Returns the plugs of the node that are connected'''
+        return list(OpenMaya.MFnDependencyNode(nodeObject).getConnections())
+
+    @staticmethod
+    def objects(objectArray):
+        return list(objectArray)
+
+    @staticmethod
+    def animCurveKeys(curve, unit):
+        '''Returns the time in the unit, the value and the tangent types of every key'''
+        curveFn = OpenMayaAnim.MFnAnimCurve(curve)
+        return [(curveFn.input(i).asUnits(unit), curveFn.value(i), curveFn.inTangentType(i), curveFn.outTangentType(i))
+                for i in range(curveFn.numKeys)]
+
+    @staticmethod
+    def existingIndices(arrayPlug):
+        return list(arrayPlug.getExistingArrayAttributeIndices())
+
+    @staticmethod
+    def dagPathTo(nodeObject):
+        return OpenMaya.MDagPath.getAPathTo(nodeObject)
+
+    @staticmethod
+    def dependNode(sList, index):
+        return sList.getDependNode(index)
+
+    @staticmethod
+    def dagPath(sList, index):
+        return sList.getDagPath(index)
+
+    @staticmethod
+    def typeId(nodeFn):
+        return nodeFn.typeId
+
+    @staticmethod
+    def transformTranslation(transFn, space):
+        return transFn.translation(space)
+
+    @staticmethod
+    def objectStrings(argData):
+        return argData.getObjectStrings()
+
+    @staticmethod
+    def isQuery(argData):
+        return argData.isQuery
+
+    @staticmethod
+    def flagArgumentList(argData, flag, index):
+        return argData.getFlagArgumentList(flag, index)
+
+    @staticmethod
+    def activeSelection():
+        return OpenMaya.MGlobal.getActiveSelectionList()
+
+class sePushPullConstraintNode(sePushPullNode.sePushPullConstraintBase, OpenMaya.MPxNode):
+    '''sePushPullConstraint node class'''
+    kPluginNodeId = OpenMaya.MTypeId(0x0011A640)
+    api = sePushPullApi
+
+class sePushPullMultiConstraintNode(sePushPullNode.sePushPullMultiConstraintBase, OpenMaya.MPxNode):
+    '''sePushPullMultiConstraint node class, one target pushing or pulling many constrained transforms'''
+    kPluginNodeId = OpenMaya.MTypeId(0x0011A641)
+    api = sePushPullApi
+
+sePushPullApi.nodeClass = sePushPullConstraintNode
+sePushPullApi.multiNodeClass = sePushPullMultiConstraintNode
+
+class sePushPullConstraintCmd(sePushPullCommand.sePushPullConstraintCmdBase, OpenMaya.MPxCommand):
+    '''Class that contains all functions related to the sePushPullConstraint command'''
+    api = sePushPullApi
+
+def nodeCreator():
+    '''Creates and returns a new instance of the node'''
+    return sePushPullConstraintNode()
+
+def nodeInitialize():
+    '''Handles adding the attributes to the node'''
+    sePushPullAttributes.initializeNode(sePushPullConstraintNode, sePushPullApi)
+
+def multiNodeCreator():
+    '''Creates and returns a new instance of the multi node'''
+    return sePushPullMultiConstraintNode()
+
+def multiNodeInitialize():
+    '''Handles adding the attributes to the multi node'''
+    sePushPullAttributes.initializeMultiNode(sePushPullMultiConstraintNode, sePushPullApi)
+
+def cmdCreator():
+    '''Creates and returns and instance of the sePushPullConstraint command'''
+    return sePushPullConstraintCmd()
+
+def cmdSyntax():
+    '''Creates the syntax for the command'''
+    return sePushPullCommand.cmdSyntax(sePushPullApi)
+
+def sampleNetwork(nodeFns, frames, unit):
+    '''Returns a sePushPullNetwork solving the constraint nodes, see sePushPullCommand.sampleNetwork'''
+    return sePushPullCommand.sampleNetwork(sePushPullApi, nodeFns, frames, unit)
+
+def writeStateStore(store, nodeFns, indices=None, modifier=None):
+    '''Sets the node attributes from the store, see sePushPullCommand.writeStateStore'''
+    return sePushPullCommand.writeStateStore(sePushPullApi, store, nodeFns, indices, modifier)
+
+# the callbacks made when the plugin is loaded
+animCurveCallback = None
+nodeRemovedCallback = None
+timeChangedCallback = None
+
+def initializePlugin(obj):
+    '''Called when loading the plugin'''
+    global animCurveCallback, nodeRemovedCallback, timeChangedCallback
+    plugin = OpenMaya.MFnPlugin(obj, 'Scott Englert', '1.2', 'Any')
+    try:
+        plugin.registerNode('sePushPullConstraint', sePushPullConstraintNode.kPluginNodeId, nodeCreator, nodeInitialize)
+        print("sePushPullConstraint  Copyright (C) 2014  Scott Englert - scott@scottenglert.com")
+        print("This program comes with ABSOLUTELY NO WARRANTY; for details read the license file.")
+        print("This is free software, and you are welcome to redistribute it under certain conditions; See license file for details.")
+    except:
+        raise RuntimeError('Failed to register node')
+
+    if numpy is not None:
+        try:
+            plugin.registerNode('sePushPullMultiConstraint', sePushPullMultiConstraintNode.kPluginNodeId, multiNodeCreator, multiNodeInitialize)
+        except:
+            raise RuntimeError('Failed to register multi node')
+
+    try:
+        plugin.registerCommand('sePushPullConstraint', cmdCreator, cmdSyntax)
+    except:
+        raise RuntimeError('Failed to register command')
+
+    animCurveCallback = OpenMayaAnim.MAnimMessage.addAnimCurveEditedCallback(sePushPullNode.animCurvesEdited, sePushPullApi)
+    nodeRemovedCallback = OpenMaya.MDGMessage.addNodeRemovedCallback(sePushPullNode.nodeRemoved, 'sePushPullConstraint',
+                                                                      sePushPullApi)
+    timeChangedCallback = OpenMaya.MEventMessage.addEventCallback('timeChanged', sePushPullNode.timeChanged, sePushPullApi)
+
+def uninitializePlugin(obj):
+    '''Called by Maya to unload the plugin'''
+    global animCurveCallback, nodeRemovedCallback, timeChangedCallback
+    plugin = OpenMaya.MFnPlugin(obj)
+    sePushPullNode.stopAllPrerolls(sePushPullApi)
+    if animCurveCallback is not None:
+        OpenMaya.MMessage.removeCallback(animCurveCallback)
+        animCurveCallback = None
+    if nodeRemovedCallback is not None:
+        OpenMaya.MMessage.removeCallback(nodeRemovedCallback)
+        nodeRemovedCallback = None
+    if timeChangedCallback is not None:
+        OpenMaya.MMessage.removeCallback(timeChangedCallback)
+        timeChangedCallback = None
+
+    try:
+        plugin.deregisterNode(sePushPullConstraintNode.kPluginNodeId)
+    except:
+        raise RuntimeError('Failed to deregister node')
+
+    if numpy is not None:
+        try:
+            plugin.deregisterNode(sePushPullMultiConstraintNode.kPluginNodeId)
+        except:
+            raise RuntimeError('Failed to deregister multi node')
+
+    try:
+        plugin.deregisterCommand('sePushPullConstraint')
+    except:
+        raise RuntimeError('Failed to deregister command')
@@ -0,0 +1,42 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Writing files so a reader never sees half of one.'''
+
+import contextlib
+import os
+
+@contextlib.contextmanager
+def atomicWrite(path):
+    '''Opens a temporary file next to the path for writing in binary, the old
+    file is only replaced once the new one is written. The temporary file is
+    removed if writing it fails.'''
+    tempPath = path + '.tmp'
+    try:
+        with open(tempPath, 'wb') as f:
+            yield f
+    except:
+        if os.path.exists(tempPath):
+            os.remove(tempPath)
+        raise
+
+    replace = getattr(os, 'replace', None)
+    if replace is None:
+        # Python 2 on Windows can not rename over an existing file
+        if os.name == 'nt' and os.path.exists(path):
+            os.remove(path)
+        replace = os.rename
+    replace(tempPath, path)
@@ -0,0 +1,278 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Maya independent solve of a single constraint with plain floats.
+
+The sePushPullConstraint node of both the Python API 1.0 and 2.0 plugins
+solves with these, one frame of one constraint at a time. Matrices use the
+Maya row vector convention with the translation in the last row. The parent
+space here reads a matrix as 16 values in row order, like the API 2.0 MMatrix
+or a tuple, the API 1.0 plugin reads its MMatrix in its own subclass.
+'''
+
+import math
+
+# the (row, column) of the upper 3x3 matrix elements in the order they are kept
+_AXES_ELEMENTS = tuple((r, c) for r in range(3) for c in range(3))
+_AXES_INDICES = tuple(r * 4 + c for r, c in _AXES_ELEMENTS)
+
+# where the animated inputs of a frame are in the input keys the state cache,
+# the input history and the pre-roll keep, the target translation, the 16
+# values of the parent matrix, the distance, push and pull
+KEY_TARGET = slice(0, 3)
+KEY_PARENT = slice(3, 19)
+KEY_DISTANCE = 19
+KEY_PUSH = 20
+KEY_PULL = 21
+
+class sePushPullParentSpace(object):
+    '''The constrained object parent matrix and its inverse as plain floats.
+
+    The inverse is only worked out when a solve corrects the position, and
+    only again after the upper 3x3 of the parent matrix changes, a parent that
+    only moves just needs its inverse translation updated. Parent matrices from
+    Maya transforms are affine so the last column is not kept.
+    '''
+
+    def __init__(self):
+        self.matrix = None
+        self.axes = None
+        self.translation = (0.0, 0.0, 0.0)
+
+        # None until worked out for the current axes and translation, the
+        # inverse axes stay None when the axes can not be inverted
+        self.inverted = False
+        self.inverseAxes = None
+        self.inverseTranslation = None
+
+        # how many times the inverse was worked out
+        self.inversions = 0
+
+    def update(self, matrix):
+        '''Updates from the 16 parent matrix values, does nothing if they are the
+        same as last time'''
+        values = tuple(matrix)
+        if values == self.matrix:
+            return
+        self.matrix = values
+
+        axes = tuple(values[i] for i in _AXES_INDICES)
+        if axes != self.axes:
+            self.setAxes(axes)
+
+        self.setTranslation(values[12], values[13], values[14])
+
+    def blend(self, axes, translation, matrix, weight):
+        '''Sets the parent space part way from the axes and translation to the
+        matrix. The axes are blended element by element, which is close enough
+        for the rotation of a parent over a single frame.'''
+        self.matrix = None
+
+        blended = tuple(a + (matrix[i] - a) * weight for a, i in zip(axes, _AXES_INDICES))
+        if blended != self.axes:
+            self.setAxes(blended)
+
+        self.setTranslation(translation[0] + (matrix[12] - translation[0]) * weight,
+                            translation[1] + (matrix[13] - translation[1]) * weight,
+                            translation[2] + (matrix[14] - translation[2]) * weight)
+
+    def setAxes(self, axes):
+        '''Sets the upper 3x3 matrix, its inverse is worked out when needed'''
+        self.axes = axes
+        self.inverted = False
+        self.inverseAxes = None
+
+    def setTranslation(self, tx, ty, tz):
+        '''Sets the translation, its inverse is worked out when needed'''
+        self.translation = (tx, ty, tz)
+        self.inverseTranslation = None
+
+    def inverse(self):
+        '''Returns the inverse axes and inverse translation, or None if the axes
+        can not be inverted like a parent scaled to nothing'''
+        if not self.inverted:
+            self.inverseAxes = invertAxes(self.axes)
+            self.inverted = True
+            self.inversions += 1
+
+        i = self.inverseAxes
+        if i is None:
+            return None
+
+        if self.inverseTranslation is None:
+            # the inverse translation is the negative translation through the inverse axes
+            tx, ty, tz = self.translation
+            self.inverseTranslation = (-(tx * i[0] + ty * i[3] + tz * i[6]),
+                                       -(tx * i[1] + ty * i[4] + tz * i[7]),
+                                       -(tx * i[2] + ty * i[5] + tz * i[8]))
+        return i, self.inverseTranslation
+
+def invertAxes(axes):
+    '''Returns the inverse of the upper 3x3 matrix given as 9 values, or None
+    if it can not be inverted'''
+    a, b, c, d, e, f, g, h, i = axes
+
+    # the cofactors of the first row give the determinant
+    A = e * i - f * h
+    B = f * g - d * i
+    C = d * h - e * g
+    det = a * A + b * B + c * C
+    if det == 0.0:
+        return None
+
+    s = 1.0 / det
+    return (A * s, (c * h - b * i) * s, (b * f - c * e) * s,
+            B * s, (a * i - c * g) * s, (c * d - a * f) * s,
+            C * s, (b * g - a * h) * s, (a * e - b * d) * s)
+
+def solvePosition(lastPosition, targetPos, parentSpace, dist, isPushActive, isPullActive):
+    '''Returns the new (x, y, z) local position or None if the constrained does
+    not need to move or the parent matrix can not be inverted. The parent space
+    must already be updated with the parent matrix.'''
+    x, y, z = lastPosition
+    a = parentSpace.axes
+    t = parentSpace.translation
+
+    # store the target translation
+    tx, ty, tz = targetPos
+
+    # we get the relative vector from the target to the constrained
+    rx = x * a[0] + y * a[3] + z * a[6] + t[0] - tx
+    ry = x * a[1] + y * a[4] + z * a[7] + t[1] - ty
+    rz = x * a[2] + y * a[5] + z * a[8] + t[2] - tz
+
+    # get distance between these two objects
+    currentDistance = math.sqrt(rx * rx + ry * ry + rz * rz)
+
+    # if the pull is on and the current distance is greater than our set distance
+    if (isPullActive and (currentDistance > dist)) or (isPushActive and (currentDistance < dist)):
+        # scale the relative vector to the distance, on top of the target it stays there
+        scale = dist / currentDistance if currentDistance else 0.0
+        # add it to the target giving us were need to place the constraint object
+        wx = tx + rx * scale
+        wy = ty + ry * scale
+        wz = tz + rz * scale
+        # bring it back into the parent space, a parent scaled to nothing keeps the position
+        inverse = parentSpace.inverse()
+        if inverse is None:
+            return None
+        i, it = inverse
+        return (wx * i[0] + wy * i[3] + wz * i[6] + it[0],
+                wx * i[1] + wy * i[4] + wz * i[7] + it[1],
+                wx * i[2] + wy * i[5] + wz * i[8] + it[2])
+
+    return None
+
+def inputKey(targetPos, parentValues, dist, isPushActive, isPullActive):
+    '''Returns the hashable input key of a frame from the target translation
+    and the 16 values of the parent matrix'''
+    return tuple(targetPos) + tuple(parentValues) + (dist, isPushActive, isPullActive)
+
+def solveInputKey(lastPosition, key, parentSpace):
+    '''Solves on from the last position with the inputs of an input key,
+    returning the last position when the constrained does not move'''
+    if not key[KEY_PUSH] and not key[KEY_PULL]:
+        return lastPosition
+
+    parentSpace.update(key[KEY_PARENT])
+    localPos = solvePosition(lastPosition, key[KEY_TARGET], parentSpace,
+                             key[KEY_DISTANCE], key[KEY_PUSH], key[KEY_PULL])
+    return lastPosition if localPos is None else localPos
+
+def solveSubsteps(lastPosition, previousTargetPos, targetPos, previousAxes, previousTranslation,
+                  constraintParentMat, parentSpace, dist, isPushActive, isPullActive, maxSubsteps, fraction):
+    '''Solves the frame in even sub steps from the previous frame inputs. The
+    number of steps is how many times the target moved the fraction of the
+    distance relative to the constrained, up to the max. Returns the new local
+    position or None if the constrained does not need to move, and the number
+    of steps taken.'''
+    x, y, z = lastPosition
+
+    # where the parents move the constrained to without any correction
+    parentSpace.update(constraintParentMat)
+    a = parentSpace.axes
+    t = parentSpace.translation
+    p = previousAxes
+    pt = previousTranslation
+    dx = (x * (a[0] - p[0]) + y * (a[3] - p[3]) + z * (a[6] - p[6]) + t[0] - pt[0])
+    dy = (x * (a[1] - p[1]) + y * (a[4] - p[4]) + z * (a[7] - p[7]) + t[1] - pt[1])
+    dz = (x * (a[2] - p[2]) + y * (a[5] - p[5]) + z * (a[8] - p[8]) + t[2] - pt[2])
+
+    # the target movement relative to that
+    rx = targetPos[0] - previousTargetPos[0] - dx
+    ry = targetPos[1] - previousTargetPos[1] - dy
+    rz = targetPos[2] - previousTargetPos[2] - dz
+    displacement = math.sqrt(rx * rx + ry * ry + rz * rz)
+
+    steps = 1
+    if dist > 0.0 and fraction > 0.0:
+        steps = int(min(max(math.ceil(displacement / (dist * fraction)), 1), max(maxSubsteps, 1)))
+
+    if steps == 1:
+        return solvePosition(lastPosition, targetPos, parentSpace, dist, isPushActive, isPullActive), 1
+
+    moved = False
+    for step in range(1, steps + 1):
+        weight = float(step) / steps
+        if step == steps:
+            parentSpace.update(constraintParentMat)
+        else:
+            parentSpace.blend(previousAxes, previousTranslation, constraintParentMat, weight)
+
+        stepTarget = (previousTargetPos[0] + (targetPos[0] - previousTargetPos[0]) * weight,
+                      previousTargetPos[1] + (targetPos[1] - previousTargetPos[1]) * weight,
+                      previousTargetPos[2] + (targetPos[2] - previousTargetPos[2]) * weight)
+        localPos = solvePosition(lastPosition, stepTarget, parentSpace, dist, isPushActive, isPullActive)
+        if localPos is not None:
+            lastPosition = localPos
+            moved = True
+
+    return (lastPosition if moved else None), steps
+
+def worldPosition(position, parentSpace):
+    '''Returns the local position moved into world space by the parent space'''
+    x, y, z = position
+    a = parentSpace.axes
+    t = parentSpace.translation
+    return (x * a[0] + y * a[3] + z * a[6] + t[0],
+            x * a[1] + y * a[4] + z * a[7] + t[1],
+            x * a[2] + y * a[5] + z * a[8] + t[2])
+
+def isOutsideView(position, cameraPos, viewAxis, maxDistance, minCosine):
+    '''Returns True if the world position is further from the camera than the
+    max distance, or outside the cone around the view axis with the cosine of
+    its half angle. A max distance of 0 or a cosine of -1 leaves that test out.'''
+    rx = position[0] - cameraPos[0]
+    ry = position[1] - cameraPos[1]
+    rz = position[2] - cameraPos[2]
+    distanceSquared = rx * rx + ry * ry + rz * rz
+    if maxDistance > 0.0 and distanceSquared > maxDistance * maxDistance:
+        return True
+    if minCosine <= -1.0:
+        return False
+
+    # the view axis can be scaled by the camera transform
+    vx, vy, vz = viewAxis
+    lengths = math.sqrt(distanceSquared * (vx * vx + vy * vy + vz * vz))
+    if lengths == 0.0:
+        return False
+    return rx * vx + ry * vy + rz * vz < minCosine * lengths
+
+def blendPosition(position, otherPosition, weight):
+    '''Returns the position part way to the other position'''
+    return (position[0] + (otherPosition[0] - position[0]) * weight,
+            position[1] + (otherPosition[1] - position[1]) * weight,
+            position[2] + (otherPosition[2] - position[2]) * weight)
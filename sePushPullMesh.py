@@ -0,0 +1,426 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Maya independent closest point lookups on a triangle mesh target.
+
+The triangles are kept in a bounding volume hierarchy that is built once for
+the mesh topology. When only the points move the boxes are refit from the
+leaves up, which keeps the order of the triangles, so a deforming mesh never
+has to be built again. A closest point lookup only visits the boxes that can
+hold a closer triangle than the closest one found so far.
+
+Whether a point is in front of or behind the surface is found from the angle
+weighted pseudonormal of the part of the triangle its closest point is on. On
+the inside of a face that is the face normal, on an edge the sum of the
+normals of the faces sharing it and on a point the sum of the normals of the
+faces around it weighted by their angle at the point. Unlike the normal of the
+one face found closest, the sign is right wherever the closest point is on a
+closed mesh, concave or convex.
+
+The hierarchy is a complete binary tree over the triangles sorted along a
+Morton curve of their centers. Node i has the children 2i + 1 and 2i + 2 and
+the leaves are the last nodes, each holding up to leafSize triangles in the
+sorted order. Leaves past the last triangle have empty boxes and are never
+visited.
+'''
+
+import math
+
+import numpy
+
+# points closer than this to the surface are on it and move out along its normal
+SURFACE_TOLERANCE = 1e-9
+
+# the part of a triangle a closest point is on
+FEATURE_FACE = 0
+FEATURE_POINT_A = 1
+FEATURE_POINT_B = 2
+FEATURE_POINT_C = 3
+FEATURE_EDGE_AB = 4
+FEATURE_EDGE_AC = 5
+FEATURE_EDGE_BC = 6
+
+class sePushPullMeshBVH(object):
+    '''Bounding volume hierarchy of the triangles for closest point lookups.
+
+    The triangles are an (n, 3) array of point indices and the points an
+    (m, 3) array of positions. Build it again when the triangles change and
+    refit it when only the points move.
+    '''
+
+    def __init__(self, triangles, points, leafSize=4):
+        self.triangles = numpy.asarray(triangles, dtype=numpy.intp).reshape(-1, 3)
+        self.leafSize = max(int(leafSize), 1)
+
+        numTriangles = len(self.triangles)
+        numLeaves = max(-(-numTriangles // self.leafSize), 1)
+        self.numLeaves = 1 << (numLeaves - 1).bit_length()
+        self.firstLeaf = self.numLeaves - 1
+
+        # nearby triangles end up next to each other along the curve
+        points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+        if numTriangles:
+            centers = points[self.triangles[:, 0]] + points[self.triangles[:, 1]] + points[self.triangles[:, 2]]
+            self.order = numpy.argsort(mortonCodes(centers), kind='mergesort')
+        else:
+            self.order = numpy.zeros(0, dtype=numpy.intp)
+        self.sortedTriangles = self.triangles[self.order]
+
+        # where each triangle is in the sorted order
+        self.rows = numpy.empty_like(self.order)
+        self.rows[self.order] = numpy.arange(len(self.order))
+        # and where its points start in the flat list of point values
+        self.leafTriangles = (self.sortedTriangles * 3).tolist()
+
+        # the edges ab, ac and bc of each sorted triangle, the same edge of two
+        # triangles has the same index
+        numPoints = max(len(points), 1)
+        ends = self.sortedTriangles[:, [0, 1, 0, 2, 1, 2]].reshape(-1, 3, 2)
+        ends.sort(axis=2)
+        edgeKeys = ends[:, :, 0] * numPoints + ends[:, :, 1]
+        edgeKeys, self.edgeIndices = numpy.unique(edgeKeys.ravel(), return_inverse=True)
+        self.edgeIndices = self.edgeIndices.reshape(-1, 3)
+        self.numEdges = len(edgeKeys)
+
+        self.refit(points)
+
+    def refit(self, points):
+        '''Updates the boxes to the moved points'''
+        points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+        numTriangles = len(self.sortedTriangles)
+
+        # the boxes of every node, the empty ones are inside out so every point is outside them
+        boxes = numpy.empty((self.firstLeaf + self.numLeaves, 6))
+        boxes[:, :3] = numpy.inf
+        boxes[:, 3:] = -numpy.inf
+
+        if numTriangles:
+            a = points[self.sortedTriangles[:, 0]]
+            b = points[self.sortedTriangles[:, 1]]
+            c = points[self.sortedTriangles[:, 2]]
+            starts = numpy.arange(0, numTriangles, self.leafSize)
+            leaves = self.firstLeaf + numpy.arange(len(starts))
+            boxes[leaves, :3] = numpy.minimum.reduceat(numpy.minimum(numpy.minimum(a, b), c), starts)
+            boxes[leaves, 3:] = numpy.maximum.reduceat(numpy.maximum(numpy.maximum(a, b), c), starts)
+
+        # each level up from the leaves holds its two children
+        first = self.firstLeaf
+        while first:
+            parents = numpy.arange((first - 1) // 2, first)
+            left = boxes[2 * parents + 1]
+            right = boxes[2 * parents + 2]
+            boxes[parents, :3] = numpy.minimum(left[:, :3], right[:, :3])
+            boxes[parents, 3:] = numpy.maximum(left[:, 3:], right[:, 3:])
+            first = (first - 1) // 2
+
+        # the lookups walk the tree in Python where lists are quicker to read than arrays
+        self.boxes = boxes.ravel().tolist()
+        self.points = points.ravel().tolist()
+
+        self.updatePseudonormals(points)
+
+    def updatePseudonormals(self, points):
+        '''Works out the unit face normals and the angle weighted pseudonormals
+        of the edges and points'''
+        self.faceNormals = numpy.zeros((len(self.sortedTriangles), 3))
+        self.edgeNormals = numpy.zeros((self.numEdges, 3))
+        self.pointNormals = numpy.zeros((len(points), 3))
+        if not len(self.sortedTriangles):
+            return
+
+        a = points[self.sortedTriangles[:, 0]]
+        b = points[self.sortedTriangles[:, 1]]
+        c = points[self.sortedTriangles[:, 2]]
+        ab = b - a
+        ac = c - a
+        bc = c - b
+
+        # degenerate triangles have no normal and add nothing to their neighbours
+        normals = numpy.cross(ab, ac)
+        lengths = numpy.sqrt(numpy.einsum('ij,ij->i', normals, normals))
+        numpy.divide(normals, lengths[:, None], out=self.faceNormals, where=lengths[:, None] > 0.0)
+
+        # every face sharing an edge adds its normal, the angle around an edge is always half a turn
+        _addTo(self.edgeNormals, self.edgeIndices.ravel(), numpy.repeat(self.faceNormals, 3, axis=0))
+
+        # the sides of each triangle by length give the angles at its points
+        abLength = numpy.sqrt(numpy.einsum('ij,ij->i', ab, ab))
+        acLength = numpy.sqrt(numpy.einsum('ij,ij->i', ac, ac))
+        bcLength = numpy.sqrt(numpy.einsum('ij,ij->i', bc, bc))
+        for corner, dot, lengths in ((0, numpy.einsum('ij,ij->i', ab, ac), abLength * acLength),
+                                     (1, -numpy.einsum('ij,ij->i', ab, bc), abLength * bcLength),
+                                     (2, numpy.einsum('ij,ij->i', ac, bc), acLength * bcLength)):
+            cosines = numpy.divide(dot, lengths, out=numpy.ones_like(dot), where=lengths > 0.0)
+            angles = numpy.arccos(numpy.clip(cosines, -1.0, 1.0))
+            _addTo(self.pointNormals, self.sortedTriangles[:, corner], self.faceNormals * angles[:, None])
+
+    def closestPoint(self, x, y, z):
+        '''Returns the squared distance, the closest (x, y, z) point on the mesh,
+        the index of its triangle and the part of the triangle it is on. The
+        index is -1 with no triangles.'''
+        boxes = self.boxes
+        points = self.points
+        triangles = self.leafTriangles
+        firstLeaf = self.firstLeaf
+        leafSize = self.leafSize
+        numTriangles = len(self.sortedTriangles)
+
+        bestDistance = float('inf')
+        bestPoint = None
+        bestRow = -1
+        bestFeature = FEATURE_FACE
+
+        stack = [(0.0, 0)]
+        while stack:
+            boxDistance, node = stack.pop()
+            if boxDistance >= bestDistance:
+                continue
+
+            if node >= firstLeaf:
+                start = (node - firstLeaf) * leafSize
+                for row in range(start, min(start + leafSize, numTriangles)):
+                    i, j, k = triangles[row]
+                    point = closestPointOnTriangle(x, y, z, points[i], points[i + 1], points[i + 2],
+                                                   points[j], points[j + 1], points[j + 2],
+                                                   points[k], points[k + 1], points[k + 2])
+                    dx = point[0] - x
+                    dy = point[1] - y
+                    dz = point[2] - z
+                    distance = dx * dx + dy * dy + dz * dz
+                    if distance < bestDistance:
+                        bestDistance = distance
+                        bestPoint = point
+                        bestRow = row
+                        bestFeature = point[3]
+                continue
+
+            # the nearer child goes on the stack last so it is looked at first
+            left = 2 * node + 1
+            right = left + 1
+            leftDistance = _boxDistance(boxes, left, x, y, z)
+            rightDistance = _boxDistance(boxes, right, x, y, z)
+            if leftDistance < rightDistance:
+                if rightDistance < bestDistance:
+                    stack.append((rightDistance, right))
+                if leftDistance < bestDistance:
+                    stack.append((leftDistance, left))
+            else:
+                if leftDistance < bestDistance:
+                    stack.append((leftDistance, left))
+                if rightDistance < bestDistance:
+                    stack.append((rightDistance, right))
+
+        if bestRow < 0:
+            return bestDistance, None, -1, FEATURE_FACE
+        return bestDistance, bestPoint[:3], int(self.order[bestRow]), bestFeature
+
+    def normal(self, triangle):
+        '''Returns the unnormalized normal of the triangle by its index, facing
+        the way its points wind counter clockwise'''
+        i, j, k = self.leafTriangles[self.rows[triangle]]
+        p = self.points
+        ux, uy, uz = p[j] - p[i], p[j + 1] - p[i + 1], p[j + 2] - p[i + 2]
+        vx, vy, vz = p[k] - p[i], p[k + 1] - p[i + 1], p[k + 2] - p[i + 2]
+        return (uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx)
+
+    def pseudonormal(self, triangle, feature):
+        '''Returns the unnormalized angle weighted pseudonormal of the part of
+        the triangle by its index'''
+        row = self.rows[triangle]
+        if feature == FEATURE_FACE:
+            normal = self.faceNormals[row]
+        elif feature >= FEATURE_EDGE_AB:
+            normal = self.edgeNormals[self.edgeIndices[row, feature - FEATURE_EDGE_AB]]
+        else:
+            normal = self.pointNormals[self.sortedTriangles[row, feature - FEATURE_POINT_A]]
+        return tuple(normal.tolist())
+
+def _addTo(totals, indices, values):
+    '''Adds the (n, 3) values to the rows of the totals by their indices'''
+    for axis in range(3):
+        totals[:, axis] += numpy.bincount(indices, values[:, axis], minlength=len(totals))
+
+def _boxDistance(boxes, node, x, y, z):
+    '''Returns the squared distance from the point to the node box, 0 inside it'''
+    b = node * 6
+    dx = boxes[b] - x
+    if dx < 0.0:
+        dx = x - boxes[b + 3]
+        if dx < 0.0:
+            dx = 0.0
+    dy = boxes[b + 1] - y
+    if dy < 0.0:
+        dy = y - boxes[b + 4]
+        if dy < 0.0:
+            dy = 0.0
+    dz = boxes[b + 2] - z
+    if dz < 0.0:
+        dz = z - boxes[b + 5]
+        if dz < 0.0:
+            dz = 0.0
+    return dx * dx + dy * dy + dz * dz
+
+def closestPointOnTriangle(px, py, pz, ax, ay, az, bx, by, bz, cx, cy, cz):
+    '''Returns the closest (x, y, z) point on the triangle abc and the part of
+    the triangle it is on as (x, y, z, feature), found from the region of the
+    triangle the point is in'''
+    abx, aby, abz = bx - ax, by - ay, bz - az
+    acx, acy, acz = cx - ax, cy - ay, cz - az
+    apx, apy, apz = px - ax, py - ay, pz - az
+
+    # in the region of a
+    d1 = abx * apx + aby * apy + abz * apz
+    d2 = acx * apx + acy * apy + acz * apz
+    if d1 <= 0.0 and d2 <= 0.0:
+        return (ax, ay, az, FEATURE_POINT_A)
+
+    # in the region of b
+    bpx, bpy, bpz = px - bx, py - by, pz - bz
+    d3 = abx * bpx + aby * bpy + abz * bpz
+    d4 = acx * bpx + acy * bpy + acz * bpz
+    if d3 >= 0.0 and d4 <= d3:
+        return (bx, by, bz, FEATURE_POINT_B)
+
+    # on the edge ab
+    vc = d1 * d4 - d3 * d2
+    if vc <= 0.0 and d1 >= 0.0 and d3 <= 0.0:
+        v = d1 / (d1 - d3)
+        return (ax + abx * v, ay + aby * v, az + abz * v, FEATURE_EDGE_AB)
+
+    # in the region of c
+    cpx, cpy, cpz = px - cx, py - cy, pz - cz
+    d5 = abx * cpx + aby * cpy + abz * cpz
+    d6 = acx * cpx + acy * cpy + acz * cpz
+    if d6 >= 0.0 and d5 <= d6:
+        return (cx, cy, cz, FEATURE_POINT_C)
+
+    # on the edge ac
+    vb = d5 * d2 - d1 * d6
+    if vb <= 0.0 and d2 >= 0.0 and d6 <= 0.0:
+        w = d2 / (d2 - d6)
+        return (ax + acx * w, ay + acy * w, az + acz * w, FEATURE_EDGE_AC)
+
+    # on the edge bc
+    va = d3 * d6 - d5 * d4
+    if va <= 0.0 and (d4 - d3) >= 0.0 and (d5 - d6) >= 0.0:
+        w = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        return (bx + (cx - bx) * w, by + (cy - by) * w, bz + (cz - bz) * w, FEATURE_EDGE_BC)
+
+    # inside the face, degenerate triangles have no inside
+    total = va + vb + vc
+    if total == 0.0:
+        return (ax, ay, az, FEATURE_POINT_A)
+    denom = 1.0 / total
+    v = vb * denom
+    w = vc * denom
+    return (ax + abx * v + acx * w, ay + aby * v + acy * w, az + abz * v + acz * w, FEATURE_FACE)
+
+def mortonCodes(positions):
+    '''Returns the 30 bit Morton codes of the positions in their bounding box'''
+    positions = numpy.asarray(positions, dtype=numpy.float64)
+    low = positions.min(axis=0)
+    size = positions.max(axis=0) - low
+    size[size == 0.0] = 1.0
+    cells = numpy.clip(((positions - low) / size * 1023.0).astype(numpy.int64), 0, 1023)
+
+    codes = numpy.zeros(len(positions), dtype=numpy.int64)
+    for axis in range(3):
+        # spread the 10 bits out to every third bit
+        v = cells[:, axis]
+        v = (v | (v << 16)) & 0x030000FF
+        v = (v | (v << 8)) & 0x0300F00F
+        v = (v | (v << 4)) & 0x030C30C3
+        v = (v | (v << 2)) & 0x09249249
+        codes |= v << (2 - axis)
+    return codes
+
+class sePushPullMeshTarget(object):
+    '''Keeps the hierarchy of a target mesh between evaluations. It is built
+    again only when the topology changes and refit when the points moved.'''
+
+    def __init__(self):
+        self.topology = None
+        self.points = None
+        self.bvh = None
+
+    def update(self, topology, triangles, points):
+        '''Updates to the mesh with the topology key, anything that changes
+        when the triangles do, and its points. The triangles are a function
+        returning the (n, 3) point indices, only called to build again.'''
+        points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+        if self.bvh is None or topology != self.topology:
+            self.bvh = sePushPullMeshBVH(triangles(), points)
+            self.topology = topology
+        elif not numpy.array_equal(points, self.points):
+            self.bvh.refit(points)
+        self.points = points
+        return self.bvh
+
+def solveMeshPosition(lastPosition, bvh, parentSpace, dist, isPushActive, isPullActive):
+    '''Returns the new (x, y, z) local position or None if the constrained does
+    not need to move. The distance is measured to the closest point on the mesh
+    and is negative behind the surface, so a push moves the constrained back out
+    in front of it. The parent space must already be updated with the parent
+    matrix.'''
+    x, y, z = lastPosition
+    a = parentSpace.axes
+    t = parentSpace.translation
+
+    # the world position of the constrained
+    px = x * a[0] + y * a[3] + z * a[6] + t[0]
+    py = x * a[1] + y * a[4] + z * a[7] + t[1]
+    pz = x * a[2] + y * a[5] + z * a[8] + t[2]
+
+    distanceSquared, closest, triangle, feature = bvh.closestPoint(px, py, pz)
+    if triangle < 0:
+        return None
+
+    # the relative vector from the closest point to the constrained
+    cx, cy, cz = closest
+    rx = px - cx
+    ry = py - cy
+    rz = pz - cz
+    currentDistance = math.sqrt(distanceSquared)
+
+    # the pseudonormal gives the side of the surface even at an edge or point
+    nx, ny, nz = bvh.pseudonormal(triangle, feature)
+    if rx * nx + ry * ny + rz * nz < 0.0:
+        currentDistance = -currentDistance
+
+    if (isPullActive and (currentDistance > dist)) or (isPushActive and (currentDistance < dist)):
+        if abs(currentDistance) > SURFACE_TOLERANCE:
+            # behind the surface the way out is back through the closest point
+            scale = dist / currentDistance
+            dx, dy, dz = rx * scale, ry * scale, rz * scale
+        else:
+            # on the surface it moves out along the normal
+            length = math.sqrt(nx * nx + ny * ny + nz * nz)
+            scale = dist / length if length else 0.0
+            dx, dy, dz = nx * scale, ny * scale, nz * scale
+
+        wx = cx + dx
+        wy = cy + dy
+        wz = cz + dz
+        # bring it back into the parent space, a parent scaled to nothing keeps the position
+        inverse = parentSpace.inverse()
+        if inverse is None:
+            return None
+        i, it = inverse
+        return (wx * i[0] + wy * i[3] + wz * i[6] + it[0],
+                wx * i[1] + wy * i[4] + wz * i[7] + it[1],
+                wx * i[2] + wy * i[5] + wz * i[8] + it[2])
+
+    return None
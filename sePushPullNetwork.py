@@ -0,0 +1,307 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Maya independent solver for networks of chained constraints.
+
+Constraints get chained when the transform one of them drives is the target,
+or the parent of the constrained, of another one, like the links of a tail or
+a rope. Each frame the driving constraint has to be solved first and the
+world matrix of the transform it drives worked out before the next one can be
+solved, which is the order the Maya DG evaluates them in.
+
+The constraints are put into topological levels where every constraint only
+depends on ones in the levels before it. Each frame solves a level at a time
+with sePushPullSolver.solveFrame so all the constraints in a level are done
+in one go. Chains that do not depend on each other can be solved in separate
+processes.
+
+A constraint that depends on another one has its target or parent matrix
+given relative to the world matrix of the transform the other one drives.
+The transform a constraint drives has its local matrix given with the
+translation row holding only the pivot offset, the solved translation is
+added to it and the result is put into the world with the constraint parent
+matrix.
+'''
+
+import multiprocessing
+import os
+import sys
+
+import numpy
+
+import sePushPullMath
+import sePushPullSolver
+
+def topologicalLevels(dependencies):
+    '''Returns lists of constraint indices where every constraint only depends on
+    constraints in the lists before it.
+
+    dependencies - a set of the constraint indices each constraint depends on
+    '''
+    remaining = dict((index, set(depends)) for index, depends in enumerate(dependencies))
+    levels = []
+    while remaining:
+        level = sorted(index for index, depends in remaining.items() if not depends)
+        if not level:
+            raise ValueError('The constraints depend on each other in a cycle.')
+
+        for index in level:
+            del remaining[index]
+        for depends in remaining.values():
+            depends.difference_update(level)
+        levels.append(level)
+    return levels
+
+def connectedGroups(dependencies):
+    '''Returns lists of the constraint indices that are chained together in any way'''
+    groups = list(range(len(dependencies)))
+
+    def root(index):
+        while groups[index] != index:
+            groups[index] = groups[groups[index]]
+            index = groups[index]
+        return index
+
+    for index, depends in enumerate(dependencies):
+        for other in depends:
+            groups[root(index)] = root(other)
+
+    members = {}
+    for index in range(len(dependencies)):
+        members.setdefault(root(index), []).append(index)
+    return sorted(members.values())
+
+class sePushPullNetwork(object):
+    '''The sampled inputs of a network of constraints over a range of frames.
+
+    frames - (frames,) frame values in evaluation order
+    targetDrivers, parentDrivers - (constraints,) index of the constraint driving
+                                   the target or parent, or -1 if it is not driven
+    targetMatrices, parentMatrices - (frames, constraints, 4, 4) world matrices, or
+                                     matrices relative to the driven transform of
+                                     the driver when there is one
+    localMatrices - (frames, constraints, 4, 4) local matrix of the transform each
+                    constraint drives with only the pivot offset as translation
+    drivenAxes - (constraints, 3) True for the translate axes the constraint drives
+    localTranslates - (frames, constraints, 3) translate of the driven transform
+                      used for the axes the constraint does not drive
+    distances, pushes, pulls - (frames, constraints) animated values
+    startFrames - (constraints,) start frames
+    startPositions - (constraints, 3) start positions
+    maxSubsteps - (constraints,) most sub steps a frame can take, 0 when the
+                  constraint does not take adaptive sub steps
+    substepFractions - (constraints,) fraction of the distance the target can
+                       move in one sub step
+    '''
+
+    def __init__(self, frames, targetDrivers, targetMatrices, parentDrivers, parentMatrices, localMatrices,
+                 drivenAxes, localTranslates, distances, pushes, pulls, startFrames, startPositions,
+                 maxSubsteps=None, substepFractions=None):
+        self.frames = numpy.asarray(frames, dtype=numpy.float64)
+        self.targetDrivers = numpy.asarray(targetDrivers, dtype=numpy.intp)
+        self.targetMatrices = numpy.asarray(targetMatrices, dtype=numpy.float64)
+        self.parentDrivers = numpy.asarray(parentDrivers, dtype=numpy.intp)
+        self.parentMatrices = numpy.asarray(parentMatrices, dtype=numpy.float64)
+        self.localMatrices = numpy.asarray(localMatrices, dtype=numpy.float64)
+        self.drivenAxes = numpy.asarray(drivenAxes, dtype=bool)
+        self.localTranslates = numpy.asarray(localTranslates, dtype=numpy.float64)
+        self.distances = numpy.asarray(distances, dtype=numpy.float64)
+        self.pushes = numpy.asarray(pushes, dtype=bool)
+        self.pulls = numpy.asarray(pulls, dtype=bool)
+        self.startFrames = numpy.asarray(startFrames, dtype=numpy.float64)
+        self.startPositions = numpy.asarray(startPositions, dtype=numpy.float64)
+
+        numConstraints = self.targetDrivers.shape[0]
+        if maxSubsteps is None:
+            maxSubsteps = numpy.zeros(numConstraints, dtype=numpy.intp)
+        if substepFractions is None:
+            substepFractions = numpy.zeros(numConstraints)
+        self.maxSubsteps = numpy.asarray(maxSubsteps, dtype=numpy.intp)
+        self.substepFractions = numpy.asarray(substepFractions, dtype=numpy.float64)
+
+        if self.targetMatrices.ndim != 4 or self.targetMatrices.shape[-2:] != (4, 4):
+            raise ValueError('targetMatrices must have the shape (frames, constraints, 4, 4).')
+        if self.targetMatrices.shape[0] != self.frames.shape[0]:
+            raise ValueError('The inputs must have one value per frame.')
+
+    def numConstraints(self):
+        return self.targetDrivers.shape[0]
+
+    def dependencies(self):
+        '''Returns the set of constraints each constraint depends on'''
+        return [set(int(driver) for driver in drivers if driver >= 0)
+                for drivers in zip(self.targetDrivers, self.parentDrivers)]
+
+    def subset(self, indices):
+        '''Returns a network of only the constraints given, they must include
+        every constraint they depend on'''
+        indices = numpy.asarray(indices, dtype=numpy.intp)
+        remap = numpy.full(self.numConstraints() + 1, -1, dtype=numpy.intp)
+        remap[indices] = numpy.arange(indices.shape[0])
+
+        # -1 stays -1 since it picks the last entry of the remap
+        return sePushPullNetwork(self.frames, remap[self.targetDrivers[indices]], self.targetMatrices[:, indices],
+                                 remap[self.parentDrivers[indices]], self.parentMatrices[:, indices],
+                                 self.localMatrices[:, indices], self.drivenAxes[indices],
+                                 self.localTranslates[:, indices], self.distances[:, indices],
+                                 self.pushes[:, indices], self.pulls[:, indices], self.startFrames[indices],
+                                 self.startPositions[indices], self.maxSubsteps[indices],
+                                 self.substepFractions[indices])
+
+    def solve(self, processes=1):
+        '''Returns the (frames, constraints, 3) solved local positions.
+
+        With more than one process the chains that do not depend on each other
+        are split between a pool of processes.
+        '''
+        dependencies = self.dependencies()
+        groups = connectedGroups(dependencies)
+        processes = min(processes, len(groups))
+        pool = _startPool(processes) if processes > 1 else None
+        if pool is None:
+            return self.solveLevels(topologicalLevels(dependencies))
+
+        # spread the chains so every process gets about the same number of constraints
+        jobs = [[] for _ in range(processes)]
+        for group in sorted(groups, key=len, reverse=True):
+            min(jobs, key=len).extend(group)
+        jobs = [sorted(job) for job in jobs]
+
+        try:
+            results = pool.map(_solveSubset, [self.subset(job) for job in jobs])
+        finally:
+            pool.close()
+            pool.join()
+
+        positions = numpy.empty((self.frames.shape[0], self.numConstraints(), 3))
+        for job, result in zip(jobs, results):
+            positions[:, job] = result
+        return positions
+
+    def solveLevels(self, levels):
+        '''Solves every frame a level at a time in this process'''
+        numFrames = self.frames.shape[0]
+        levels = [numpy.asarray(level, dtype=numpy.intp) for level in levels]
+
+        # the drivers of each level, split into the driven and not driven constraints
+        drivers = []
+        for level in levels:
+            targetDriven = self.targetDrivers[level] >= 0
+            parentDriven = self.parentDrivers[level] >= 0
+            drivers.append((targetDriven, self.targetDrivers[level][targetDriven],
+                            parentDriven, self.parentDrivers[level][parentDriven]))
+
+        # the constraints of each level taking sub steps are solved again one at a time
+        substepped = [numpy.flatnonzero(self.maxSubsteps[level] > 0) for level in levels]
+        previousInputs = {}
+        parentSpace = sePushPullMath.sePushPullParentSpace()
+
+        positions = numpy.empty((numFrames, self.numConstraints(), 3))
+        current = numpy.array(self.startPositions)
+        worldMatrices = numpy.empty((self.numConstraints(), 4, 4))
+
+        for frame in range(numFrames):
+            time = self.frames[frame]
+            for level, (targetDriven, targetDrivers, parentDriven, parentDrivers), substeps in zip(levels, drivers, substepped):
+                targetMatrix = self.targetMatrices[frame, level]
+                if targetDrivers.shape[0]:
+                    targetMatrix = numpy.array(targetMatrix)
+                    targetMatrix[targetDriven] = numpy.matmul(targetMatrix[targetDriven], worldMatrices[targetDrivers])
+
+                parentMatrix = self.parentMatrices[frame, level]
+                if parentDrivers.shape[0]:
+                    parentMatrix = numpy.array(parentMatrix)
+                    parentMatrix[parentDriven] = numpy.matmul(parentMatrix[parentDriven], worldMatrices[parentDrivers])
+
+                lastPositions = current[level]
+                current[level] = sePushPullSolver.solveFrame(lastPositions, targetMatrix, parentMatrix, time,
+                                                             self.distances[frame, level], self.startFrames[level],
+                                                             self.startPositions[level], self.pushes[frame, level],
+                                                             self.pulls[frame, level])
+                for i in substeps:
+                    self.solveSubsteps(frame, level[i], lastPositions[i], targetMatrix[i], parentMatrix[i],
+                                       current, previousInputs, parentSpace)
+
+                # where the driven transforms end up for the levels after this one
+                localMatrix = numpy.array(self.localMatrices[frame, level])
+                localMatrix[:, 3, :3] += numpy.where(self.drivenAxes[level], current[level],
+                                                     self.localTranslates[frame, level])
+                worldMatrices[level] = numpy.matmul(localMatrix, parentMatrix)
+
+            positions[frame] = current
+
+        return positions
+
+    def solveSubsteps(self, frame, index, lastPosition, targetMatrix, parentMatrix, current, previousInputs,
+                      parentSpace):
+        '''Solves the frame of a constraint in sub steps from the inputs of the
+        frame before like the node does when playing every frame. The frame
+        before has to be before the start frame or have push or pull on.'''
+        time = self.frames[frame]
+        push = self.pushes[frame, index]
+        pull = self.pulls[frame, index]
+        targetPos = tuple(targetMatrix[3, :3])
+        parentValues = tuple(parentMatrix.ravel())
+
+        previous = previousInputs.get(index)
+        if time >= self.startFrames[index] and (push or pull) and previous is not None and previous[0] == time - 1.0:
+            localPos, steps = sePushPullMath.solveSubsteps(tuple(lastPosition), previous[1], targetPos, previous[2],
+                                                           previous[3], parentValues, parentSpace,
+                                                           self.distances[frame, index], push, pull,
+                                                           self.maxSubsteps[index], self.substepFractions[index])
+            current[index] = lastPosition if localPos is None else localPos
+
+        if time < self.startFrames[index] or push or pull:
+            parentSpace.update(parentValues)
+            previousInputs[index] = (time, targetPos, parentSpace.axes, parentSpace.translation)
+
+def _solveSubset(network):
+    '''Solves a network in a pool process'''
+    return network.solveLevels(topologicalLevels(network.dependencies()))
+
+def _mayapyPath():
+    '''Returns the path of mayapy when running inside Maya, where sys.executable
+    is Maya itself, or None'''
+    executable = os.path.basename(sys.executable).lower()
+    if executable.startswith('maya') and not executable.startswith('mayapy'):
+        extension = os.path.splitext(sys.executable)[1]
+        return os.path.join(os.path.dirname(sys.executable), 'mayapy' + extension)
+    return None
+
+def _startPool(processes):
+    '''Returns a pool of spawned processes, or None when they can not be started.
+
+    Forking would copy the whole Maya process so the processes are always
+    spawned, inside Maya they have to start mayapy instead of Maya. The
+    multiprocessing module keeps the executable to spawn for every context, so
+    it is only changed while the pool starts its processes and put back after.
+    Python 2 has no spawn context, inside Maya it solves in this process.
+    '''
+    mayapy = _mayapyPath()
+    if not hasattr(multiprocessing, 'get_context'):
+        return multiprocessing.Pool(processes) if mayapy is None else None
+
+    context = multiprocessing.get_context('spawn')
+    if mayapy is None:
+        return context.Pool(processes)
+
+    from multiprocessing import spawn
+    executable = spawn.get_executable()
+    context.set_executable(mayapy)
+    try:
+        return context.Pool(processes)
+    finally:
+        context.set_executable(executable)
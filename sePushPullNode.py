@@ -0,0 +1,1166 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''The evaluation of the sePushPullConstraint and sePushPullMultiConstraint
+nodes, shared by the API 1.0 and 2.0 builds of the plugin.
+
+The node classes of sePushPullConstraint.py and sePushPullConstraint2.py
+derive from the classes here and from the MPxNode of their API. The few
+calls that are written differently in the two APIs, like reading a matrix
+element or the value of a time, go through the api class of the plugin, so
+the branches, the state cache, the level of detail and the pre-roll
+bookkeeping are only written once.
+'''
+
+import collections
+import math
+import threading
+
+from sePushPullCache import sePushPullStateCache, sePushPullInputHistory
+from sePushPullMath import solvePosition, solveSubsteps
+import sePushPullMath
+import sePushPullPreroll
+import sePushPullStats
+
+# the multi constraint node solves with NumPy and the single node only follows
+# a target mesh or reads a trajectory cache file with it
+try:
+    import numpy
+    import sePushPullSolver
+    import sePushPullTrajectory
+    import sePushPullMesh
+except ImportError:
+    numpy = None
+
+# the lodMode attribute values, off, hold the last position or solve every lodRate frames
+LOD_OFF = 0
+LOD_HOLD = 1
+LOD_REDUCED = 2
+
+class sePushPullConstraintBase(object):
+    '''The sePushPullConstraint node without the MPxNode of either API. The
+    plugin class sets api and the attributes.'''
+
+    # the calls that differ between the two APIs
+    api = None
+
+    ## DEFINE THE ATTRIBUTES - PLACE HOLDERS, set by sePushPullAttributes.initializeNode
+    # constraint output attribute
+    constTransAttr = None
+    ctAttrX = None
+    ctAttrY = None
+    ctAttrZ = None
+
+    # last position attribute
+    lastPositionAttr = None
+    lpAttrX = None
+    lpAttrY = None
+    lpAttrZ = None
+
+    # start position attribute
+    startPositionAttr = None
+    spAttrX = None
+    spAttrY = None
+    spAttrZ = None
+
+    # target and constraint matrix attributes
+    targetAttr = None
+    constraintParentAttr = None
+
+    # others
+    distanceAttr = None
+    inTimeAttr = None
+    startFrameAttr = None
+    pullAttr = None
+    pushAttr = None
+
+    # state cache attributes
+    useCacheAttr = None
+    checkpointIntervalAttr = None
+    cacheSizeAttr = None
+
+    # trajectory cache file attributes
+    cacheFileAttr = None
+    cacheIndexAttr = None
+
+    # adaptive sub step attributes
+    adaptiveSubstepsAttr = None
+    maxSubstepsAttr = None
+    substepFractionAttr = None
+    substepsTakenAttr = None
+
+    # target mesh attribute
+    targetMeshAttr = None
+
+    # stateless evaluation attribute
+    statelessAttr = None
+
+    # background pre-roll attribute
+    prerollAttr = None
+
+    # level of detail attributes
+    cameraMatrixAttr = None
+    lodModeAttr = None
+    lodDistanceAttr = None
+    lodAngleAttr = None
+    lodRateAttr = None
+
+    def __init__(self):
+        self.api.MPxNode.__init__(self)
+        self.stateCache = sePushPullStateCache()
+        self.trajectoryFile = None
+
+        # the inputs of the frames the state cache replays, recorded when they are
+        # evaluated or sampled while Maya is idle, and the parent space they are solved in
+        self.inputHistory = sePushPullInputHistory()
+        self.historySpace = sePushPullMath.sePushPullParentSpace()
+
+        # the parent matrix is usually static so its inverse is kept between evaluations
+        self.parentSpace = self.api.parentSpace()
+
+        # (frame, target position, parent axes, parent translation) of the last
+        # evaluation, sub steps blend from these to the current inputs
+        self.previousInputs = None
+        self.substepsTaken = 0
+
+        # the closest point hierarchy of the target mesh, kept while its topology is the same
+        self.meshTarget = None
+        # the points of the target mesh are only read again after its plug is dirtied
+        self.meshDirty = True
+
+        # stateless evaluations can come from more than one thread, they share the state cache
+        self.lock = threading.Lock()
+        self.stateless = False
+
+        # the frames solved ahead by the background worker
+        self.preroll = None
+
+        # the handle of the node once its inputs are sampled while Maya is idle,
+        # they are sampled in the time unit of the last evaluation
+        self.nodeHandle = None
+        self.sampleUnit = None
+
+        # the keys of the anim curves upstream of the node by the hash code of
+        # their handle, found the first time the inputs are sampled
+        self.curveKeys = None
+
+        # the position last shown by the level of detail, the (frame, previous, last) solves
+        # of the reduced rate and the (frame, shown position, last output) blended from when back in view
+        self.lodShown = None
+        self.lodSolves = None
+        self.lodReturn = None
+
+        # (frame, world position, lod rate, lod distance, cosine of the lod angle, in view)
+        # of the last view test, only read again every lod rate frames so the same frame
+        # evaluated again gets the same answer
+        self.lodTested = None
+
+        # evaluation counters, only made once profiling is turned on
+        self.stats = None
+
+    def compute(self, plug, data):
+        '''Does all the computing when the node needs to evaluate'''
+
+        # check the plug is the output one we need to compute for
+        attr = self.api.rootAttribute(plug)
+        if attr != self.constTransAttr and attr != self.substepsTakenAttr:
+            return self.api.unknownParameter
+
+        # stateless nodes solve without the last position feedback
+        if data.inputValue(self.statelessAttr).asBool():
+            evaluate = self.evaluateStateless
+        else:
+            evaluate = self.evaluate
+            self.stateless = False
+
+        if not sePushPullStats.enabled:
+            evaluate(data)
+            return
+
+        # time the evaluation and count the branch it took
+        start = sePushPullStats.timer()
+        branch = evaluate(data)
+        seconds = sePushPullStats.timer() - start
+
+        if self.stats is None or self.stats.removed:
+            self.stats = sePushPullStats.statsForNode(nodeUuid(self.api, self.thisMObject()))
+        frame = self.api.frameValue(data.inputValue(self.inTimeAttr).asTime())
+        sePushPullStats.record(self.stats, branch, seconds, frame)
+
+    def evaluate(self, data):
+        '''Computes the output position, returns the name of the branch taken'''
+        api = self.api
+
+        # get the current and start frame
+        currentFrame = data.inputValue(self.inTimeAttr).asTime()
+        frame = api.frameValue(currentFrame)
+        startFrame = data.inputValue(self.startFrameAttr).asDouble()
+
+        # get the output attributes
+        outputHandle = data.outputValue(self.constTransAttr)
+
+        # only the solve below takes sub steps
+        data.outputValue(self.substepsTakenAttr).setInt(0)
+        data.setClean(self.substepsTakenAttr)
+
+        # when reading from a trajectory cache file the position is only looked up
+        position = self.trajectoryPosition(data, frame)
+        if position is not None:
+            outputHandle.set3Double(position[0], position[1], position[2])
+            lastPosOutHandle = data.outputValue(self.lastPositionAttr)
+            lastPosOutHandle.set3Double(position[0], position[1], position[2])
+
+            data.setClean(self.lastPositionAttr)
+            data.setClean(self.constTransAttr)
+            return 'cacheFile'
+
+        # the background pre-roll has usually solved this frame already
+        if data.inputValue(self.prerollAttr).asBool():
+            position = self.prerollPosition(data, currentFrame, startFrame)
+            if position is not None:
+                outputHandle.set3Double(position[0], position[1], position[2])
+                lastPosOutHandle = data.outputValue(self.lastPositionAttr)
+                lastPosOutHandle.set3Double(position[0], position[1], position[2])
+
+                data.setClean(self.lastPositionAttr)
+                data.setClean(self.constTransAttr)
+                return 'stateCache'
+        elif self.preroll is not None:
+            stopPreroll(self)
+
+        # if the current frame is before the start frame set the current position
+        # as the start position and return as completed
+        if frame < startFrame:
+            startPos = data.inputValue(self.startPositionAttr).asVector()
+            lastPosHandle = data.outputValue(self.lastPositionAttr)
+
+            lastPosHandle.setMVector(startPos)
+            outputHandle.setMVector(startPos)
+
+            data.setClean(self.constTransAttr)
+            data.setClean(self.lastPositionAttr)
+
+            # the first solved frame can sub step from here
+            if data.inputValue(self.adaptiveSubstepsAttr).asBool():
+                self.storePreviousInputs(frame, data.inputValue(self.targetAttr).asMatrix(),
+                                         data.inputValue(self.constraintParentAttr).asMatrix())
+
+            # starting again does not blend from the level of detail
+            self.lodShown = self.lodSolves = self.lodReturn = None
+
+            return 'beforeStartFrame'
+
+        # far from the camera or out of view the level of detail solves less often or not at all
+        lodMode = data.inputValue(self.lodModeAttr).asShort()
+        if lodMode != LOD_OFF:
+            branch = self.lodPosition(data, outputHandle, lodMode, frame)
+            if branch is not None:
+                data.setClean(self.constTransAttr)
+                return branch
+        elif self.lodShown is not None:
+            self.endLod(frame)
+
+        # check if either the push or pull toggles are on to save a little time
+        isPullActive = data.inputValue(self.pullAttr).asBool()
+        isPushActive = data.inputValue(self.pushAttr).asBool()
+
+        # when caching, the position comes from the per frame cache instead of the last position
+        useCache = data.inputValue(self.useCacheAttr).asBool()
+
+        if not isPullActive and not isPushActive and not useCache:
+            # no need to go any further since nothing will change
+            data.setClean(self.constTransAttr)
+            return 'pushPullOff'
+
+        # get the target world matrix
+        targetMat = data.inputValue(self.targetAttr).asMatrix()
+
+        # get the distance
+        dist = data.inputValue(self.distanceAttr).asDouble()
+
+        # get the constrained object parent matrix attribute
+        constraintParentMat = data.inputValue(self.constraintParentAttr).asMatrix()
+
+        # a target mesh is solved against its closest point, without the cache or sub steps
+        targetMesh = self.targetMesh(data)
+
+        localPos = None
+        if useCache and targetMesh is None:
+            inputs = self.inputKey(targetMat, constraintParentMat, dist, isPushActive, isPullActive)
+            self.sampleUnit = api.timeUnit(currentFrame)
+            self.recordInputs(frame, inputs)
+            localPos = self.cachedPosition(data, frame, startFrame, inputs)
+
+        # until the inputs of the frames before are sampled, a cached node solves on from the last position
+        if localPos is not None:
+            outputHandle.set3Double(localPos[0], localPos[1], localPos[2])
+            lastPosOutHandle = data.outputValue(self.lastPositionAttr)
+            lastPosOutHandle.set3Double(localPos[0], localPos[1], localPos[2])
+
+            if self.lodReturn is not None:
+                shown = self.lodBlend(data, frame, localPos)
+                outputHandle.set3Double(shown[0], shown[1], shown[2])
+
+            data.setClean(self.lastPositionAttr)
+            data.setClean(self.constTransAttr)
+            return 'stateCache'
+
+        # use the last position we stored on the previous calculation
+        lp = data.inputValue(self.lastPositionAttr).asVector()
+        lastPosition = (lp.x, lp.y, lp.z)
+        targetPos = api.translation(targetMat)
+
+        previous = self.previousInputs
+        if data.inputValue(self.adaptiveSubstepsAttr).asBool() and targetMesh is None:
+            if previous is not None and previous[0] == frame:
+                # evaluated again on the same frame, the last position is already solved
+                data.outputValue(self.substepsTakenAttr).setInt(self.substepsTaken)
+                previous = None
+            else:
+                # sub steps blend from the last frame so only the next frame can use them
+                self.storePreviousInputs(frame, targetMat, constraintParentMat)
+                self.substepsTaken = 0
+                if previous is not None and frame - previous[0] != 1.0:
+                    previous = None
+        else:
+            previous = self.previousInputs = None
+
+        if previous is not None:
+            maxSubsteps = data.inputValue(self.maxSubstepsAttr).asInt()
+            fraction = data.inputValue(self.substepFractionAttr).asDouble()
+            localPos, self.substepsTaken = solveSubsteps(lastPosition, previous[1], targetPos, previous[2], previous[3],
+                                                         constraintParentMat, self.parentSpace, dist,
+                                                         isPushActive, isPullActive, maxSubsteps, fraction)
+            data.outputValue(self.substepsTakenAttr).setInt(self.substepsTaken)
+        elif targetMesh is not None:
+            self.parentSpace.update(constraintParentMat)
+            localPos = sePushPullMesh.solveMeshPosition(lastPosition, targetMesh, self.parentSpace, dist,
+                                                        isPushActive, isPullActive)
+        else:
+            self.parentSpace.update(constraintParentMat)
+            localPos = solvePosition(lastPosition, targetPos, self.parentSpace, dist, isPushActive, isPullActive)
+
+        if localPos is not None:
+            # set the value to the plugs
+            outputHandle.set3Double(localPos[0], localPos[1], localPos[2])
+            lastPosOutHandle = data.outputValue(self.lastPositionAttr)
+            lastPosOutHandle.set3Double(localPos[0], localPos[1], localPos[2])
+
+            data.setClean(self.lastPositionAttr)
+
+        # back in view, the output blends from where the level of detail showed it
+        if self.lodReturn is not None:
+            shown = self.lodBlend(data, frame, lastPosition if localPos is None else localPos)
+            outputHandle.set3Double(shown[0], shown[1], shown[2])
+
+        # set the plug to clean
+        data.setClean(self.constTransAttr)
+
+        return 'insideBand' if localPos is None else 'corrected'
+
+    def evaluateStateless(self, data):
+        '''Computes the output position from the inputs at the whole frames since
+        the start frame, without reading or writing the last position, so the
+        result does not depend on the order frames are evaluated in. Returns the
+        name of the branch taken'''
+        currentFrame = data.inputValue(self.inTimeAttr).asTime()
+        frame = self.api.frameValue(currentFrame)
+        startFrame = data.inputValue(self.startFrameAttr).asDouble()
+        outputHandle = data.outputValue(self.constTransAttr)
+
+        # stateless nodes never take sub steps
+        data.outputValue(self.substepsTakenAttr).setInt(0)
+        data.setClean(self.substepsTakenAttr)
+
+        with self.lock:
+            position = self.trajectoryPosition(data, frame)
+            if position is not None:
+                branch = 'cacheFile'
+            elif frame < startFrame:
+                sp = data.inputValue(self.startPositionAttr).asVector()
+                position = (sp.x, sp.y, sp.z)
+                branch = 'beforeStartFrame'
+                # like a simulation, going back before the start solves every frame again
+                self.stateCache.clear()
+            else:
+                position = self.statelessPosition(data, currentFrame, startFrame)
+                branch = 'stateCache'
+
+        outputHandle.set3Double(position[0], position[1], position[2])
+        data.setClean(self.constTransAttr)
+        return branch
+
+    def statelessPosition(self, data, currentFrame, startFrame):
+        '''Returns the position for the current frame. The whole frames from the
+        start frame are solved in order and kept in the state cache, a frame in
+        between two of them is solved on from the one before and not kept. The
+        inputs of the frames before come from the input history, it is the same
+        whatever thread or order the frames are evaluated in.'''
+        api = self.api
+
+        # the frames solved with the last position feedback can not be used
+        if not self.stateless:
+            self.stateCache.clear()
+            self.stateless = True
+
+        inputs = self.inputKey(data.inputValue(self.targetAttr).asMatrix(),
+                               data.inputValue(self.constraintParentAttr).asMatrix(),
+                               data.inputValue(self.distanceAttr).asDouble(),
+                               data.inputValue(self.pushAttr).asBool(),
+                               data.inputValue(self.pullAttr).asBool())
+        frame = api.frameValue(currentFrame)
+        self.sampleUnit = api.timeUnit(currentFrame)
+        self.recordInputs(frame, inputs)
+
+        offset = frame - startFrame
+        if offset == math.floor(offset):
+            position = self.cachedPosition(data, frame, startFrame, inputs)
+            if position is not None:
+                return position
+        else:
+            wholeFrame = startFrame + math.floor(offset)
+            position = self.cachedPosition(data, wholeFrame, startFrame, self.inputHistory.get(wholeFrame))
+            if position is not None:
+                return self.solveInputs(position, inputs)
+
+        # until the inputs of the frames before are sampled, solve on from the nearest frame cached before it
+        anchor = self.stateCache.nearest(frame)
+        if anchor is not None:
+            return self.solveInputs(anchor[2], inputs)
+        sp = data.inputValue(self.startPositionAttr).asVector()
+        return self.solveInputs((sp.x, sp.y, sp.z), inputs)
+
+    def trajectoryPosition(self, data, frame):
+        '''Returns the position at the frame from the trajectory cache file, or
+        None when there is no file to read'''
+        cacheFile = data.inputValue(self.cacheFileAttr).asString()
+        if not cacheFile or numpy is None:
+            return None
+
+        cacheIndex = data.inputValue(self.cacheIndexAttr).asInt()
+        self.trajectoryFile = sePushPullTrajectory.openTrajectoryFile(self.trajectoryFile, cacheFile, frame)
+        if self.trajectoryFile is None or not 0 <= cacheIndex < self.trajectoryFile.numConstraints:
+            return None
+        return self.trajectoryFile.positionAt(frame, cacheIndex)
+
+    def prerollPosition(self, data, currentFrame, startFrame):
+        '''Returns the position at the current frame solved by the background
+        pre-roll, or None when it has not got that far. The pre-roll starts the
+        first time and samples every frame again when the inputs changed.'''
+        api = self.api
+
+        # the pre-roll does not follow a target mesh or take sub steps
+        if (not data.inputValue(self.targetMeshAttr).asMesh().isNull() or
+                data.inputValue(self.adaptiveSubstepsAttr).asBool()):
+            return None
+
+        if self.preroll is None:
+            self.preroll = sePushPullPreroll.sePushPullPreroll()
+        self.sampleUnit = api.timeUnit(currentFrame)
+
+        sp = data.inputValue(self.startPositionAttr).asVector()
+        self.preroll.setRange(startFrame, (sp.x, sp.y, sp.z), api.maxTime())
+
+        inputs = self.inputKey(data.inputValue(self.targetAttr).asMatrix(),
+                               data.inputValue(self.constraintParentAttr).asMatrix(),
+                               data.inputValue(self.distanceAttr).asDouble(),
+                               data.inputValue(self.pushAttr).asBool(),
+                               data.inputValue(self.pullAttr).asBool())
+        position = self.preroll.lookup(api.frameValue(currentFrame), inputs)
+
+        if self.preroll.needsSampling():
+            queuePreroll(self)
+        return position
+
+    def lodPosition(self, data, outputHandle, lodMode, frame):
+        '''Sets the output and returns the name of the branch taken when the node
+        is further from the camera than the lod distance or outside its view, or
+        returns None when it is solved as normal. Held nodes keep their last
+        position. Reduced rate nodes solve every lod rate frames and show the
+        position part way between the last two solves, so they trail the solve by
+        lod rate frames. The world position of the node and the lod attributes are
+        only read every lod rate frames. A node left out is tested against the
+        camera every frame, one in view only every lod rate frames, which can only
+        make it leave the view late.'''
+        tested = self.lodTested
+        if tested is None or not 0.0 <= frame - tested[0] < tested[2]:
+            maxDistance = data.inputValue(self.lodDistanceAttr).asDouble()
+            angle = data.inputValue(self.lodAngleAttr).asDouble()
+            minCosine = -1.0 if angle >= math.pi else math.cos(angle)
+            if maxDistance <= 0.0 and minCosine <= -1.0:
+                self.lodTested = None
+                return self.endLod(frame)
+
+            rate = float(max(data.inputValue(self.lodRateAttr).asInt(), 1))
+            lp = data.inputValue(self.lastPositionAttr).asVector()
+            self.parentSpace.update(data.inputValue(self.constraintParentAttr).asMatrix())
+            tested = (frame, sePushPullMath.worldPosition((lp.x, lp.y, lp.z), self.parentSpace),
+                      rate, maxDistance, minCosine, False)
+        elif tested[5] and self.lodShown is None:
+            # the cheap check, a node in view a few frames ago is solved as normal
+            return None
+        rate = tested[2]
+
+        # the camera looks down its negative z axis
+        cameraMat = data.inputValue(self.cameraMatrixAttr).asMatrix()
+        zAxis = self.api.row(cameraMat, 2)
+        if not sePushPullMath.isOutsideView(tested[1], self.api.translation(cameraMat),
+                                            (-zAxis[0], -zAxis[1], -zAxis[2]), tested[3], tested[4]):
+            self.lodTested = tested[:5] + (True,)
+            return self.endLod(frame)
+        self.lodTested = tested
+
+        if lodMode == LOD_HOLD:
+            # the output keeps its value once it is set
+            if self.lodShown is None or self.lodSolves is not None:
+                lp = data.inputValue(self.lastPositionAttr).asVector()
+                self.lodShown = self.lodStart((lp.x, lp.y, lp.z))
+                self.lodSolves = None
+                outputHandle.set3Double(self.lodShown[0], self.lodShown[1], self.lodShown[2])
+            return 'lod'
+
+        solves = self.lodSolves
+        branch = 'lod'
+        if solves is None or not 0.0 <= frame - solves[0] < rate:
+            lp = data.inputValue(self.lastPositionAttr).asVector()
+            lastPosition = (lp.x, lp.y, lp.z)
+            isPullActive = data.inputValue(self.pullAttr).asBool()
+            isPushActive = data.inputValue(self.pushAttr).asBool()
+            localPos = None
+            if isPullActive or isPushActive:
+                dist = data.inputValue(self.distanceAttr).asDouble()
+                self.parentSpace.update(data.inputValue(self.constraintParentAttr).asMatrix())
+                targetMesh = self.targetMesh(data)
+                if targetMesh is not None:
+                    localPos = sePushPullMesh.solveMeshPosition(lastPosition, targetMesh, self.parentSpace, dist,
+                                                                isPushActive, isPullActive)
+                else:
+                    targetMat = data.inputValue(self.targetAttr).asMatrix()
+                    localPos = solvePosition(lastPosition, self.api.translation(targetMat), self.parentSpace,
+                                             dist, isPushActive, isPullActive)
+
+            if localPos is not None:
+                data.outputValue(self.lastPositionAttr).set3Double(localPos[0], localPos[1], localPos[2])
+                data.setClean(self.lastPositionAttr)
+                lastPosition = localPos
+            branch = 'insideBand' if localPos is None else 'corrected'
+
+            # carrying on from the last solve trails it, coming from the full solve starts
+            # from the output and anything else starts from here
+            if solves is not None and frame - solves[0] == rate:
+                solves = (frame, solves[2], lastPosition)
+            elif solves is None:
+                solves = (frame, self.lodStart(lastPosition), lastPosition)
+            else:
+                solves = (frame, lastPosition, lastPosition)
+            self.lodSolves = solves
+
+        self.lodShown = sePushPullMath.blendPosition(solves[1], solves[2], (frame - solves[0]) / rate)
+        outputHandle.set3Double(self.lodShown[0], self.lodShown[1], self.lodShown[2])
+        return branch
+
+    def lodStart(self, lastPosition):
+        '''Returns the position the level of detail starts from, the output when
+        it was still blending back to the full solve or else the last position'''
+        if self.lodReturn is None:
+            return lastPosition
+        output = self.lodReturn[2]
+        self.lodReturn = None
+        return output
+
+    def endLod(self, frame):
+        '''Goes back to the full solve, blending from where the level of detail
+        last showed the node. Returns None.'''
+        if self.lodShown is not None:
+            self.lodReturn = (frame, self.lodShown, self.lodShown)
+        self.lodShown = self.lodSolves = None
+
+    def lodBlend(self, data, frame, position):
+        '''Returns the output part way from where the level of detail last showed
+        the node to the solved position, over the lod rate frames after it came
+        back in view so it does not pop'''
+        returnFrame, shown = self.lodReturn[:2]
+        rate = max(data.inputValue(self.lodRateAttr).asInt(), 1)
+        weight = (frame - returnFrame + 1.0) / (rate + 1.0)
+        if not 0.0 < weight < 1.0:
+            self.lodReturn = None
+            return position
+        output = sePushPullMath.blendPosition(shown, position, weight)
+        self.lodReturn = (returnFrame, shown, output)
+        return output
+
+    def sampleInputs(self, count):
+        '''Samples the inputs at the next frames missing from the input history,
+        then at the next frames of the pre-roll and hands them to the worker
+        thread. Returns False when there is nothing left to sample.'''
+        MTime = self.api.OpenMaya.MTime
+
+        if self.curveKeys is None:
+            self.curveKeys = self.trackCurves()
+
+        with self.lock:
+            frames = self.inputHistory.framesToSample(count)
+        if frames:
+            inputs = [self.inputKey(*self.inputsAtTime(MTime(frame, self.sampleUnit))) for frame in frames]
+            with self.lock:
+                for frame, key in zip(frames, inputs):
+                    self.inputHistory.record(frame, key)
+            return True
+
+        if self.preroll is None:
+            return False
+        frames = self.preroll.framesToSample(count)
+        if not frames:
+            return False
+
+        inputs = [self.inputKey(*self.inputsAtTime(MTime(frame, self.sampleUnit))) for frame in frames]
+        if self.preroll.addInputs(frames[0], inputs):
+            sePushPullPreroll.worker.add(self.preroll)
+        return True
+
+    def trackCurves(self):
+        '''Returns the keys of the anim curves the node is driven by, by the hash
+        code of their handle, so an edit only has to sample the frames it changes'''
+        api = self.api
+        return dict((api.OpenMaya.MObjectHandle(curve).hashCode(), api.animCurveKeys(curve, self.sampleUnit))
+                    for curve in upstreamCurves(api, self.thisMObject()))
+
+    def resampleFrom(self, frame):
+        '''Drops the cached frames from the frame on and samples their inputs
+        again, every frame when the frame is None'''
+        with self.lock:
+            if frame is None:
+                self.stateCache.clear()
+            else:
+                self.stateCache.invalidate(frame)
+            self.inputHistory.resample(frame)
+        queueSampling(self)
+
+        if self.preroll is not None:
+            self.preroll.resample(frame)
+            queuePreroll(self)
+
+    def schedulingType(self):
+        '''Stateless nodes only read their inputs at other frames from the input
+        history, which is filled in while Maya is idle, so any number of them
+        can be evaluated at once. Otherwise the last position has to come from
+        the evaluation before, so the nodes run one at a time while the rest of
+        the graph stays parallel.'''
+        if self.api.OpenMaya.MPlug(self.thisMObject(), self.statelessAttr).asBool():
+            return self.api.MPxNode.kParallel
+        return self.api.MPxNode.kSerial
+
+    def setDependentsDirty(self, plug, plugArray):
+        '''Notes when the target mesh changes so its points are only read then'''
+        if plug == self.targetMeshAttr:
+            self.meshDirty = True
+        return self.api.MPxNode.setDependentsDirty(self, plug, plugArray)
+
+    def preEvaluation(self, context, evaluationNode):
+        '''The evaluation manager does not dirty the plugs, it says which are dirty
+        before it evaluates the node'''
+        if evaluationNode.dirtyPlugExists(self.targetMeshAttr):
+            self.meshDirty = True
+
+    def connectionBroken(self, plug, otherPlug, asSrc):
+        '''Breaking an input connection changes the inputs of every frame, so the
+        state cache starts again and the input history and pre-roll sample every
+        frame again. The curves upstream are found again too.'''
+        if not asSrc:
+            self.curveKeys = None
+            with self.lock:
+                self.stateCache.clear()
+                self.inputHistory.resample()
+            if self.inputHistory.requested:
+                queueSampling(self)
+            if self.preroll is not None:
+                self.preroll.resample()
+                queuePreroll(self)
+        return self.api.MPxNode.connectionBroken(self, plug, otherPlug, asSrc)
+
+    def targetMesh(self, data):
+        '''Returns the closest point hierarchy of the target mesh, or None when
+        there is no mesh connected or no NumPy'''
+        meshObj = data.inputValue(self.targetMeshAttr).asMesh()
+        if numpy is None or meshObj.isNull():
+            self.meshTarget = None
+            return None
+
+        if self.meshTarget is None:
+            self.meshTarget = sePushPullMesh.sePushPullMeshTarget()
+        elif not self.meshDirty:
+            return self.meshTarget.bvh
+        self.meshDirty = False
+
+        # only built again when the counts change, otherwise refit to the points
+        api = self.api
+        meshFn = api.OpenMaya.MFnMesh(meshObj)
+        return self.meshTarget.update(api.meshTopology(meshFn), lambda: api.meshTriangles(meshFn),
+                                      api.meshPoints(meshFn))
+
+    def cachedPosition(self, data, frame, startFrame, inputs):
+        '''Returns the position at the frame using the state cache, replaying
+        from the nearest cached frame before it with the inputs in the input
+        history. Returns None when the inputs at the frame or a frame to replay
+        are not known, they are sampled the next times Maya is idle.'''
+        cache = self.stateCache
+        history = self.inputHistory
+
+        cache.checkpointInterval = data.inputValue(self.checkpointIntervalAttr).asInt()
+        cache.maxFrames = data.inputValue(self.cacheSizeAttr).asInt()
+
+        # a different start makes every cached frame invalid
+        sp = data.inputValue(self.startPositionAttr).asVector()
+        startPos = (sp.x, sp.y, sp.z)
+        cache.setParameters(startFrame, startPos)
+
+        if inputs is not None:
+            position = cache.lookup(frame, inputs)
+            if position is not None:
+                return position
+
+        # find a cached frame to start from, its inputs have to be the ones in the history
+        anchor = cache.nearest(frame)
+        while anchor is not None and history.get(anchor[0]) != anchor[1]:
+            cache.invalidate(anchor[0])
+            anchor = cache.nearest(frame)
+
+        if anchor is None:
+            # nothing cached, start from the frame before the start frame
+            anchorFrame = startFrame - 1.0
+            position = startPos
+        else:
+            anchorFrame, anchorInputs, position = anchor
+
+        replayFrames = []
+        replayFrame = anchorFrame + 1.0
+        while replayFrame < frame:
+            replayFrames.append(replayFrame)
+            replayFrame += 1.0
+
+        if history.missing(replayFrames if inputs is not None else replayFrames + [frame]):
+            queueSampling(self)
+            return None
+
+        # replay the frames in between with the inputs at those frames
+        lastPosition = position
+        for replayFrame in replayFrames:
+            lastPosition = self.cacheStep(replayFrame, lastPosition, history.get(replayFrame))
+
+        return self.cacheStep(frame, lastPosition, history.get(frame) if inputs is None else inputs)
+
+    def cacheStep(self, frame, lastPosition, inputs):
+        '''Solves a single frame and stores it in the state cache'''
+        lastPosition = self.solveInputs(lastPosition, inputs)
+        self.stateCache.store(frame, inputs, lastPosition)
+        return lastPosition
+
+    def solveInputs(self, lastPosition, inputs):
+        '''Solves on from the last position with the inputs of a frame'''
+        return sePushPullMath.solveInputKey(lastPosition, inputs, self.historySpace)
+
+    def recordInputs(self, frame, inputs):
+        '''Keeps the inputs of the frame being evaluated for replaying it later.
+        Different inputs than the ones kept for the frame mean something other
+        than the time changed them, so every frame is sampled again.'''
+        if self.nodeHandle is None:
+            # the curves upstream are found the next time Maya is idle
+            trackNode(self)
+            queueSampling(self)
+        if not self.inputHistory.record(frame, inputs):
+            self.stateCache.clear()
+            self.inputHistory.resample()
+            self.inputHistory.record(frame, inputs)
+            queueSampling(self)
+
+    def inputsAtTime(self, time):
+        '''Evaluates the animated inputs at a different time, only while Maya is
+        idle and never inside compute'''
+        OpenMaya = self.api.OpenMaya
+        thisNode = self.thisMObject()
+        context = OpenMaya.MDGContext(time)
+
+        targetPlug = OpenMaya.MPlug(thisNode, self.targetAttr)
+        parentPlug = OpenMaya.MPlug(thisNode, self.constraintParentAttr)
+        targetMat = OpenMaya.MFnMatrixData(targetPlug.asMObject(context)).matrix()
+        constraintParentMat = OpenMaya.MFnMatrixData(parentPlug.asMObject(context)).matrix()
+
+        dist = OpenMaya.MPlug(thisNode, self.distanceAttr).asDouble(context)
+        isPushActive = OpenMaya.MPlug(thisNode, self.pushAttr).asBool(context)
+        isPullActive = OpenMaya.MPlug(thisNode, self.pullAttr).asBool(context)
+
+        return targetMat, constraintParentMat, dist, isPushActive, isPullActive
+
+    def inputKey(self, targetMat, constraintParentMat, dist, isPushActive, isPullActive):
+        '''Returns a hashable copy of the animated inputs used to validate cached frames'''
+        return sePushPullMath.inputKey(self.api.translation(targetMat), self.api.matrixValues(constraintParentMat),
+                                       dist, isPushActive, isPullActive)
+
+    def storePreviousInputs(self, frame, targetMat, constraintParentMat):
+        '''Keeps the inputs of this evaluation for the sub steps of the next one'''
+        self.parentSpace.update(constraintParentMat)
+        self.previousInputs = (frame, self.api.translation(targetMat),
+                               self.parentSpace.axes, self.parentSpace.translation)
+
+class sePushPullMultiConstraintBase(object):
+    '''The sePushPullMultiConstraint node without the MPxNode of either API.
+    The plugin class sets api and the attributes.'''
+
+    # the calls that differ between the two APIs
+    api = None
+
+    ## DEFINE THE ATTRIBUTES - PLACE HOLDERS, set by sePushPullAttributes.initializeMultiNode
+    # shared inputs
+    targetAttr = None
+    inTimeAttr = None
+    startFrameAttr = None
+    pullAttr = None
+    pushAttr = None
+
+    # extra targets that only push, each with its own radius
+    pusherAttr = None
+    pusherMatrixAttr = None
+    pusherRadiusAttr = None
+
+    # per constrained inputs
+    constraintAttr = None
+    constraintParentAttr = None
+    distanceAttr = None
+    startPositionAttr = None
+    spAttrX = None
+    spAttrY = None
+    spAttrZ = None
+
+    # constraint output attribute
+    constTransAttr = None
+    ctAttrX = None
+    ctAttrY = None
+    ctAttrZ = None
+
+    # last position attribute
+    lastPositionAttr = None
+    lpAttrX = None
+    lpAttrY = None
+    lpAttrZ = None
+
+    # trajectory cache file attribute, the element index is the index in the file
+    cacheFileAttr = None
+
+    def __init__(self):
+        self.api.MPxNode.__init__(self)
+        self.trajectoryFile = None
+
+        # the inputs and positions of the last solve
+        self.solvedInputs = None
+        self.solvedPositions = None
+
+    def compute(self, plug, data):
+        '''Solves every constrained element in one go'''
+        api = self.api
+
+        # check the plug is the output one we need to compute for
+        if api.rootAttribute(plug) != self.constTransAttr:
+            return api.unknownParameter
+
+        # the shared inputs are read once for all the elements
+        frame = api.frameValue(data.inputValue(self.inTimeAttr).asTime())
+        startFrame = data.inputValue(self.startFrameAttr).asDouble()
+        isPullActive = data.inputValue(self.pullAttr).asBool()
+        isPushActive = data.inputValue(self.pushAttr).asBool()
+        targetMat = data.inputValue(self.targetAttr).asMatrix()
+
+        # gather the per element inputs
+        indices = []
+        parentMatrices = []
+        distances = []
+        startPositions = []
+
+        for index, elementHandle in api.arrayElements(data.inputArrayValue(self.constraintAttr)):
+            indices.append(index)
+            parentMatrices.append(api.matrixToList(elementHandle.child(self.constraintParentAttr).asMatrix()))
+            distances.append(elementHandle.child(self.distanceAttr).asDouble())
+            sp = elementHandle.child(self.startPositionAttr).asVector()
+            startPositions.append((sp.x, sp.y, sp.z))
+
+        # the last positions we stored on the previous calculation, elements
+        # without one yet start from their start position
+        lastByIndex = {}
+        for index, elementHandle in api.arrayElements(data.inputArrayValue(self.lastPositionAttr)):
+            lp = elementHandle.asVector()
+            lastByIndex[index] = (lp.x, lp.y, lp.z)
+
+        lastPositions = [lastByIndex.get(index, startPositions[i]) for i, index in enumerate(indices)]
+
+        # look the positions up when every element is in the trajectory cache file
+        cacheFile = data.inputValue(self.cacheFileAttr).asString()
+        if cacheFile:
+            self.trajectoryFile = sePushPullTrajectory.openTrajectoryFile(self.trajectoryFile, cacheFile, frame)
+        useCacheFile = (cacheFile and indices and self.trajectoryFile is not None and
+                        max(indices) < self.trajectoryFile.numConstraints)
+
+        # the pushers keep every element out of their radius, only nearby pairs are tested
+        pusherMatrices = []
+        pusherRadii = []
+        if indices and not useCacheFile and frame >= startFrame and isPushActive:
+            for index, elementHandle in api.arrayElements(data.inputArrayValue(self.pusherAttr)):
+                pusherMatrices.append(api.matrixToList(elementHandle.child(self.pusherMatrixAttr).asMatrix()))
+                pusherRadii.append(elementHandle.child(self.pusherRadiusAttr).asDouble())
+
+        # evaluated again with the same inputs the last positions are already
+        # solved, the pushers would move them again
+        inputs = (frame, api.matrixToList(targetMat), indices, parentMatrices, distances, startPositions,
+                  startFrame, isPushActive, isPullActive, pusherMatrices, pusherRadii)
+
+        if useCacheFile:
+            positions = self.trajectoryFile.positionsAt(frame, indices).tolist()
+        elif inputs == self.solvedInputs and lastPositions == self.solvedPositions:
+            positions = lastPositions
+        else:
+            if frame < startFrame:
+                # reset everything back to the start position
+                positions = startPositions
+            elif not indices or (not isPullActive and not isPushActive):
+                # no need to solve since nothing will change
+                positions = lastPositions
+            else:
+                positions = sePushPullSolver.solveFrame(lastPositions,
+                                                        numpy.broadcast_to(api.matrixToList(targetMat), (len(indices), 4, 4)),
+                                                        parentMatrices, frame, distances, startFrame,
+                                                        startPositions, isPushActive, isPullActive).tolist()
+
+            if pusherMatrices:
+                positions = sePushPullSolver.solveMultiTargetFrame(positions, pusherMatrices, pusherRadii,
+                                                                   parentMatrices).tolist()
+
+            self.solvedInputs = inputs
+            self.solvedPositions = [tuple(position) for position in positions]
+
+        # write out all the elements
+        setArrayPositions(api, data, self.constTransAttr, indices, positions)
+        setArrayPositions(api, data, self.lastPositionAttr, indices, positions)
+
+        data.setClean(self.constTransAttr)
+        data.setClean(self.lastPositionAttr)
+
+def setArrayPositions(api, data, attr, indices, positions):
+    '''Sets the double3 array attribute elements to the given positions'''
+    arrayHandle = data.outputArrayValue(attr)
+    builder = api.OpenMaya.MArrayDataBuilder(data, attr, len(indices))
+    for index, position in zip(indices, positions):
+        builder.addElement(index).set3Double(position[0], position[1], position[2])
+    arrayHandle.set(builder)
+    arrayHandle.setAllClean()
+
+def nodeRemoved(node, api):
+    '''Node removed callback, a deleted node's counters are dropped. The api
+    of the plugin is the client data.'''
+    sePushPullStats.removeNode(nodeUuid(api, node))
+
+def nodeUuid(api, node):
+    '''Returns the UUID of the node as a string, its counters are kept by it'''
+    return api.OpenMaya.MFnDependencyNode(node).uuid().asString()
+
+def upstreamCurves(api, nodeObject):
+    '''Returns the anim curves upstream of the node. The world matrix of a DAG
+    node depends on its parents without a connection, so they are followed too.'''
+    OpenMaya = api.OpenMaya
+    curves = []
+    visited = set()
+    nodes = [nodeObject]
+    while nodes:
+        node = nodes.pop()
+        hashCode = OpenMaya.MObjectHandle(node).hashCode()
+        if hashCode in visited:
+            continue
+        visited.add(hashCode)
+
+        # a curve can be driven too, like a set driven key
+        if node.hasFn(OpenMaya.MFn.kAnimCurve):
+            curves.append(node)
+        for plug in api.nodeConnections(node):
+            nodes.extend(source.node() for source in api.connectedPlugs(plug, True, False))
+        if node.hasFn(OpenMaya.MFn.kDagNode):
+            dagFn = OpenMaya.MFnDagNode(node)
+            nodes.extend(dagFn.parent(i) for i in range(dagFn.parentCount()))
+    return curves
+
+def keysChangedFrom(oldKeys, newKeys):
+    '''Returns the time of the first frame the curve can be changed at by the
+    edit from the old keys to the new keys, or None when it can change at any
+    frame. An auto tangent follows the keys either side of it, so the curve is
+    the same up to two keys before the first key that changed.'''
+    for index, (old, new) in enumerate(zip(oldKeys, newKeys)):
+        if old != new:
+            break
+    else:
+        if len(oldKeys) == len(newKeys):
+            # only a tangent or the infinity changed, which can move any frame
+            return None
+        index = min(len(oldKeys), len(newKeys))
+
+    # the curve holds the first key before it
+    if index == 0:
+        return None
+    return newKeys[max(index - 2, 0)][0]
+
+def animCurvesEdited(editedCurves, api):
+    '''Anim curve edited callback. A key edit can change the inputs of frames
+    before the one being read, so the nodes driven by the edited curves drop
+    their cached frames and sample their inputs again from the first frame the
+    edit changes. The api of the plugin is the client data.'''
+    curves = dict((api.OpenMaya.MObjectHandle(curve).hashCode(), curve) for curve in api.objects(editedCurves))
+
+    nodes = []
+    for node in list(historyNodes.values()):
+        if not node.nodeHandle.isAlive():
+            historyNodes.pop(node.nodeHandle.hashCode(), None)
+            continue
+        if not node.nodeHandle.isValid():
+            # deleted, every frame is solved again if the delete is undone
+            node.curveKeys = None
+            node.resampleFrom(None)
+            continue
+        nodes.append(node)
+
+    # a curve no node knows of can be new, so the curves upstream of every
+    # node are found again, unless it was found not to drive any before
+    known = set(otherCurves)
+    for node in nodes:
+        if node.curveKeys is not None:
+            known.update(node.curveKeys)
+    findAgain = any(hashCode not in known for hashCode in curves)
+
+    for node in nodes:
+        if node.curveKeys is None:
+            # edited before its curves were found
+            node.resampleFrom(None)
+            continue
+
+        changed = []
+        for hashCode, curve in curves.items():
+            oldKeys = node.curveKeys.get(hashCode)
+            if oldKeys is not None:
+                newKeys = api.animCurveKeys(curve, node.sampleUnit)
+                node.curveKeys[hashCode] = newKeys
+                changed.append(keysChangedFrom(oldKeys, newKeys))
+
+        if findAgain:
+            curveKeys = node.trackCurves()
+            if any(hashCode in curveKeys and hashCode not in node.curveKeys for hashCode in curves):
+                changed.append(None)
+            node.curveKeys = curveKeys
+
+        if changed:
+            node.resampleFrom(None if None in changed else min(changed))
+
+    # only once the curves of every node are known
+    if findAgain and nodes and all(node.curveKeys is not None for node in nodes):
+        found = set()
+        for node in nodes:
+            found.update(node.curveKeys)
+        otherCurves.update(hashCode for hashCode in curves if hashCode not in found)
+
+# the nodes with an input history and the nodes with a pre-roll by the hash code
+# of their handle, and the ones that still have frames to sample, a few at a time
+# while Maya is idle
+historyNodes = {}
+prerollNodes = {}
+
+# the hash codes of edited curves that were found not to drive any node
+otherCurves = set()
+prerollQueue = collections.OrderedDict()
+prerollCallback = None
+
+# stateless nodes queue frames to sample from the evaluation threads
+prerollLock = threading.Lock()
+mainThread = threading.current_thread()
+
+# frames sampled for one node each time Maya is idle
+PREROLL_CHUNK = 10
+
+def trackNode(node):
+    '''Keeps the handle of the node, its input history is sampled again when a key is edited'''
+    node.nodeHandle = node.api.OpenMaya.MObjectHandle(node.thisMObject())
+    historyNodes[node.nodeHandle.hashCode()] = node
+
+def queueSampling(node):
+    '''Samples the inputs the node is missing the next times Maya is idle. The
+    idle callback can only be added on the main thread, from an evaluation
+    thread it is added when the time changes.'''
+    if node.nodeHandle is None:
+        trackNode(node)
+    with prerollLock:
+        prerollQueue[node] = None
+    if threading.current_thread() is mainThread:
+        startSampling(node.api)
+
+def startSampling(api):
+    '''Adds the idle callback if there are nodes to sample'''
+    global prerollCallback
+    if prerollCallback is None and prerollQueue:
+        prerollCallback = api.OpenMaya.MEventMessage.addEventCallback('idle', samplePrerolls, api)
+
+def timeChanged(api):
+    '''Time changed callback, adds the idle callback for the nodes queued
+    from an evaluation thread. The api of the plugin is the client data.'''
+    startSampling(api)
+
+def queuePreroll(node):
+    '''Samples the inputs of the node pre-roll the next times Maya is idle'''
+    if node.nodeHandle is None:
+        trackNode(node)
+    prerollNodes[node.nodeHandle.hashCode()] = node
+    queueSampling(node)
+
+def stopPreroll(node):
+    '''Drops the pre-roll of the node and the frames it solved'''
+    if node.nodeHandle is not None:
+        prerollNodes.pop(node.nodeHandle.hashCode(), None)
+    sePushPullPreroll.worker.remove(node.preroll)
+    node.preroll = None
+
+def samplePrerolls(api):
+    '''Idle callback sampling the next frames of the queued input histories
+    and pre-rolls in turn, it is removed once there is nothing left to sample.
+    The api of the plugin is the client data.'''
+    global prerollCallback
+    while prerollQueue:
+        with prerollLock:
+            node = prerollQueue.popitem(last=False)[0]
+        if not node.nodeHandle.isValid():
+            # the node was deleted
+            stopPreroll(node)
+            continue
+        if node.sampleInputs(PREROLL_CHUNK):
+            with prerollLock:
+                prerollQueue[node] = None
+            return
+
+    api.OpenMaya.MMessage.removeCallback(prerollCallback)
+    prerollCallback = None
+
+def stopAllPrerolls(api):
+    '''Stops the idle callback and the worker thread'''
+    global prerollCallback
+    if prerollCallback is not None:
+        api.OpenMaya.MMessage.removeCallback(prerollCallback)
+        prerollCallback = None
+    for node in list(prerollNodes.values()):
+        stopPreroll(node)
+    historyNodes.clear()
+    otherCurves.clear()
+    prerollQueue.clear()
+    sePushPullPreroll.worker.stop()
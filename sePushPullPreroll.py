@@ -0,0 +1,273 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Solves push pull constraints ahead of the playhead in a background thread.
+
+A pre-roll holds the inputs of one constraint at every whole frame from its
+start frame to the end frame, and the positions solved from them in order.
+The inputs can only be sampled from the dependency graph on the main thread,
+so they are handed to the pre-roll a few frames at a time while Maya is idle
+and one worker thread solves every pre-roll as far as its inputs go.
+
+Sampling the same frames again compares them with the inputs they were
+solved with, the positions from the first frame that differs on are thrown
+away and solved again. The inputs are the same hashable keys the state cache
+uses, laid out as the KEY_* slices and indices of sePushPullMath.
+'''
+
+import collections
+import math
+import threading
+import time
+
+import sePushPullMath
+
+# frames solved by the worker before it moves on to the next pre-roll
+SOLVE_BATCH = 100
+
+class sePushPullPreroll(object):
+    '''The sampled inputs and solved positions of one constraint'''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+        self.startFrame = None
+        self.startPosition = None
+        self.endFrame = None
+
+        # the inputs and positions of the whole frames from the start frame
+        self.inputs = []
+        self.positions = []
+
+        # the next frame to sample, frames before it have been checked against
+        # the scene since the last change
+        self.sampleIndex = 0
+
+        # changes when positions are thrown away so the worker drops what it
+        # was solving at the time
+        self.generation = 0
+
+        # only used by the worker thread
+        self.parentSpace = sePushPullMath.sePushPullParentSpace()
+
+    def setRange(self, startFrame, startPosition, endFrame):
+        '''Sets the frames to solve, a different start solves everything again'''
+        with self.lock:
+            if startFrame != self.startFrame or startPosition != self.startPosition:
+                self.startFrame = startFrame
+                self.startPosition = startPosition
+                self.truncate(0)
+                self.sampleIndex = 0
+            self.endFrame = endFrame
+
+    def truncate(self, index):
+        '''Throws away the inputs and positions from the index on, the lock must be held'''
+        del self.inputs[index:]
+        del self.positions[index:]
+        self.generation += 1
+
+    def framesToSample(self, count):
+        '''Returns up to count of the next frames to sample, none once every
+        frame up to the end frame has been sampled'''
+        with self.lock:
+            if self.startFrame is None or self.endFrame is None:
+                return []
+            numFrames = int(self.endFrame - self.startFrame) + 1
+            return [self.startFrame + index
+                    for index in range(self.sampleIndex, min(self.sampleIndex + count, numFrames))]
+
+    def addInputs(self, firstFrame, inputs):
+        '''Adds the sampled inputs of the frames from firstFrame on.
+
+        Returns True if there are new frames for the worker to solve.
+        '''
+        with self.lock:
+            # the pre-roll was restarted while these were being sampled
+            if firstFrame != self.startFrame + self.sampleIndex:
+                return False
+
+            index = self.sampleIndex
+            for key in inputs:
+                if index < len(self.inputs):
+                    if self.inputs[index] == key:
+                        index += 1
+                        continue
+                    # the first frame affected by a change, solve again from here
+                    self.truncate(index)
+                self.inputs.append(key)
+                index += 1
+
+            self.sampleIndex = index
+            return len(self.positions) < len(self.inputs)
+
+    def lookup(self, frame, inputs):
+        '''Returns the solved position at the frame or None if it is not solved
+        yet. If the frame was sampled with different inputs, every frame is
+        sampled again to find the first one that changed.'''
+        with self.lock:
+            if self.startFrame is None:
+                return None
+
+            offset = frame - self.startFrame
+            if offset < 0 or offset != int(offset):
+                return None
+
+            index = int(offset)
+            if index >= self.sampleIndex or index >= len(self.inputs):
+                return None
+
+            if self.inputs[index] != inputs:
+                # this frame and the frames after it are solved again, the
+                # frames before it are checked when they are sampled again
+                self.truncate(index)
+                self.sampleIndex = 0
+                return None
+
+            if index >= len(self.positions):
+                return None
+            return self.positions[index]
+
+    def resample(self, fromFrame=None):
+        '''Samples the frames from the given frame on again, every frame when
+        it is None, for a change to the inputs of frames that are not being
+        evaluated like an edited key'''
+        with self.lock:
+            if fromFrame is None or self.startFrame is None:
+                self.sampleIndex = 0
+            else:
+                self.sampleIndex = min(self.sampleIndex, max(int(math.ceil(fromFrame - self.startFrame)), 0))
+
+    def needsSampling(self):
+        '''Returns True if there are frames left to sample'''
+        return bool(self.framesToSample(1))
+
+    def progress(self):
+        '''Returns the last frame that is solved and checked against the scene
+        and the end frame. The last frame is before the start frame when
+        nothing is solved yet.'''
+        with self.lock:
+            if self.startFrame is None:
+                return None, self.endFrame
+            solved = min(len(self.positions), self.sampleIndex)
+            return self.startFrame + solved - 1, self.endFrame
+
+    def solveNext(self, count):
+        '''Solves up to count of the sampled frames that are not solved yet.
+
+        Returns True if there are more frames to solve.
+        '''
+        with self.lock:
+            index = len(self.positions)
+            batch = self.inputs[index:index + count]
+            if not batch:
+                return False
+            generation = self.generation
+            lastPosition = self.positions[-1] if index else self.startPosition
+
+        # the inputs are only read so the solve does not need the lock
+        solved = []
+        parentSpace = self.parentSpace
+        for key in batch:
+            lastPosition = sePushPullMath.solveInputKey(lastPosition, key, parentSpace)
+            solved.append(lastPosition)
+
+        with self.lock:
+            if generation == self.generation and index == len(self.positions):
+                self.positions.extend(solved)
+            return len(self.positions) < len(self.inputs)
+
+class sePushPullPrerollWorker(object):
+    '''One background thread solving the pre-rolls that have new inputs, a
+    batch of frames at a time from each in turn'''
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.pending = collections.deque()
+        self.queued = set()
+        self.thread = None
+
+        # the pre-roll being solved outside of the condition
+        self.solving = None
+
+    def add(self, preroll):
+        '''Queues the pre-roll to be solved, starting the thread if needed'''
+        with self.condition:
+            if preroll not in self.queued:
+                self.queued.add(preroll)
+                self.pending.append(preroll)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name='sePushPullPreroll')
+                self.thread.daemon = True
+                self.thread.start()
+            self.condition.notify_all()
+
+    def remove(self, preroll):
+        '''Stops solving the pre-roll'''
+        with self.condition:
+            if preroll in self.queued:
+                self.queued.discard(preroll)
+                self.pending.remove(preroll)
+
+    def stop(self, timeout=None):
+        '''Stops the thread once it finishes the batch it is solving'''
+        with self.condition:
+            thread = self.thread
+            self.thread = None
+            self.pending.clear()
+            self.queued.clear()
+            self.condition.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+
+    def isIdle(self):
+        '''Returns True if nothing is being solved or waiting to be'''
+        with self.condition:
+            return not self.pending and self.solving is None
+
+    def wait(self, timeout=None):
+        '''Waits until nothing is left to solve, returns False on a timeout'''
+        deadline = None if timeout is None else time.time() + timeout
+        with self.condition:
+            while self.pending or self.solving is not None:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0.0:
+                    return False
+                self.condition.wait(remaining)
+            return True
+
+    def run(self):
+        thread = threading.current_thread()
+        while True:
+            with self.condition:
+                while self.thread is thread and not self.pending:
+                    self.condition.wait()
+                if self.thread is not thread:
+                    return
+                preroll = self.solving = self.pending.popleft()
+                self.queued.discard(preroll)
+
+            more = preroll.solveNext(SOLVE_BATCH)
+
+            with self.condition:
+                self.solving = None
+                if more and self.thread is thread and preroll not in self.queued:
+                    self.queued.add(preroll)
+                    self.pending.append(preroll)
+                if not self.pending:
+                    # wakes anything waiting for the solve to finish
+                    self.condition.notify_all()
+
+worker = sePushPullPrerollWorker()
@@ -0,0 +1,376 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Maya independent solver for the sePushPullConstraint math.
+
+This does the same thing as sePushPullConstraintNode.compute but for many
+constraints over many frames at once using NumPy arrays. Matrices use the
+Maya row vector convention where a point is transformed as p * M and the
+translation is stored in the last row.
+'''
+
+import numpy
+
+def _asConstraintArray(value, numConstraints, dtype=numpy.float64):
+    '''Broadcasts a scalar or per constraint value to shape (constraints,)'''
+    return numpy.broadcast_to(numpy.asarray(value, dtype=dtype), (numConstraints,))
+
+def _asPositionArray(value, numConstraints):
+    '''Broadcasts a single or per constraint position to shape (constraints, 3)'''
+    return numpy.broadcast_to(numpy.asarray(value, dtype=numpy.float64), (numConstraints, 3))
+
+def transformPoints(points, matrices):
+    '''Transforms points of shape (..., 3) by row vector matrices of shape (..., 4, 4)'''
+    return numpy.einsum('...i,...ij->...j', points, matrices[..., :3, :3]) + matrices[..., 3, :3]
+
+def solveFrame(lastPosition, targetMatrix, parentMatrix, time, distance, startFrame, startPosition,
+               push=True, pull=True):
+    '''Solves a single frame for every constraint.
+
+    lastPosition, startPosition - (constraints, 3) local positions
+    targetMatrix, parentMatrix - (constraints, 4, 4) world matrices
+    time - the current frame
+    distance, startFrame, push, pull - scalars or (constraints,) arrays
+
+    Returns the new (constraints, 3) local positions which are both the
+    output and the last position for the next frame.
+    '''
+    lastPosition = numpy.asarray(lastPosition, dtype=numpy.float64)
+    numConstraints = lastPosition.shape[0]
+
+    targetMatrix = numpy.asarray(targetMatrix, dtype=numpy.float64)
+    parentMatrix = numpy.asarray(parentMatrix, dtype=numpy.float64)
+    distance = _asConstraintArray(distance, numConstraints)
+    startFrame = _asConstraintArray(startFrame, numConstraints)
+    startPosition = _asPositionArray(startPosition, numConstraints)
+    push = _asConstraintArray(push, numConstraints, bool)
+    pull = _asConstraintArray(pull, numConstraints, bool)
+
+    result = lastPosition.copy()
+
+    # if the current frame is before the start frame reset to the start position
+    reset = time < startFrame
+    result[reset] = startPosition[reset]
+
+    # only the active constraints need any work done
+    active = ~reset & (push | pull)
+    if not active.any():
+        return result
+
+    targetPos = targetMatrix[..., 3, :3]
+
+    # the relative vector from the target to the constrained in world space
+    worldPos = transformPoints(lastPosition, parentMatrix)
+    relativePos = worldPos - targetPos
+    currentDistance = numpy.sqrt(numpy.einsum('ij,ij->i', relativePos, relativePos))
+
+    corrected = active & ((pull & (currentDistance > distance)) | (push & (currentDistance < distance)))
+    if not corrected.any():
+        return result
+
+    # place the constrained at the set distance along the same direction,
+    # a zero length vector stays zero just like MVector.normalize
+    length = currentDistance[corrected]
+    scale = numpy.divide(distance[corrected], length, out=numpy.zeros_like(length), where=length > 0.0)
+    newPosition = targetPos[corrected] + relativePos[corrected] * scale[:, None]
+
+    # convert back into the constrained parent space
+    inverseParent = numpy.linalg.inv(parentMatrix[corrected])
+    result[corrected] = transformPoints(newPosition, inverseParent)
+
+    return result
+
+def solve(targetMatrices, parentMatrices, times, distance, startFrame, startPosition,
+          push=True, pull=True, lastPosition=None):
+    '''Solves every constraint over every frame.
+
+    targetMatrices, parentMatrices - (frames, constraints, 4, 4) world matrices
+    times - (frames,) frame values in evaluation order
+    distance, startFrame, push, pull - scalars or (constraints,) arrays
+    startPosition - (3,) or (constraints, 3) local start positions
+    lastPosition - optional (constraints, 3) state carried in from a previous
+                   evaluation, defaults to the start position like a newly
+                   created constraint
+
+    Returns the (frames, constraints, 3) local constrained positions.
+    '''
+    targetMatrices = numpy.asarray(targetMatrices, dtype=numpy.float64)
+    parentMatrices = numpy.asarray(parentMatrices, dtype=numpy.float64)
+    times = numpy.asarray(times, dtype=numpy.float64)
+
+    if targetMatrices.ndim != 4 or targetMatrices.shape[-2:] != (4, 4):
+        raise ValueError('targetMatrices must have the shape (frames, constraints, 4, 4).')
+
+    numFrames, numConstraints = targetMatrices.shape[:2]
+    parentMatrices = numpy.broadcast_to(parentMatrices, targetMatrices.shape)
+
+    if times.shape != (numFrames,):
+        raise ValueError('times must have one value per frame.')
+
+    distance = _asConstraintArray(distance, numConstraints)
+    startFrame = _asConstraintArray(startFrame, numConstraints)
+    startPosition = _asPositionArray(startPosition, numConstraints)
+    push = _asConstraintArray(push, numConstraints, bool)
+    pull = _asConstraintArray(pull, numConstraints, bool)
+
+    if lastPosition is None:
+        current = numpy.array(startPosition)
+    else:
+        current = numpy.array(_asPositionArray(lastPosition, numConstraints))
+
+    positions = numpy.empty((numFrames, numConstraints, 3))
+    for frame in range(numFrames):
+        current = solveFrame(current, targetMatrices[frame], parentMatrices[frame], times[frame],
+                             distance, startFrame, startPosition, push, pull)
+        positions[frame] = current
+
+    return positions
+
+def _pairsFromRanges(pointIndices, starts, counts):
+    '''Expands per point [start, start + count) ranges into flat (point, index) pairs'''
+    total = int(counts.sum())
+    pairPoints = numpy.repeat(pointIndices, counts)
+    offsets = numpy.arange(total) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+    return pairPoints, numpy.repeat(starts, counts) + offsets
+
+def findTargetPairsBruteForce(points, targetPositions, radius, chunkSize=1024):
+    '''Returns (pointIndices, targetIndices) of every point closer to a target
+    than its radius by testing all pairs, sorted by point then target.
+
+    points - (points, 3) world positions
+    targetPositions - (targets, 3) world positions
+    radius - scalar or (targets,) array
+    '''
+    points = numpy.asarray(points, dtype=numpy.float64)
+    targetPositions = numpy.asarray(targetPositions, dtype=numpy.float64)
+    radius = _asConstraintArray(radius, targetPositions.shape[0])
+
+    pointIndices = []
+    targetIndices = []
+
+    # work in chunks of points to keep the distance table small
+    for start in range(0, points.shape[0], chunkSize):
+        relative = points[start:start + chunkSize, None, :] - targetPositions[None, :, :]
+        inside = numpy.einsum('ijk,ijk->ij', relative, relative) < radius * radius
+        p, t = numpy.nonzero(inside)
+        pointIndices.append(p + start)
+        targetIndices.append(t)
+
+    if not pointIndices:
+        return numpy.zeros(0, dtype=numpy.intp), numpy.zeros(0, dtype=numpy.intp)
+
+    return numpy.concatenate(pointIndices), numpy.concatenate(targetIndices)
+
+# below this many point and target pairs testing them all is faster than the
+# grid, multiTargetBenchmark.py finds the grid faster from about 1000 points
+BRUTE_FORCE_PAIRS = 200000
+
+# the most cells along each axis of the grid, the cell keys of a larger grid
+# would not fit in 64 bits
+MAX_GRID_CELLS = 2 ** 20
+
+def _targetGrid(targetPositions, radius):
+    '''Returns (cellSize, minCell, gridShape, order, sortedKeys) of the targets
+    put in a uniform grid, or None if no target has a radius'''
+    cellSize = radius.max()
+    if cellSize <= 0.0:
+        return None
+
+    # targets spread very far apart for their radius get larger cells
+    extent = (targetPositions.max(axis=0) - targetPositions.min(axis=0)).max()
+    cellSize = max(cellSize, extent / MAX_GRID_CELLS)
+
+    # the cells the targets fall in, padded by one so neighbours stay in range
+    targetCells = numpy.floor(targetPositions / cellSize).astype(numpy.int64)
+    minCell = targetCells.min(axis=0) - 1
+    gridShape = targetCells.max(axis=0) + 2 - minCell
+
+    # sort the targets by cell so each cell is a contiguous range
+    targetKeys = _cellKeys(targetCells, minCell, gridShape)
+    order = numpy.argsort(targetKeys, kind='stable')
+    return cellSize, minCell, gridShape, order, targetKeys[order]
+
+def _cellKeys(cells, minCell, gridShape):
+    '''Returns the key of each cell of the grid'''
+    cells = cells - minCell
+    return (cells[:, 0] * gridShape[1] + cells[:, 1]) * gridShape[2] + cells[:, 2]
+
+def _gridPairs(grid, points, targetPositions, radius):
+    '''Returns the unsorted (pointIndices, targetIndices) of the points inside
+    the targets of the grid'''
+    cellSize, minCell, gridShape, order, sortedKeys = grid
+
+    # points far outside the grid are clamped to two cells out, so they and
+    # their neighbours stay outside it
+    pointCells = numpy.clip(numpy.floor(points / cellSize), minCell - 1, minCell + gridShape).astype(numpy.int64)
+    pointRange = numpy.arange(points.shape[0])
+
+    pointIndices = []
+    targetIndices = []
+    for offset in numpy.ndindex(3, 3, 3):
+        neighbourCells = pointCells + (numpy.array(offset) - 1)
+
+        # points next to cells outside the grid can not have any targets
+        inGrid = numpy.all((neighbourCells > minCell) & (neighbourCells < minCell + gridShape - 1), axis=1)
+        if not inGrid.any():
+            continue
+
+        keys = _cellKeys(neighbourCells[inGrid], minCell, gridShape)
+        starts = numpy.searchsorted(sortedKeys, keys, side='left')
+        counts = numpy.searchsorted(sortedKeys, keys, side='right') - starts
+
+        p, s = _pairsFromRanges(pointRange[inGrid], starts, counts)
+        t = order[s]
+
+        relative = points[p] - targetPositions[t]
+        inside = numpy.einsum('ij,ij->i', relative, relative) < radius[t] * radius[t]
+        pointIndices.append(p[inside])
+        targetIndices.append(t[inside])
+
+    if not pointIndices:
+        empty = numpy.zeros(0, dtype=numpy.intp)
+        return empty, empty
+
+    return numpy.concatenate(pointIndices), numpy.concatenate(targetIndices)
+
+def findTargetPairs(points, targetPositions, radius):
+    '''Returns (pointIndices, targetIndices) of every point closer to a target
+    than its radius, sorted by point then target.
+
+    This gives the same result as findTargetPairsBruteForce but the targets are
+    put into a uniform grid with cells the size of the largest radius, so each
+    point only tests the targets in its own and the 26 neighbouring cells.
+    Targets spread more than MAX_GRID_CELLS of the largest radius apart get
+    larger cells.
+    '''
+    points = numpy.asarray(points, dtype=numpy.float64)
+    targetPositions = numpy.asarray(targetPositions, dtype=numpy.float64)
+    radius = _asConstraintArray(radius, targetPositions.shape[0])
+
+    empty = numpy.zeros(0, dtype=numpy.intp)
+    if not points.shape[0] or not targetPositions.shape[0]:
+        return empty, empty
+
+    grid = _targetGrid(targetPositions, radius)
+    if grid is None:
+        return empty, empty
+
+    pointIndices, targetIndices = _gridPairs(grid, points, targetPositions, radius)
+
+    # match the brute force order
+    order = numpy.lexsort((targetIndices, pointIndices))
+    return pointIndices[order], targetIndices[order]
+
+def solveMultiTargetFrame(positions, targetMatrix, radius, parentMatrix=None, bruteForce=None):
+    '''Pushes every constrained position out of every target it is inside.
+
+    positions - (points, 3) positions, local to parentMatrix if given
+    targetMatrix - (targets, 4, 4) world matrices
+    radius - scalar or (targets,) push distance of each target
+    parentMatrix - optional (points, 4, 4) world matrices of the constrained parents
+    bruteForce - True to test all pairs and False to use the grid, by default
+                 all pairs are tested when there are fewer than BRUTE_FORCE_PAIRS
+
+    The targets correct a point one after the other in target order, the same
+    as chaining a node for each target. Each round the points moved in the last
+    round are tested again and pushed out of the first of the following targets
+    they are inside, so it takes at most as many rounds as there are targets.
+    Returns the new (points, 3) positions.
+    '''
+    positions = numpy.asarray(positions, dtype=numpy.float64)
+    targetMatrix = numpy.asarray(targetMatrix, dtype=numpy.float64)
+    targetPos = targetMatrix[..., 3, :3]
+    radius = _asConstraintArray(radius, targetPos.shape[0])
+
+    if parentMatrix is not None:
+        parentMatrix = numpy.broadcast_to(numpy.asarray(parentMatrix, dtype=numpy.float64), positions.shape[:1] + (4, 4))
+        worldPos = transformPoints(positions, parentMatrix)
+    else:
+        worldPos = positions.copy()
+
+    numTargets = targetPos.shape[0]
+    grid = None
+    if bruteForce is not True and numTargets:
+        grid = _targetGrid(targetPos, radius)
+        if grid is None:
+            return positions.copy()
+
+    # the first target each point can still be corrected by
+    nextTarget = numpy.zeros(positions.shape[0], dtype=numpy.intp)
+    moved = numpy.zeros(positions.shape[0], dtype=bool)
+    active = numpy.arange(positions.shape[0])
+
+    while active.size:
+        if grid is None or (bruteForce is None and active.size * numTargets < BRUTE_FORCE_PAIRS):
+            p, t = findTargetPairsBruteForce(worldPos[active], targetPos, radius)
+        else:
+            p, t = _gridPairs(grid, worldPos[active], targetPos, radius)
+        p = active[p]
+
+        following = t >= nextTarget[p]
+        p = p[following]
+        t = t[following]
+        if not p.size:
+            break
+
+        # the first of the targets of each point
+        order = numpy.lexsort((t, p))
+        p = p[order]
+        t = t[order]
+        first = numpy.ones(p.size, dtype=bool)
+        first[1:] = p[1:] != p[:-1]
+        p = p[first]
+        t = t[first]
+
+        relative = worldPos[p] - targetPos[t]
+        length = numpy.sqrt(numpy.einsum('ij,ij->i', relative, relative))
+        scale = numpy.divide(radius[t], length, out=numpy.zeros_like(length), where=length > 0.0)
+        worldPos[p] = targetPos[t] + relative * scale[:, None]
+
+        moved[p] = True
+        nextTarget[p] = t + 1
+        active = p
+
+    if parentMatrix is None:
+        return worldPos
+
+    result = positions.copy()
+    result[moved] = transformPoints(worldPos[moved], numpy.linalg.inv(parentMatrix[moved]))
+    return result
+
+def solveMultiTarget(positions, targetMatrices, radius, parentMatrices=None, bruteForce=None):
+    '''Solves the multi target push over many frames.
+
+    positions - (points, 3) starting positions
+    targetMatrices - (frames, targets, 4, 4) world matrices
+    radius - scalar or (targets,) push distance of each target
+    parentMatrices - optional (frames, points, 4, 4) world matrices
+    bruteForce - passed on to solveMultiTargetFrame
+
+    Returns the (frames, points, 3) positions.
+    '''
+    targetMatrices = numpy.asarray(targetMatrices, dtype=numpy.float64)
+    if targetMatrices.ndim != 4 or targetMatrices.shape[-2:] != (4, 4):
+        raise ValueError('targetMatrices must have the shape (frames, targets, 4, 4).')
+
+    current = numpy.array(positions, dtype=numpy.float64)
+    result = numpy.empty((targetMatrices.shape[0],) + current.shape)
+    for frame in range(targetMatrices.shape[0]):
+        parentMatrix = None if parentMatrices is None else parentMatrices[frame]
+        current = solveMultiTargetFrame(current, targetMatrices[frame], radius, parentMatrix, bruteForce)
+        result[frame] = current
+
+    return result
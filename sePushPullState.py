@@ -0,0 +1,204 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''State of many push pull constraints kept outside of the dependency graph.
+
+Every field of the sePushPullConstraint node state is one contiguous array
+with an entry per constraint, so a crowd of constraints takes a known amount
+of memory and a frame is solved for all of them with sePushPullSolver. The
+fields have the same names as the node attributes they are read from and
+written back to by the plugin.
+
+A state file is a 64 byte little endian header followed by every field in
+the order of FIELDS, each as contiguous values with an entry per constraint:
+
+    magic           8 bytes  'SEPPSOA1'
+    version         uint32
+    numConstraints  uint32
+    padding         up to 64 bytes
+
+Run this module to print the header of a state file:
+
+    python sePushPullState.py crowd.spps
+'''
+
+from __future__ import print_function
+
+import os
+import struct
+import sys
+
+import numpy
+
+import sePushPullFile
+import sePushPullSolver
+
+MAGIC = b'SEPPSOA1'
+VERSION = 1
+HEADER_FORMAT = '<8sII'
+HEADER_SIZE = 64
+
+# (name, file type, values per constraint, default) in the order they are saved
+FIELDS = (('lastPosition', '<f8', 3, 0.0),
+          ('startPosition', '<f8', 3, 0.0),
+          ('distance', '<f8', 1, 0.0),
+          ('startFrame', '<f8', 1, 1.0),
+          ('push', '|b1', 1, True),
+          ('pull', '|b1', 1, True))
+
+def _fieldShape(width, numConstraints):
+    return (numConstraints, width) if width > 1 else (numConstraints,)
+
+def _fieldProperty(name, width):
+    '''Returns a property reading and writing one entry of a store field'''
+    if width > 1:
+        def getter(self):
+            return tuple(getattr(self.store, name)[self.index].tolist())
+    else:
+        def getter(self):
+            return getattr(self.store, name)[self.index].item()
+
+    def setter(self, value):
+        getattr(self.store, name)[self.index] = value
+
+    return property(getter, setter)
+
+class sePushPullStateView(object):
+    '''One constraint in a state store, reading and writing its fields goes
+    straight to the store arrays'''
+
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __repr__(self):
+        return 'sePushPullStateView(%d)' % self.index
+
+for _name, _fileType, _width, _default in FIELDS:
+    setattr(sePushPullStateView, _name, _fieldProperty(_name, _width))
+del _name, _fileType, _width, _default
+
+class sePushPullStateStore(object):
+    '''The parameters and last positions of many constraints, one array per
+    field in FIELDS. Indexing the store returns a view of one constraint.'''
+
+    def __init__(self, numConstraints=0):
+        for name, fileType, width, default in FIELDS:
+            setattr(self, name, numpy.full(_fieldShape(width, numConstraints), default,
+                                           dtype=numpy.dtype(fileType).newbyteorder('=')))
+
+    def __len__(self):
+        return len(self.distance)
+
+    def __getitem__(self, index):
+        numConstraints = len(self)
+        if index < 0:
+            index += numConstraints
+        if index < 0 or index >= numConstraints:
+            raise IndexError('state store index out of range')
+        return sePushPullStateView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield sePushPullStateView(self, index)
+
+    @property
+    def nbytes(self):
+        '''The memory used by the arrays'''
+        return sum(getattr(self, name).nbytes for name, fileType, width, default in FIELDS)
+
+    def solveFrame(self, targetMatrix, parentMatrix, time):
+        '''Solves one frame for every constraint and keeps the result as the
+        last position for the next one.
+
+        targetMatrix, parentMatrix - (constraints, 4, 4) world matrices
+
+        Returns the (constraints, 3) solved local positions.
+        '''
+        self.lastPosition[:] = sePushPullSolver.solveFrame(self.lastPosition, targetMatrix, parentMatrix, time,
+                                                           self.distance, self.startFrame, self.startPosition,
+                                                           self.push, self.pull)
+        return self.lastPosition
+
+    def save(self, path):
+        '''Writes the store to a file, the old file is only replaced once the new one is written'''
+        header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, len(self))
+        with sePushPullFile.atomicWrite(path) as f:
+            f.write(header + b'\0' * (HEADER_SIZE - len(header)))
+            for name, fileType, width, default in FIELDS:
+                f.write(numpy.ascontiguousarray(getattr(self, name), dtype=fileType).tobytes())
+
+    @classmethod
+    def load(cls, path):
+        '''Returns the store read from a file written by save'''
+        numConstraints = readHeader(path)
+        with open(path, 'rb') as f:
+            f.seek(HEADER_SIZE)
+            data = bytearray(f.read())
+
+        if len(data) < fileSize(numConstraints) - HEADER_SIZE:
+            raise ValueError('%s is missing some of the state.' % path)
+
+        # the arrays share the one buffer that was read
+        store = cls()
+        offset = 0
+        for name, fileType, width, default in FIELDS:
+            dtype = numpy.dtype(fileType)
+            count = numConstraints * width
+            values = numpy.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            if not dtype.isnative:
+                values = values.astype(dtype.newbyteorder('='))
+            setattr(store, name, values.reshape(_fieldShape(width, numConstraints)))
+            offset += count * dtype.itemsize
+        return store
+
+def fileSize(numConstraints):
+    '''Returns the size in bytes of a state file with the number of constraints'''
+    return HEADER_SIZE + numConstraints * sum(numpy.dtype(fileType).itemsize * width
+                                              for name, fileType, width, default in FIELDS)
+
+def readHeader(path):
+    '''Returns the number of constraints from the header of a state file'''
+    with open(path, 'rb') as f:
+        data = f.read(HEADER_SIZE)
+
+    if len(data) < HEADER_SIZE:
+        raise ValueError('%s is too small to be a state file.' % path)
+
+    magic, version, numConstraints = struct.unpack_from(HEADER_FORMAT, data)
+    if magic != MAGIC:
+        raise ValueError('%s is not a state file.' % path)
+    if version != VERSION:
+        raise ValueError('%s has an unsupported version %d.' % (path, version))
+    return numConstraints
+
+def main(args):
+    '''Prints the header of every state file given'''
+    if not args:
+        print(__doc__)
+        return 1
+
+    for path in args:
+        numConstraints = readHeader(path)
+        print('%-16s %s' % ('path', path))
+        print('%-16s %s' % ('numConstraints', numConstraints))
+        print('%-16s %s' % ('fileSize', os.path.getsize(path)))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,132 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Evaluation counters for the sePushPullConstraint node.
+
+Nothing is recorded until enabled is set to True, the node only checks the
+flag when it is off. Each node has its own counters and every record is also
+added to the aggregate counters for the whole scene.
+'''
+
+import threading
+import time
+
+# turned on and off with the sePushPullConstraint -profile flag
+enabled = False
+
+timer = getattr(time, 'perf_counter', time.time)
+
+# the order the values are returned in by the command, as field=value strings
+BRANCHES = ('beforeStartFrame', 'pushPullOff', 'insideBand', 'corrected', 'stateCache', 'cacheFile', 'lod')
+FIELDS = ('calls', 'totalTime', 'maxTime') + BRANCHES + ('timeJumps',)
+
+class sePushPullStats(object):
+    '''Counters for one node or for every node'''
+
+    def __init__(self):
+        self.reset()
+        # set when the node is deleted, the node then starts new counters if it is brought back
+        self.removed = False
+
+    def reset(self):
+        '''Sets every counter back to zero'''
+        self.calls = 0
+        self.totalTime = 0.0
+        self.maxTime = 0.0
+        self.branches = dict((branch, 0) for branch in BRANCHES)
+        self.timeJumps = 0
+        self.lastFrame = None
+
+    def record(self, branch, seconds, frame=None):
+        '''Adds one compute call that took the branch, time jumps are only
+        counted when the frame is given'''
+        self.calls += 1
+        self.totalTime += seconds
+        self.maxTime = max(self.maxTime, seconds)
+        self.branches[branch] += 1
+
+        if frame is None:
+            return
+
+        # anything but the same or the next frame means the last position is not from the frame before
+        if self.lastFrame is not None and frame != self.lastFrame and frame != self.lastFrame + 1.0:
+            self.timeJumps += 1
+        self.lastFrame = frame
+
+    def values(self):
+        '''Returns the counters in the FIELDS order'''
+        return ([float(self.calls), self.totalTime, self.maxTime] +
+                [float(self.branches[branch]) for branch in BRANCHES] + [float(self.timeJumps)])
+
+    def asDict(self):
+        '''Returns the counters by name'''
+        return dict(zip(FIELDS, self.values()))
+
+def labels(stats, name=None):
+    '''Returns the field=value strings of the counters in the FIELDS order,
+    node.field=value when the name of the node is given'''
+    prefix = '' if name is None else name + '.'
+    return ['%s%s=%r' % (prefix, field, value) for field, value in zip(FIELDS, stats.values())]
+
+def parseLabels(strings, name=None):
+    '''Returns the counters of the named node by field from the strings the
+    command returns, or the aggregate counters when there is no name'''
+    prefix = '' if name is None else name + '.'
+    result = {}
+    for string in strings:
+        label, value = string.rsplit('=', 1)
+        if label.startswith(prefix) and '.' not in label[len(prefix):]:
+            result[label[len(prefix):]] = float(value)
+    return result
+
+# counters of every node, keyed by the node UUID string
+nodeStats = {}
+aggregate = sePushPullStats()
+
+# stateless nodes can be evaluated from more than one thread at once
+_lock = threading.Lock()
+
+def statsForNode(key):
+    '''Returns the counters for a node, making them if needed'''
+    with _lock:
+        stats = nodeStats.get(key)
+        if stats is None:
+            stats = nodeStats[key] = sePushPullStats()
+        return stats
+
+def removeNode(key):
+    '''Drops the counters of a deleted node'''
+    with _lock:
+        stats = nodeStats.pop(key, None)
+        if stats is not None:
+            stats.removed = True
+
+def record(stats, branch, seconds, frame):
+    '''Records the compute call on the node counters and the aggregate'''
+    with _lock:
+        timeJumps = stats.timeJumps
+        stats.record(branch, seconds, frame)
+
+        # the nodes are evaluated in any order so the aggregate takes the jumps from the node
+        aggregate.record(branch, seconds)
+        aggregate.timeJumps += stats.timeJumps - timeJumps
+
+def resetAll():
+    '''Resets the aggregate and every node's counters'''
+    with _lock:
+        aggregate.reset()
+        for stats in nodeStats.values():
+            stats.reset()
@@ -0,0 +1,296 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Streaming solve of the sePushPullConstraint math for long takes.
+
+The matrices are given as an iterator of chunks and the solved positions are
+yielded a chunk at a time, only the last position of each constraint is kept
+between chunks so the memory used does not grow with the length of the take.
+The state can be saved after any chunk and the solve carried on from it later.
+
+A matrix stream file is a 64 byte little endian header followed by one record
+per frame holding the frame time and the target and parent world matrices of
+every constraint as float64 values:
+
+    magic           8 bytes  'SEPPMTX1'
+    version         uint32
+    numConstraints  uint32
+    numFrames       uint64
+    padding         up to 64 bytes
+
+    record          time, (constraints, 4, 4) target, (constraints, 4, 4) parent
+
+A state file has the same layout with the magic 'SEPPSTA1', numFrames being
+the frames solved so far, followed by the last time and the
+(constraints, 3) last positions.
+
+Run this module to solve a matrix stream file into a trajectory cache file,
+carrying on from the frames already in the cache:
+
+    python sePushPullStream.py matrices.sppm positions.sppc --distance 2.0 --chunk 4096
+'''
+
+from __future__ import print_function
+
+import argparse
+import os
+import struct
+import sys
+
+import numpy
+
+import sePushPullFile
+import sePushPullSolver
+import sePushPullTrajectory
+
+MATRIX_MAGIC = b'SEPPMTX1'
+STATE_MAGIC = b'SEPPSTA1'
+VERSION = 1
+HEADER_FORMAT = '<8sIIQ'
+HEADER_SIZE = 64
+
+_NUM_FRAMES_OFFSET = struct.calcsize('<8sII')
+
+def _packHeader(magic, numConstraints, numFrames):
+    '''Returns the header bytes padded to the header size'''
+    header = struct.pack(HEADER_FORMAT, magic, VERSION, numConstraints, numFrames)
+    return header + b'\0' * (HEADER_SIZE - len(header))
+
+def _readHeader(f, path, magic):
+    '''Returns the (numConstraints, numFrames) from the header of the open file'''
+    data = f.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE:
+        raise ValueError('%s is too small to be a stream file.' % path)
+
+    fileMagic, version, numConstraints, numFrames = struct.unpack_from(HEADER_FORMAT, data)
+    if fileMagic != magic:
+        raise ValueError('%s is not a %s file.' % (path, magic.decode('ascii')))
+    if version != VERSION:
+        raise ValueError('%s has an unsupported version %d.' % (path, version))
+    return numConstraints, numFrames
+
+def recordType(numConstraints):
+    '''Returns the numpy dtype of one frame in a matrix stream file'''
+    return numpy.dtype([('time', '<f8'),
+                        ('target', '<f8', (numConstraints, 4, 4)),
+                        ('parent', '<f8', (numConstraints, 4, 4))])
+
+class sePushPullStreamState(object):
+    '''What the streaming solve carries from one chunk to the next.
+
+    lastPosition - (constraints, 3) local positions solved for the last frame
+    lastTime - the time of the last frame, None before any frame is solved
+    numFrames - the number of frames solved so far
+    '''
+
+    def __init__(self, lastPosition, lastTime=None, numFrames=0):
+        self.lastPosition = numpy.array(lastPosition, dtype=numpy.float64)
+        self.lastTime = lastTime
+        self.numFrames = numFrames
+
+        if self.lastPosition.ndim != 2 or self.lastPosition.shape[1] != 3:
+            raise ValueError('lastPosition must have the shape (constraints, 3).')
+
+    def numConstraints(self):
+        return self.lastPosition.shape[0]
+
+    def save(self, path):
+        '''Writes the state to a file, the old file is only replaced once the new one is written'''
+        lastTime = numpy.nan if self.lastTime is None else self.lastTime
+        with sePushPullFile.atomicWrite(path) as f:
+            f.write(_packHeader(STATE_MAGIC, self.numConstraints(), self.numFrames))
+            f.write(struct.pack('<d', lastTime))
+            f.write(numpy.ascontiguousarray(self.lastPosition, dtype='<f8').tobytes())
+
+    @classmethod
+    def load(cls, path):
+        '''Returns the state read from a file written by save'''
+        with open(path, 'rb') as f:
+            numConstraints, numFrames = _readHeader(f, path, STATE_MAGIC)
+            data = f.read(8 + numConstraints * 3 * 8)
+
+        if len(data) < 8 + numConstraints * 3 * 8:
+            raise ValueError('%s is missing some of the state.' % path)
+
+        lastTime = struct.unpack_from('<d', data)[0]
+        lastPosition = numpy.frombuffer(data, dtype='<f8', offset=8).reshape(numConstraints, 3)
+        return cls(lastPosition, None if numpy.isnan(lastTime) else lastTime, numFrames)
+
+    @classmethod
+    def fromTrajectory(cls, path):
+        '''Returns the state at the end of a trajectory cache file, the positions
+        in the cache are the same as the state the solve carries'''
+        trajectory = sePushPullTrajectory.sePushPullTrajectoryFile(path)
+        if not trajectory.numFrames:
+            raise ValueError('%s has no frames to carry on from.' % path)
+        lastTime = trajectory.frameRange()[1]
+        return cls(trajectory.positionsAt(lastTime), lastTime, trajectory.numFrames)
+
+def solveChunks(chunks, distance, startFrame, startPosition, push=True, pull=True, state=None):
+    '''Solves a stream of matrix chunks, yielding the (times, positions) of each chunk.
+
+    chunks - an iterator of (times, targetMatrices, parentMatrices) where times is
+             (frames,) and the matrices are (frames, constraints, 4, 4) world
+             matrices, the parent matrices can be one (constraints, 4, 4) for
+             every frame. Chunks of (frames, 4, 4) matrices are one constraint
+             and yield (frames, 3) positions.
+    distance, startFrame, push, pull - scalars or (constraints,) arrays
+    startPosition - (3,) or (constraints, 3) local start positions
+    state - a sePushPullStreamState to carry on from, it is updated after each
+            chunk so it can be saved between them
+
+    The positions are the same as solving every frame in one go with
+    sePushPullSolver.solve.
+    '''
+    for times, targetMatrices, parentMatrices in chunks:
+        targetMatrices = numpy.asarray(targetMatrices, dtype=numpy.float64)
+        parentMatrices = numpy.asarray(parentMatrices, dtype=numpy.float64)
+        times = numpy.asarray(times, dtype=numpy.float64)
+
+        single = targetMatrices.ndim == 3
+        if single:
+            targetMatrices = targetMatrices[:, None]
+            parentMatrices = parentMatrices[..., None, :, :]
+
+        if state is None:
+            numConstraints = targetMatrices.shape[1]
+            state = sePushPullStreamState(numpy.broadcast_to(numpy.asarray(startPosition, dtype=numpy.float64),
+                                                             (numConstraints, 3)))
+
+        positions = sePushPullSolver.solve(targetMatrices, parentMatrices, times, distance, startFrame,
+                                           startPosition, push, pull, state.lastPosition)
+
+        if times.shape[0]:
+            state.lastPosition = positions[-1].copy()
+            state.lastTime = float(times[-1])
+            state.numFrames += times.shape[0]
+
+        yield times, positions[:, 0] if single else positions
+
+def writeMatrixStream(path, chunks):
+    '''Writes (times, targetMatrices, parentMatrices) chunks to a matrix stream
+    file and returns the number of frames written'''
+    numFrames = 0
+    dtype = None
+    with open(path, 'wb') as f:
+        for times, targetMatrices, parentMatrices in chunks:
+            targetMatrices = numpy.asarray(targetMatrices, dtype=numpy.float64)
+            parentMatrices = numpy.asarray(parentMatrices, dtype=numpy.float64)
+            if targetMatrices.ndim == 3:
+                targetMatrices = targetMatrices[:, None]
+                parentMatrices = parentMatrices[..., None, :, :]
+            numConstraints = targetMatrices.shape[1]
+
+            if dtype is None:
+                dtype = recordType(numConstraints)
+                f.write(_packHeader(MATRIX_MAGIC, numConstraints, 0))
+            elif numConstraints != dtype['target'].shape[0]:
+                raise ValueError('The stream has %d constraints, got %d.' % (dtype['target'].shape[0], numConstraints))
+
+            records = numpy.empty(targetMatrices.shape[0], dtype=dtype)
+            records['time'] = times
+            records['target'] = targetMatrices
+            records['parent'] = parentMatrices
+            f.write(records.tobytes())
+            numFrames += records.shape[0]
+
+        if dtype is None:
+            raise ValueError('There are no chunks to write.')
+
+        # only set the frame count once the records are there
+        f.seek(_NUM_FRAMES_OFFSET)
+        f.write(struct.pack('<Q', numFrames))
+    return numFrames
+
+def readMatrixStream(path, chunkSize=4096, skipFrames=0):
+    '''Yields (times, targetMatrices, parentMatrices) chunks of up to chunkSize
+    frames from a matrix stream file, starting after skipFrames frames'''
+    with open(path, 'rb') as f:
+        numConstraints, numFrames = _readHeader(f, path, MATRIX_MAGIC)
+        dtype = recordType(numConstraints)
+
+        f.seek(HEADER_SIZE + skipFrames * dtype.itemsize)
+        for start in range(skipFrames, numFrames, chunkSize):
+            records = numpy.fromfile(f, dtype=dtype, count=min(chunkSize, numFrames - start))
+            if records.shape[0] < min(chunkSize, numFrames - start):
+                raise ValueError('%s is missing frames after frame %d.' % (path, start + records.shape[0]))
+            yield records['time'], records['target'], records['parent']
+
+def writeTrajectory(path, solvedChunks, append=False):
+    '''Writes the (times, positions) chunks from solveChunks to a trajectory cache
+    file as they are solved and returns the number of frames written. The
+    frames have to be one apart like the cache expects.'''
+    numFrames = 0
+    nextFrame = None
+    if append:
+        numConstraints, firstFrame, cachedFrames = sePushPullTrajectory.readHeader(path)
+        nextFrame = firstFrame + cachedFrames
+
+    for times, positions in solvedChunks:
+        if not times.shape[0]:
+            continue
+        if positions.ndim == 2:
+            positions = positions[:, None]
+
+        if numpy.any(numpy.diff(times) != 1.0) or (nextFrame is not None and times[0] != nextFrame):
+            raise ValueError('The trajectory cache needs frames one apart, got frame %g.' % times[0])
+
+        if nextFrame is None:
+            sePushPullTrajectory.write(path, times[0], positions)
+        else:
+            sePushPullTrajectory.append(path, positions)
+        nextFrame = times[-1] + 1.0
+        numFrames += times.shape[0]
+    return numFrames
+
+def solveFile(matrixPath, trajectoryPath, distance, startFrame, startPosition, push=True, pull=True,
+              chunkSize=4096, resume=True):
+    '''Solves a matrix stream file into a trajectory cache file a chunk at a time.
+
+    When resume is on and the cache already has frames the solve carries on
+    from the end of it, so a solve that was stopped part way can be run again.
+    Returns the number of frames solved.
+    '''
+    state = None
+    if resume and os.path.exists(trajectoryPath):
+        state = sePushPullStreamState.fromTrajectory(trajectoryPath)
+
+    skipFrames = state.numFrames if state is not None else 0
+    chunks = readMatrixStream(matrixPath, chunkSize, skipFrames)
+    solved = solveChunks(chunks, distance, startFrame, startPosition, push, pull, state)
+    return writeTrajectory(trajectoryPath, solved, append=state is not None)
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Solves a matrix stream file into a trajectory cache file.')
+    parser.add_argument('matrixFile')
+    parser.add_argument('trajectoryFile')
+    parser.add_argument('--distance', type=float, default=1.0)
+    parser.add_argument('--startFrame', type=float, default=0.0)
+    parser.add_argument('--startPosition', type=float, nargs=3, default=[0.0, 0.0, 0.0])
+    parser.add_argument('--noPush', action='store_true')
+    parser.add_argument('--noPull', action='store_true')
+    parser.add_argument('--chunk', type=int, default=4096, help='frames to solve at a time')
+    parser.add_argument('--restart', action='store_true', help='solve from the first frame again')
+    options = parser.parse_args(args)
+
+    numFrames = solveFile(options.matrixFile, options.trajectoryFile, options.distance, options.startFrame,
+                          options.startPosition, not options.noPush, not options.noPull, options.chunk,
+                          not options.restart)
+    print('solved %d frames into %s' % (numFrames, options.trajectoryFile))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
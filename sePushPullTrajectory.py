@@ -0,0 +1,220 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''On disk trajectory cache for solved sePushPullConstraint positions.
+
+The file is a 64 byte little endian header followed by the solved positions
+as contiguous float64 values in (frames, constraints, 3) order:
+
+    magic           8 bytes  'SEPPTRJ1'
+    version         uint32
+    numConstraints  uint32
+    firstFrame      float64
+    numFrames       uint64
+    padding         up to 64 bytes
+
+Frames are one apart starting at firstFrame. Reading memory maps the data so
+only the pages that are used get loaded and the OS page cache is shared by
+every process reading the same file. Frames can be appended to the end of an
+existing file as they are solved.
+
+Run this module to print the header of a cache file:
+
+    python sePushPullTrajectory.py cacheFile.sppc
+'''
+
+from __future__ import print_function
+
+import os
+import struct
+import sys
+
+import numpy
+
+MAGIC = b'SEPPTRJ1'
+VERSION = 1
+HEADER_FORMAT = '<8sIIdQ'
+HEADER_SIZE = 64
+
+_NUM_FRAMES_OFFSET = struct.calcsize('<8sIId')
+
+def _packHeader(numConstraints, firstFrame, numFrames):
+    '''Returns the header bytes padded to the header size'''
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, numConstraints, firstFrame, numFrames)
+    return header + b'\0' * (HEADER_SIZE - len(header))
+
+def readHeader(path):
+    '''Returns the (numConstraints, firstFrame, numFrames) from the file header'''
+    with open(path, 'rb') as f:
+        data = f.read(HEADER_SIZE)
+
+    if len(data) < HEADER_SIZE:
+        raise ValueError('%s is too small to be a trajectory cache.' % path)
+
+    magic, version, numConstraints, firstFrame, numFrames = struct.unpack_from(HEADER_FORMAT, data)
+    if magic != MAGIC:
+        raise ValueError('%s is not a trajectory cache.' % path)
+    if version != VERSION:
+        raise ValueError('%s has an unsupported version %d.' % (path, version))
+
+    return numConstraints, firstFrame, numFrames
+
+def _asPositions(positions):
+    '''Returns the positions as a contiguous little endian (frames, constraints, 3) array'''
+    positions = numpy.ascontiguousarray(positions, dtype='<f8')
+    if positions.ndim != 3 or positions.shape[2] != 3:
+        raise ValueError('positions must have the shape (frames, constraints, 3).')
+    return positions
+
+def write(path, firstFrame, positions):
+    '''Writes a new cache file, replacing any existing one.
+
+    positions - (frames, constraints, 3) solved positions starting at firstFrame
+    '''
+    positions = _asPositions(positions)
+    numFrames, numConstraints = positions.shape[:2]
+
+    with open(path, 'wb') as f:
+        f.write(_packHeader(numConstraints, firstFrame, numFrames))
+        f.write(positions.tobytes())
+
+def append(path, positions):
+    '''Appends frames to the end of an existing cache file.
+
+    positions - (frames, constraints, 3) solved positions for the frames
+                following the last frame in the file
+    '''
+    positions = _asPositions(positions)
+    numConstraints, firstFrame, numFrames = readHeader(path)
+    if positions.shape[1] != numConstraints:
+        raise ValueError('The cache has %d constraints, got %d.' % (numConstraints, positions.shape[1]))
+
+    with open(path, 'r+b') as f:
+        # drop anything past the last full frame before adding more
+        f.truncate(HEADER_SIZE + numFrames * numConstraints * 3 * 8)
+        f.seek(0, os.SEEK_END)
+        f.write(positions.tobytes())
+
+        # only update the frame count once the data is there
+        f.seek(_NUM_FRAMES_OFFSET)
+        f.write(struct.pack('<Q', numFrames + positions.shape[0]))
+
+def inspect(path):
+    '''Returns a dictionary describing the cache file'''
+    numConstraints, firstFrame, numFrames = readHeader(path)
+    return {'path': path,
+            'version': VERSION,
+            'numConstraints': numConstraints,
+            'firstFrame': firstFrame,
+            'lastFrame': firstFrame + numFrames - 1,
+            'numFrames': numFrames,
+            'fileSize': os.path.getsize(path)}
+
+class sePushPullTrajectoryFile(object):
+    '''Memory mapped reader of a trajectory cache file'''
+
+    def __init__(self, path):
+        self.path = path
+        self.numConstraints, self.firstFrame, self.numFrames = readHeader(path)
+
+        # remember what was mapped so appends to the file can be noticed
+        stat = os.stat(path)
+        self.fileStamp = (stat.st_mtime, stat.st_size)
+        self.checkedFrame = None
+
+        if self.numFrames:
+            self.positions = numpy.memmap(path, dtype='<f8', mode='r', offset=HEADER_SIZE,
+                                          shape=(self.numFrames, self.numConstraints, 3))
+        else:
+            self.positions = numpy.zeros((0, self.numConstraints, 3))
+
+    def isStale(self):
+        '''Returns True if the file changed since it was mapped'''
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return True
+        return (stat.st_mtime, stat.st_size) != self.fileStamp
+
+    def frameRange(self):
+        '''Returns the first and last frame in the file'''
+        return self.firstFrame, self.firstFrame + self.numFrames - 1
+
+    def positionsAt(self, frame, indices=None):
+        '''Returns the (constraints, 3) positions at the frame.
+
+        Frames outside of the file hold the first or last frame and frames in
+        between two cached frames are linearly interpolated.
+        '''
+        if not self.numFrames:
+            raise ValueError('%s has no frames.' % self.path)
+
+        offset = min(max(frame - self.firstFrame, 0.0), self.numFrames - 1.0)
+        low = int(offset)
+        high = min(low + 1, self.numFrames - 1)
+        weight = offset - low
+
+        if indices is None:
+            indices = slice(None)
+
+        result = numpy.array(self.positions[low, indices])
+        if weight > 0.0:
+            result += (self.positions[high, indices] - result) * weight
+        return result
+
+    def positionAt(self, frame, index):
+        '''Returns the (x, y, z) position of one constraint at the frame'''
+        return tuple(self.positionsAt(frame, [index])[0].tolist())
+
+def openTrajectoryFile(trajectoryFile, path, frame=None):
+    '''Returns the mapped trajectory cache file for the path, reusing the one
+    given if it is the same file and it has not changed. Returns None if the
+    file can not be read.
+
+    When the frame is given the file is only checked for changes the first
+    time at each frame, a node evaluated many times at the same frame does not
+    stat the file every time.'''
+    if trajectoryFile is not None and trajectoryFile.path == path:
+        if frame is not None and frame == trajectoryFile.checkedFrame:
+            return trajectoryFile
+        trajectoryFile.checkedFrame = frame
+        if not trajectoryFile.isStale():
+            return trajectoryFile
+
+    try:
+        trajectoryFile = sePushPullTrajectoryFile(path)
+    except (IOError, OSError, ValueError):
+        return None
+
+    # an empty file has nothing to look up
+    if not trajectoryFile.numFrames:
+        return None
+    trajectoryFile.checkedFrame = frame
+    return trajectoryFile
+
+def main(args):
+    '''Prints the header of every cache file given'''
+    if not args:
+        print(__doc__)
+        return 1
+
+    for path in args:
+        for key, value in sorted(inspect(path).items()):
+            print('%-16s %s' % (key, value))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,38 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Runs the tests with the stand-in maya package in benchmarks/fakeMaya, the
+plugin tests run once with each of the API 1.0 and 2.0 builds.'''
+
+import importlib
+import os
+import sys
+
+import pytest
+
+testDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(testDir), 'benchmarks', 'fakeMaya'))
+sys.path.insert(0, os.path.dirname(testDir))
+
+@pytest.fixture(params=['sePushPullConstraint', 'sePushPullConstraint2'])
+def plugin(request):
+    '''Loads the plugin build into a new scene and unloads it after the test'''
+    import maya.OpenMaya as OpenMaya
+    module = importlib.import_module(request.param)
+    OpenMaya.newScene()
+    module.initializePlugin(OpenMaya.MObject())
+    yield module
+    module.uninitializePlugin(OpenMaya.MObject())
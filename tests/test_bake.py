@@ -0,0 +1,117 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Tests baking the constraint to keys against playing the scene.
+
+The stand-in maya package only has MFnAnimCurve in OpenMayaAnim like Maya,
+so the bake fails here if it looks for it anywhere else.
+'''
+
+import pytest
+
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaMPx as OpenMayaMPx
+import maya.cmds as cmds
+
+def buildScene():
+    '''A keyed target pulling a constrained object along'''
+    OpenMaya.newScene()
+    cmds.createNode('transform', name='target')
+    cmds.createNode('transform', name='constrained')
+    cmds.setAttr('constrained.translate', 3, 0, 0)
+    cmds.setKeyframe('target', attribute='translateX', time=0, value=0)
+    cmds.setKeyframe('target', attribute='translateX', time=40, value=20)
+    cmds.setKeyframe('target', attribute='translateZ', time=20, value=-4)
+    OpenMayaMPx.runCommand('sePushPullConstraint', '-d', 2, '-sf', 5, 'target', 'constrained')
+
+def play(frames):
+    positions = []
+    for frame in frames:
+        cmds.currentTime(frame)
+        positions.append(tuple(cmds.getAttr('constrained.translate')[0]))
+    return positions
+
+def test_bakeKeysMatchPlayback(plugin):
+    assert not hasattr(OpenMaya, 'MFnAnimCurve')
+    buildScene()
+    played = play(range(30))
+
+    command = OpenMayaMPx.runCommand('sePushPullConstraint', '-b', 10, 29, 'sePushPullConstraint1')
+    assert command.currentResult() == ['sePushPullConstraint1']
+    assert cmds.listConnections('constrained.translateX')[0] != 'sePushPullConstraint1'
+
+    baked = play(range(10, 30))
+    assert max(abs(a - b) for position, expected in zip(baked, played[10:])
+               for a, b in zip(position, expected)) < 1e-9
+
+def test_bakeSubstepsMatchPlayback(plugin):
+    # a fast target going through the band of a constrained in a turning group
+    OpenMaya.newScene()
+    cmds.createNode('transform', name='target')
+    cmds.createNode('transform', name='group')
+    cmds.createNode('transform', name='constrained', parent='group')
+    cmds.setAttr('constrained.translate', 0, 0, 0.5)
+    for frame in range(0, 31, 3):
+        cmds.setKeyframe('target', attribute='translateX', time=frame, value=(-3, 3)[frame % 2])
+        cmds.setKeyframe('target', attribute='translateZ', time=frame, value=frame * 0.1)
+        cmds.setKeyframe('group', attribute='rotateY', time=frame, value=frame * 0.05)
+    OpenMayaMPx.runCommand('sePushPullConstraint', '-d', 1, '-sf', 2, 'target', 'constrained')
+    cmds.setAttr('sePushPullConstraint1.adaptiveSubsteps', True)
+    cmds.setAttr('sePushPullConstraint1.maxSubsteps', 16)
+    cmds.setAttr('sePushPullConstraint1.substepFraction', 0.05)
+    # push and pull off for a frame, the frame after it is not sub stepped
+    cmds.setKeyframe('sePushPullConstraint1', attribute='push', time=14, value=True)
+    cmds.setKeyframe('sePushPullConstraint1', attribute='push', time=15, value=False)
+    cmds.setKeyframe('sePushPullConstraint1', attribute='push', time=16, value=True)
+    cmds.setKeyframe('sePushPullConstraint1', attribute='pull', time=14, value=True)
+    cmds.setKeyframe('sePushPullConstraint1', attribute='pull', time=15, value=False)
+    cmds.setKeyframe('sePushPullConstraint1', attribute='pull', time=16, value=True)
+
+    played = []
+    taken = []
+    for frame in range(30):
+        cmds.currentTime(frame)
+        played.append(tuple(cmds.getAttr('constrained.translate')[0]))
+        taken.append(cmds.getAttr('sePushPullConstraint1.substepsTaken'))
+    assert max(taken) > 1
+
+    OpenMayaMPx.runCommand('sePushPullConstraint', '-b', 0, 29, 'sePushPullConstraint1')
+    baked = play(range(30))
+    assert max(abs(a - b) for position, expected in zip(baked, played)
+               for a, b in zip(position, expected)) < 1e-9
+
+def test_bakeRejectsFractionalFrames(plugin):
+    buildScene()
+    for bakeRange in ((10.5, 29), (10, 28.5)):
+        with pytest.raises(RuntimeError):
+            OpenMayaMPx.runCommand('sePushPullConstraint', '-b', bakeRange[0], bakeRange[1], 'sePushPullConstraint1')
+    assert cmds.listConnections('constrained.translate') == ['sePushPullConstraint1']
+
+def test_bakeRejectsTargetMesh(plugin):
+    # the bake solves from the target matrix alone, like the pre-roll
+    buildScene()
+    selection = OpenMaya.MSelectionList()
+    selection.add('sePushPullConstraint1')
+    nodeObj = OpenMaya.MObject()
+    selection.getDependNode(0, nodeObj)
+    data = OpenMaya.MFnMeshData().create()
+    points = [OpenMaya.MPoint(0, 0, 0), OpenMaya.MPoint(1, 0, 0), OpenMaya.MPoint(0, 1, 0)]
+    OpenMaya.MFnMesh().create(3, 1, points, [3], [0, 1, 2], data)
+    OpenMaya.MFnDependencyNode(nodeObj).findPlug('targetMesh').setMObject(data)
+
+    with pytest.raises(RuntimeError):
+        OpenMayaMPx.runCommand('sePushPullConstraint', '-b', 10, 29, 'sePushPullConstraint1')
+    assert cmds.listConnections('constrained.translate') == ['sePushPullConstraint1']
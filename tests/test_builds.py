@@ -0,0 +1,113 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Tests the API 1.0 and 2.0 builds give the same results for the same scene.'''
+
+import importlib
+import math
+
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaMPx as OpenMayaMPx
+import maya.cmds as cmds
+
+import sePushPullStats
+
+# the frames played, back to an earlier frame part way through
+FRAMES = list(range(0, 41)) + [12] + list(range(25, 31))
+
+# the single nodes and the attributes set on each
+SINGLES = [{},
+           {'useCache': True, 'checkpointInterval': 4},
+           {'adaptiveSubsteps': True, 'maxSubsteps': 8, 'substepFraction': 0.05},
+           {'stateless': True},
+           {'lodMode': 2, 'lodDistance': 50.0}]
+
+def buildScene():
+    '''A fast target going around single nodes with different options and a
+    multi node with a pusher, the camera backs away from frame 15 to 25'''
+    cmds.createNode('transform', name='target')
+    cmds.createNode('transform', name='camera')
+    for frame in range(0, 41, 2):
+        cmds.setKeyframe('target', attribute='translateX', time=frame, value=6 * math.sin(frame * 0.3))
+        cmds.setKeyframe('target', attribute='translateZ', time=frame, value=6 * math.cos(frame * 0.2))
+    for frame, z in ((0, 10), (15, 10), (25, 200), (40, 200)):
+        cmds.setKeyframe('camera', attribute='translateZ', time=frame, value=z)
+
+    for index, attrs in enumerate(SINGLES):
+        cmds.createNode('transform', name='constrained%d' % index)
+        cmds.setAttr('constrained%d.translate' % index, 4, 0, index * 0.5)
+        node = OpenMayaMPx.runCommand('sePushPullConstraint', '-d', 2.5, '-sf', 1, 'target',
+                                      'constrained%d' % index).currentResult()
+        cmds.connectAttr('camera.worldMatrix[0]', node + '.cameraMatrix')
+        for name, value in sorted(attrs.items()):
+            cmds.setAttr('%s.%s' % (node, name), value)
+
+    for index in range(3):
+        cmds.createNode('transform', name='multi%d' % index)
+        cmds.setAttr('multi%d.translate' % index, 1 + index, 0, index * 0.5)
+    multi = OpenMayaMPx.runCommand('sePushPullConstraint', '-m', '-d', 1.5, '-sf', 1, 'target',
+                                   'multi0', 'multi1', 'multi2').currentResult()
+    cmds.createNode('transform', name='pusher')
+    cmds.setAttr('pusher.translate', 3, 0, 0.3)
+    cmds.connectAttr('pusher.worldMatrix[0]', multi + '.pusher[0].pusherWorldMatrix')
+    cmds.setAttr(multi + '.pusher[0].pusherRadius', 1.0)
+
+def translate(name):
+    return tuple(cmds.getAttr(name + '.translate')[0])
+
+def runScene(moduleName):
+    '''Loads the build, plays and bakes the scene and returns everything read back'''
+    module = importlib.import_module(moduleName)
+    OpenMaya.newScene()
+    module.initializePlugin(OpenMaya.MObject())
+    try:
+        buildScene()
+        OpenMayaMPx.runCommand('sePushPullConstraint', '-resetStats')
+        sePushPullStats.enabled = True
+        try:
+            played = []
+            for frame in FRAMES:
+                cmds.currentTime(frame)
+                played.append([translate('constrained%d' % index) for index in range(len(SINGLES))] +
+                              [translate('multi%d' % index) for index in range(3)] +
+                              [cmds.getAttr('sePushPullConstraint3.substepsTaken')])
+        finally:
+            sePushPullStats.enabled = False
+
+        # the timings differ between the builds, the counters do not
+        stats = {}
+        for index in range(len(SINGLES)):
+            node = 'sePushPullConstraint%d' % (index + 1)
+            values = OpenMayaMPx.runCommand('sePushPullConstraint', '-q', '-stats', node).currentResult()
+            stats[node] = [label for label in values if label.split('=')[0].split('.')[1] not in ('totalTime', 'maxTime')]
+
+        OpenMayaMPx.runCommand('sePushPullConstraint', '-b', 0, 40, 'sePushPullConstraint1')
+        baked = []
+        for frame in range(41):
+            cmds.currentTime(frame)
+            baked.append(translate('constrained0'))
+        return played, stats, baked
+    finally:
+        module.uninitializePlugin(OpenMaya.MObject())
+
+def test_buildsMatch():
+    played, stats, baked = runScene('sePushPullConstraint')
+    assert (played, stats, baked) == runScene('sePushPullConstraint2')
+
+    # the scene moved the constrained objects and took sub steps, so the test means something
+    assert max(abs(position[0] - 4) for position in baked) > 1.0
+    assert max(values[-1] for values in played) > 1
+    assert played[0] != played[40]
@@ -0,0 +1,164 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Tests creating constraints in bulk and appending to a multi node, and that
+undo and redo give back exactly the same connections.'''
+
+import pytest
+
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaMPx as OpenMayaMPx
+import maya.cmds as cmds
+
+import sePushPullState
+
+def buildScene(numTransforms):
+    OpenMaya.newScene()
+    for index in range(numTransforms):
+        cmds.createNode('transform', name='target%d' % index)
+        cmds.createNode('transform', name='constrained%d' % index)
+        cmds.setAttr('constrained%d.translate' % index, index + 2, 0, 1)
+    cmds.setKeyframe('target0', attribute='translateX', time=0, value=0)
+    cmds.setKeyframe('target0', attribute='translateX', time=10, value=5)
+
+def sceneState():
+    '''Returns the nodes and every (destination, source) connection'''
+    connections = set()
+    for name in cmds.ls():
+        found = cmds.listConnections(name, destination=False, plugs=True, connections=True)
+        connections.update(zip(found[::2], found[1::2]))
+    return sorted(cmds.ls()), connections
+
+def arrayIndices(name):
+    selection = OpenMaya.MSelectionList()
+    selection.add(name.split('.')[0])
+    nodeObj = OpenMaya.MObject()
+    selection.getDependNode(0, nodeObj)
+    indices = OpenMaya.MIntArray()
+    OpenMaya.MFnDependencyNode(nodeObj).findPlug(name.split('.')[1]).getExistingArrayAttributeIndices(indices)
+    return list(indices)
+
+def test_pairs(plugin):
+    buildScene(3)
+    before = sceneState()
+    command = OpenMayaMPx.runCommand('sePushPullConstraint', '-p', '-d', 2, '-sf', 1, '-n', 'push',
+                                     'target0', 'constrained0', 'target1', 'constrained1', 'target2', 'constrained2')
+    assert command.currentResult() == ['push1', 'push2', 'push3']
+    after = sceneState()
+
+    for index in range(3):
+        node = 'push%d' % (index + 1)
+        assert cmds.listConnections(node + '.targetWorldMatrix', plugs=True) == ['target%d.worldMatrix[0]' % index]
+        assert cmds.listConnections('constrained%d.translate' % index, plugs=True) == [node + '.constraintTranslate']
+        assert cmds.getAttr(node + '.distance') == 2
+
+    command.undoIt()
+    assert sceneState() == before
+    command.redoIt()
+    assert sceneState() == after
+
+def test_pairsNeedTargetAndConstrained(plugin):
+    buildScene(2)
+    with pytest.raises(RuntimeError):
+        OpenMayaMPx.runCommand('sePushPullConstraint', '-p', 'target0', 'constrained0', 'target1')
+    with pytest.raises(RuntimeError):
+        OpenMayaMPx.runCommand('sePushPullConstraint', '-p', '-m', 'target0', 'constrained0')
+
+def test_nameOneNode(plugin):
+    buildScene(3)
+    command = OpenMayaMPx.runCommand('sePushPullConstraint', '-m', '-n', 'crowd', 'target0',
+                                     'constrained0', 'constrained1', 'constrained2')
+    assert command.currentResult() == 'crowd'
+    command = OpenMayaMPx.runCommand('sePushPullConstraint', '-n', 'single', 'target1', 'constrained1')
+    assert command.currentResult() == 'single'
+
+def test_appendUndoRedo(plugin):
+    buildScene(4)
+    multi = OpenMayaMPx.runCommand('sePushPullConstraint', '-m', '-d', 1.5, '-sf', 1, 'target0',
+                                   'constrained0', 'constrained1').currentResult()
+    for frame in range(5):
+        cmds.currentTime(frame)
+        cmds.getAttr('constrained0.translate')
+    before = sceneState()
+    lastPosition = cmds.getAttr(multi + '.lastPosition[0]')
+
+    command = OpenMayaMPx.runCommand('sePushPullConstraint', '-a', multi, '-d', 3, 'constrained2', 'constrained3')
+    assert command.currentResult() == multi
+    after = sceneState()
+    assert arrayIndices(multi + '.constraint') == [0, 1, 2, 3]
+    assert cmds.listConnections('constrained3.parentMatrix[0]', plugs=True) == [multi + '.constraint[3].constraintParentMatrix']
+    assert cmds.listConnections('constrained3.translate', plugs=True) == [multi + '.constraintTranslate[3]']
+    assert cmds.getAttr(multi + '.constraint[3].distance') == 3
+
+    # the added elements are taken out after the modifier broke their connections
+    for repeat in range(2):
+        command.undoIt()
+        assert sceneState() == before
+        for name in ('constraint', 'lastPosition', 'constraintTranslate'):
+            assert arrayIndices('%s.%s' % (multi, name)) == [0, 1]
+        assert cmds.getAttr(multi + '.lastPosition[0]') == lastPosition
+
+        command.redoIt()
+        assert sceneState() == after
+        assert arrayIndices(multi + '.constraint') == [0, 1, 2, 3]
+        assert cmds.getAttr(multi + '.constraint[2].distance') == 3
+
+def nodeState(name):
+    return [cmds.getAttr('%s.%s' % (name, field[0])) for field in sePushPullState.FIELDS]
+
+def test_stateStoreRoundTrip(plugin, tmpdir):
+    buildScene(3)
+    OpenMayaMPx.runCommand('sePushPullConstraint', '-p', '-d', 2, '-sf', 1, 'target0', 'constrained0',
+                           'target1', 'constrained1', 'target2', 'constrained2')
+    nodes = ['sePushPullConstraint1', 'sePushPullConstraint2', 'sePushPullConstraint3']
+    for index, name in enumerate(nodes):
+        cmds.setAttr(name + '.distance', index + 1.5)
+        cmds.setAttr(name + '.startFrame', index * 10)
+        cmds.setAttr(name + '.pull', bool(index % 2))
+
+    nodeFns = []
+    for name in nodes:
+        selection = OpenMaya.MSelectionList()
+        selection.add(name)
+        nodeObj = OpenMaya.MObject()
+        selection.getDependNode(0, nodeObj)
+        nodeFns.append(plugin.OpenMaya.MFnDependencyNode(nodeObj))
+    path = str(tmpdir.join('crowd.spps'))
+    plugin.readStateStore(nodeFns).save(path)
+    saved = [nodeState(name) for name in nodes]
+
+    for name in nodes:
+        cmds.setAttr(name + '.distance', 7)
+        cmds.setAttr(name + '.push', False)
+    changed = [nodeState(name) for name in nodes]
+
+    # the states in the reverse order, undone and redone by the command
+    command = OpenMayaMPx.runCommand('sePushPullConstraint', '-ls', path, '-si', 2, '-si', 1, '-si', 0, *nodes)
+    assert command.currentResult() == nodes
+    assert [nodeState(name) for name in nodes] == saved[::-1]
+    command.undoIt()
+    assert [nodeState(name) for name in nodes] == changed
+    command.redoIt()
+    assert [nodeState(name) for name in nodes] == saved[::-1]
+
+    # without the command the modifier done is returned to undo
+    modifier = plugin.writeStateStore(sePushPullState.sePushPullStateStore.load(path), nodeFns)
+    assert [nodeState(name) for name in nodes] == saved
+    modifier.undoIt()
+    assert [nodeState(name) for name in nodes] == saved[::-1]
+
+    with pytest.raises(RuntimeError):
+        OpenMayaMPx.runCommand('sePushPullConstraint', '-ls', path, '-si', 3, nodes[0])
@@ -0,0 +1,56 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Tests the state files are replaced whole and only once they are written.'''
+
+import numpy
+import pytest
+
+import sePushPullFile
+import sePushPullState
+import sePushPullStream
+
+def test_atomicWrite(tmpdir):
+    path = str(tmpdir.join('state'))
+    with sePushPullFile.atomicWrite(path) as f:
+        f.write(b'old')
+
+    # a failed write leaves the old file and no temporary file behind
+    with pytest.raises(ValueError):
+        with sePushPullFile.atomicWrite(path) as f:
+            f.write(b'new')
+            raise ValueError()
+    assert open(path, 'rb').read() == b'old'
+    assert tmpdir.listdir() == [tmpdir.join('state')]
+
+    with sePushPullFile.atomicWrite(path) as f:
+        f.write(b'new')
+    assert open(path, 'rb').read() == b'new'
+    assert tmpdir.listdir() == [tmpdir.join('state')]
+
+def test_stateFilesSaved(tmpdir):
+    store = sePushPullState.sePushPullStateStore(3)
+    store.lastPosition[:] = numpy.arange(9.0).reshape(3, 3)
+    store.save(str(tmpdir.join('crowd.spps')))
+    loaded = sePushPullState.sePushPullStateStore.load(str(tmpdir.join('crowd.spps')))
+    assert numpy.array_equal(loaded.lastPosition, store.lastPosition)
+
+    state = sePushPullStream.sePushPullStreamState(numpy.ones((2, 3)), 4.0, 5)
+    state.save(str(tmpdir.join('stream.state')))
+    loaded = sePushPullStream.sePushPullStreamState.load(str(tmpdir.join('stream.state')))
+    assert (loaded.lastTime, loaded.numFrames) == (4.0, 5)
+    assert numpy.array_equal(loaded.lastPosition, state.lastPosition)
+    assert len(tmpdir.listdir()) == 2
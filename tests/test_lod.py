@@ -0,0 +1,88 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Tests the camera driven level of detail of the node.'''
+
+import math
+
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaMPx as OpenMayaMPx
+import maya.cmds as cmds
+
+import sePushPullStats
+
+NODE = 'sePushPullConstraint1'
+
+def buildScene(lodMode, lodDistance=50.0):
+    '''A target going around the constrained while the camera backs away from
+    frame 15 to 25 and comes back from 35 to 45'''
+    OpenMaya.newScene()
+    cmds.createNode('transform', name='target')
+    cmds.createNode('transform', name='constrained')
+    cmds.createNode('transform', name='camera')
+    cmds.setAttr('constrained.translate', 4, 0, 0)
+    for frame in range(0, 61, 3):
+        cmds.setKeyframe('target', attribute='translateX', time=frame, value=6 * math.sin(frame * 0.3))
+        cmds.setKeyframe('target', attribute='translateZ', time=frame, value=6 * math.cos(frame * 0.2))
+    for frame, z in ((0, 10), (15, 10), (25, 200), (35, 200), (45, 10), (60, 10)):
+        cmds.setKeyframe('camera', attribute='translateZ', time=frame, value=z)
+    OpenMayaMPx.runCommand('sePushPullConstraint', '-d', 2.5, '-sf', 1, 'target', 'constrained')
+    cmds.connectAttr('camera.worldMatrix[0]', NODE + '.cameraMatrix')
+    cmds.setAttr(NODE + '.lodMode', lodMode)
+    cmds.setAttr(NODE + '.lodDistance', lodDistance)
+
+def play(frames):
+    positions = []
+    for frame in frames:
+        cmds.currentTime(frame)
+        positions.append(tuple(cmds.getAttr('constrained.translate')[0]))
+    return positions
+
+def playStats(frames):
+    '''Plays the frames with profiling on and returns the counters of the node'''
+    OpenMayaMPx.runCommand('sePushPullConstraint', '-resetStats')
+    sePushPullStats.enabled = True
+    try:
+        play(frames)
+    finally:
+        sePushPullStats.enabled = False
+    values = OpenMayaMPx.runCommand('sePushPullConstraint', '-q', '-stats', NODE).currentResult()
+    return sePushPullStats.parseLabels(values, NODE)
+
+def test_offMatchesSolve(plugin):
+    buildScene(0)
+    solved = play(range(61))
+    for lodMode in (1, 2):
+        buildScene(lodMode, lodDistance=1e6)
+        assert play(range(61)) == solved
+
+def test_lodCountedApart(plugin):
+    buildScene(1)
+    held = playStats(range(61))
+    assert held['lod'] > 0
+    assert held['pushPullOff'] == 0
+
+    buildScene(2)
+    reduced = playStats(range(61))
+    assert 0 < reduced['lod'] < held['lod']
+    assert reduced['pushPullOff'] == 0
+
+    # push and pull off is still counted on its own
+    buildScene(1)
+    cmds.setAttr(NODE + '.push', False)
+    cmds.setAttr(NODE + '.pull', False)
+    off = playStats(range(61))
+    assert off['pushPullOff'] == off['calls'] - off['beforeStartFrame'] - off['lod']
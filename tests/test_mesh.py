@@ -0,0 +1,171 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Tests the closest point lookups and the side of the surface on convex and
+concave meshes against brute force, and when the node reads the mesh.'''
+
+import math
+
+import numpy
+import pytest
+
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaMPx as OpenMayaMPx
+import maya.cmds as cmds
+
+import sePushPullMesh
+
+NODE = 'sePushPullConstraint1'
+
+def bumpySphere(bumps, rings=12, segments=16):
+    '''Returns the triangles and points of a closed sphere wound so the normals
+    face out, its radius goes in and out the given amount making it concave'''
+    theta = numpy.linspace(0.0, math.pi, rings + 1)[1:-1]
+    phi = numpy.linspace(0.0, 2.0 * math.pi, segments, endpoint=False)
+    t, p = numpy.meshgrid(theta, phi, indexing='ij')
+    radius = 1.0 + bumps * numpy.sin(3.0 * p) * numpy.sin(t) ** 2
+    ring = numpy.stack([radius * numpy.sin(t) * numpy.cos(p), radius * numpy.cos(t),
+                        radius * numpy.sin(t) * numpy.sin(p)], axis=-1).reshape(-1, 3)
+    points = numpy.concatenate([ring, [[0.0, 1.0, 0.0], [0.0, -1.0, 0.0]]])
+    top = len(points) - 2
+    bottom = top + 1
+
+    triangles = []
+    for s in range(segments):
+        n = (s + 1) % segments
+        triangles.append((top, n, s))
+        for r in range(rings - 2):
+            a, b = r * segments + s, r * segments + n
+            c, d = a + segments, b + segments
+            triangles.extend([(a, b, c), (b, d, c)])
+        last = (rings - 2) * segments
+        triangles.append((bottom, last + s, last + n))
+    return numpy.array(triangles), points
+
+def bruteClosest(query, triangles, points):
+    '''Returns the squared distance to the closest point on every triangle'''
+    best = float('inf')
+    for a, b, c in triangles.tolist():
+        x, y, z, feature = sePushPullMesh.closestPointOnTriangle(*(list(query) + list(points[a]) +
+                                                                   list(points[b]) + list(points[c])))
+        best = min(best, (x - query[0]) ** 2 + (y - query[1]) ** 2 + (z - query[2]) ** 2)
+    return best
+
+def windingNumber(queries, triangles, points):
+    '''Returns the winding number of the closed mesh around each point, about 1
+    inside and 0 outside, from the solid angles of its triangles'''
+    a = points[triangles[:, 0]][None] - queries[:, None]
+    b = points[triangles[:, 1]][None] - queries[:, None]
+    c = points[triangles[:, 2]][None] - queries[:, None]
+    la, lb, lc = [numpy.linalg.norm(v, axis=2) for v in (a, b, c)]
+    numerator = numpy.einsum('ijk,ijk->ij', a, numpy.cross(b, c))
+    denominator = (la * lb * lc + numpy.einsum('ijk,ijk->ij', a, b) * lc +
+                   numpy.einsum('ijk,ijk->ij', b, c) * la + numpy.einsum('ijk,ijk->ij', c, a) * lb)
+    return numpy.sum(2.0 * numpy.arctan2(numerator, denominator), axis=1) / (4.0 * math.pi)
+
+@pytest.mark.parametrize('bumps, rings, segments', [(0.0, 12, 16), (0.6, 6, 8)])
+def test_closestPointAndSide(bumps, rings, segments):
+    # on the coarse concave mesh the normal of the closest face alone gets the side wrong
+    triangles, points = bumpySphere(bumps, rings, segments)
+    bvh = sePushPullMesh.sePushPullMeshBVH(triangles, points)
+
+    random = numpy.random.RandomState(3)
+    directions = random.normal(size=(2000, 3))
+    directions /= numpy.linalg.norm(directions, axis=1)[:, None]
+    queries = directions * random.uniform(0.4, 1.6, size=(2000, 1))
+    inside = windingNumber(queries, triangles, points) > 0.5
+
+    corners = 0
+    for index, (query, isInside) in enumerate(zip(queries.tolist(), inside)):
+        distance, closest, triangle, feature = bvh.closestPoint(*query)
+        if index < 200:
+            assert abs(distance - bruteClosest(query, triangles, points)) < 1e-12
+        if distance < 1e-12:
+            continue
+
+        nx, ny, nz = bvh.pseudonormal(triangle, feature)
+        behind = (query[0] - closest[0]) * nx + (query[1] - closest[1]) * ny + (query[2] - closest[2]) * nz < 0.0
+        assert behind == isInside, (query, feature)
+        corners += feature != sePushPullMesh.FEATURE_FACE
+
+    # the sides were also tested at edges and points, not only inside the faces
+    assert corners > 10
+
+def test_refitKeepsPseudonormals():
+    triangles, points = bumpySphere(0.6, 6, 8)
+    moved = points * 1.5 + 0.25
+    bvh = sePushPullMesh.sePushPullMeshBVH(triangles, points)
+    bvh.refit(moved)
+    built = sePushPullMesh.sePushPullMeshBVH(triangles, moved)
+    assert numpy.allclose(bvh.pointNormals, built.pointNormals)
+    assert numpy.allclose(bvh.edgeNormals, built.edgeNormals)
+
+def meshData(points):
+    '''Returns a new mesh data object of a cube with the points'''
+    data = OpenMaya.MFnMeshData().create()
+    counts = [4] * 6
+    connects = [0, 1, 3, 2, 2, 3, 5, 4, 4, 5, 7, 6, 6, 7, 1, 0, 1, 7, 5, 3, 6, 0, 2, 4]
+    OpenMaya.MFnMesh().create(8, 6, points, counts, connects, data)
+    return data
+
+def cubePoints(size):
+    return [OpenMaya.MPoint(x * size, y * size, z * size) for z, y, x in
+            ((1, -1, -1), (1, -1, 1), (1, 1, -1), (1, 1, 1), (-1, 1, -1), (-1, 1, 1), (-1, -1, -1), (-1, -1, 1))]
+
+def test_meshOnlyReadWhenDirty(plugin, monkeypatch):
+    cmds.createNode('transform', name='target')
+    cmds.createNode('transform', name='constrained')
+    cmds.setAttr('constrained.translate', 0.5, 0, 0)
+    OpenMayaMPx.runCommand('sePushPullConstraint', '-d', 0.5, '-sf', 1, 'target', 'constrained')
+
+    selection = OpenMaya.MSelectionList()
+    selection.add(NODE)
+    nodeObj = OpenMaya.MObject()
+    selection.getDependNode(0, nodeObj)
+    meshPlug = OpenMaya.MFnDependencyNode(nodeObj).findPlug('targetMesh')
+    data = meshData(cubePoints(1.0))
+    meshPlug.setMObject(data)
+
+    reads = []
+    meshPoints = plugin.meshPoints
+    monkeypatch.setattr(plugin, 'meshPoints', lambda meshFn: reads.append(1) or meshPoints(meshFn))
+
+    def position(frame):
+        cmds.currentTime(frame)
+        return cmds.getAttr('constrained.translate')[0]
+
+    # pushed out in front of the cube face
+    assert abs(position(1)[0] - 1.5) < 1e-9
+    for frame in range(2, 6):
+        position(frame)
+    assert len(reads) == 1
+
+    # moving the points without the plug being dirtied is not seen
+    OpenMaya.MFnMesh(data).setPoints(cubePoints(2.0))
+    position(6)
+    assert len(reads) == 1
+
+    meshPlug.setMObject(data)
+    assert abs(position(7)[0] - 2.5) < 1e-9
+    assert len(reads) == 2
+
+def test_meshPointsReadInBulk(plugin):
+    points = [OpenMaya.MPoint(p.x + 0.1, p.y * 2.0, p.z - 3.7) for p in cubePoints(1.3)]
+    meshFn = plugin.OpenMaya.MFnMesh(meshData(points))
+    read = plugin.meshPoints(meshFn)
+    assert read.shape == (8, 3)
+    # the mesh keeps its points as floats
+    assert numpy.allclose(read, [(p.x, p.y, p.z) for p in points], rtol=0, atol=1e-6)
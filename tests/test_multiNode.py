@@ -0,0 +1,140 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Tests the multi node against a single node for each constrained element.'''
+
+import numpy
+
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaMPx as OpenMayaMPx
+import maya.cmds as cmds
+
+import sePushPullSolver
+
+def buildScene(numConstrained):
+    '''A keyed target near constrained objects in their own turning groups'''
+    OpenMaya.newScene()
+    cmds.createNode('transform', name='target')
+    keys = [(0, 0, 0), (2, 1, 0.4), (5, -1, 0.8), (1, 3, 0.2)]
+    for index, (x, z, rotation) in enumerate(keys):
+        cmds.setKeyframe('target', attribute='translateX', time=index * 20, value=x)
+        cmds.setKeyframe('target', attribute='translateZ', time=index * 20, value=z)
+    for index in range(numConstrained):
+        addConstrained(index)
+        for key, (x, z, rotation) in enumerate(keys):
+            cmds.setKeyframe('group%d' % index, attribute='rotateY', time=key * 20, value=rotation * (index + 1))
+
+def addConstrained(index):
+    cmds.createNode('transform', name='group%d' % index)
+    cmds.createNode('transform', name='multi%d' % index, parent='group%d' % index)
+    cmds.createNode('transform', name='single%d' % index, parent='group%d' % index)
+    for name in ('multi%d' % index, 'single%d' % index):
+        cmds.setAttr(name + '.translate', 1 + index, 0, index * 0.5)
+
+def createSingles(indices):
+    for index in indices:
+        OpenMayaMPx.runCommand('sePushPullConstraint', '-d', 1.5 + index * 0.25, '-sf', 3, 'target', 'single%d' % index)
+
+def translate(name):
+    return tuple(cmds.getAttr(name + '.translate')[0])
+
+def assertClose(position, expected):
+    assert max(abs(a - b) for a, b in zip(position, expected)) < 1e-9, (position, expected)
+
+def play(frames, indices):
+    '''Plays the frames checking each multi element against its single node'''
+    for frame in frames:
+        cmds.currentTime(frame)
+        for index in indices:
+            assertClose(translate('multi%d' % index), translate('single%d' % index))
+
+def createMulti(indices):
+    command = OpenMayaMPx.runCommand('sePushPullConstraint', '-m', '-d', 1.5, '-sf', 3, 'target',
+                                     *['multi%d' % index for index in indices])
+    # each element has its own distance like the single nodes
+    for element, index in enumerate(indices):
+        cmds.setAttr('%s.constraint[%d].distance' % (command.currentResult(), element), 1.5 + index * 0.25)
+    return command.currentResult()
+
+def test_multiMatchesSingles(plugin):
+    buildScene(4)
+    createSingles(range(4))
+    multi = createMulti(range(4))
+    assert multi == 'sePushPullMultiConstraint1'
+    play(range(70), range(4))
+
+    # the constrained objects moved, so the test means something
+    assert max(abs(a) for a in translate('multi0')) > 1.0
+
+def test_addAndRemoveElements(plugin):
+    buildScene(4)
+    createSingles(range(3))
+    multi = createMulti(range(3))
+    play(range(25), range(3))
+
+    # an element added part way starts from where it is, like a new single node
+    OpenMayaMPx.runCommand('sePushPullConstraint', '-a', multi, '-d', 2.25, 'multi3')
+    createSingles([3])
+    play(range(25, 50), range(4))
+
+    # removing an element leaves the others solving as before
+    for name in ('constraint', 'lastPosition', 'constraintTranslate'):
+        cmds.removeMultiInstance('%s.%s[1]' % (multi, name), b=True)
+    play(range(50, 80), [0, 2, 3])
+
+def test_pushersAfterSolve(plugin):
+    # the constrained objects are not parented, so their local positions are world positions
+    OpenMaya.newScene()
+    cmds.createNode('transform', name='target')
+    cmds.setKeyframe('target', attribute='translateX', time=0, value=0)
+    cmds.setKeyframe('target', attribute='translateX', time=30, value=6)
+    startPositions = numpy.array([[1.0, 0.0, 0.0], [3.0, 0.0, 0.5], [5.0, 0.0, -0.5]])
+    for index, position in enumerate(startPositions):
+        cmds.createNode('transform', name='multi%d' % index)
+        cmds.setAttr('multi%d.translate' % index, *position)
+    multi = OpenMayaMPx.runCommand('sePushPullConstraint', '-m', '-d', 1.5, '-sf', 0, 'target',
+                                   'multi0', 'multi1', 'multi2').currentResult()
+
+    pusherPositions = numpy.array([[3.0, 0.0, 0.3], [4.5, 0.0, -0.2]])
+    radii = numpy.array([1.0, 0.75])
+    pusherMatrices = numpy.tile(numpy.identity(4), (2, 1, 1))
+    pusherMatrices[:, 3, :3] = pusherPositions
+    for index, position in enumerate(pusherPositions):
+        cmds.createNode('transform', name='pusher%d' % index)
+        cmds.setAttr('pusher%d.translate' % index, *position)
+        cmds.connectAttr('pusher%d.worldMatrix[0]' % index, '%s.pusher[%d].pusherWorldMatrix' % (multi, index))
+        cmds.setAttr('%s.pusher[%d].pusherRadius' % (multi, index), radii[index])
+
+    positions = startPositions
+    for frame in range(31):
+        cmds.currentTime(frame)
+        targetMatrix = numpy.identity(4)
+        targetMatrix[3, :3] = translate('target')
+        positions = sePushPullSolver.solveFrame(positions, numpy.broadcast_to(targetMatrix, (3, 4, 4)),
+                                                numpy.broadcast_to(numpy.identity(4), (3, 4, 4)), frame, 1.5, 0,
+                                                startPositions)
+        # each pusher in turn moves the positions out of its radius
+        for pusher, radius in zip(pusherPositions, radii):
+            relative = positions - pusher
+            length = numpy.sqrt((relative * relative).sum(axis=1))
+            inside = length < radius
+            positions[inside] = pusher + relative[inside] * (radius / length[inside])[:, None]
+        for index in range(3):
+            assertClose(translate('multi%d' % index), positions[index])
+
+    # every constrained ended up out of the pushers
+    for pusher, radius in zip(pusherPositions, radii):
+        assert (numpy.sqrt(((positions - pusher) ** 2).sum(axis=1)) >= radius - 1e-9).all()
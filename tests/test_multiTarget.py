@@ -0,0 +1,72 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Tests the multi target solve against chaining a node for each target.'''
+
+import numpy
+import pytest
+
+import sePushPullSolver
+
+def targetMatrices(targetPositions):
+    '''Returns the (targets, 4, 4) matrices of the positions'''
+    matrices = numpy.tile(numpy.identity(4), (len(targetPositions), 1, 1))
+    matrices[:, 3, :3] = targetPositions
+    return matrices
+
+def chained(positions, targetPositions, radius):
+    '''Pushes each point out of the targets one after the other like a chain of nodes'''
+    result = numpy.array(positions, dtype=numpy.float64)
+    for point in result:
+        for target, r in zip(targetPositions, radius):
+            relative = point - target
+            length = numpy.sqrt(relative.dot(relative))
+            if length < r:
+                point[:] = target + (relative * r / length if length else 0.0)
+    return result
+
+@pytest.mark.parametrize('bruteForce', [True, False, None])
+def test_pushedIntoLaterTarget(bruteForce):
+    # the first target pushes the point into the second, which it was not inside at the start
+    targetPositions = numpy.array([[0.0, 0.0, 0.0], [1.5, 0.0, 0.0]])
+    radius = numpy.array([1.0, 1.0])
+    positions = numpy.array([[0.2, 0.0, 0.0]])
+
+    result = sePushPullSolver.solveMultiTargetFrame(positions, targetMatrices(targetPositions), radius,
+                                                    bruteForce=bruteForce)
+    assert numpy.allclose(result, chained(positions, targetPositions, radius))
+    assert numpy.allclose(result, [[0.5, 0.0, 0.0]])
+
+@pytest.mark.parametrize('bruteForce', [True, False])
+def test_matchesChain(bruteForce):
+    random = numpy.random.RandomState(1)
+    positions = random.uniform(0.0, 10.0, (300, 3))
+    targetPositions = random.uniform(0.0, 10.0, (60, 3))
+    radius = random.uniform(0.5, 2.0, 60)
+
+    result = sePushPullSolver.solveMultiTargetFrame(positions, targetMatrices(targetPositions), radius,
+                                                    bruteForce=bruteForce)
+    assert numpy.allclose(result, chained(positions, targetPositions, radius))
+
+def test_farApartTargets():
+    # the cell keys of a grid with cells the size of the radius would overflow
+    targetPositions = numpy.array([[0.0, 0.0, 0.0], [1e15, 1e15, 1e15], [-1e15, 0.0, 1e15]])
+    radius = numpy.full(3, 1e-3)
+    points = numpy.array([[0.0, 0.0, 5e-4], [1e15, 1e15, 1e15], [1.0, 0.0, 0.0], [1e300, 0.0, 0.0]])
+
+    expected = sePushPullSolver.findTargetPairsBruteForce(points, targetPositions, radius)
+    result = sePushPullSolver.findTargetPairs(points, targetPositions, radius)
+    assert [list(a) for a in result] == [list(a) for a in expected] == [[0, 1], [0, 1]]
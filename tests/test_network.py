@@ -0,0 +1,64 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Tests solving networks of constraints in a pool of processes.'''
+
+import multiprocessing
+import sys
+
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+import sePushPullNetwork
+
+def buildNetwork(numChains=4, numLinks=3, numFrames=20):
+    '''Returns chains that do not depend on each other, the first links follow a
+    target going around a circle and the others target the link before'''
+    numConstraints = numChains * numLinks
+    frames = numpy.arange(numFrames, dtype=numpy.float64)
+    links = numpy.tile(numpy.arange(numLinks), numChains)
+    firstLinks = links == 0
+    targetDrivers = numpy.where(firstLinks, -1, numpy.arange(numConstraints) - 1)
+
+    angles = 0.3 * frames[:, None] + numpy.arange(numChains)[None, :]
+    targetMatrices = numpy.broadcast_to(numpy.identity(4), (numFrames, numConstraints, 4, 4)).copy()
+    targetMatrices[:, firstLinks, 3, 0] = 10.0 * numpy.cos(angles)
+    targetMatrices[:, firstLinks, 3, 2] = 10.0 * numpy.sin(angles)
+
+    identities = numpy.broadcast_to(numpy.identity(4), (numFrames, numConstraints, 4, 4))
+    startPositions = numpy.column_stack([links + 1.0, numpy.zeros(numConstraints), numpy.zeros(numConstraints)])
+    return sePushPullNetwork.sePushPullNetwork(frames, targetDrivers, targetMatrices, numpy.full(numConstraints, -1),
+                                               identities, identities, numpy.ones((numConstraints, 3), dtype=bool),
+                                               numpy.zeros((numFrames, numConstraints, 3)),
+                                               numpy.full((numFrames, numConstraints), 1.0),
+                                               numpy.ones((numFrames, numConstraints), dtype=bool),
+                                               numpy.ones((numFrames, numConstraints), dtype=bool),
+                                               numpy.zeros(numConstraints), startPositions)
+
+@pytest.mark.skipif(not hasattr(multiprocessing, 'get_context'), reason='needs a spawn context')
+def test_poolInsideMaya(monkeypatch):
+    # inside Maya the pool spawns mayapy, here the running Python stands in for
+    # it, and the executable other tools spawn is put back
+    from multiprocessing import spawn
+    executable = spawn.get_executable()
+    startMethod = multiprocessing.get_start_method()
+    monkeypatch.setattr(sePushPullNetwork, '_mayapyPath', lambda: sys.executable)
+
+    network = buildNetwork()
+    assert numpy.array_equal(network.solve(2), network.solve(1))
+    assert spawn.get_executable() == executable
+    assert multiprocessing.get_start_method() == startMethod
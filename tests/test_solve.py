@@ -0,0 +1,89 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Tests the single constraint solve with parents that can not be inverted.'''
+
+import math
+
+import sePushPullMath
+import sePushPullPreroll
+
+def parentMatrix(scale, angle=0.0, translation=(1.0, 2.0, 3.0)):
+    '''Returns the 16 values of a parent scaled and rotated about y'''
+    c = math.cos(angle) * scale
+    s = math.sin(angle) * scale
+    return (c, 0.0, -s, 0.0,
+            0.0, scale, 0.0, 0.0,
+            s, 0.0, c, 0.0,
+            translation[0], translation[1], translation[2], 1.0)
+
+def test_inverseOnlyWhenCorrecting():
+    parentSpace = sePushPullMath.sePushPullParentSpace()
+    for frame in range(10):
+        parentSpace.update(parentMatrix(1.0, frame * 0.1))
+        # inside the band nothing is corrected
+        assert sePushPullMath.solvePosition((0.0, 0.0, 0.0), (2.0, 2.0, 3.0), parentSpace, 1.0, True, True) is None
+    assert parentSpace.inversions == 0
+
+    parentSpace.update(parentMatrix(2.0, 0.5))
+    position = sePushPullMath.solvePosition((0.0, 0.0, 0.0), (5.0, 2.0, 3.0), parentSpace, 1.0, True, True)
+    world = sePushPullMath.worldPosition(position, parentSpace)
+    assert abs(math.sqrt((world[0] - 5.0) ** 2 + (world[1] - 2.0) ** 2 + (world[2] - 3.0) ** 2) - 1.0) < 1e-12
+    assert parentSpace.inversions == 1
+
+def test_singularParentHolds():
+    parentSpace = sePushPullMath.sePushPullParentSpace()
+    parentSpace.update(parentMatrix(0.0))
+    assert sePushPullMath.solvePosition((1.0, 0.0, 0.0), (5.0, 0.0, 0.0), parentSpace, 1.0, True, True) is None
+
+    # the parent coming back is solved as normal
+    parentSpace.update(parentMatrix(1.0))
+    assert sePushPullMath.solvePosition((1.0, 0.0, 0.0), (5.0, 0.0, 0.0), parentSpace, 1.0, True, True) is not None
+
+def test_prerollSingularParent():
+    # a parent scaled to nothing part way through holds the position, the
+    # frames after it are still solved
+    preroll = sePushPullPreroll.sePushPullPreroll()
+    preroll.setRange(1.0, (0.0, 0.0, 0.0), 10.0)
+    inputs = []
+    for frame in range(1, 11):
+        scale = 0.0 if 4 <= frame <= 6 else 1.0
+        inputs.append(sePushPullMath.inputKey((frame * 2.0, 0.0, 0.0),
+                                              parentMatrix(scale, translation=(0.0, 0.0, 0.0)), 1.0, True, True))
+    assert preroll.addInputs(1.0, inputs)
+    while preroll.solveNext(3):
+        pass
+
+    assert len(preroll.positions) == 10
+    assert preroll.positions[3] == preroll.positions[2] == preroll.positions[5]
+    assert preroll.positions[9] == (19.0, 0.0, 0.0)
+
+def test_inputKeyLayout():
+    key = sePushPullMath.inputKey((5.0, 2.0, 3.0), parentMatrix(2.0, 0.5), 1.5, True, True)
+    assert key[sePushPullMath.KEY_TARGET] == (5.0, 2.0, 3.0)
+    assert key[sePushPullMath.KEY_PARENT] == parentMatrix(2.0, 0.5)
+    assert key[sePushPullMath.KEY_DISTANCE] == 1.5
+    assert key[sePushPullMath.KEY_PUSH] is True
+    assert key[sePushPullMath.KEY_PULL] is True
+
+    # solving a key is the same as solving its inputs, nothing moves without push or pull
+    parentSpace = sePushPullMath.sePushPullParentSpace()
+    parentSpace.update(parentMatrix(2.0, 0.5))
+    expected = sePushPullMath.solvePosition((0.0, 0.0, 0.0), (5.0, 2.0, 3.0), parentSpace, 1.5, True, True)
+    assert expected is not None
+    assert sePushPullMath.solveInputKey((0.0, 0.0, 0.0), key, sePushPullMath.sePushPullParentSpace()) == expected
+    still = sePushPullMath.inputKey((5.0, 2.0, 3.0), parentMatrix(2.0, 0.5), 1.5, False, False)
+    assert sePushPullMath.solveInputKey((0.0, 0.0, 0.0), still, parentSpace) == (0.0, 0.0, 0.0)
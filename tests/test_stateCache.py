@@ -0,0 +1,211 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Tests the state cache, stateless evaluation and pre-roll of the node
+against playing every frame in order.'''
+
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaMPx as OpenMayaMPx
+import maya.cmds as cmds
+
+def buildScene(useCache, stateless=False):
+    '''A target going back and forth past a constrained object in a rotating group'''
+    OpenMaya.newScene()
+    cmds.createNode('transform', name='target')
+    cmds.createNode('transform', name='group')
+    cmds.createNode('transform', name='constrained', parent='group')
+    cmds.setAttr('constrained.translate', 4, 0, 0)
+    keys = [(0, 0, 0), (3, 1, 0.2), (6, -1, 0.5), (8, 2, 0.4), (5, 5, 0.1), (1, 3, 0.0)]
+    for index, (x, z, rotation) in enumerate(keys):
+        cmds.setKeyframe('target', attribute='translateX', time=index * 20, value=x)
+        cmds.setKeyframe('target', attribute='translateZ', time=index * 20, value=z)
+        cmds.setKeyframe('group', attribute='rotateY', time=index * 20, value=rotation)
+    OpenMayaMPx.runCommand('sePushPullConstraint', '-d', 2.5, '-sf', 1, 'target', 'constrained')
+    cmds.setAttr('sePushPullConstraint1.useCache', useCache)
+    cmds.setAttr('sePushPullConstraint1.stateless', stateless)
+
+def play(frames):
+    '''Returns the constrained translation at the frames, evaluated in the order given'''
+    positions = {}
+    for frame in frames:
+        cmds.currentTime(frame)
+        positions[frame] = tuple(cmds.getAttr('constrained.translate')[0])
+    return positions
+
+def assertClose(position, expected):
+    assert max(abs(a - b) for a, b in zip(position, expected)) < 1e-9, (position, expected)
+
+def settle():
+    '''Samples what the nodes are missing like Maya does while it is idle'''
+    import sePushPullPreroll
+    while OpenMaya.idle():
+        pass
+    sePushPullPreroll.worker.wait()
+
+def test_cacheMatchesSerial(plugin):
+    buildScene(False)
+    serial = play(range(101))
+    buildScene(True)
+    cached = play(range(101))
+    for frame in serial:
+        assertClose(cached[frame], serial[frame])
+
+def test_keyEditBeforeCachedFrame(plugin):
+    # every frame is cached, then a key before the last frame is moved and
+    # the time jumps past it without evaluating the frames in between, their
+    # inputs are sampled again while Maya is idle
+    buildScene(True)
+    before = play(range(101))[100]
+    cmds.setKeyframe('target', attribute='translateX', time=55, value=-3)
+    settle()
+    jumped = play([100])[100]
+
+    buildScene(False)
+    cmds.setKeyframe('target', attribute='translateX', time=55, value=-3)
+    serial = play(range(101))[100]
+
+    assert max(abs(a - b) for a, b in zip(before, serial)) > 1e-3
+    assertClose(jumped, serial)
+
+def test_keyEditKeepsEarlierFrames(plugin):
+    buildScene(False)
+    cmds.setKeyframe('target', attribute='translateX', time=60, value=-3)
+    serial = play(range(101))
+
+    # a second constraint that the edited curve does not drive
+    buildScene(True)
+    cmds.createNode('transform', name='other')
+    cmds.createNode('transform', name='otherConstrained')
+    cmds.setKeyframe('other', attribute='translateX', time=0, value=0)
+    cmds.setKeyframe('other', attribute='translateX', time=100, value=10)
+    OpenMayaMPx.runCommand('sePushPullConstraint', '-d', 1, '-sf', 1, 'other', 'otherConstrained')
+    cmds.setAttr('sePushPullConstraint2.useCache', True)
+    for frame in range(101):
+        cmds.currentTime(frame)
+        cmds.getAttr('constrained.translate')
+        cmds.getAttr('otherConstrained.translate')
+    settle()
+    node = userNode('sePushPullConstraint1')
+    otherNode = userNode('sePushPullConstraint2')
+    otherCached = len(otherNode.stateCache)
+    assert otherCached == 100
+
+    # the curve is the same up to the key two before the edited one at frame 20,
+    # the frames from the start frame up to it are kept
+    cmds.setKeyframe('target', attribute='translateX', time=60, value=-3)
+    assert len(otherNode.stateCache) == otherCached
+    assert not otherNode.inputHistory.requested
+    assert len(node.stateCache) == 19
+    assert node.stateCache.nearest(100)[0] == 19
+    assert min(node.inputHistory.requested) == 20
+
+    settle()
+    assertClose(play([100])[100], serial[100])
+
+def test_statelessAnyOrderAfterKeyEdit(plugin):
+    buildScene(False)
+    cmds.setKeyframe('target', attribute='translateX', time=55, value=-3)
+    serial = play(range(101))
+
+    # frames solved before the edit are not used after it, whatever the order
+    buildScene(False, stateless=True)
+    play(range(101))
+    cmds.setKeyframe('target', attribute='translateX', time=55, value=-3)
+    settle()
+    backwards = play(range(100, -1, -1))
+    for frame in serial:
+        assertClose(backwards[frame], serial[frame])
+
+def test_prerollKeyEditThenJump(plugin):
+    import maya.OpenMayaAnim as OpenMayaAnim
+
+    buildScene(False)
+    cmds.setKeyframe('target', attribute='translateX', time=55, value=-3)
+    serial = play(range(101))
+
+    buildScene(False)
+    OpenMayaAnim.MAnimControl.setMinMaxTime(OpenMaya.MTime(0.0), OpenMaya.MTime(100.0))
+    cmds.setAttr('sePushPullConstraint1.preroll', True)
+    play([0])
+    settle()
+
+    # the frames after the key are solved again without evaluating its frame
+    cmds.setKeyframe('target', attribute='translateX', time=55, value=-3)
+    play([100])
+    settle()
+    assertClose(play([100])[100], serial[100])
+
+def userNode(name):
+    selection = OpenMaya.MSelectionList()
+    selection.add(name)
+    nodeObj = OpenMaya.MObject()
+    selection.getDependNode(0, nodeObj)
+    return OpenMaya.MFnDependencyNode(nodeObj).userNode()
+
+def test_disconnectClearsCache(plugin):
+    buildScene(False)
+    cmds.disconnectAttr('target.worldMatrix[0]', 'sePushPullConstraint1.targetWorldMatrix')
+    serial = play(range(101))[100]
+
+    buildScene(True)
+    play(range(101))
+    assert len(userNode('sePushPullConstraint1').stateCache)
+    cmds.disconnectAttr('target.worldMatrix[0]', 'sePushPullConstraint1.targetWorldMatrix')
+    assert not len(userNode('sePushPullConstraint1').stateCache)
+    settle()
+    assertClose(play([100])[100], serial)
+
+def test_otherFramesOnlyReadWhenIdle(plugin, monkeypatch):
+    buildScene(False)
+    serial = play(range(61))
+
+    # the inputs of other frames are not read inside compute, so stateless
+    # nodes can be evaluated at the same time as each other
+    buildScene(False, stateless=True)
+    node = userNode('sePushPullConstraint1')
+    assert node.schedulingType() == type(node).kParallel
+
+    def inputsAtTime(time):
+        raise AssertionError('inputs read at another frame inside compute')
+    monkeypatch.setattr(node, 'inputsAtTime', inputsAtTime)
+
+    # jumping ahead solves on from the start position until the frames before are sampled
+    play([60])
+    assert node.inputHistory.requested
+    monkeypatch.undo()
+    settle()
+    assert not node.inputHistory.requested
+
+    monkeypatch.setattr(node, 'inputsAtTime', inputsAtTime)
+    for frame, position in play(range(60, -1, -7)).items():
+        assertClose(position, serial[frame])
+
+    cmds.setAttr('sePushPullConstraint1.stateless', False)
+    assert node.schedulingType() == type(node).kSerial
+    cmds.setAttr('sePushPullConstraint1.useCache', True)
+    assert node.schedulingType() == type(node).kSerial
+
+def test_checkpointsCapped():
+    import sePushPullCache
+    cache = sePushPullCache.sePushPullStateCache(checkpointInterval=2, maxFrames=3, maxCheckpoints=5)
+    cache.setParameters(0.0, None)
+    for frame in range(40):
+        cache.store(float(frame), frame, (frame, 0.0, 0.0))
+    # a checkpoint read again is kept over the older ones
+    cache.lookup(30.0, 30)
+    cache.store(40.0, 40, (40, 0.0, 0.0))
+    assert sorted(cache.checkpoints) == [30.0, 34.0, 36.0, 38.0, 40.0]
+    assert sorted(cache.frames) == [35.0, 37.0, 39.0]
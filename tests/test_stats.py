@@ -0,0 +1,83 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Tests the evaluation counters are kept per node and dropped with it.'''
+
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaMPx as OpenMayaMPx
+import maya.cmds as cmds
+
+import sePushPullStats
+
+NODE = 'sePushPullConstraint1'
+
+def buildConstraint():
+    cmds.createNode('transform', name='target')
+    cmds.createNode('transform', name='constrained')
+    cmds.setAttr('constrained.translate', 4, 0, 0)
+    OpenMayaMPx.runCommand('sePushPullConstraint', '-d', 2.5, '-sf', 1, 'target', 'constrained')
+
+def calls(name):
+    values = OpenMayaMPx.runCommand('sePushPullConstraint', '-q', '-stats', name).currentResult()
+    return sePushPullStats.parseLabels(values, name)['calls']
+
+def test_deletedNodeStatsDropped(plugin):
+    buildConstraint()
+    sePushPullStats.enabled = True
+    try:
+        for frame in range(1, 11):
+            cmds.currentTime(frame)
+            cmds.getAttr('constrained.translate')
+    finally:
+        sePushPullStats.enabled = False
+    assert calls(NODE) >= 10
+
+    selection = OpenMaya.MSelectionList()
+    selection.add(NODE)
+    nodeObj = OpenMaya.MObject()
+    selection.getDependNode(0, nodeObj)
+    key = OpenMaya.MFnDependencyNode(nodeObj).uuid().asString()
+    assert key in sePushPullStats.nodeStats
+
+    # a new node with the same name starts from nothing
+    cmds.delete(NODE)
+    assert key not in sePushPullStats.nodeStats
+    cmds.delete('target', 'constrained')
+    buildConstraint()
+    assert calls(NODE) == 0
+
+def test_statsLabeled(plugin):
+    buildConstraint()
+    OpenMayaMPx.runCommand('sePushPullConstraint', '-resetStats')
+    sePushPullStats.enabled = True
+    try:
+        for frame in range(1, 6):
+            cmds.currentTime(frame)
+            cmds.getAttr('constrained.translate')
+    finally:
+        sePushPullStats.enabled = False
+
+    # node.field=value for each node asked for, in the FIELDS order
+    labels = OpenMayaMPx.runCommand('sePushPullConstraint', '-q', '-stats', NODE, NODE).currentResult()
+    fields = ['%s.%s' % (NODE, field) for field in sePushPullStats.FIELDS]
+    assert [label.split('=')[0] for label in labels] == fields * 2
+    nodeCalls = sePushPullStats.parseLabels(labels, NODE)['calls']
+    assert nodeCalls >= 5
+
+    labels = OpenMayaMPx.runCommand('sePushPullConstraint', '-q', '-stats').currentResult()
+    assert [label.split('=')[0] for label in labels] == list(sePushPullStats.FIELDS)
+    assert sePushPullStats.parseLabels(labels)['calls'] == nodeCalls
+    assert sePushPullStats.parseLabels(labels, NODE) == {}
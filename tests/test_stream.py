@@ -0,0 +1,105 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Tests the streaming solve gives the same positions as solving the whole
+take at once, however it is chunked or stopped and carried on.'''
+
+import numpy
+import pytest
+
+import sePushPullSolver
+import sePushPullStream
+
+NUM_FRAMES = 103
+
+def take(numConstraints=3):
+    '''Returns the times, target and parent matrices of targets moving around
+    constraints in parents turning about y'''
+    times = numpy.arange(NUM_FRAMES, dtype=numpy.float64)
+    targets = numpy.tile(numpy.eye(4), (NUM_FRAMES, numConstraints, 1, 1))
+    parents = numpy.tile(numpy.eye(4), (NUM_FRAMES, numConstraints, 1, 1))
+    for index in range(numConstraints):
+        phase = times * (0.1 + index * 0.03)
+        targets[:, index, 3, 0] = numpy.sin(phase) * (4.0 + index)
+        targets[:, index, 3, 2] = numpy.cos(phase * 0.7) * 3.0
+        angle = times * 0.02 * (index + 1)
+        parents[:, index, 0, 0] = parents[:, index, 2, 2] = numpy.cos(angle)
+        parents[:, index, 0, 2] = -numpy.sin(angle)
+        parents[:, index, 2, 0] = numpy.sin(angle)
+        parents[:, index, 3, :3] = (index, 0.5, -index)
+    return times, targets, parents
+
+def chunked(chunkSize, times, targets, parents, start=0):
+    for first in range(start, len(times), chunkSize):
+        last = first + chunkSize
+        yield times[first:last], targets[first:last], parents[first:last]
+
+DISTANCE = numpy.array([2.0, 1.5, 3.0])
+START_FRAME = numpy.array([0.0, 5.0, 10.0])
+START_POSITION = numpy.array([[3.0, 0.0, 0.0], [0.0, 0.0, 2.0], [-1.0, 1.0, 0.0]])
+
+@pytest.mark.parametrize('chunkSize', [1, 7, 10, 64, 200])
+def test_chunksMatchSolve(chunkSize):
+    times, targets, parents = take()
+    expected = sePushPullSolver.solve(targets, parents, times, DISTANCE, START_FRAME, START_POSITION)
+
+    solved = list(sePushPullStream.solveChunks(chunked(chunkSize, times, targets, parents),
+                                               DISTANCE, START_FRAME, START_POSITION))
+    assert sum(len(chunkTimes) for chunkTimes, positions in solved) == NUM_FRAMES
+    assert numpy.array_equal(numpy.concatenate([positions for chunkTimes, positions in solved]), expected)
+
+def test_resumeFromState(tmpdir):
+    times, targets, parents = take()
+    expected = sePushPullSolver.solve(targets, parents, times, DISTANCE, START_FRAME, START_POSITION)
+
+    # stop after the chunk ending on frame 41 and carry on from the saved state
+    state = sePushPullStream.sePushPullStreamState(START_POSITION)
+    solved = sePushPullStream.solveChunks(chunked(6, times[:42], targets[:42], parents[:42]),
+                                          DISTANCE, START_FRAME, START_POSITION, state=state)
+    first = numpy.concatenate([positions for chunkTimes, positions in solved])
+    state.save(str(tmpdir.join('stream.state')))
+
+    state = sePushPullStream.sePushPullStreamState.load(str(tmpdir.join('stream.state')))
+    assert (state.lastTime, state.numFrames) == (41.0, 42)
+    solved = sePushPullStream.solveChunks(chunked(9, times, targets, parents, state.numFrames),
+                                          DISTANCE, START_FRAME, START_POSITION, state=state)
+    rest = numpy.concatenate([positions for chunkTimes, positions in solved])
+    assert numpy.array_equal(numpy.concatenate([first, rest]), expected)
+
+def test_resumeFromTrajectory(tmpdir):
+    times, targets, parents = take()
+    expected = sePushPullSolver.solve(targets, parents, times, DISTANCE, START_FRAME, START_POSITION)
+
+    matrixPath = str(tmpdir.join('take.sppm'))
+    cachePath = str(tmpdir.join('take.sppc'))
+    sePushPullStream.writeMatrixStream(matrixPath, chunked(11, times, targets, parents))
+
+    # a solve that stopped part way leaves the frames it finished in the cache
+    sePushPullStream.writeTrajectory(cachePath, sePushPullStream.solveChunks(
+        chunked(8, times[:30], targets[:30], parents[:30]), DISTANCE, START_FRAME, START_POSITION))
+    assert sePushPullStream.solveFile(matrixPath, cachePath, DISTANCE, START_FRAME, START_POSITION,
+                                      chunkSize=13) == NUM_FRAMES - 30
+
+    trajectory = sePushPullStream.sePushPullTrajectory.sePushPullTrajectoryFile(cachePath)
+    assert trajectory.frameRange() == (0.0, NUM_FRAMES - 1.0)
+    solved = numpy.array([trajectory.positionsAt(frame) for frame in times])
+    assert numpy.array_equal(solved, expected)
+
+    # solving from the start again gives the same cache
+    assert sePushPullStream.solveFile(matrixPath, cachePath, DISTANCE, START_FRAME, START_POSITION,
+                                      chunkSize=17, resume=False) == NUM_FRAMES
+    trajectory = sePushPullStream.sePushPullTrajectory.sePushPullTrajectoryFile(cachePath)
+    assert numpy.array_equal(numpy.array([trajectory.positionsAt(frame) for frame in times]), expected)
@@ -0,0 +1,78 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Tests the adaptive sub steps catch a target passing through the band
+between two frames.'''
+
+import maya.OpenMaya as OpenMaya
+import maya.OpenMayaMPx as OpenMayaMPx
+import maya.cmds as cmds
+
+import sePushPullMath
+
+def buildScene(adaptiveSubsteps, maxSubsteps=8):
+    '''A target crossing the constrained object in one frame, the constrained
+    is only pushed'''
+    OpenMaya.newScene()
+    cmds.createNode('transform', name='target')
+    cmds.createNode('transform', name='constrained')
+    cmds.setAttr('constrained.translate', 0, 0, 0.5)
+    cmds.setKeyframe('target', attribute='translateX', time=1, value=-3)
+    cmds.setKeyframe('target', attribute='translateX', time=2, value=3)
+    OpenMayaMPx.runCommand('sePushPullConstraint', '-d', 1, '-sf', 1, 'target', 'constrained')
+    cmds.setAttr('sePushPullConstraint1.pull', False)
+    cmds.setAttr('sePushPullConstraint1.adaptiveSubsteps', adaptiveSubsteps)
+    cmds.setAttr('sePushPullConstraint1.maxSubsteps', maxSubsteps)
+    cmds.setAttr('sePushPullConstraint1.substepFraction', 0.01)
+
+def play(frames):
+    for frame in frames:
+        cmds.currentTime(frame)
+        position = tuple(cmds.getAttr('constrained.translate')[0])
+    return position, cmds.getAttr('sePushPullConstraint1.substepsTaken')
+
+def fineReference(steps):
+    '''Returns the position solved with the target moved a little at a time'''
+    parentSpace = sePushPullMath.sePushPullParentSpace()
+    parentSpace.update((1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0))
+    position = (0.0, 0.0, 0.5)
+    for step in range(1, steps + 1):
+        target = (-3.0 + 6.0 * step / steps, 0.0, 0.0)
+        position = sePushPullMath.solvePosition(position, target, parentSpace, 1.0, True, False) or position
+    return position
+
+def test_fastTargetPushes(plugin):
+    # in one step the target lands past the band and never touches the constrained
+    buildScene(False)
+    single, taken = play([1, 2])
+    assert single == (0.0, 0.0, 0.5)
+    assert taken == 0
+
+    buildScene(True, maxSubsteps=400)
+    substepped, taken = play([1, 2])
+    assert taken == 400
+    reference = fineReference(20000)
+    assert max(abs(a - b) for a, b in zip(substepped, single)) > 0.1
+    assert max(abs(a - b) for a, b in zip(substepped, reference)) < 1e-2, (substepped, reference)
+
+    # evaluating the frame again keeps the steps taken and the position
+    assert play([2]) == (substepped, 400)
+
+def test_substepsCapped(plugin):
+    buildScene(True, maxSubsteps=8)
+    assert play([1, 2])[1] == 8
+    # a jump of more than a frame is not sub stepped
+    assert play([1, 3])[1] == 0
@@ -0,0 +1,54 @@
+#    sePushPullConstraint - A constraint plugin for Autodesk's Maya
+#    Copyright (C) 2014  Scott Englert - scott@scottenglert.com
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''Tests the trajectory cache file is only checked for changes once a frame.'''
+
+import os
+
+import numpy
+
+import sePushPullTrajectory
+
+def test_checkedOncePerFrame(tmpdir, monkeypatch):
+    path = str(tmpdir.join('trajectory.sepp'))
+    sePushPullTrajectory.write(path, 1, numpy.zeros((4, 2, 3)))
+    trajectoryFile = sePushPullTrajectory.openTrajectoryFile(None, path, 1.0)
+
+    stats = []
+    stat = os.stat
+    monkeypatch.setattr(os, 'stat', lambda path: stats.append(path) or stat(path))
+
+    # evaluating again at the same frame does not look at the file
+    for _ in range(5):
+        assert sePushPullTrajectory.openTrajectoryFile(trajectoryFile, path, 1.0) is trajectoryFile
+    assert not stats
+
+    assert sePushPullTrajectory.openTrajectoryFile(trajectoryFile, path, 2.0) is trajectoryFile
+    assert sePushPullTrajectory.openTrajectoryFile(trajectoryFile, path, 2.0) is trajectoryFile
+    assert len(stats) == 1
+
+    # frames appended to the file are seen at the next frame
+    sePushPullTrajectory.append(path, numpy.ones((2, 2, 3)))
+    assert sePushPullTrajectory.openTrajectoryFile(trajectoryFile, path, 2.0) is trajectoryFile
+    appended = sePushPullTrajectory.openTrajectoryFile(trajectoryFile, path, 3.0)
+    assert appended is not trajectoryFile
+    assert appended.numFrames == 6
+
+    # without a frame it is checked every time like before
+    del stats[:]
+    sePushPullTrajectory.openTrajectoryFile(appended, path)
+    sePushPullTrajectory.openTrajectoryFile(appended, path)
+    assert len(stats) == 2